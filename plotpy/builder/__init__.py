@@ -4,6 +4,8 @@
 # (see plotpy/LICENSE for details)
 
 # pylint: disable=C0103
+# pylint: disable=unused-import
+# flake8: noqa
 
 """
 Item builder
@@ -11,36 +13,36 @@ Item builder
 
 The `builder` module provides a builder singleton class that can be
 used to simplify the creation of plot items.
+
+The builder classes and the :py:data:`plotpy.builder.make` singleton are
+imported on first access (see :mod:`plotpy.lazy`).
 """
 
 from __future__ import annotations
 
-from .annotation import AnnotationBuilder
-from .curvemarker import CurveMarkerCursorBuilder
-from .image import ImageBuilder
-from .label import LabelBuilder
-from .plot import WidgetBuilder
-from .shape import ShapeBuilder
-
-
-class PlotBuilder(
-    WidgetBuilder,
-    CurveMarkerCursorBuilder,
-    ImageBuilder,
-    LabelBuilder,
-    ShapeBuilder,
-    AnnotationBuilder,
-):
-    """Class regrouping a set of factory functions to simplify the creation
-    of plot widgets and plot items.
-
-    It is a singleton class, so you should not create instances of this class
-    but use the :py:data:`plotpy.builder.make` instance instead.
-    """
-
-    def __init__(self):
-        super().__init__()
-
-
-#: Instance of :py:class:`.PlotBuilder`
-make = PlotBuilder()
+from typing import TYPE_CHECKING
+
+from plotpy.lazy import attach
+
+if TYPE_CHECKING:
+    from .annotation import AnnotationBuilder
+    from .curvemarker import CurveMarkerCursorBuilder
+    from .factory import PlotBuilder, make
+    from .image import ImageBuilder
+    from .label import LabelBuilder
+    from .plot import WidgetBuilder
+    from .shape import ShapeBuilder
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AnnotationBuilder": ".annotation",
+        "CurveMarkerCursorBuilder": ".curvemarker",
+        "PlotBuilder": ".factory",
+        "make": ".factory",
+        "ImageBuilder": ".image",
+        "LabelBuilder": ".label",
+        "WidgetBuilder": ".plot",
+        "ShapeBuilder": ".shape",
+    },
+)
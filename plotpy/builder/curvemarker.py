@@ -31,6 +31,7 @@ from plotpy.items import (
     ErrorBarCurveItem,
     HistogramItem,
     Marker,
+    StreamingCurveItem,
     XRangeSelection,
 )
 from plotpy.plot import BasePlot
@@ -123,6 +124,7 @@ class CurveMarkerCursorBuilder:
         baseline: float | None = None,
         dsamp_factor: int | None = None,
         use_dsamp: bool | None = None,
+        dsamp_mode: str | None = None,
     ) -> None:
         """Apply parameters to a :py:class:`.CurveParam` instance"""
         self.__set_baseparam(
@@ -147,6 +149,8 @@ class CurveMarkerCursorBuilder:
             param.dsamp_factor = dsamp_factor
         if use_dsamp is not None:
             param.use_dsamp = use_dsamp
+        if dsamp_mode is not None:
+            param.dsamp_mode = dsamp_mode
 
     def __get_arg_triple_plot(self, args):
         """Convert MATLAB-like arguments into x, y, style"""
@@ -238,7 +242,7 @@ class CurveMarkerCursorBuilder:
             args: x, y, style
             kwargs: title, color, linestyle, linewidth, marker, markersize,
             markerfacecolor, markeredgecolor, shade, curvestyle, baseline,
-            dsamp_factor, use_dsamp
+            dsamp_factor, use_dsamp, dsamp_mode
 
         Returns:
             :py:class:`.CurveItem` object
@@ -267,6 +271,8 @@ class CurveMarkerCursorBuilder:
                 param.dsamp_factor = kwargs.pop("dsamp_factor")
             if "use_dsamp" in kwargs:
                 param.use_dsamp = kwargs.pop("use_dsamp")
+            if "dsamp_mode" in kwargs:
+                param.dsamp_mode = kwargs.pop("dsamp_mode")
             update_style_attr(stylei, param)
             curves.append(self.pcurve(x, yi, param, **kwargs))
         if len(curves) == 1:
@@ -328,6 +334,9 @@ class CurveMarkerCursorBuilder:
         errorbarcap: int | None = None,
         errorbarmode: str | None = None,
         errorbaralpha: float | None = None,
+        dsamp_mode: str | None = None,
+        maxlen: int | None = None,
+        max_age: float | None = None,
     ) -> CurveItem:
         """Make a curve `plot item` from x, y, data
 
@@ -363,6 +372,15 @@ class CurveMarkerCursorBuilder:
              "Both"). Default is None
             errorbaralpha: 0 <= float <= 1 (error bar transparency).
              Default is None
+            dsamp_mode: downsampling mode ("factor": fixed downsampling
+             factor, "m4": min/max envelope or "lttb": largest triangle, the
+             last two being view-dependent). Default is None
+            maxlen: if not None, make a :py:class:`.StreamingCurveItem` object
+             (real-time data acquisition) holding at most `maxlen` points.
+             Default is None
+            max_age: if not None, make a :py:class:`.StreamingCurveItem` object
+             evicting the points older than `max_age` (X data units).
+             Default is None
 
         Returns:
             :py:class:`.CurveItem` object
@@ -400,6 +418,7 @@ class CurveMarkerCursorBuilder:
                 yaxis=yaxis,
                 dsamp_factor=dsamp_factor,
                 use_dsamp=use_dsamp,
+                dsamp_mode=dsamp_mode,
             )
 
         basename = _("Curve")
@@ -423,7 +442,14 @@ class CurveMarkerCursorBuilder:
             baseline,
             dsamp_factor,
             use_dsamp,
+            dsamp_mode,
         )
+        if maxlen is not None or max_age is not None:
+            curve = StreamingCurveItem(param, maxlen, max_age)
+            curve.set_data(x, y)
+            curve.update_params()
+            self.__set_curve_axes(curve, xaxis, yaxis)
+            return curve
         return self.pcurve(x, y, param, xaxis, yaxis)
 
     def merror(self, *args, **kwargs) -> ErrorBarCurveItem:
@@ -517,6 +543,7 @@ class CurveMarkerCursorBuilder:
         yaxis: str = "left",
         dsamp_factor: int | None = None,
         use_dsamp: bool | None = None,
+        dsamp_mode: str | None = None,
     ) -> ErrorBarCurveItem:
         """Make an errorbar curve `plot item`
 
@@ -556,6 +583,8 @@ class CurveMarkerCursorBuilder:
             yaxis: y axis name. Default is 'left'
             dsamp_factor: downsampling factor. Default is None
             use_dsamp: use downsampling. Default is None
+            dsamp_mode: downsampling mode ("factor", "m4" or "lttb").
+             Default is None
 
         Returns:
             :py:class:`.ErrorBarCurveItem` object
@@ -587,6 +616,7 @@ class CurveMarkerCursorBuilder:
             baseline,
             dsamp_factor,
             use_dsamp,
+            dsamp_mode,
         )
         errorbarparam.color = curveparam.line.color
         if errorbarwidth is not None:
@@ -31,13 +31,17 @@ from plotpy import io
 from plotpy.config import _, make_title
 from plotpy.constants import LUTAlpha
 from plotpy.items import (
+    ArrayTileSource,
     ContourItem,
+    ContourMapItem,
     Histogram2DItem,
     ImageItem,
     MaskedImageItem,
     MaskedXYImageItem,
     QuadGridItem,
     RGBImageItem,
+    TiledImageItem,
+    TileSource,
     TrImageItem,
     XYImageItem,
     create_contour_items,
@@ -160,7 +164,9 @@ class ImageBuilder:
         y: numpy.ndarray | None = None,
         lut_range: tuple[float, float] | None = None,
         lock_position: bool = True,
-    ) -> ImageItem | XYImageItem | RGBImageItem:
+        pyramid: str | None = None,
+        tiled: bool | int = False,
+    ) -> ImageItem | XYImageItem | RGBImageItem | TiledImageItem:
         """Make an image `plot item` from data
 
         Args:
@@ -186,11 +192,21 @@ class ImageBuilder:
             y: y data. Default is None
             lut_range: LUT range. Default is None
             lock_position: lock position. Default is True
+            pyramid: reduction method of the multi-resolution pyramid used to
+             draw the image when zoomed out ('mean', 'min', 'max' or 'nearest').
+             Default is None (no pyramid). Ignored if `x` and `y` are specified,
+             not supported if `tiled` is set (levels come from the tile source)
+            tiled: if True (or a tile size, in pixels), data (e.g. a
+             ``numpy.memmap`` or a HDF5 dataset) is displayed out-of-core by a
+             :py:class:`.TiledImageItem`, reading only the tiles which are
+             displayed. Default is False. Data may also be directly a
+             :py:class:`.TileSource` object
 
         Returns:
             :py:class:`.ImageItem` object or
             :py:class:`.XYImageItem` object if `x` and `y` are specified or
-            :py:class:`.RGBImageItem` object if data has 3 dimensions
+            :py:class:`.RGBImageItem` object if data has 3 dimensions or
+            :py:class:`.TiledImageItem` object if data is tiled
         """
         if x is not None or y is not None:
             assert pixel_size is None and center_on is None, (
@@ -237,15 +253,20 @@ class ImageBuilder:
             yc = (0.5 * data.shape[0] - 1) * dy + ipy
             center_on = xc, yc
 
-        if data.ndim == 3:
-            return self.rgbimage(
+        if tiled and not isinstance(data, TileSource):
+            data = ArrayTileSource(data, 512 if tiled is True else tiled)
+        if not isinstance(data, TileSource) and data.ndim == 3:
+            image = self.rgbimage(
                 data=data,
                 filename=filename,
                 title=title,
                 alpha_function=alpha_function,
                 alpha=alpha,
             )
-        assert data.ndim == 2, "Data must have 2 dimensions"
+            if pyramid is not None:
+                image.set_pyramid_mode(pyramid)
+            return image
+        assert len(data.shape) == 2, "Data must have 2 dimensions"
         if pixel_size is None:
             assert (
                 center_on is None
@@ -271,8 +292,13 @@ class ImageBuilder:
             zformat=zformat,
             lock_position=lock_position,
         )
-        image = ImageItem(data, param)
+        if isinstance(data, TileSource):
+            image = TiledImageItem(data, param)
+        else:
+            image = ImageItem(data, param)
         image.set_filename(filename)
+        if pyramid is not None:
+            image.set_pyramid_mode(pyramid)
         if lut_range is not None:
             assert eliminate_outliers is None, (
                 "Ambiguous parameters: both `lut_range`"
@@ -852,6 +878,36 @@ class ImageBuilder:
         """
         return create_contour_items(Z, levels, X, Y)
 
+    def contourmap(
+        self,
+        Z: np.ndarray,
+        levels: float | np.ndarray,
+        X: np.ndarray | None = None,
+        Y: np.ndarray | None = None,
+        title: str | None = None,
+    ) -> ContourMapItem:
+        """Make a contour map item: all contour lines drawn as a single item
+
+        Args:
+            Z: The height values over which the contour is drawn.
+            levels : Level, or levels of the contour lines
+            X: The coordinates of the values in *Z* (1-D array of size M, or 2-D
+             array of the shape of *Z*). If none, they are assumed to be integer
+             indices, i.e. ``X = range(M)``.
+            Y: The coordinates of the values in *Z* (1-D array of size N, or 2-D
+             array of the shape of *Z*). If none, they are assumed to be integer
+             indices, i.e. ``Y = range(N)``.
+            title: Item title. Default is None
+
+        Returns:
+            :py:class:`.ContourMapItem` object
+        """
+        item = ContourMapItem(Z, levels, X, Y)
+        if title is not None:
+            item.param.label = title
+            item.update_params()
+        return item
+
     def histogram2D(
         self,
         X: numpy.ndarray,
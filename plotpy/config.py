@@ -48,6 +48,9 @@ def get_plotpy_defaults() -> dict[str, int | float | str | bool]:
         "plot": {
             "selection/distance": 6,
             "antialiasing": False,
+            # Number of threads used by the scaler engine to draw images
+            # (0: one thread per CPU core)
+            "image/threads": 0,
             "title/font/size": 12,
             "title/font/bold": False,
             "selected_curve_symbol/marker": "Rect",
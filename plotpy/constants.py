@@ -150,6 +150,40 @@ class LUTAlpha(enum.Enum):
         )
 
 
+# Lookup table transfer functions for image items
+class LUTTransfer(enum.Enum):
+    """LUT transfer functions, applied to pixel values before the LUT"""
+
+    #: No transfer function
+    LINEAR = 0
+
+    #: Base-10 logarithm, values being clipped to a floor value (parameter)
+    LOG = 1
+
+    #: Symmetric logarithm: sign(x) * log10(1 + |x| / c), c being the parameter
+    SYMLOG = 2
+
+    #: Gamma curve within the LUT range, gamma being the parameter
+    GAMMA = 3
+
+    #: Inverse hyperbolic sine: asinh(x / c), c being the parameter
+    ASINH = 4
+
+    #: Histogram equalization within the LUT range, the parameter being the
+    #: number of histogram bins
+    EQUALIZE = 5
+
+    def get_default_param(self) -> float:
+        """Return the default parameter of the transfer function"""
+        return {LUTTransfer.GAMMA: 0.5, LUTTransfer.EQUALIZE: LUT_SIZE}.get(self, 1.0)
+
+    def is_scale(self) -> bool:
+        """Return True if the LUT range is expressed in transformed values (the
+        colormap axis is graduated in transformed values), False if the transfer
+        function is a contrast curve within the LUT range (in data values)"""
+        return self in (LUTTransfer.LOG, LUTTransfer.SYMLOG, LUTTransfer.ASINH)
+
+
 # Lookup table size
 LUT_SIZE = 1024
 LUT_MAX = float(LUT_SIZE - 1)
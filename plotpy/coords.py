@@ -18,6 +18,7 @@ The following functions are available:
 * :py:func:`.canvas_to_axes`
 * :py:func:`.axes_to_canvas`
 * :py:func:`.pixelround`
+* :py:func:`.qpointf_array_from_coords`
 
 Reference
 ^^^^^^^^^
@@ -25,6 +26,7 @@ Reference
 .. autofunction:: canvas_to_axes
 .. autofunction:: axes_to_canvas
 .. autofunction:: pixelround
+.. autofunction:: qpointf_array_from_coords
 """
 
 from __future__ import annotations
@@ -32,6 +34,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import numpy as np
+from qtpy import QtCore as QC
+
+try:
+    from qtpy import sip
+except ImportError:  # PySide
+    sip = None
 
 if TYPE_CHECKING:
     from qtpy.QtCore import QPointF
@@ -91,3 +99,30 @@ def pixelround(x: float, corner: str | None = None) -> int:
         return np.ceil(x)
     elif corner == "TL":
         return np.floor(x)
+
+
+def qpointf_array_from_coords(coords: np.ndarray) -> sip.array | None:
+    """Return a Qt array of points holding the given canvas coordinates
+
+    The coordinates are copied once to the memory of the Qt array, so that
+    painter methods taking an array of points (e.g. ``drawPolyline``,
+    ``drawLines``) may be called on the whole array, or on slices of it,
+    without creating one Qt object per point.
+
+    Args:
+        coords: Coordinates, as an array of shape (N, 2) (or any array with an
+         even number of values, interpreted as (x, y) pairs in order)
+
+    Returns:
+        Array of N points, or None if Qt arrays of points are not supported by
+        the Qt bindings (e.g. PySide): the caller should then fall back to
+        :py:func:`qwt.plot_curve.array2d_to_qpolygonf`
+    """
+    if sip is None or not hasattr(sip, "array"):
+        return None
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    points = sip.array(QC.QPointF, coords.shape[0])
+    if coords.shape[0] > 0:
+        memory = np.frombuffer(memoryview(points).cast("B"), np.float64)
+        memory.reshape(coords.shape)[...] = coords
+    return points
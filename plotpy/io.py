@@ -17,6 +17,7 @@ The `io` module provides the following input/output helper functions:
 * :py:func:`.io.imread`: load an image (.png, .tiff,
     .dicom, etc.) and return its data as a NumPy array
 * :py:func:`.io.imwrite`: save an array to an image file
+* :py:func:`.io.rgb_to_grayscale`: convert a RGB(A) image to grayscale
 * :py:func:`.io.load_items`: load plot items from HDF5
 * :py:func:`.io.save_items`: save plot items to HDF5
 
@@ -25,12 +26,14 @@ Reference
 
 .. autofunction:: imread
 .. autofunction:: imwrite
+.. autofunction:: rgb_to_grayscale
 .. autofunction:: load_items
 .. autofunction:: save_items
 """
 
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os.path as osp
 import re
@@ -233,14 +236,20 @@ iohandler = ImageIOHandler()
 # ==============================================================================
 
 
-def _imread_tiff(filename):
-    """Open a TIFF image and return a NumPy array"""
+def _imread_tiff(filename, mmap=False, **kwargs):
+    """Open a TIFF image and return a NumPy array (memory-mapped array if `mmap`
+    is True and image data is uncompressed and contiguous in the file)"""
     try:
         import tifffile
-
-        return tifffile.imread(filename)
     except ImportError:
         return _imread_pil(filename)
+    if mmap:
+        try:
+            return tifffile.memmap(filename, mode="r")
+        except ValueError:
+            # Image data is compressed, or not contiguous: it can't be mapped
+            pass
+    return tifffile.imread(filename)
 
 
 def _imwrite_tiff(filename, arr):
@@ -365,27 +374,52 @@ def _imwrite_pil(filename, arr):
 # ==============================================================================
 def _import_dcm():
     """DICOM Import function (checking for required libraries):
-    DICOM support requires library `pydicom`"""
+    DICOM support requires library `pydicom`
+
+    pydicom is slow to import: it is only looked for here, and imported when
+    reading the first DICOM file (see :py:func:`_get_dcmread`)"""
+    if importlib.util.find_spec("pydicom") is None:
+        raise ImportError("DICOM support requires library `pydicom`")
+
 
+def _get_dcmread():
+    """Import pydicom and return its `dcmread` function"""
     logger = logging.getLogger("pydicom")
     logger.setLevel(logging.CRITICAL)
 
-    # This import statement must stay here because the purpose of this function
-    # is to check if pydicom is installed:
     # pylint: disable=import-outside-toplevel
     # pylint: disable=import-error
-    from pydicom import dcmread  # type:ignore # noqa: F401
+    from pydicom import dcmread  # type:ignore
 
     logger.setLevel(logging.WARNING)
+    return dcmread
 
 
-def _imread_dcm(filename, **kwargs):
-    """Open DICOM image with pydicom and return a NumPy array"""
-    # pylint: disable=import-outside-toplevel
-    # pylint: disable=import-error
-    from pydicom import dcmread  # type:ignore
+def _memmap_dcm(filename, dcm, dtype):
+    """Return memory-mapped pixel data of DICOM file, or None if pixel data
+    can't be mapped (data not deferred, encapsulated i.e. compressed, or in
+    non-native byte order)"""
+    try:
+        elem = dcm.get_item(0x7FE00010, keep_deferred=True)
+    except TypeError:  # keep_deferred is not supported by this pydicom version
+        return None
+    if (
+        getattr(elem, "value_tell", None) is None
+        or elem.value is not None
+        or elem.length == 0xFFFFFFFF
+        or elem.is_little_endian != (sys.byteorder == "little")
+    ):
+        return None
+    count = elem.length // dtype.itemsize
+    return np.memmap(filename, dtype, mode="r", offset=elem.value_tell, shape=count)
 
-    dcm = dcmread(filename, force=True)
+
+def _imread_dcm(filename, mmap=False, **kwargs):
+    """Open DICOM image with pydicom and return a NumPy array (memory-mapped
+    array if `mmap` is True and pixel data is uncompressed)"""
+    dcmread = _get_dcmread()
+    # Pixel data is not read when mapped (large elements reading is deferred)
+    dcm = dcmread(filename, force=True, defer_size=1024 if mmap else None)
     # **********************************************************************
     # The following is necessary until pydicom numpy support is improved:
     # (after that, a simple: 'arr = dcm.PixelArray' will work the same)
@@ -398,15 +432,17 @@ def _imread_dcm(filename, **kwargs):
             "PixelRepresentation=%d, BitsAllocated=%d"
             % (dcm.PixelRepresentation, dcm.BitsAllocated)
         )
-    arr = np.frombuffer(dcm.PixelData, dtype)
-    try:
-        # pydicom 0.9.3:
-        dcm_is_little_endian = dcm.isLittleEndian
-    except AttributeError:
-        # pydicom 0.9.4:
-        dcm_is_little_endian = dcm.is_little_endian
-    if dcm_is_little_endian != (sys.byteorder == "little"):
-        arr.byteswap(True)
+    arr = _memmap_dcm(filename, dcm, dtype) if mmap else None
+    if arr is None:
+        arr = np.frombuffer(dcm.PixelData, dtype)
+        try:
+            # pydicom 0.9.3:
+            dcm_is_little_endian = dcm.isLittleEndian
+        except AttributeError:
+            # pydicom 0.9.4:
+            dcm_is_little_endian = dcm.is_little_endian
+        if dcm_is_little_endian != (sys.byteorder == "little"):
+            arr = arr.byteswap()  # Pixel data buffer is read-only
     spp = getattr(dcm, "SamplesperPixel", 1)
     if hasattr(dcm, "NumberOfFrames") and dcm.NumberOfFrames > 1:
         if spp > 1:
@@ -459,14 +495,28 @@ def _imwrite_dcm(filename, arr, template=None):
 # Text files Private I/O functions
 # ==============================================================================
 def _imread_txt(filename, **kwargs):
-    """Open text file image and return a NumPy array"""
-    for delimiter in ("\t", ",", " ", ";"):
-        try:
-            return np.loadtxt(filename, delimiter=delimiter)
-        except ValueError:
-            continue
+    """Open text file image and return a NumPy array (the delimiter is guessed
+    from the first line of data, so that the file is parsed only once)"""
+    line = ""
+    with open(filename, encoding="utf-8", errors="replace") as fdesc:
+        for line in fdesc:
+            if line.strip() and not line.lstrip().startswith("#"):
+                break
+    for delimiter in ("\t", ",", ";"):
+        if delimiter in line:
+            break
     else:
-        raise ValueError(f"Could not load {filename!r}")
+        delimiter = None  # Any whitespace
+    try:
+        return np.loadtxt(filename, delimiter=delimiter)
+    except ValueError as exc:
+        raise ValueError(f"Could not load {filename!r}") from exc
+
+
+def _imread_npy(filename, mmap=False, **kwargs):
+    """Open NumPy array file and return a NumPy array (memory-mapped array if
+    `mmap` is True)"""
+    return np.load(filename, mmap_mode="r" if mmap else None)
 
 
 def _imwrite_txt(filename, arr):
@@ -502,7 +552,7 @@ iohandler.add(
     write_func=_imwrite_pil,
     data_types=(np.uint8,),
 )
-iohandler.add(_("NumPy arrays"), "*.npy", read_func=np.load, write_func=np.save)
+iohandler.add(_("NumPy arrays"), "*.npy", read_func=_imread_npy, write_func=np.save)
 iohandler.add(
     _("Text files"), "*.txt *.csv *.asc", read_func=_imread_txt, write_func=_imwrite_txt
 )
@@ -520,8 +570,40 @@ iohandler.add(
 # ==============================================================================
 # Generic image read/write functions
 # ==============================================================================
+#: Number of pixels converted at once to grayscale (see :py:func:`rgb_to_grayscale`)
+GRAYSCALE_CHUNK_SIZE = 1 << 20
+
+
+def rgb_to_grayscale(arr: np.ndarray) -> np.ndarray:
+    """Convert a RGB(A) image to grayscale (mean of color channels and alpha
+    channel), by chunks of rows: temporary floating point data is limited to a
+    chunk, and memory-mapped data is read progressively
+
+    Args:
+        arr: RGB(A) image (3-D array)
+
+    Returns:
+        Grayscale image (2-D array of the data type of `arr`)
+    """
+    out = np.empty(arr.shape[:2], arr.dtype)
+    nchannels = min(arr.shape[2], 4)
+    nrows = max(GRAYSCALE_CHUNK_SIZE // max(arr.shape[1], 1), 1)
+    for row in range(0, arr.shape[0], nrows):
+        chunk = arr[row : row + nrows, :, :4]
+        if arr.dtype in (np.uint8, np.uint16):
+            # Integer mean, rounded down as the cast of the floating point mean
+            total = chunk[..., 0].astype(np.uint32)
+            for channel in range(1, nchannels):
+                total += chunk[..., channel]
+            total //= nchannels
+            out[row : row + nrows] = total
+        else:
+            out[row : row + nrows] = chunk.mean(axis=2)
+    return out
+
+
 def imread(
-    fname: str, ext: str | None = None, to_grayscale: bool = False
+    fname: str, ext: str | None = None, to_grayscale: bool = False, mmap: bool = False
 ) -> np.ndarray:
     """Read an image from a file as a NumPy array
 
@@ -529,20 +611,25 @@ def imread(
         fname: image filename
         ext: image file extension (if None, extension is guessed from filename)
         to_grayscale: convert RGB images to grayscale
+        mmap: if True, return a read-only memory-mapped array when the file
+         format allows it (uncompressed TIFF files, NumPy arrays and uncompressed
+         DICOM files): opening the file is then immediate, whatever its size, and
+         data is read from disk on demand (e.g. when displayed). Other files are
+         read as usual. Default is False
+
+    Returns:
+        Image data
     """
     if not isinstance(fname, str):
         fname = str(fname)  # in case filename is a QString instance
     if ext is None:
         _base, ext = osp.splitext(fname)
-    arr = iohandler.get_readfunc(ext)(fname)
-    dtype = arr.dtype
+    read_func = iohandler.get_readfunc(ext)
+    arr = read_func(fname, mmap=True) if mmap else read_func(fname)
     if to_grayscale and arr.ndim == 3:
         # Converting to grayscale
-        arr = arr[..., :4].mean(axis=2)
-        arr = arr.astype(dtype)
-        return arr
-    else:
-        return arr
+        return rgb_to_grayscale(arr)
+    return arr
 
 
 def imwrite(
@@ -597,6 +684,7 @@ register_serializable_items(
     [
         "CurveItem",
         "PolygonMapItem",
+        "ContourMapItem",
         "ErrorBarCurveItem",
         "RawImageItem",
         "ImageItem",
@@ -3,66 +3,147 @@
 # pylint: disable=unused-import
 # flake8: noqa
 
-from .annotation import (
-    AnnotatedCircle,
-    AnnotatedEllipse,
-    AnnotatedObliqueRectangle,
-    AnnotatedPoint,
-    AnnotatedRectangle,
-    AnnotatedPolygon,
-    AnnotatedSegment,
-    AnnotatedShape,
-)
-from .contour import ContourItem, create_contour_items
-from .curve import CurveItem, ErrorBarCurveItem
-from .grid import GridItem
-from .histogram import HistogramItem
-from .image import (
-    BaseImageItem,
-    Histogram2DItem,
-    ImageFilterItem,
-    ImageItem,
-    MaskedImageItem,
-    MaskedXYImageItem,
-    QuadGridItem,
-    RawImageItem,
-    RGBImageItem,
-    TrImageItem,
-    XYImageFilterItem,
-    XYImageItem,
-    assemble_imageitems,
-    compute_trimageitems_original_size,
-    get_image_from_plot,
-    get_image_from_qrect,
-    get_image_in_shape,
-    get_items_in_rectangle,
-    get_plot_qrect,
-)
-from .image.masked import MaskedArea, MaskedImageItem, MaskedXYImageItem
-from .label import (
-    AbstractLabelItem,
-    DataInfoLabel,
-    LabelItem,
-    LegendBoxItem,
-    ObjectInfo,
-    RangeComputation,
-    RangeComputation2d,
-    RangeInfo,
-    SelectedLegendBoxItem,
-)
-from .polygonmap import PolygonMapItem
-from .shape import (
-    AbstractShape,
-    Axes,
-    CircleSVGShape,
-    EllipseShape,
-    Marker,
-    ObliqueRectangleShape,
-    PointShape,
-    PolygonShape,
-    RectangleShape,
-    RectangleSVGShape,
-    SegmentShape,
-    SquareSVGShape,
-    XRangeSelection,
+from typing import TYPE_CHECKING
+
+from plotpy.lazy import attach
+
+if TYPE_CHECKING:
+    from .annotation import (
+        AnnotatedCircle,
+        AnnotatedEllipse,
+        AnnotatedObliqueRectangle,
+        AnnotatedPoint,
+        AnnotatedRectangle,
+        AnnotatedPolygon,
+        AnnotatedSegment,
+        AnnotatedShape,
+    )
+    from .contour import ContourItem, ContourMapItem, create_contour_items
+    from .curve import CurveItem, ErrorBarCurveItem, StreamingCurveItem
+    from .grid import GridItem
+    from .histogram import HistogramItem
+    from .image import (
+        ArrayTileSource,
+        BaseImageItem,
+        Histogram2DItem,
+        ImageFilterItem,
+        ImageItem,
+        MaskedImageItem,
+        MaskedXYImageItem,
+        QuadGridItem,
+        RawImageItem,
+        RGBImageItem,
+        TileCache,
+        TiledArray,
+        TiledImageItem,
+        TileSource,
+        TrImageItem,
+        XYImageFilterItem,
+        XYImageItem,
+        assemble_imageitems,
+        compute_trimageitems_original_size,
+        get_image_from_plot,
+        get_image_from_qrect,
+        get_image_in_shape,
+        get_items_in_rectangle,
+        get_plot_qrect,
+    )
+    from .image.masked import MaskedArea, MaskedImageItem, MaskedXYImageItem
+    from .label import (
+        AbstractLabelItem,
+        DataInfoLabel,
+        LabelItem,
+        LegendBoxItem,
+        ObjectInfo,
+        RangeComputation,
+        RangeComputation2d,
+        RangeInfo,
+        SelectedLegendBoxItem,
+    )
+    from .polygonmap import PolygonMapItem
+    from .shape import (
+        AbstractShape,
+        Axes,
+        CircleSVGShape,
+        EllipseShape,
+        Marker,
+        ObliqueRectangleShape,
+        PointShape,
+        PolygonShape,
+        RectangleShape,
+        RectangleSVGShape,
+        SegmentShape,
+        SquareSVGShape,
+        XRangeSelection,
+    )
+
+# Objects are imported from their submodule on first access (see plotpy.lazy)
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AnnotatedCircle": ".annotation",
+        "AnnotatedEllipse": ".annotation",
+        "AnnotatedObliqueRectangle": ".annotation",
+        "AnnotatedPoint": ".annotation",
+        "AnnotatedRectangle": ".annotation",
+        "AnnotatedPolygon": ".annotation",
+        "AnnotatedSegment": ".annotation",
+        "AnnotatedShape": ".annotation",
+        "ContourItem": ".contour",
+        "ContourMapItem": ".contour",
+        "create_contour_items": ".contour",
+        "CurveItem": ".curve",
+        "ErrorBarCurveItem": ".curve",
+        "StreamingCurveItem": ".curve",
+        "GridItem": ".grid",
+        "HistogramItem": ".histogram",
+        "ArrayTileSource": ".image",
+        "BaseImageItem": ".image",
+        "Histogram2DItem": ".image",
+        "ImageFilterItem": ".image",
+        "ImageItem": ".image",
+        "MaskedImageItem": ".image.masked",
+        "MaskedXYImageItem": ".image.masked",
+        "QuadGridItem": ".image",
+        "RawImageItem": ".image",
+        "RGBImageItem": ".image",
+        "TileCache": ".image",
+        "TiledArray": ".image",
+        "TiledImageItem": ".image",
+        "TileSource": ".image",
+        "TrImageItem": ".image",
+        "XYImageFilterItem": ".image",
+        "XYImageItem": ".image",
+        "assemble_imageitems": ".image",
+        "compute_trimageitems_original_size": ".image",
+        "get_image_from_plot": ".image",
+        "get_image_from_qrect": ".image",
+        "get_image_in_shape": ".image",
+        "get_items_in_rectangle": ".image",
+        "get_plot_qrect": ".image",
+        "MaskedArea": ".image.masked",
+        "AbstractLabelItem": ".label",
+        "DataInfoLabel": ".label",
+        "LabelItem": ".label",
+        "LegendBoxItem": ".label",
+        "ObjectInfo": ".label",
+        "RangeComputation": ".label",
+        "RangeComputation2d": ".label",
+        "RangeInfo": ".label",
+        "SelectedLegendBoxItem": ".label",
+        "PolygonMapItem": ".polygonmap",
+        "AbstractShape": ".shape",
+        "Axes": ".shape",
+        "CircleSVGShape": ".shape",
+        "EllipseShape": ".shape",
+        "Marker": ".shape",
+        "ObliqueRectangleShape": ".shape",
+        "PointShape": ".shape",
+        "PolygonShape": ".shape",
+        "RectangleShape": ".shape",
+        "RectangleSVGShape": ".shape",
+        "SegmentShape": ".shape",
+        "SquareSVGShape": ".shape",
+        "XRangeSelection": ".shape",
+    },
 )
@@ -14,23 +14,51 @@ This module provides functions and classes to create contour curves.
 
 .. autofunction:: compute_contours
 
+.. autoclass:: ContourEngine
+   :members:
+
 .. autoclass:: ContourItem
    :members:
 
 .. autofunction:: create_contour_items
+
+.. autoclass:: ContourMapItem
+   :members:
 """
 
 from __future__ import annotations
 
+import collections
+from typing import TYPE_CHECKING
+
 import guidata.dataset as gds
 import numpy as np
+from guidata.dataset import update_dataset
 from guidata.utils.misc import assert_interfaces_valid
-from skimage import measure
+from qtpy import QtCore as QC
+from qtpy import QtGui as QG
+from qwt.plot_curve import array2d_to_qpolygonf
 
-from plotpy.config import _
+from plotpy.config import CONF, _
+from plotpy.coords import qpointf_array_from_coords
+from plotpy.items.polygonmap import PolygonMapItem, cull_polygons, get_canvas_scale
 from plotpy.items.shape.polygon import PolygonShape
+from plotpy.mathutils.threads import get_threads_count, map_ordered
 from plotpy.styles import ShapeParam
 
+if TYPE_CHECKING:
+    import guidata.io
+    from qwt import QwtScaleMap
+
+    from plotpy.styles.base import ItemParameters
+
+#: Default size of the tiles in which contour lines are computed (in pixels)
+CONTOUR_TILE_SIZE = 512
+
+#: Default maximum number of cached contour lines computations (one per tile and
+#: level), see :py:class:`ContourEngine`
+CONTOUR_CACHE_SIZE = 4096
+
 
 class ContourLine(gds.DataSet):
     """A contour line"""
@@ -44,6 +72,7 @@ def compute_contours(
     levels: float | np.ndarray,
     X: np.ndarray | None = None,
     Y: np.ndarray | None = None,
+    nthreads: int = 1,
 ) -> list[ContourLine]:
     """Create contour curves
 
@@ -63,6 +92,10 @@ def compute_contours(
          ``numpy.meshgrid``), or it must both be 1-D such that ``len(Y) == N``
          is the number of rows in *Z*.
          If none, they are assumed to be integer indices, i.e. ``Y = range(N)``.
+        nthreads: Number of threads computing the levels (0: one per CPU core,
+         None: ``image/threads`` option of the ``plot`` configuration section).
+         Default is 1: scikit-image's ``find_contours`` holds the GIL (lines
+         are assembled in Python), so that threads are serialized
 
     Returns:
         A list of :py:class:`ContourLine` instances.
@@ -87,10 +120,19 @@ def compute_contours(
     else:
         delta_y, y_origin = Y[1, 0] - Y[0, 0], Y[0, 0]
 
-    # Find contours in the binary image for each level
+    # pylint: disable=import-outside-toplevel
+    from skimage import measure
+
+    # Find contours in the binary image for each level (levels are independent,
+    # but threads are serialized by the GIL: see `nthreads` argument)
     clines = []
-    for level in levels:
-        for contour in measure.find_contours(Z, level):
+    results = map_ordered(
+        lambda level: measure.find_contours(Z, level),
+        list(levels),
+        get_threads_count(nthreads),
+    )
+    for level, contours in zip(levels, results):
+        for contour in contours:
             contour = contour.squeeze()
             if len(contour) > 1:  # Avoid single points
                 line = np.zeros_like(contour, dtype=np.float32)
@@ -101,6 +143,217 @@ def compute_contours(
     return clines
 
 
+class ContourEngine:
+    """Contour lines computation engine
+
+    The image is split in tiles, which share their border rows and columns:
+    contour lines are computed for each tile and each level independently.
+    Results are cached (the least recently used results are dropped beyond
+    `cache_size` tiles and levels), so that:
+
+    * changing levels only computes the new levels,
+    * changing a region of the image (see :py:meth:`set_data`) only computes
+      the tiles intersecting this region again.
+
+    Tiles may be computed in a pool of threads, but scikit-image's
+    ``find_contours`` holds the GIL (lines are assembled in Python): threads
+    are serialized and tiles are computed one at a time by default.
+
+    Lines crossing the border of a tile are split in several lines (which
+    share their end points), so that computed lines are meant to be drawn
+    (e.g. by a :py:class:`ContourMapItem`): see :py:func:`compute_contours`
+    to get whole contour lines.
+
+    Args:
+        Z: The height values over which the contour is drawn.
+        X: The coordinates of the values in *Z* (1-D array of size M, or 2-D
+         array of the shape of *Z*). If none, they are assumed to be integer
+         indices, i.e. ``X = range(M)``.
+        Y: The coordinates of the values in *Z* (1-D array of size N, or 2-D
+         array of the shape of *Z*). If none, they are assumed to be integer
+         indices, i.e. ``Y = range(N)``.
+        tile_size: Size of tiles (in pixels). Default is None (i.e.
+         :py:data:`CONTOUR_TILE_SIZE`)
+        nthreads: Number of threads (0: one per CPU core, None: ``image/threads``
+         option of the ``plot`` configuration section). Default is 1 (threads
+         are serialized by the GIL, see above)
+        cache_size: Maximum number of cached results (one per tile and level).
+         Default is None (i.e. :py:data:`CONTOUR_CACHE_SIZE`)
+    """
+
+    def __init__(
+        self,
+        Z: np.ndarray,
+        X: np.ndarray | None = None,
+        Y: np.ndarray | None = None,
+        tile_size: int | None = None,
+        nthreads: int | None = 1,
+        cache_size: int | None = None,
+    ) -> None:
+        self.tile_size = CONTOUR_TILE_SIZE if tile_size is None else int(tile_size)
+        self.nthreads = nthreads
+        if cache_size is None:
+            cache_size = CONTOUR_CACHE_SIZE
+        self.cache_size = cache_size
+        #: Data version, incremented each time data is changed
+        self.version = 0
+        self.z: np.ndarray | None = None
+        self.x: np.ndarray | None = None
+        self.y: np.ndarray | None = None
+        self._row_bounds: np.ndarray | None = None
+        self._col_bounds: np.ndarray | None = None
+        # Contour lines of tiles (index coordinates): {(ti, tj, level): lines},
+        # in least recently used order
+        self._cache: collections.OrderedDict[
+            tuple[int, int, float], list[np.ndarray]
+        ] = collections.OrderedDict()
+        self._lines_key = None
+        self._lines = None
+        self.set_data(Z, X, Y)
+
+    def get_tile_bounds(self, n: int) -> np.ndarray:
+        """Return the bounds of tiles along an axis: tile k spans indices
+        bounds[k] to bounds[k + 1] (included)
+
+        Args:
+            n: Number of pixels along the axis
+
+        Returns:
+            Tile bounds
+        """
+        return np.append(np.arange(0, n - 1, self.tile_size), n - 1)
+
+    def set_data(
+        self,
+        Z: np.ndarray,
+        X: np.ndarray | None = None,
+        Y: np.ndarray | None = None,
+        rect: tuple[int, int, int, int] | None = None,
+    ) -> None:
+        """Set data
+
+        Args:
+            Z: The height values over which the contour is drawn.
+            X: The coordinates of the values in *Z* (see :py:class:`ContourEngine`)
+            Y: The coordinates of the values in *Z* (see :py:class:`ContourEngine`)
+            rect: Region (i0, i1, j0, j1) of the data which has changed since
+             the last call, i.e. rows i0 to i1 and columns j0 to j1 (excluded):
+             cached contour lines of the tiles intersecting this region are
+             computed again. Default is None (i.e. the whole data has changed).
+             Region is ignored if the shape of data or the coordinates change.
+        """
+        z = np.asarray(Z, dtype=np.float64)
+        if z.ndim != 2:
+            raise TypeError("Input z must be a 2D array.")
+        elif z.shape[0] < 2 or z.shape[1] < 2:
+            raise TypeError("Input z must be at least a 2x2 array.")
+        ni, nj = z.shape
+        x = np.arange(nj, dtype=np.float64) if X is None else np.asarray(X, float)
+        y = np.arange(ni, dtype=np.float64) if Y is None else np.asarray(Y, float)
+        x = x[0, :] if x.ndim == 2 else x
+        y = y[:, 0] if y.ndim == 2 else y
+        if x.shape != (nj,) or y.shape != (ni,):
+            raise TypeError("Coordinates must match the shape of z.")
+        if (
+            rect is None
+            or self.z is None
+            or self.z.shape != z.shape
+            or not np.array_equal(self.x, x)
+            or not np.array_equal(self.y, y)
+        ):
+            self._cache.clear()
+            self._row_bounds = self.get_tile_bounds(ni)
+            self._col_bounds = self.get_tile_bounds(nj)
+        else:
+            # Tiles which cells (pixel squares) contain a changed pixel
+            i0, i1, j0, j1 = rect
+            rb, cb = self._row_bounds, self._col_bounds
+            rows = np.flatnonzero((rb[:-1] < i1) & (rb[1:] >= i0))
+            cols = np.flatnonzero((cb[:-1] < j1) & (cb[1:] >= j0))
+            rows, cols = set(rows.tolist()), set(cols.tolist())
+            for key in list(self._cache):
+                if key[0] in rows and key[1] in cols:
+                    del self._cache[key]
+        self.z, self.x, self.y = z, x, y
+        self.version += 1
+
+    def __compute_tile(self, task: tuple[int, int, float]) -> list[np.ndarray]:
+        """Compute contour lines of a tile, in index coordinates
+
+        Args:
+            task: Tile row and column indices, and level
+
+        Returns:
+            List of lines (arrays of (row, column) coordinates)
+        """
+        # pylint: disable=import-outside-toplevel
+        from skimage import measure
+
+        ti, tj, level = task
+        i0, i1 = self._row_bounds[ti : ti + 2]
+        j0, j1 = self._col_bounds[tj : tj + 2]
+        lines = []
+        for contour in measure.find_contours(self.z[i0 : i1 + 1, j0 : j1 + 1], level):
+            if len(contour) > 1:  # Avoid single points
+                contour += (i0, j0)
+                lines.append(contour)
+        return lines
+
+    def get_lines(
+        self, levels: float | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return contour lines
+
+        Args:
+            levels: Level, or levels of the contour lines
+
+        Returns:
+            Tuple (points, starts, line_levels): array of the (x, y) coordinates
+            of line points (Mx2), array of the indices of the first point of
+            each line (N), and array of the level of each line (N)
+        """
+        levels = np.atleast_1d(np.asarray(levels, dtype=np.float64)).ravel()
+        key = (self.version, tuple(levels.tolist()))
+        if key == self._lines_key:
+            return self._lines
+        ntr, ntc = len(self._row_bounds) - 1, len(self._col_bounds) - 1
+        tasks = [
+            (ti, tj, level)
+            for level in levels.tolist()
+            for ti in range(ntr)
+            for tj in range(ntc)
+        ]
+        missing = [task for task in tasks if task not in self._cache]
+        results = map_ordered(
+            self.__compute_tile, missing, get_threads_count(self.nthreads)
+        )
+        computed = dict(zip(missing, results))
+        lines, line_levels = [], []
+        for task in tasks:
+            task_lines = computed.get(task)
+            if task_lines is None:
+                task_lines = self._cache[task]
+                self._cache.move_to_end(task)
+            lines += task_lines
+            line_levels += [task[2]] * len(task_lines)
+        self._cache.update(computed)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        counts = np.array([len(line) for line in lines], dtype=np.intp)
+        starts = np.cumsum(counts) - counts
+        if lines:
+            ij = np.concatenate(lines)
+        else:
+            ij = np.zeros((0, 2))
+        # Index coordinates to data coordinates
+        points = np.empty_like(ij)
+        points[:, 0] = np.interp(ij[:, 1], np.arange(self.x.size), self.x)
+        points[:, 1] = np.interp(ij[:, 0], np.arange(self.y.size), self.y)
+        self._lines_key = key
+        self._lines = points, starts, np.array(line_levels, dtype=np.float64)
+        return self._lines
+
+
 class ContourItem(PolygonShape):
     """Contour shape"""
 
@@ -156,3 +409,265 @@ def create_contour_items(
         item.setTitle(_("Contour") + f"[Z={cline.level}]")
         items.append(item)
     return items
+
+
+def simplify_lines(
+    pts: np.ndarray,
+    starts: np.ndarray,
+    indices: np.ndarray,
+    scale: tuple[float, float, float, float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Transform lines to canvas coordinates, merging the consecutive points of
+    each line which are in the same canvas pixel (level-of-detail simplification:
+    the first and last points of lines are always kept)
+
+    Args:
+        pts: Array of points (Mx2)
+        starts: Array of the indices of the first point of each line (N)
+        indices: Indices of the lines to be transformed
+        scale: Linear transform coefficients (ax, bx, ay, by) from plot coordinates
+         to canvas coordinates (x -> ax * x + bx)
+
+    Returns:
+        Tuple (points, counts): array of the canvas coordinates of the points of
+        the simplified lines (Kx2), and array of the number of points of each line
+    """
+    ax, bx, ay, by = scale
+    counts = np.diff(np.append(starts, pts.shape[0]))[indices]
+    ends = np.cumsum(counts)
+    size = int(ends[-1]) if ends.size else 0
+    offsets = np.repeat(starts[indices] - (ends - counts), counts)
+    pts = pts[np.arange(size) + offsets]
+    x, y = ax * pts[:, 0] + bx, ay * pts[:, 1] + by
+    col, row = np.floor(x), np.floor(y)
+    keep = np.ones(size, dtype=bool)
+    keep[1:] = (col[1:] != col[:-1]) | (row[1:] != row[:-1])
+    keep[ends - counts] = True
+    keep[ends - 1] = True
+    kept = np.cumsum(keep)[ends - 1]
+    return np.column_stack((x[keep], y[keep])), np.diff(np.append(0, kept))
+
+
+class ContourMapItem(PolygonMapItem):
+    """Contour lines drawn as a single plot item
+
+    Contour lines of all levels are computed and cached by a
+    :py:class:`ContourEngine`. When drawing the item, lines outside the canvas
+    are culled and lines are simplified to the canvas resolution (see
+    :py:func:`simplify_lines`), so that thousands of lines are drawn with a
+    single pen, without creating a plot item per line.
+
+    Args:
+        Z: The height values over which the contour is drawn (Default value = None)
+        levels: Level, or levels of the contour lines (Default value = None)
+        X: The coordinates of the values in *Z* (see :py:class:`ContourEngine`)
+        Y: The coordinates of the values in *Z* (see :py:class:`ContourEngine`)
+        param: Shape parameters (style of lines). Default is None (i.e. the
+         ``shape/contour`` style of the ``plot`` configuration section)
+    """
+
+    _icon_name = "contour.png"
+
+    def __init__(
+        self,
+        Z: np.ndarray | None = None,
+        levels: float | np.ndarray | None = None,
+        X: np.ndarray | None = None,
+        Y: np.ndarray | None = None,
+        param: ShapeParam | None = None,
+    ) -> None:
+        if param is None:
+            param = ShapeParam(_("Contour"), icon="contour.png")
+            param.read_config(CONF, "plot", "shape/contour")
+            param.label = _("Contour")
+        super().__init__(param)
+        self.engine: ContourEngine | None = None
+        self.levels = np.zeros(0)
+        self._levels = None  # Level of each line (N)
+        if Z is not None:
+            self.set_contour_data(Z, X, Y)
+        if levels is not None:
+            self.set_levels(levels)
+
+    def __reduce__(self):
+        engine = self.engine
+        data = (None, None, None) if engine is None else (engine.z, engine.x, engine.y)
+        state = (self.param, data, self.levels, self.z())
+        return (self.__class__, (), state)
+
+    def __setstate__(self, state):
+        param, (z, x, y), levels, zorder = state
+        self.param = param
+        if z is not None:
+            self.set_contour_data(z, x, y)
+        self.set_levels(levels)
+        self.setZ(zorder)
+        self.update_params()
+
+    def serialize(
+        self,
+        writer: guidata.io.HDF5Writer | guidata.io.INIWriter | guidata.io.JSONWriter,
+    ) -> None:
+        """Serialize object to HDF5 writer
+
+        Args:
+            writer: HDF5, INI or JSON writer
+        """
+        writer.write(self.engine.z, group_name="Zdata")
+        writer.write(self.engine.x, group_name="Xdata")
+        writer.write(self.engine.y, group_name="Ydata")
+        writer.write(self.levels, group_name="levels")
+        writer.write(self.z(), group_name="z")
+        self.param.update_param(self)
+        writer.write(self.param, group_name="param")
+
+    def deserialize(
+        self,
+        reader: guidata.io.HDF5Reader | guidata.io.INIReader | guidata.io.JSONReader,
+    ) -> None:
+        """Deserialize object from HDF5 reader
+
+        Args:
+            reader: HDF5, INI or JSON reader
+        """
+        z = reader.read(group_name="Zdata", func=reader.read_array)
+        x = reader.read(group_name="Xdata", func=reader.read_array)
+        y = reader.read(group_name="Ydata", func=reader.read_array)
+        self.set_contour_data(z, x, y)
+        self.set_levels(reader.read(group_name="levels", func=reader.read_array))
+        self.setZ(reader.read("z"))
+        self.param = ShapeParam(_("Contour"), icon="contour.png")
+        reader.read("param", instance=self.param)
+        self.update_params()
+
+    def set_contour_data(
+        self,
+        Z: np.ndarray,
+        X: np.ndarray | None = None,
+        Y: np.ndarray | None = None,
+        rect: tuple[int, int, int, int] | None = None,
+    ) -> None:
+        """Set the data over which contour lines are computed
+
+        Args:
+            Z: The height values over which the contour is drawn.
+            X: The coordinates of the values in *Z* (see :py:class:`ContourEngine`)
+            Y: The coordinates of the values in *Z* (see :py:class:`ContourEngine`)
+            rect: Region (i0, i1, j0, j1) of the data which has changed since
+             the last call (see :py:meth:`ContourEngine.set_data`). Default is
+             None (i.e. the whole data has changed)
+        """
+        if self.engine is None:
+            self.engine = ContourEngine(Z, X, Y)
+        else:
+            self.engine.set_data(Z, X, Y, rect)
+        self.update_lines()
+
+    def set_levels(self, levels: float | np.ndarray) -> None:
+        """Set contour levels
+
+        Args:
+            levels: Level, or levels of the contour lines
+        """
+        self.levels = np.atleast_1d(np.asarray(levels, dtype=np.float64)).ravel()
+        self.update_lines()
+
+    def get_lines(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return contour lines
+
+        Returns:
+            Tuple (points, starts, line_levels) (see
+            :py:meth:`ContourEngine.get_lines`)
+        """
+        if self._pts is None:
+            return np.zeros((0, 2)), np.zeros(0, np.intp), np.zeros(0)
+        return self._pts, self._n[:, 1], self._levels
+
+    def update_lines(self) -> None:
+        """Update contour lines from data and levels"""
+        if self.engine is None:
+            return
+        pts, starts, levels = self.engine.get_lines(self.levels)
+        self._levels = levels
+        if pts.size == 0:
+            # No line at these levels: previous lines must not be drawn anymore
+            self._pts = np.zeros((0, 2), np.float64)
+            self._n = np.zeros((0, 2), np.intp)
+            self._c = np.zeros((0, 2), np.uint32)
+            self._bounds = np.zeros((0, 4), np.float64)
+            self._groups = np.zeros(0, np.intp)
+            self.bounds = QC.QRectF()
+        else:
+            n = np.column_stack((np.arange(starts.size), starts))
+            color = self.pen.color().rgba()
+            self.set_data(pts, n, np.full((starts.size, 2), color, dtype=np.uint32))
+        self.invalidate_plot()
+
+    def update_params(self) -> None:
+        """Update object properties from item parameters (dataset)"""
+        super().update_params()
+        if getattr(self, "_pts", None) is not None:
+            self._c[:, :] = self.pen.color().rgba()
+
+    def get_item_parameters(self, itemparams: ItemParameters) -> None:
+        """
+        Appends datasets to the list of DataSets describing the parameters
+        used to customize apearance of this item
+
+        Args:
+            itemparams: Item parameters
+        """
+        self.param.update_param(self)
+        itemparams.add("ShapeParam", self, self.param)
+
+    def set_item_parameters(self, itemparams: ItemParameters) -> None:
+        """
+        Change the appearance of this item according
+        to the parameter set provided
+
+        Args:
+            itemparams: Item parameters
+        """
+        update_dataset(self.param, itemparams.get("ShapeParam"), visible_only=True)
+        self.update_params()
+
+    def draw(
+        self,
+        painter: QG.QPainter,
+        xMap: QwtScaleMap,
+        yMap: QwtScaleMap,
+        canvasRect: QC.QRectF,
+    ) -> None:
+        """Draw the item
+
+        Args:
+            painter: Painter
+            xMap: X axis scale map
+            yMap: Y axis scale map
+            canvasRect: Canvas rectangle
+        """
+        if self.is_empty():
+            return
+        scale = get_canvas_scale(xMap, yMap)
+        margin = max(self.pen.widthF(), 1.0)
+        large, small = cull_polygons(
+            self._bounds, scale, canvasRect.getCoords(), margin
+        )
+        indices = np.union1d(large, small)
+        if indices.size == 0:
+            return
+        coords, counts = simplify_lines(self._pts, self._n[:, 1], indices, scale)
+        ends = np.cumsum(counts)
+        points = qpointf_array_from_coords(coords)
+        painter.setPen(self.pen)
+        for end, count in zip(ends.tolist(), counts.tolist()):
+            if points is None:
+                start = end - count
+                painter.drawPolyline(
+                    array2d_to_qpolygonf(coords[start:end, 0], coords[start:end, 1])
+                )
+            else:
+                painter.drawPolyline(points[end - count : end])
+
+
+assert_interfaces_valid(ContourMapItem)
@@ -5,3 +5,4 @@
 
 from plotpy.items.curve.base import CurveItem
 from plotpy.items.curve.errorbar import ErrorBarCurveItem
+from plotpy.items.curve.streaming import StreamingCurveItem
@@ -9,7 +9,7 @@ import numpy as np
 from guidata.dataset import update_dataset
 from guidata.utils.misc import assert_interfaces_valid
 from qtpy import QtCore as QC
-from qwt import QwtPlotCurve
+from qwt import QwtPlotCurve, QwtPointArrayData
 
 from plotpy.config import CONF, _
 from plotpy.coords import canvas_to_axes
@@ -19,11 +19,15 @@ from plotpy.interfaces import (
     ISerializableType,
     ITrackableItemType,
 )
+from plotpy.mathutils.decimation import decimate_curve
+from plotpy.mathutils.pointindex import PointIndex
 from plotpy.styles.base import SymbolParam
 from plotpy.styles.curve import CurveParam
 
 if TYPE_CHECKING:
     import guidata.io
+    from qtpy import QtGui as QG
+    from qwt import QwtScaleMap
 
     from plotpy.interfaces import IItemType
     from plotpy.styles.base import ItemParameters
@@ -34,6 +38,41 @@ SELECTED_SYMBOL_PARAM.read_config(CONF, "plot", "selected_curve_symbol")
 SELECTED_SYMBOL = SELECTED_SYMBOL_PARAM.build_symbol()
 
 
+def segments_distances(
+    P: tuple[float, float],
+    X0: np.ndarray,
+    Y0: np.ndarray,
+    X1: np.ndarray,
+    Y1: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute distances between point P and segments (X0, Y0), (X1, Y1)
+
+    Args:
+        P: Point
+        X0: X coordinates of the first points
+        Y0: Y coordinates of the first points
+        X1: X coordinates of the second points
+        Y1: Y coordinates of the second points
+
+    Returns:
+        tuple: Tuple with two elements: (distances, t), where t is the position
+        of the closest point of each segment (0: first point, 1: second point)
+
+    .. note::
+
+        If P orthogonal projection on a segment is outside segment bounds, the
+        distance to the closest end of the segment is returned. Distances are NaN
+        for segments with non-finite coordinates.
+    """
+    px, py = P
+    with np.errstate(invalid="ignore"):
+        VX, VY = X1 - X0, Y1 - Y0
+        norm2 = VX**2 + VY**2
+        t = ((px - X0) * VX + (py - Y0) * VY) / np.where(norm2 > 0, norm2, 1.0)
+        t = t.clip(0.0, 1.0)
+        return np.hypot(X0 + t * VX - px, Y0 + t * VY - py), t
+
+
 def seg_dist(P: QC.QPointF, P0: QC.QPointF, P1: QC.QPointF) -> float:
     """Compute distance between point P and segment (P0, P1)
 
@@ -50,18 +89,14 @@ def seg_dist(P: QC.QPointF, P0: QC.QPointF, P1: QC.QPointF) -> float:
         If P orthogonal projection on (P0, P1) is outside segment bounds, return
         either distance to P0 or to P1 (the closest one)
     """
-    u = QC.QLineF(P0, P).length()
-    if P0 == P1:
-        return u
-    else:
-        angle = QC.QLineF(P0, P).angleTo(QC.QLineF(P0, P1)) * np.pi / 180
-        projection = u * np.cos(angle)
-        if projection > QC.QLineF(P0, P1).length():
-            return QC.QLineF(P1, P).length()
-        elif projection < 0:
-            return QC.QLineF(P0, P).length()
-        else:
-            return abs(u * np.sin(angle))
+    distances, _t = segments_distances(
+        (P.x(), P.y()),
+        np.array([P0.x()]),
+        np.array([P0.y()]),
+        np.array([P1.x()]),
+        np.array([P1.y()]),
+    )
+    return float(distances[0])
 
 
 def seg_dist_v(
@@ -83,22 +118,50 @@ def seg_dist_v(
 
         This is the vectorized version of ``seg_dist`` function
     """
-    V = np.zeros((X0.shape[0], 2), float)
-    PP = np.zeros((X0.shape[0], 2), float)
-    PP[:, 0] = X0
-    PP[:, 1] = Y0
-    V[:, 0] = X1 - X0
-    V[:, 1] = Y1 - Y0
-    dP = np.array(P).reshape(1, 2) - PP
-    norm2V = (V**2).sum(axis=1)
-    nV = np.sqrt(norm2V).clip(1e-12)  # clip: avoid division by zero
-    w2 = V / nV[:, np.newaxis]
-    w = np.array([-w2[:, 1], w2[:, 0]]).T
-    distances = np.fabs((dP * w).sum(axis=1))
+    distances, _t = segments_distances(P, X0, Y0, X1, Y1)
     ix = distances.argmin()
     return ix, distances[ix]
 
 
+def closest_segment(
+    P: tuple[float, float],
+    X: np.ndarray,
+    Y: np.ndarray,
+    mask: np.ndarray | None = None,
+) -> tuple[int, float]:
+    """Find the closest segment of a polyline to point P
+
+    Args:
+        P: Point
+        X: X coordinates of polyline vertices
+        Y: Y coordinates of polyline vertices
+        mask: Boolean array of ``len(X) - 1`` elements (False for segments to
+         be ignored). Default is None
+
+    Returns:
+        tuple: Tuple with two elements: (index, distance), where index is the
+        index of the closest end of the closest segment (-1 if no segment has
+        finite coordinates)
+
+    .. note::
+
+        Segments with non-finite coordinates are ignored. If the polyline has
+        a single vertex, the distance to this vertex is returned.
+    """
+    px, py = P
+    if X.size == 1:
+        distance = np.hypot(X[0] - px, Y[0] - py)
+        return (0, distance) if np.isfinite(distance) else (-1, np.inf)
+    distances, t = segments_distances(P, X[:-1], Y[:-1], X[1:], Y[1:])
+    distances[~np.isfinite(distances)] = np.inf
+    if mask is not None:
+        distances[~mask] = np.inf
+    ix = int(distances.argmin())
+    if not np.isfinite(distances[ix]):
+        return -1, np.inf
+    return ix + int(t[ix] > 0.5), distances[ix]
+
+
 class CurveItem(QwtPlotCurve):
     """Curve item
 
@@ -112,6 +175,16 @@ class CurveItem(QwtPlotCurve):
     _private = False
     _icon_name = "curve.png"
 
+    #: Maximum number of view-dependent decimated curves kept in cache
+    dsamp_cache_size = 8
+
+    #: Maximum number of points processed by hit test: beyond this, hit test
+    #: is computed on the min/max envelope of the curve (sorted X data only)
+    hit_test_max_points = 1 << 16
+
+    #: Initial search radius (pixels) of hit test for unsorted X data
+    hit_test_radius = 4
+
     def __init__(self, curveparam: CurveParam | None = None) -> None:
         super().__init__()
         if curveparam is None:
@@ -122,6 +195,10 @@ class CurveItem(QwtPlotCurve):
         self.immutable = True  # set to false to allow moving points around
         self._x = None
         self._y = None
+        self._x_sorted: bool | None = None
+        self._x_order: tuple[np.ndarray, np.ndarray] | None = None
+        self._point_index: PointIndex | None = None
+        self._dsamp_cache: dict[tuple, QwtPointArrayData] = {}
         self.update_params()
 
     def _get_visible_axis_min(self, axis_id: int, axis_data: np.ndarray) -> float:
@@ -377,22 +454,115 @@ class CurveItem(QwtPlotCurve):
             self._setData(self._x, self._y)
 
     def dsamp(self, data: np.ndarray) -> np.ndarray:
-        """Downsample data
+        """Downsample data with a fixed downsampling factor
 
         Args:
             data: Data to downsample
 
         Returns:
-            Downsampled data
+            Downsampled data (data is returned unchanged with view-dependent
+            downsampling modes, which are applied when drawing the curve)
         """
-        if self.param.use_dsamp and self.param.dsamp_factor > 1:
+        if (
+            self.param.use_dsamp
+            and self.param.dsamp_mode == "factor"
+            and self.param.dsamp_factor > 1
+        ):
             return data[:: self.param.dsamp_factor]
         return data
 
     def _setData(self, x: np.ndarray, y: np.ndarray) -> None:
         """Wrapper around QwtPlotCurve.setData() to handle downsampling"""
+        self._x_sorted = None
+        self._x_order = None
+        self._point_index = None
+        self._dsamp_cache.clear()
         return super().setData(self.dsamp(x), self.dsamp(y))
 
+    def is_x_sorted(self) -> bool:
+        """Return True if X data is sorted in increasing order
+
+        Returns:
+            True if X data is sorted (result is cached until data is changed)
+        """
+        if self._x_sorted is None:
+            x = self._x
+            self._x_sorted = bool(x.size < 2 or (x[1:] >= x[:-1]).all())
+        return self._x_sorted
+
+    def get_point_index(self) -> PointIndex:
+        """Return the spatial index of curve points, used to search points
+        close to a position when X data is not sorted (the index is built on
+        first call and cached until data is changed)
+
+        Returns:
+            Point index (index values are the indexes of curve points, after
+            fixed-factor downsampling if enabled)
+        """
+        if self._point_index is None:
+            x, y = self.dsamp(self._x), self.dsamp(self._y)
+            self._point_index = PointIndex(x, y, np.arange(x.size))
+        return self._point_index
+
+    def get_view_dsamp_data(self, xMap: QwtScaleMap) -> QwtPointArrayData | None:
+        """Return curve data decimated for the current view, when a
+        view-dependent downsampling mode is enabled ("m4" or "lttb"): the
+        visible part of the curve is reduced to a few points per horizontal
+        pixel (see :py:mod:`plotpy.mathutils.decimation`)
+
+        Args:
+            xMap: X axis scale map
+
+        Returns:
+            Decimated data, or None if view-dependent downsampling is disabled
+        """
+        mode = self.param.dsamp_mode
+        if not self.param.use_dsamp or mode == "factor" or self.is_empty():
+            return None
+        plot = self.plot()
+        xlog = plot is not None and plot.get_axis_scale(self.xAxis()) == "log"
+        width = int(abs(xMap.pDist())) or 1
+        key = (mode, xMap.s1(), xMap.s2(), width, xlog)
+        series = self._dsamp_cache.get(key)
+        if series is None:
+            x, y = self._x, self._y
+            xsorted = self.is_x_sorted()
+            indexes = decimate_curve(
+                x, y, xMap.s1(), xMap.s2(), width, mode, xsorted, xlog
+            )
+            series = QwtPointArrayData(x[indexes], y[indexes])
+            while len(self._dsamp_cache) >= self.dsamp_cache_size:
+                self._dsamp_cache.pop(next(iter(self._dsamp_cache)))
+            self._dsamp_cache[key] = series
+        return series
+
+    def draw(
+        self,
+        painter: QG.QPainter,
+        xMap: QwtScaleMap,
+        yMap: QwtScaleMap,
+        canvasRect: QC.QRectF,
+    ) -> None:
+        """Draw the item
+
+        Args:
+            painter: Painter
+            xMap: X axis scale map
+            yMap: Y axis scale map
+            canvasRect: Canvas rectangle
+        """
+        series = self.get_view_dsamp_data(xMap)
+        if series is None:
+            super().draw(painter, xMap, yMap, canvasRect)
+            return
+        # Full resolution data is restored after drawing: bounding rectangle,
+        # hit test and samples are not affected by view-dependent downsampling
+        data = self.swapData(series)
+        try:
+            super().draw(painter, xMap, yMap, canvasRect)
+        finally:
+            self.swapData(data)
+
     def set_data(self, x: np.ndarray, y: np.ndarray) -> None:
         """Set curve data
 
@@ -415,6 +585,78 @@ class CurveItem(QwtPlotCurve):
         """
         return self._x is None or self._y is None or self._y.size == 0
 
+    @staticmethod
+    def __get_closest_segment(
+        pos: QC.QPointF,
+        x: np.ndarray,
+        y: np.ndarray,
+        indexes: np.ndarray,
+        xmap: QwtScaleMap,
+        ymap: QwtScaleMap,
+        mask: np.ndarray | None = None,
+    ) -> tuple[int, float]:
+        """Return the closest segment of the polyline joining points of
+        indexes *indexes* (see :py:func:`closest_segment`), in canvas
+        coordinates"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cx = xmap.transform_scalar(x[indexes].astype(float))
+            cy = ymap.transform_scalar(y[indexes].astype(float))
+        return closest_segment((pos.x(), pos.y()), cx, cy, mask)
+
+    def __get_sorted_hit_candidates(
+        self,
+        pos: QC.QPointF,
+        x: np.ndarray,
+        y: np.ndarray,
+        xmap: QwtScaleMap,
+        ymap: QwtScaleMap,
+    ) -> np.ndarray:
+        """Return indexes of the points which may be the closest to *pos*
+        (canvas coordinates), when X data is sorted"""
+        i = int(x.searchsorted(xmap.invTransform(pos.x())))
+        indexes = np.arange(max(i - 1, 0), min(i + 1, x.size))
+        _ix, distance = self.__get_closest_segment(pos, x, y, indexes, xmap, ymap)
+        if np.isfinite(distance):
+            # Closer segments have at least one end in this vertical band
+            x0 = xmap.invTransform(pos.x() - distance)
+            x1 = xmap.invTransform(pos.x() + distance)
+        else:
+            x0, x1 = xmap.s1(), xmap.s2()
+        xlog = self.plot().get_axis_scale(self.xAxis()) == "log"
+        width = self.hit_test_max_points // 4
+        return decimate_curve(x, y, x0, x1, width, "m4", True, xlog)
+
+    def __get_indexed_hit_candidates(
+        self, pos: QC.QPointF, size: int, xmap: QwtScaleMap, ymap: QwtScaleMap
+    ) -> np.ndarray:
+        """Return indexes of the points which may be the closest to *pos*
+        (canvas coordinates), when X data is not sorted: ends of the segments
+        having at least one end close to *pos* (non-consecutive indexes are not
+        joined by a segment)"""
+        index = self.get_point_index()
+        canvas = self.plot().canvas()
+
+        def get_points(radius: float) -> np.ndarray:
+            """Return points inside a square around *pos*"""
+            x0 = xmap.invTransform(pos.x() - radius)
+            x1 = xmap.invTransform(pos.x() + radius)
+            y0 = ymap.invTransform(pos.y() - radius)
+            y1 = ymap.invTransform(pos.y() + radius)
+            return index.get_points(x0, x1, y0, y1)
+
+        radius = self.hit_test_radius
+        points = get_points(radius)
+        while not points.size and radius <= max(canvas.width(), canvas.height()):
+            radius *= 4
+            points = get_points(radius)
+        if points.size:
+            # Points found in the square corners may be farther than points
+            # outside the square: the closest point is in the circumscribed square
+            points = get_points(radius * np.sqrt(2))
+        indexes = index.z[points].astype(np.intp)
+        indexes = np.unique(np.concatenate((indexes - 1, indexes, indexes + 1)))
+        return indexes[(indexes >= 0) & (indexes < size)]
+
     def hit_test(self, pos: QC.QPointF) -> tuple[float, float, bool, None]:
         """Return a tuple (distance, attach point, inside, other_object)
 
@@ -437,39 +679,23 @@ class CurveItem(QwtPlotCurve):
         if self.is_empty():
             return sys.maxsize, 0, False, None
         plot = self.plot()
-        ax = self.xAxis()
-        ay = self.yAxis()
-        px = plot.invTransform(ax, pos.x())
-        py = plot.invTransform(ay, pos.y())
-        # On cherche les 4 points qui sont les plus proches en X et en Y
-        # avant et après ie tels que p1x < x < p2x et p3y < y < p4y
-        tmpx = self._x - px
-        tmpy = self._y - py
-        if np.count_nonzero(tmpx) != len(tmpx) or np.count_nonzero(tmpy) != len(tmpy):
-            # Avoid dividing by zero warning when computing dx or dy
-            return sys.maxsize, 0, False, None
-        dx = 1 / tmpx
-        dy = 1 / tmpy
-        i0 = dx.argmin()
-        i1 = dx.argmax()
-        i2 = dy.argmin()
-        i3 = dy.argmax()
-        t = np.array((i0, i1, i2, i3))
-        t2 = (t + 1).clip(0, self._x.shape[0] - 1)
-        i, _d = seg_dist_v((px, py), self._x[t], self._y[t], self._x[t2], self._y[t2])
-        i = t[i]
-        # Recalcule la distance dans le répère du widget
-        p0x = plot.transform(ax, self._x[i])
-        p0y = plot.transform(ay, self._y[i])
-        if i + 1 >= self._x.shape[0]:
-            p1x = p0x
-            p1y = p0y
+        xmap = plot.canvasMap(self.xAxis())
+        ymap = plot.canvasMap(self.yAxis())
+        # Hit test is computed on displayed data (i.e. with fixed-factor
+        # downsampling, the attach point is an index of downsampled data)
+        x, y = self.dsamp(self._x), self.dsamp(self._y)
+        if self.is_x_sorted():
+            indexes = self.__get_sorted_hit_candidates(pos, x, y, xmap, ymap)
+            mask = None
         else:
-            p1x = plot.transform(ax, self._x[i + 1])
-            p1y = plot.transform(ay, self._y[i + 1])
-        distance = seg_dist(QC.QPointF(pos), QC.QPointF(p0x, p0y), QC.QPointF(p1x, p1y))
-        final_index = i // (int(not self.param.use_dsamp) or self.param.dsamp_factor)
-        return distance, final_index, False, None
+            indexes = self.__get_indexed_hit_candidates(pos, x.size, xmap, ymap)
+            mask = np.diff(indexes) == 1
+        if indexes.size == 0:
+            return sys.maxsize, 0, False, None
+        ix, distance = self.__get_closest_segment(pos, x, y, indexes, xmap, ymap, mask)
+        if ix < 0:
+            return sys.maxsize, 0, False, None
+        return distance, int(indexes[ix]), False, None
 
     def get_closest_coordinates(self, x: float, y: float) -> tuple[float, float]:
         """
@@ -488,8 +714,7 @@ class CurveItem(QwtPlotCurve):
         xc = plot.transform(ax, x)
         yc = plot.transform(ay, y)
         _distance, i, _inside, _other = self.hit_test(QC.QPointF(xc, yc))
-        point = self.sample(i)
-        return point.x(), point.y()
+        return self.dsamp(self._x)[i], self.dsamp(self._y)[i]
 
     def get_coordinates_label(self, x: float, y: float) -> str:
         """
@@ -515,11 +740,22 @@ class CurveItem(QwtPlotCurve):
         Returns:
             tuple[float, float]: Closest point coordinates
         """
-        # We assume X is sorted, otherwise we'd need :
-        # argmin(abs(x-xc))
-        i = self._x.searchsorted(xc)
-        if i > 0 and np.fabs(self._x[i - 1] - xc) < np.fabs(self._x[i] - xc):
-            return self._x[i - 1], self._y[i - 1]
+        if self.is_x_sorted():
+            x, order = self._x, None
+        else:
+            if self._x_order is None:
+                # NaN values are sorted at the end and excluded from search
+                order = np.argsort(self._x, kind="stable")
+                order = order[: np.count_nonzero(~np.isnan(self._x))]
+                self._x_order = self._x[order], order
+            x, order = self._x_order
+        if x.size == 0:
+            return np.nan, np.nan
+        i = min(int(x.searchsorted(xc)), x.size - 1)
+        if i > 0 and np.fabs(x[i - 1] - xc) < np.fabs(x[i] - xc):
+            i -= 1
+        if order is not None:
+            i = order[i]
         return self._x[i], self._y[i]
 
     def move_local_point_to(
@@ -10,10 +10,13 @@ from guidata.dataset import update_dataset
 from guidata.utils.misc import assert_interfaces_valid
 from qtpy import QtCore as QC
 from qtpy import QtGui as QG
-from qwt import QwtPlotCurve, QwtScaleMap
+from qwt import QwtScaleMap
+from qwt.plot_curve import array2d_to_qpolygonf
 
 from plotpy.config import _
+from plotpy.coords import qpointf_array_from_coords
 from plotpy.items.curve.base import CurveItem
+from plotpy.mathutils.decimation import collapse_segments, decimate_curve
 from plotpy.styles.curve import CurveParam
 from plotpy.styles.errorbar import ErrorBarParam
 
@@ -24,11 +27,6 @@ if TYPE_CHECKING:
     from plotpy.styles.base import ItemParameters
 
 
-def _transform(map: QwtScaleMap, v: float) -> float:
-    """Transform coordinates"""
-    return QwtScaleMap.transform(map, v)
-
-
 def vmap(map: QwtScaleMap, v: np.ndarray) -> np.ndarray:
     """Transform coordinates while handling RuntimeWarning
     that could be raised by NumPy when trying to transform
@@ -43,8 +41,38 @@ def vmap(map: QwtScaleMap, v: np.ndarray) -> np.ndarray:
     """
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", category=RuntimeWarning)
-        output = np.vectorize(_transform)(map, v)
-    return output
+        output = map.transform_scalar(np.asarray(v, dtype=np.float64))
+    return np.asarray(output, dtype=np.float64)
+
+
+def draw_lines(
+    painter: QG.QPainter,
+    x1: np.ndarray,
+    y1: np.ndarray,
+    x2: np.ndarray,
+    y2: np.ndarray,
+) -> None:
+    """Draw lines from (x1, y1) to (x2, y2) with a single painter call,
+    without creating one Qt object per line (the end points coordinates are
+    copied to the memory of a Qt array of points)
+
+    Args:
+        painter: Painter
+        x1: X coordinates of the first end points
+        y1: Y coordinates of the first end points
+        x2: X coordinates of the second end points
+        y2: Y coordinates of the second end points
+    """
+    size = np.size(x1)
+    if size == 0:
+        return
+    points = qpointf_array_from_coords(np.column_stack((x1, y1, x2, y2)))
+    if points is not None:
+        painter.drawLines(points)
+    else:
+        xdata = np.column_stack((x1, x2)).ravel()
+        ydata = np.column_stack((y1, y2)).ravel()
+        painter.drawLines(array2d_to_qpolygonf(xdata, ydata))
 
 
 class ErrorBarCurveItem(CurveItem):
@@ -274,9 +302,8 @@ class ErrorBarCurveItem(CurveItem):
         x, y, xmin, xmax, ymin, ymax = self.get_minmax_arrays(all_values=False)
         tx = vmap(xMap, x)
         ty = vmap(yMap, y)
-        RN = list(range(len(tx)))
         if self.errorOnTop:
-            QwtPlotCurve.draw(self, painter, xMap, yMap, canvasRect)
+            CurveItem.draw(self, painter, xMap, yMap, canvasRect)
 
         painter.save()
         painter.setPen(self.errorPen)
@@ -286,53 +313,88 @@ class ErrorBarCurveItem(CurveItem):
             txmin = vmap(xMap, xmin)
             txmax = vmap(xMap, xmax)
             # Classic error bars
-            lines = []
-            for i in RN:
-                yi = ty[i]
-                lines.append(QC.QLineF(txmin[i], yi, txmax[i], yi))
-            painter.drawLines(lines)
+            self.__draw_segments(painter, canvasRect, ty, txmin, txmax, False)
             if cap > 0:
-                lines = []
-                for i in RN:
-                    yi = ty[i]
-                    lines.append(QC.QLineF(txmin[i], yi - cap, txmin[i], yi + cap))
-                    lines.append(QC.QLineF(txmax[i], yi - cap, txmax[i], yi + cap))
-            painter.drawLines(lines)
+                ty0, ty1 = ty - cap, ty + cap
+                for txcap in (txmin, txmax):
+                    self.__draw_segments(painter, canvasRect, txcap, ty0, ty1, True)
 
         if self._dy is not None:
-            tymin = vmap(yMap, ymin)
-            tymax = vmap(yMap, ymax)
             if self.errorbarparam.mode == 0:
+                tymin = vmap(yMap, ymin)
+                tymax = vmap(yMap, ymax)
                 # Classic error bars
-                lines = []
-                for i in RN:
-                    xi = tx[i]
-                    lines.append(QC.QLineF(xi, tymin[i], xi, tymax[i]))
-                painter.drawLines(lines)
+                self.__draw_segments(painter, canvasRect, tx, tymin, tymax, True)
                 if cap > 0:
                     # Cap
-                    lines = []
-                    for i in RN:
-                        xi = tx[i]
-                        lines.append(QC.QLineF(xi - cap, tymin[i], xi + cap, tymin[i]))
-                        lines.append(QC.QLineF(xi - cap, tymax[i], xi + cap, tymax[i]))
-                painter.drawLines(lines)
+                    tx0, tx1 = tx - cap, tx + cap
+                    for tycap in (tymin, tymax):
+                        self.__draw_segments(
+                            painter, canvasRect, tycap, tx0, tx1, False
+                        )
             else:
-                # Error area
-                points = []
-                rpoints = []
-                for i in RN:
-                    xi = tx[i]
-                    points.append(QC.QPointF(xi, tymin[i]))
-                    rpoints.append(QC.QPointF(xi, tymax[i]))
-                points += reversed(rpoints)
+                # Error area: lower and upper bounds are decimated (min/max
+                # envelope of each pixel column)
+                plot = self.plot()
+                xlog = plot is not None and plot.get_axis_scale(self.xAxis()) == "log"
+                width = int(abs(xMap.pDist())) or 1
+                args = (xMap.s1(), xMap.s2(), width, "m4", self.is_x_sorted(), xlog)
+                lower = decimate_curve(x, ymin, *args)
+                upper = decimate_curve(x, ymax, *args)[::-1]
+                points = array2d_to_qpolygonf(
+                    np.concatenate((tx[lower], tx[upper])),
+                    np.concatenate((vmap(yMap, ymin[lower]), vmap(yMap, ymax[upper]))),
+                )
                 painter.setBrush(QG.QBrush(self.errorBrush))
-                painter.drawPolygon(*points)
+                painter.drawPolygon(points)
 
         painter.restore()
 
         if not self.errorOnTop:
-            QwtPlotCurve.draw(self, painter, xMap, yMap, canvasRect)
+            CurveItem.draw(self, painter, xMap, yMap, canvasRect)
+
+    @staticmethod
+    def __draw_segments(
+        painter: QG.QPainter,
+        canvasRect: QC.QRectF,
+        c: np.ndarray,
+        a0: np.ndarray,
+        a1: np.ndarray,
+        vertical: bool,
+    ) -> None:
+        """Draw axis-aligned segments (error bars or caps), culled to the canvas
+
+        If there are more segments than pixel columns, overlapping segments
+        of each pixel column are merged before drawing.
+
+        Args:
+            painter: Painter
+            canvasRect: Canvas rectangle
+            c: segments X (resp. Y) coordinates for vertical (resp. horizontal)
+             segments
+            a0: segments start Y (resp. X) coordinates
+            a1: segments end Y (resp. X) coordinates
+            vertical: True for vertical segments, False for horizontal segments
+        """
+        if vertical:
+            cmin, cmax = canvasRect.left(), canvasRect.right()
+            amin, amax = canvasRect.top(), canvasRect.bottom()
+        else:
+            cmin, cmax = canvasRect.top(), canvasRect.bottom()
+            amin, amax = canvasRect.left(), canvasRect.right()
+        if c.size > cmax - cmin:
+            c, a0, a1 = collapse_segments(c, a0, a1, cmin, cmax, amin, amax)
+        else:
+            margin = max(painter.pen().widthF(), 1.0)
+            visible = (c >= cmin - margin) & (c <= cmax + margin)
+            visible &= (np.maximum(a0, a1) >= amin - margin) & (
+                np.minimum(a0, a1) <= amax + margin
+            )
+            c, a0, a1 = c[visible], a0[visible], a1[visible]
+        if vertical:
+            draw_lines(painter, c, a0, c, a1)
+        else:
+            draw_lines(painter, a0, c, a1, c)
 
     def update_params(self):
         """Update object properties from item parameters"""
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from guidata.utils.misc import assert_interfaces_valid
+from qtpy import QtCore as QC
+from qwt.plot_series import QwtSeriesData
+
+from plotpy.items.curve.base import CurveItem
+
+if TYPE_CHECKING:
+    from qtpy import QtGui as QG
+    from qwt import QwtScaleMap
+
+    from plotpy.styles.curve import CurveParam
+
+
+class StreamingCurveData(QwtSeriesData):
+    """Series data referencing the ring buffer of a streaming curve item (no copy)
+
+    Args:
+        item: Streaming curve item
+    """
+
+    def __init__(self, item: StreamingCurveItem) -> None:
+        super().__init__()
+        self.item = item
+
+    def size(self) -> int:
+        """Return the number of samples"""
+        return self.xData().size
+
+    def sample(self, index: int) -> QC.QPointF:
+        """Return the sample at position `index`"""
+        return QC.QPointF(self.xData()[index], self.yData()[index])
+
+    def xData(self) -> np.ndarray:
+        """Return the X data"""
+        return self.item.dsamp(self.item._x)
+
+    def yData(self) -> np.ndarray:
+        """Return the Y data"""
+        return self.item.dsamp(self.item._y)
+
+    def boundingRect(self) -> QC.QRectF:
+        """Return the bounding rectangle (maintained incrementally by the item)"""
+        xmin, xmax, ymin, ymax = self.item.get_data_bounds()
+        return QC.QRectF(xmin, ymin, xmax - xmin, ymax - ymin)
+
+
+class StreamingCurveItem(CurveItem):
+    """Curve item for real-time data acquisition
+
+    Data is stored in a preallocated buffer with ring semantics: points are
+    appended with :py:meth:`append` or :py:meth:`extend` without reallocating
+    or copying the existing points, and the oldest points are evicted when the
+    buffer is full (`maxlen` points) or when they are older than `max_age`
+    (X data being the acquisition time).
+
+    Non-finite points are not stored. Curve data arrays (see
+    :py:meth:`get_data`) are views of the buffer, which are updated when
+    points are added.
+
+    When the plot axes have not moved since the last redraw, only the newly
+    appended segment is painted on the plot canvas (see :py:meth:`extend`).
+
+    Args:
+        curveparam: Curve parameters
+        maxlen: Maximum number of points. Default is None
+         (i.e. :py:attr:`default_maxlen`)
+        max_age: Maximum age of points (in X data units, X data being sorted
+         in increasing order). Default is None (no age limit)
+    """
+
+    #: Default maximum number of points
+    default_maxlen = 1 << 20
+
+    def __init__(
+        self,
+        curveparam: CurveParam | None = None,
+        maxlen: int | None = None,
+        max_age: float | None = None,
+    ) -> None:
+        if maxlen is None:
+            maxlen = self.default_maxlen
+        if maxlen < 1:
+            raise ValueError("maxlen must be a positive integer")
+        self.maxlen = int(maxlen)
+        self.max_age = max_age
+        # The buffer can hold twice the maximum number of points, so that the
+        # current points are always contiguous: they are moved back to the
+        # beginning of the buffer only when its end is reached (amortized O(1))
+        self._buffer = np.empty((2, 2 * self.maxlen), dtype=np.float64)
+        self._start = self._stop = 0
+        self._xbounds: tuple[float, float] | None = None
+        self._ybounds: tuple[float, float] | None = None
+        self._view_key: tuple | None = None
+        super().__init__(curveparam)
+        self._x, self._y = self._buffer[:, :0]
+        self._x_sorted = True
+        self.setData(StreamingCurveData(self))
+
+    def __reduce__(self) -> tuple[type, tuple, tuple]:
+        """Return state information for pickling"""
+        state = (self.param, self._x.copy(), self._y.copy(), self.z())
+        res = (StreamingCurveItem, (None, self.maxlen, self.max_age), state)
+        return res
+
+    def get_size(self) -> int:
+        """Return the number of points
+
+        Returns:
+            Number of points
+        """
+        return self._stop - self._start
+
+    def get_data_bounds(self) -> tuple[float, float, float, float]:
+        """Return the data bounds
+
+        Returns:
+            tuple: xmin, xmax, ymin, ymax (NaN if the curve is empty)
+        """
+        if self.get_size() == 0:
+            return (np.nan,) * 4
+        if self._xbounds is None:
+            self._xbounds = float(self._x.min()), float(self._x.max())
+        if self._ybounds is None:
+            self._ybounds = float(self._y.min()), float(self._y.max())
+        return self._xbounds + self._ybounds
+
+    def __update_views(self) -> None:
+        """Update curve data arrays (views of the buffer) and clear data caches"""
+        self._x, self._y = self._buffer[:, self._start : self._stop]
+        self._x_order = None
+        self._point_index = None
+        self._dsamp_cache.clear()
+
+    def __evict(self, count: int) -> int:
+        """Evict the oldest points
+
+        Args:
+            count: Number of points to evict
+
+        Returns:
+            Number of evicted points
+        """
+        if count <= 0:
+            return 0
+        x, y = self._buffer[:, self._start : self._start + count]
+        self._start += count
+        if self._start == self._stop:
+            self._start = self._stop = 0
+            self._xbounds = self._ybounds = None
+            self._x_sorted = True
+            return count
+        if self._x_sorted:
+            if self._xbounds is not None:
+                self._xbounds = float(self._buffer[0, self._start]), self._xbounds[1]
+        elif self._xbounds is not None:
+            xmin, xmax = self._xbounds
+            if x.min() <= xmin or x.max() >= xmax:
+                self._xbounds = None
+        if self._ybounds is not None:
+            ymin, ymax = self._ybounds
+            if y.min() <= ymin or y.max() >= ymax:
+                self._ybounds = None
+        if self._x_sorted is False:
+            self._x_sorted = None  # Evicted points may have been unsorted
+        return count
+
+    def __get_aged_count(self) -> int:
+        """Return the number of points older than the maximum age"""
+        if self.max_age is None or self.get_size() == 0:
+            return 0
+        x = self._buffer[0, self._start : self._stop]
+        limit = x[-1] - self.max_age
+        if self._x_sorted is None:
+            self._x_sorted = bool((x[1:] >= x[:-1]).all())
+        if self._x_sorted:
+            return int(x.searchsorted(limit, "left"))
+        return int(np.argmax(x >= limit))
+
+    def __get_view_key(self, xMap: QwtScaleMap, yMap: QwtScaleMap) -> tuple:
+        """Return a key identifying the view (scale maps)"""
+        return (xMap.s1(), xMap.s2(), xMap.p1(), xMap.p2()) + (
+            yMap.s1(),
+            yMap.s2(),
+            yMap.p1(),
+            yMap.p2(),
+        )
+
+    def __can_paint_segment(self, evicted_x: float | None) -> bool:
+        """Return True if the newly appended segment may be painted directly on
+        the plot canvas (i.e. without redrawing the whole plot)
+
+        Args:
+            evicted_x: X coordinate of the first point after the evicted points,
+             or None if no point has been evicted
+        """
+        plot = self.plot()
+        if self._view_key is None or (
+            self.param.use_dsamp and self.param.dsamp_mode == "factor"
+        ):
+            return False
+        xMap = plot.canvasMap(self.xAxis())
+        yMap = plot.canvasMap(self.yAxis())
+        if self.__get_view_key(xMap, yMap) != self._view_key:
+            return False
+        # Evicted points have to be erased, unless they were outside the view
+        return evicted_x is None or (
+            self.is_x_sorted() and evicted_x <= min(xMap.s1(), xMap.s2())
+        )
+
+    def draw(
+        self,
+        painter: QG.QPainter,
+        xMap: QwtScaleMap,
+        yMap: QwtScaleMap,
+        canvasRect: QC.QRectF,
+    ) -> None:
+        """Draw the item
+
+        Args:
+            painter: Painter
+            xMap: X axis scale map
+            yMap: Y axis scale map
+            canvasRect: Canvas rectangle
+        """
+        self._view_key = self.__get_view_key(xMap, yMap)
+        super().draw(painter, xMap, yMap, canvasRect)
+
+    def _setData(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Reset cached data properties after an in-place modification of data
+        (data is stored in the buffer, see :py:meth:`set_data`)"""
+        self._x_sorted = None
+        self._xbounds = self._ybounds = None
+        self._view_key = None
+        self.__update_views()
+
+    def set_data(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Set curve data (replacing all points, the oldest points being evicted
+        if there are too many of them)
+
+        Args:
+            x: X data
+            y: Y data
+        """
+        self._start = self._stop = 0
+        self._xbounds = self._ybounds = None
+        self._x_sorted = True
+        self._view_key = None
+        self.extend(x, y, refresh=False)
+
+    def append(self, x: float, y: float, refresh: bool = True) -> None:
+        """Append a point
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            refresh: if True, refresh the plot (see :py:meth:`extend`).
+             Default is True
+        """
+        self.extend([x], [y], refresh)
+
+    def extend(self, xs: np.ndarray, ys: np.ndarray, refresh: bool = True) -> None:
+        """Append points
+
+        Args:
+            xs: X data
+            ys: Y data
+            refresh: if True, refresh the plot: if the plot axes have not moved
+             since the last redraw (and if evicted points were not visible), only
+             the new segment is painted, otherwise the plot is replotted.
+             Default is True
+        """
+        xs = np.ravel(np.asarray(xs, dtype=np.float64))
+        ys = np.ravel(np.asarray(ys, dtype=np.float64))
+        if xs.size != ys.size:
+            raise ValueError("X and Y data must have the same size")
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        if not finite.all():
+            xs, ys = xs[finite], ys[finite]
+        xs, ys = xs[-self.maxlen :], ys[-self.maxlen :]
+        count = xs.size
+        if count == 0:
+            return
+        self.is_x_sorted()  # Sortedness is then updated incrementally
+        evicted = self.__evict(self.get_size() + count - self.maxlen)
+        size = self.get_size()
+        if self._stop + count > self._buffer.shape[1]:
+            self._buffer[:, :size] = self._buffer[:, self._start : self._stop]
+            self._start, self._stop = 0, size
+        # Sortedness and bounds are updated from the new points only
+        if self._x_sorted and count > 1:
+            self._x_sorted = bool((xs[1:] >= xs[:-1]).all())
+        if self._x_sorted and size > 0:
+            self._x_sorted = bool(xs[0] >= self._buffer[0, self._stop - 1])
+        for attr, data in (("_xbounds", xs), ("_ybounds", ys)):
+            bounds = getattr(self, attr)
+            if bounds is not None or size == 0:
+                vmin, vmax = float(data.min()), float(data.max())
+                if bounds is not None:
+                    vmin, vmax = min(vmin, bounds[0]), max(vmax, bounds[1])
+                setattr(self, attr, (vmin, vmax))
+        self._buffer[0, self._stop : self._stop + count] = xs
+        self._buffer[1, self._stop : self._stop + count] = ys
+        self._stop += count
+        evicted += self.__evict(self.__get_aged_count())
+        self.__update_views()
+        plot = self.plot()
+        if refresh and plot is not None and self.isVisible():
+            evicted_x = float(self._x[0]) if evicted else None
+            if self.__can_paint_segment(evicted_x):
+                first = max(self.get_size() - count - 1, 0)
+                self.directPaint(first, self.get_size() - 1)
+            else:
+                plot.replot()
+
+
+assert_interfaces_valid(StreamingCurveItem)
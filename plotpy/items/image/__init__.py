@@ -18,4 +18,11 @@ from .misc import (
     get_items_in_rectangle,
     get_plot_qrect,
 )
+from .tiled import (
+    ArrayTileSource,
+    TileCache,
+    TiledArray,
+    TiledImageItem,
+    TileSource,
+)
 from .transform import TrImageItem
@@ -21,11 +21,12 @@ from plotpy._scaler import (
     INTERP_AA,
     INTERP_LINEAR,
     INTERP_NEAREST,
-    _histogram,
+    TRANSFER_GAMMA,
+    TRANSFER_TABLE,
     _scale_rect,
 )
-from plotpy.config import _
-from plotpy.constants import LUT_MAX, LUT_SIZE, LUTAlpha
+from plotpy.config import CONF, _
+from plotpy.constants import LUT_MAX, LUT_SIZE, LUTTransfer
 from plotpy.coords import pixelround
 from plotpy.interfaces import (
     IBaseImageItem,
@@ -42,9 +43,16 @@ from plotpy.interfaces import (
 
 # do not import rectangleshape from plotpy.items directly
 from plotpy.items.shape.rectangle import RectangleShape
-from plotpy.lutrange import lut_range_threshold
-from plotpy.mathutils.arrayfuncs import get_nan_range
-from plotpy.mathutils.colormap import FULLRANGE, get_cmap
+from plotpy.lutrange import (
+    eval_transfer,
+    get_equalization_table,
+    get_transfer_range,
+    lut_range_threshold,
+)
+from plotpy.mathutils.arrayfuncs import get_nan_histogram, get_nan_range
+from plotpy.mathutils.colormap import get_cmap, get_cmap_lut, interpolate_cmap
+from plotpy.mathutils.integral import IntegralImage
+from plotpy.mathutils.pyramid import ImagePyramid
 from plotpy.styles.image import RawImageParam
 
 if TYPE_CHECKING:
@@ -125,12 +133,16 @@ class BaseImageItem(QwtPlotItem):
         self.border_rect.set_style("plot", "shape/imageborder")
         # A, B, Background, Colormap
         self.lut = (1.0, 0.0, None, np.zeros((LUT_SIZE,), np.uint32))
+        self._lut_transfer = (LUTTransfer.LINEAR, 1.0)
+        self._equalization_cache = None
         self.set_lut_range((0.0, 255.0))
         self.setItemAttribute(QwtPlotItem.AutoScale)
         self.setItemAttribute(QwtPlotItem.Legend, True)
         self._filename = None  # The file this image comes from
 
         self.histogram_cache = None
+        self._integral_image: IntegralImage | None = None
+        self._data_version = 0
         if data is not None:
             self.set_data(data)
         self.param.update_item(self)
@@ -333,16 +345,46 @@ class BaseImageItem(QwtPlotItem):
             lut_range: LUT range -- tuple (levelmin, levelmax) (Default value = None)
         """
         self.data = data
-        self.histogram_cache = None
+        self.data_changed()
         self.update_bounds()
         self.update_border()
         if not self.param.keep_lut_range:
             if lut_range is not None:
                 _min, _max = lut_range
             else:
-                _min, _max = get_nan_range(data)
+                _min, _max = get_transfer_range(
+                    self.get_lut_range_full(), *self._lut_transfer
+                )
             self.set_lut_range((_min, _max))
 
+    def data_changed(self, rect: tuple[int, int, int, int] | None = None) -> None:
+        """Notify the item that its data has changed
+
+        This method is called by :py:meth:`set_data`, and must be called after
+        modifying data in place (e.g. ``item.data[10:20, 30:40] = 0``): it
+        increments the data version (see :py:meth:`get_data_version`) and clears
+        the results computed from data (histogram, equalization table, etc.).
+
+        Args:
+            rect: region (i0, i1, j0, j1) of data which has changed, i.e. rows i0
+             to i1 and columns j0 to j1 (excluded), which allows to update some
+             results in this region only. Default is None (whole data)
+        """
+        self._data_version += 1
+        self.histogram_cache = None
+        self._equalization_cache = None
+        self._integral_image = None
+
+    def get_data_version(self) -> int:
+        """Return the data version, which is incremented each time data changes
+        (see :py:meth:`data_changed`): results computed from data are cached with
+        this version
+
+        Returns:
+            Data version
+        """
+        return self._data_version
+
     def get_data(
         self, x0: float, y0: float, x1: float | None = None, y1: float | None = None
     ) -> float | tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -415,14 +457,23 @@ class BaseImageItem(QwtPlotItem):
             self.lut = (a, b, np.uint32(QG.QColor(qcolor).rgb() & 0xFFFFFF), cmap)
 
     def set_color_map(
-        self, name_or_table: str | EditableColormap, invert: bool | None = None
+        self,
+        name_or_table: str | EditableColormap,
+        invert: bool | None = None,
+        update_axis: bool = True,
     ) -> None:
         """Set colormap
 
+        The lookup table is shared with all image items using the same colormap
+        and alpha settings (see :py:func:`.get_cmap_lut`).
+
         Args:
             name_or_table: Colormap name or colormap
             invert: True to invert colormap, False otherwise (Default value = None,
              i.e. do not change the default behavior)
+            update_axis: If True, update the colormap axis of the plot (Default
+             value = True). When setting the colormap of many items, the axis may
+             be updated only once (see :py:meth:`.BasePlot.update_colormap_axis`)
         """
         if name_or_table is self.cmap_table:
             # This avoids rebuilding the LUT all the time
@@ -434,39 +485,12 @@ class BaseImageItem(QwtPlotItem):
         if invert is not None:
             table.invert = invert
         self.cmap_table = table
-        self.cmap = table.colorTable(FULLRANGE)
-        cmap_a = self.lut[3]
-        alpha = self.param.alpha
-        alpha_function = self.param.alpha_function
-        for i in range(LUT_SIZE):
-            if alpha_function == LUTAlpha.NONE.value:
-                pix_alpha = 1.0
-            elif alpha_function == LUTAlpha.CONSTANT.value:
-                pix_alpha = alpha
-            else:
-                x = i / float(LUT_SIZE - 1)
-                if alpha_function == LUTAlpha.LINEAR.value:
-                    # Linear alpha function
-                    pix_alpha = alpha * x
-                elif alpha_function == LUTAlpha.SIGMOID.value:
-                    # Sigmoid alpha function
-                    pix_alpha = alpha / (1 + np.exp(-10 * x))
-                elif alpha_function == LUTAlpha.TANH.value:
-                    # Hyperbolic tangent alpha function
-                    pix_alpha = alpha * np.tanh(5 * x)
-                elif alpha_function == LUTAlpha.STEP.value:
-                    # Fully transparent lowest value and `alpha` transparent elsewhere
-                    pix_alpha = alpha if x > 0 else 0
-                else:
-                    raise ValueError(f"Invalid alpha function {alpha_function}")
-            # pylint: disable=too-many-function-args
-            alpha_channel = max(min(np.uint32(255 * pix_alpha + 0.5), 255), 0) << 24
-            cmap_a[i] = (
-                np.uint32((table.rgb(FULLRANGE, i / LUT_MAX)) & 0xFFFFFF)
-                | alpha_channel
-            )
+        self.cmap = interpolate_cmap(table, np.arange(256) * (1.0 / 255)).tolist()
+        a, b, bg, _cmap = self.lut
+        cmap = get_cmap_lut(table, self.param.alpha_function, self.param.alpha)
+        self.lut = (a, b, bg, cmap)
         plot = self.plot()
-        if plot:
+        if plot and update_axis:
             plot.update_colormap_axis(self)
 
     def get_color_map(self) -> EditableColormap | None:
@@ -494,6 +518,114 @@ class BaseImageItem(QwtPlotItem):
         """Get interpolation mode"""
         return self.interpolate
 
+    def get_scaler_threads(self) -> int:
+        """Get the number of threads used by the scaler engine to draw the image
+
+        Returns:
+            Number of threads (0: one thread per CPU core), as set by the
+            ``image/threads`` option of the ``plot`` configuration section
+        """
+        return CONF.get("plot", "image/threads", 0)
+
+    def get_draw_lut(self) -> tuple | None:
+        """Get the pixel value transformation tuple passed to the scaler engine to
+        draw the image
+
+        Returns:
+            LUT tuple (a, b, bg, cmap), possibly followed by an overlay blended
+            over the image during the resampling (see
+            :py:meth:`.MaskedImageMixin.get_mask_overlay`) and by the transfer
+            function applied to pixel values (see :py:meth:`get_transfer_tuple`)
+        """
+        transfer = self.get_transfer_tuple()
+        if transfer is None:
+            return self.lut
+        return tuple(self.lut) + (None, transfer)
+
+    def get_export_lut(self, apply_lut: bool) -> tuple:
+        """Get the pixel value transformation tuple passed to the scaler engine to
+        export the image to a floating point array
+
+        Args:
+            apply_lut: If True, the LUT range and the transfer function are
+             applied (exported values are LUT indexes), otherwise data values are
+             exported as is
+
+        Returns:
+            LUT tuple
+        """
+        if not apply_lut:
+            return (1.0, 0.0, None)
+        a, b, _bg, _cmap = self.lut
+        return (a, b, None, None, None, self.get_transfer_tuple())
+
+    def set_lut_transfer(
+        self,
+        transfer: LUTTransfer | int = LUTTransfer.LINEAR,
+        param: float | None = None,
+    ) -> None:
+        """Set the transfer function applied to pixel values before the LUT
+
+        The transfer function is evaluated by the scaler engine while resampling
+        the image: no transformed copy of the data is stored.
+
+        The LUT range of scale transfer functions (logarithm, symmetric
+        logarithm, inverse hyperbolic sine) is expressed in transformed values,
+        and is converted by this method. Gamma and histogram equalization are
+        contrast curves within the LUT range, which remains in data values.
+
+        Args:
+            transfer: Transfer function (Default value = LUTTransfer.LINEAR)
+            param: Transfer function parameter (Default value = None, i.e. the
+             default parameter of the transfer function)
+
+        Example:
+            >>> item.set_lut_transfer(LUTTransfer.GAMMA, 0.5)
+        """
+        transfer = LUTTransfer(transfer)
+        if param is None:
+            param = transfer.get_default_param()
+        old_transfer, old_param = self._lut_transfer
+        self._lut_transfer = (transfer, param)
+        if (old_transfer, old_param) != (transfer, param):
+            lut_range = get_transfer_range(
+                self.get_lut_range(), old_transfer, old_param, inverse=True
+            )
+            self.set_lut_range(get_transfer_range(lut_range, transfer, param))
+
+    def get_lut_transfer(self) -> tuple[LUTTransfer, float]:
+        """Get the transfer function applied to pixel values before the LUT
+
+        Returns:
+            Tuple (transfer function, parameter)
+        """
+        return self._lut_transfer
+
+    def get_transfer_tuple(self) -> tuple | None:
+        """Get the transfer function tuple passed to the scaler engine
+
+        Returns:
+            Tuple (kind[, p0, p1, p2, table]), or None if there is no transfer
+            function (see :py:func:`.lutrange.eval_transfer`)
+        """
+        transfer, param = self._lut_transfer
+        if transfer is LUTTransfer.LINEAR:
+            return None
+        if transfer.is_scale():
+            return (transfer.value, float(param))
+        fmin, fmax = float(self.min), float(self.max)
+        if fmin == fmax or self.data is None:
+            return None
+        if transfer is LUTTransfer.GAMMA:
+            return (TRANSFER_GAMMA, float(param), fmin, fmax)
+        # Histogram equalization table is computed within the LUT range
+        key = (self._data_version, int(param), fmin, fmax)
+        if self._equalization_cache is None or self._equalization_cache[0] != key:
+            hist, bin_edges = self.get_histogram(int(param), (fmin, fmax))
+            table = get_equalization_table(hist, np.asarray(bin_edges))
+            self._equalization_cache = key, (TRANSFER_TABLE, fmin, fmax, 0.0, table)
+        return self._equalization_cache[1]
+
     def set_lut_range(self, lut_range: tuple[float, float]) -> None:
         """
         Set the current active lut range
@@ -602,7 +734,13 @@ class BaseImageItem(QwtPlotItem):
             yMap: Y axis scale map
         """
         dest = _scale_rect(
-            self.data, src_rect, self._offscreen, dst_rect, self.lut, self.interpolate
+            self.data,
+            src_rect,
+            self._offscreen,
+            dst_rect,
+            self.get_draw_lut(),
+            self.interpolate,
+            self.get_scaler_threads(),
         )
         qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
         painter.drawImage(qrect, self._image, qrect)
@@ -631,12 +769,9 @@ class BaseImageItem(QwtPlotItem):
             force_interp_mode: Force interpolation mode (Default value = None)
             force_interp_size: Force interpolation size (Default value = None)
         """
-        if apply_lut:
-            a, b, _bg, _cmap = self.lut
-        else:
-            a, b = 1.0, 0.0
+        lut = self.get_export_lut(apply_lut)
         interp = self.interpolate if apply_interpolation else (INTERP_NEAREST,)
-        _scale_rect(self.data, src_rect, dst_image, dst_rect, (a, b, None), interp)
+        _scale_rect(self.data, src_rect, dst_image, dst_rect, lut, interp)
 
     # ---- QwtPlotItem API -----------------------------------------------------
     def draw(
@@ -978,38 +1113,47 @@ class BaseImageItem(QwtPlotItem):
         """
         if self.data is None:
             return [0], [0, 1]
-        if self.histogram_cache is None or nbins != self.histogram_cache[0].shape[0]:
-            if True:
-                # Note: np.histogram does not accept data with NaN
-                res = np.histogram(
-                    self.data[~np.isnan(self.data)], bins=nbins, range=drange
-                )
-            else:
-                # TODO: _histogram is faster, but caching is buggy in this version
-                _min, _max = get_nan_range(self.data)
-                if self.data.dtype in (np.float64, np.float32):
-                    bins = np.unique(
-                        np.array(
-                            np.linspace(_min, _max, nbins + 1), dtype=self.data.dtype
-                        )
-                    )
-                else:
-                    bins = np.arange(_min, _max + 2, dtype=self.data.dtype)
-                res2 = np.zeros((bins.size + 1,), np.uint32)
-                _histogram(self.data.flatten(), bins, res2)
-                res = res2[1:-1], bins
-            self.histogram_cache = res
-        else:
-            res = self.histogram_cache
-        return res
+        # Cache is keyed on data version and histogram parameters
+        key = (self._data_version, nbins, None if drange is None else tuple(drange))
+        if self.histogram_cache is None or self.histogram_cache[0] != key:
+            self.histogram_cache = key, get_nan_histogram(self.data, nbins, drange)
+        return self.histogram_cache[1]
 
     def __process_cross_section(self, ydata, apply_lut):
         if apply_lut:
             a, b, _bg, _cmap = self.lut
+            ydata = eval_transfer(ydata, self.get_transfer_tuple())
             return (ydata * a + b).clip(0, LUT_MAX)
         else:
             return ydata
 
+    def get_integral_image(self) -> IntegralImage | None:
+        """Return the integral image (cumulative sums of data along each axis)
+        used to compute average cross sections, which is created on first call
+        and cleared by :py:meth:`data_changed`
+
+        Returns:
+            Integral image, or None if data is not a plain NumPy array (e.g. a
+            masked array, whose mask may be changed without calling `set_data`)
+        """
+        if type(self.data) is not np.ndarray or self.data.ndim != 2:
+            return None
+        if self._integral_image is None or self._integral_image.data is not self.data:
+            self._integral_image = IntegralImage(self.data)
+        return self._integral_image
+
+    def __get_average_section(
+        self, axis: int, i0: int, i1: int, j0: int, j1: int
+    ) -> np.ndarray:
+        """Return the average of the data[i0:i1, j0:j1] area along axis"""
+        integral = self.get_integral_image()
+        if integral is not None:
+            return integral.get_average_section(axis, i0, i1, j0, j1)
+        data = self.data[i0:i1, j0:j1]
+        if data.size == 0:
+            return np.array([])
+        return data.mean(axis=axis)
+
     def get_xsection(self, y0: float | int, apply_lut: bool = False) -> np.ndarray:
         """Return cross section along x-axis at y=y0
 
@@ -1058,10 +1202,9 @@ class BaseImageItem(QwtPlotItem):
             Average cross section along x-axis
         """
         ix0, iy0, ix1, iy1 = self.get_closest_index_rect(x0, y0, x1, y1)
-        ydata = self.data[iy0:iy1, ix0:ix1]
+        ydata = self.__get_average_section(0, iy0, iy1, ix0, ix1)
         if ydata.size == 0:
             return np.array([]), np.array([])
-        ydata = ydata.mean(axis=0)
         return (
             self.get_x_values(ix0, ix1),
             self.__process_cross_section(ydata, apply_lut),
@@ -1083,10 +1226,9 @@ class BaseImageItem(QwtPlotItem):
             Average cross section along y-axis
         """
         ix0, iy0, ix1, iy1 = self.get_closest_index_rect(x0, y0, x1, y1)
-        ydata = self.data[iy0:iy1, ix0:ix1]
+        ydata = self.__get_average_section(1, iy0, iy1, ix0, ix1)
         if ydata.size == 0:
             return np.array([]), np.array([])
-        ydata = ydata.mean(axis=1)
         return (
             self.get_y_values(iy0, iy1),
             self.__process_cross_section(ydata, apply_lut),
@@ -1116,6 +1258,14 @@ class RawImageItem(BaseImageItem):
         ISerializableType,
     )
 
+    def __init__(
+        self, data: np.ndarray | None = None, param: RawImageParam | None = None
+    ) -> None:
+        self._pyramid: ImagePyramid | None = None
+        self._pyramid_method: str | None = None
+        self._pyramid_memory: int | None = None
+        super().__init__(data=data, param=param)
+
     # ---- BaseImageItem API ---------------------------------------------------
     def get_default_param(self) -> RawImageParam:
         """Return instance of the default image param DataSet
@@ -1204,6 +1354,100 @@ class RawImageItem(BaseImageItem):
         data = io.imread(self.get_filename(), to_grayscale=True)
         self.set_data(data, lut_range=lut_range)
 
+    def set_pyramid_mode(
+        self, method: str | None = "mean", max_memory: int | None = None
+    ) -> None:
+        """Enable or disable the multi-resolution (mipmap) pyramid used to draw
+        the image when zoomed out
+
+        Args:
+            method: 2x2 reduction method ('mean', 'min', 'max' or 'nearest'),
+             or None to disable the pyramid. Default is 'mean'
+            max_memory: maximum memory used by the pyramid levels, in bytes.
+             Default is None (see :py:data:`.pyramid.DEFAULT_PYRAMID_MEMORY`)
+        """
+        self._pyramid_method = method
+        self._pyramid_memory = max_memory
+        self._pyramid = None
+
+    def get_pyramid_mode(self) -> str | None:
+        """Get the pyramid reduction method
+
+        Returns:
+            Reduction method, or None if the pyramid is disabled
+        """
+        return self._pyramid_method
+
+    def get_pyramid_src_data(
+        self, data: np.ndarray, src_rect: tuple[float, float, float, float]
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """Return the data and the source rectangle to be resampled in the
+        offscreen image, i.e. the coarsest pyramid level which still gives at
+        least one source pixel per screen pixel (if the pyramid is enabled)
+
+        Args:
+            data: Image data to be drawn
+            src_rect: Source rectangle, in pixel coordinates
+
+        Returns:
+            Tuple (data, src_rect)
+        """
+        if self._pyramid_method is None:
+            return data, src_rect
+        if self._pyramid is None or self._pyramid.data is not data:
+            self._pyramid = ImagePyramid(
+                data, self._pyramid_method, self._pyramid_memory
+            )
+        return self._pyramid.get_src_data(src_rect, self._offscreen.shape)
+
+    # ---- BaseImageItem API ---------------------------------------------------
+    def data_changed(self, rect: tuple[int, int, int, int] | None = None) -> None:
+        """Notify the item that its data has changed: the pyramid is dropped, or
+        updated in the changed region only (see
+        :py:meth:`.BaseImageItem.data_changed`)
+
+        Args:
+            rect: region (i0, i1, j0, j1) of data which has changed.
+             Default is None (whole data)
+        """
+        if rect is None or self._pyramid is None or self._pyramid.data is not self.data:
+            self._pyramid = None
+        else:
+            self._pyramid.update_region(*rect)
+        super().data_changed(rect)
+
+    def draw_image(
+        self,
+        painter: QPainter,
+        canvasRect: QRectF,
+        src_rect: tuple[float, float, float, float],
+        dst_rect: tuple[float, float, float, float],
+        xMap: qwt.scale_map.QwtScaleMap,
+        yMap: qwt.scale_map.QwtScaleMap,
+    ) -> None:
+        """Draw image
+
+        Args:
+            painter: Painter
+            canvasRect: Canvas rectangle
+            src_rect: Source rectangle
+            dst_rect: Destination rectangle
+            xMap: X axis scale map
+            yMap: Y axis scale map
+        """
+        data, src_rect = self.get_pyramid_src_data(self.data, src_rect)
+        dest = _scale_rect(
+            data,
+            src_rect,
+            self._offscreen,
+            dst_rect,
+            self.get_draw_lut(),
+            self.interpolate,
+            self.get_scaler_threads(),
+        )
+        qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
+        painter.drawImage(qrect, self._image, qrect)
+
     # ---- IBasePlotItem API ---------------------------------------------------
     def types(self) -> tuple[type[IItemType], ...]:
         """Returns a group or category for this item.
@@ -188,7 +188,10 @@ class ImageFilterItem(BaseImageItem):
         self.border_rect.move_with_selection(delta_x, delta_y)
 
     def set_color_map(
-        self, name_or_table: str | EditableColormap, invert: bool | None = None
+        self,
+        name_or_table: str | EditableColormap,
+        invert: bool | None = None,
+        update_axis: bool = True,
     ) -> None:
         """Set colormap
 
@@ -196,12 +199,14 @@ class ImageFilterItem(BaseImageItem):
             name_or_table: Colormap name or colormap
             invert: True to invert colormap, False otherwise (Default value = None,
              i.e. do not change the default behavior)
+            update_axis: If True, update the colormap axis of the plot (Default
+             value = True)
         """
         if self.use_source_cmap:
             if self.image is not None:
-                self.image.set_color_map(name_or_table, invert)
+                self.image.set_color_map(name_or_table, invert, update_axis)
         else:
-            BaseImageItem.set_color_map(self, name_or_table, invert)
+            BaseImageItem.set_color_map(self, name_or_table, invert, update_axis)
 
     def get_color_map(self) -> qwt.color_map.QwtLinearColorMap:
         """Get colormap"""
@@ -337,6 +342,7 @@ class XYImageFilterItem(ImageFilterItem):
             dstRect.getCoords(),
             lut,
             self.interpolate,
+            self.get_scaler_threads(),
         )
         qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
         painter.drawImage(qrect, self._image, qrect)
@@ -12,7 +12,7 @@ from qtpy import QtCore as QC
 
 from plotpy import io
 from plotpy.config import _
-from plotpy.constants import LUTAlpha
+from plotpy.constants import LUTAlpha, LUTTransfer
 from plotpy.coords import canvas_to_axes, pixelround
 from plotpy.interfaces import (
     IBaseImageItem,
@@ -28,7 +28,7 @@ from plotpy.interfaces import (
 )
 from plotpy.items.image.base import RawImageItem
 from plotpy.items.image.filter import XYImageFilterItem, to_bins
-from plotpy.mathutils.arrayfuncs import get_nan_range
+from plotpy.lutrange import get_transfer_range
 from plotpy.styles.image import ImageParam, RGBImageParam, XYImageParam
 
 if TYPE_CHECKING:
@@ -42,7 +42,7 @@ if TYPE_CHECKING:
     from plotpy.widgets.colormap.widget import EditableColormap
 
 try:
-    from plotpy._scaler import INTERP_NEAREST, _scale_rect, _scale_xy
+    from plotpy._scaler import INTERP_NEAREST, _pack_rgb, _scale_rect, _scale_xy
 except ImportError:
     print(
         ("Module 'plotpy.items.image': missing C extension"),
@@ -84,9 +84,7 @@ class ImageItem(RawImageItem):
         self.xmax = None
         self.ymin = None
         self.ymax = None
-        self._log_data = None
         self._lin_lut_range = None
-        self._is_zaxis_log = False
         super().__init__(data=data, param=param)
 
     # ---- BaseImageItem API ---------------------------------------------------
@@ -230,19 +228,18 @@ class ImageItem(RawImageItem):
 
     def get_zaxis_log_state(self):
         """Reimplement image.ImageItem method"""
-        return self._is_zaxis_log
+        return self.get_lut_transfer()[0] is LUTTransfer.LOG
 
     def set_zaxis_log_state(self, state):
         """Reimplement image.ImageItem method"""
-        self._is_zaxis_log = state
         plot = self.plot()
         if state:
             self._lin_lut_range = self.get_lut_range()
-            if self._log_data is None:
-                self._log_data = np.array(np.log10(self.data.clip(1)), dtype=np.float64)
-            self.set_lut_range(get_nan_range(self._log_data))
+            self.set_lut_transfer(LUTTransfer.LOG, 1.0)
+            lut_range = self.get_lut_range_full()
+            self.set_lut_range(get_transfer_range(lut_range, LUTTransfer.LOG, 1.0))
         else:
-            self._log_data = None
+            self.set_lut_transfer(LUTTransfer.LINEAR)
             self.set_lut_range(self._lin_lut_range)
         plot.update_colormap_axis(self)
 
@@ -378,18 +375,17 @@ class ImageItem(RawImageItem):
             return
         src2 = self._rescale_src_rect(src_rect)
         dst_rect = tuple([int(i) for i in dst_rect])
-
-        # Not the most efficient way to do it, but it works...
-        # --------------------------------------------------------------------------
-        if self.get_zaxis_log_state():
-            data = self._log_data
-        else:
-            data = self.data
-        # --------------------------------------------------------------------------
+        data, src2 = self.get_pyramid_src_data(self.data, src2)
 
         try:
             dest = _scale_rect(
-                data, src2, self._offscreen, dst_rect, self.lut, self.interpolate
+                data,
+                src2,
+                self._offscreen,
+                dst_rect,
+                self.get_draw_lut(),
+                self.interpolate,
+                self.get_scaler_threads(),
             )
         except ValueError:
             # This exception is raised when zooming unreasonably inside a pixel
@@ -421,17 +417,13 @@ class ImageItem(RawImageItem):
             force_interp_mode: Force interpolation mode (Default value = None)
             force_interp_size: Force interpolation size (Default value = None)
         """
-        if apply_lut:
-            a, b, _bg, _cmap = self.lut
-        else:
-            a, b = 1.0, 0.0
         interp = self.interpolate if apply_interpolation else (INTERP_NEAREST,)
         _scale_rect(
             self.data,
             self._rescale_src_rect(src_rect),
             dst_image,
             dst_rect,
-            (a, b, None),
+            self.get_export_lut(apply_lut),
             interp,
         )
 
@@ -654,7 +646,13 @@ class XYImageItem(RawImageItem):
         xytr = self.x, self.y, src_rect
         dst_rect = tuple([int(i) for i in dst_rect])
         dest = _scale_xy(
-            self.data, xytr, self._offscreen, dst_rect, self.lut, self.interpolate
+            self.data,
+            xytr,
+            self._offscreen,
+            dst_rect,
+            self.get_draw_lut(),
+            self.interpolate,
+            self.get_scaler_threads(),
         )
         qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
         painter.drawImage(qrect, self._image, qrect)
@@ -759,6 +757,11 @@ assert_interfaces_valid(XYImageItem)
 class RGBImageItem(ImageItem):
     """RGB image item
 
+    RGB(A) data is converted to ARGB32 pixels (the `data` attribute) in one pass
+    by the scaler engine. Data which pixels are already packed, i.e. uint8 BGRA
+    data with contiguous pixels (e.g. Qt or OpenCV images with an alpha
+    channel), is not copied: `data` is then a view of this data.
+
     Args:
         data: 3D NumPy array (shape: NxMx[34] -- 3: RGB, 4: RGBA)
         param: image parameters
@@ -770,6 +773,9 @@ class RGBImageItem(ImageItem):
         self, data: np.ndarray | None = None, param: RGBImageParam | None = None
     ) -> None:
         self.orig_data = None
+        self.__channel_order = "RGB"
+        self.__lazy = False
+        self.__packed_on_draw = False
         super().__init__(data, param)
         self.lut = None
 
@@ -779,22 +785,58 @@ class RGBImageItem(ImageItem):
         return RGBImageParam(_("Image"))
 
     # ---- Public API ----------------------------------------------------------
+    def get_packing_params(self) -> tuple[int, bool]:
+        """Return the parameters of the conversion of RGB(A) data to ARGB32 pixels
+
+        Returns:
+            Tuple (alpha, bgr): alpha value (-1: alpha channel of data is used)
+            and True if data channels are in BGR(A) order
+        """
+        NC = self.orig_data.shape[2]
+        use_alpha = self.param.alpha_function != LUTAlpha.NONE.value
+        if NC > 3 and use_alpha:
+            alpha = -1
+        else:
+            alpha = int(255 * self.param.alpha)
+        return alpha, self.__channel_order == "BGR"
+
     def recompute_alpha_channel(self) -> None:
         """Recompute alpha channel"""
         data = self.orig_data
         if self.orig_data is None:
             return
         H, W, NC = data.shape
-        R = data[..., 0].astype(np.uint32)
+        alpha, bgr = self.get_packing_params()
+        self._pyramid = None
+        self.__packed_on_draw = False
+        if data.dtype == np.uint8 and NC == 4 and data.strides[1:] == (4, 1):
+            if bgr and alpha < 0:
+                # Pixels are already packed: no copy
+                self.data = data.view(np.uint32)[..., 0]
+                return
+            if self.__lazy:
+                # BGRA pixels are already packed, except for the constant alpha
+                # value which is applied when drawn, only in the visible area
+                self.data = data.view(np.uint32)[..., 0]
+                self.__packed_on_draw = True
+                return
+        if (
+            self.data is None
+            or self.data.shape != (H, W)
+            or np.may_share_memory(self.data, data)
+        ):
+            self.data = np.empty((H, W), np.uint32)
+        if data.dtype == np.uint8:
+            _pack_rgb(data, self.data, alpha, bgr, self.get_scaler_threads())
+            return
+        R = data[..., 2 if bgr else 0].astype(np.uint32)
         G = data[..., 1].astype(np.uint32)
-        B = data[..., 2].astype(np.uint32)
-        use_alpha = self.param.alpha_function != LUTAlpha.NONE.value
-        alpha = self.param.alpha
-        if NC > 3 and use_alpha:
+        B = data[..., 0 if bgr else 2].astype(np.uint32)
+        if alpha < 0:
             A = data[..., 3].astype(np.uint32)
         else:
             A = np.zeros((H, W), np.uint32)
-            A[:, :] = int(255 * alpha)
+            A[:, :] = alpha
         self.data[:, :] = (A << 24) + (R << 16) + (G << 8) + B
 
     # --- BaseImageItem API ----------------------------------------------------
@@ -822,7 +864,10 @@ class RGBImageItem(ImageItem):
         self.lut = None
 
     def set_color_map(
-        self, name_or_table: str | EditableColormap, invert: bool | None = None
+        self,
+        name_or_table: str | EditableColormap,
+        invert: bool | None = None,
+        update_axis: bool = True,
     ) -> None:
         """Set colormap
 
@@ -830,6 +875,8 @@ class RGBImageItem(ImageItem):
             name_or_table: Colormap name or colormap
             invert: True to invert colormap, False otherwise (Default value = None,
              i.e. do not change the default behavior)
+            update_axis: If True, update the colormap axis of the plot (Default
+             value = True)
         """
         self.lut = None
 
@@ -839,20 +886,88 @@ class RGBImageItem(ImageItem):
         data = io.imread(self.get_filename(), to_grayscale=False)
         self.set_data(data)
 
-    def set_data(self, data: np.ndarray) -> None:
+    def set_data(
+        self, data: np.ndarray, channel_order: str = "RGB", lazy: bool = False
+    ) -> None:
         """Set image data
 
         Args:
-            data: 2D NumPy array
-        """
-        H, W, NC = data.shape
+            data: 3D NumPy array (shape: NxMx[34] -- 3: RGB, 4: RGBA)
+            channel_order: Order of color channels, "RGB" (RGB or RGBA data)
+             or "BGR" (BGR or BGRA data). Default value = "RGB"
+            lazy: If True, data is never copied, even if the alpha channel is not
+             used (the constant alpha value is then applied to the visible area
+             only, each time the item is drawn): the `data` attribute is a view
+             of the data, as is (i.e. with its alpha channel). This requires
+             uint8 BGRA data with contiguous pixels (i.e. packed ARGB32 pixels).
+             Default value = False
+        """
+        if channel_order not in ("RGB", "BGR"):
+            raise ValueError(f"Unsupported channel order: {channel_order}")
+        if lazy and not (
+            channel_order == "BGR"
+            and data.dtype == np.uint8
+            and data.ndim == 3
+            and data.shape[2] == 4
+            and data.strides[1:] == (4, 1)
+        ):
+            # Item data must be ARGB32 pixels for the rest of the item API
+            # (cross sections, statistics, export, etc.)
+            raise ValueError(
+                "Lazy mode requires uint8 BGRA data with contiguous pixels"
+            )
+        self._pyramid = None
         self.orig_data = data
-        self.data = np.empty((H, W), np.uint32)
+        self.__channel_order = channel_order
+        self.__lazy = lazy
+        self.data = None
         self.recompute_alpha_channel()
         self.update_bounds()
         self.update_border()
         self.lut = None
 
+    def draw_image(
+        self,
+        painter: QPainter,
+        canvasRect: QRectF,
+        src_rect: tuple[float, float, float, float],
+        dst_rect: tuple[float, float, float, float],
+        xMap: qwt.scale_map.QwtScaleMap,
+        yMap: qwt.scale_map.QwtScaleMap,
+    ) -> None:
+        """Draw image
+
+        Args:
+            painter: Painter
+            canvasRect: Canvas rectangle
+            src_rect: Source rectangle
+            dst_rect: Destination rectangle
+            xMap: X axis scale map
+            yMap: Y axis scale map
+        """
+        if not self.__packed_on_draw:
+            super().draw_image(painter, canvasRect, src_rect, dst_rect, xMap, yMap)
+            return
+        src2 = self._rescale_src_rect(src_rect)
+        dst_rect = tuple([int(i) for i in dst_rect])
+        try:
+            # Only the source pixels sampled for the destination rectangle are
+            # converted to ARGB32 pixels
+            dest = _scale_rect(
+                self.orig_data,
+                src2,
+                self._offscreen,
+                dst_rect,
+                self.get_packing_params(),
+                self.interpolate,
+                self.get_scaler_threads(),
+            )
+        except ValueError:
+            # This exception is raised when zooming unreasonably inside a pixel
+            return
+        qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
+        painter.drawImage(qrect, self._image, qrect)
+
     # ---- IBasePlotItem API ---------------------------------------------------
     def types(self) -> tuple[type[IItemType], ...]:
         """Returns a group or category for this item.
@@ -7,10 +7,8 @@ from typing import TYPE_CHECKING
 import guidata.io
 import numpy as np
 import numpy.ma as ma
-from qtpy import QtCore as QC
 
 from plotpy import io
-from plotpy._scaler import INTERP_NEAREST, _scale_rect, _scale_xy
 from plotpy.config import _
 from plotpy.interfaces import (
     IBaseImageItem,
@@ -19,13 +17,11 @@ from plotpy.interfaces import (
     IVoiImageItemType,
 )
 from plotpy.items.image.image_items import ImageItem, XYImageItem
+from plotpy.mathutils.bitmask import PackedMask, unpack_mask
 from plotpy.styles.image import MaskedImageParam, MaskedXYImageParam
 
 if TYPE_CHECKING:
     import guidata.io
-    import qwt.scale_map
-    from qtpy.QtCore import QRectF
-    from qtpy.QtGui import QPainter
 
     from plotpy.plot import BasePlot
 
@@ -110,6 +106,7 @@ class MaskedImageMixin:
         self._mask: ma.MaskedArray | None = mask
         self._mask_filename: str | None = None
         self._masked_areas: list[MaskedArea] = []
+        self._packed_mask: PackedMask | None = None
         # ImageItem and XYImageItem attributes:
         self.data: ma.MaskedArray | None = None
         self.param: MaskedImageParam | MaskedXYImageParam | None = None
@@ -126,6 +123,13 @@ class MaskedImageMixin:
         """
         writer.write(self.get_mask_filename(), group_name="mask_fname")
         writer.write_object_list(self._masked_areas, "masked_areas")
+        # Masks which may not be restored from a file or from the masked areas
+        # (e.g. drawn with the free-form masking tool) are saved bit-packed
+        bits = None
+        if self.get_mask_filename() is None and self.data is not None:
+            if ma.getmask(self.data) is not ma.nomask and self.data.mask.any():
+                bits = self.get_packed_mask().bits
+        writer.write(bits, group_name="mask_bits")
 
     def deserialize(
         self,
@@ -138,9 +142,14 @@ class MaskedImageMixin:
         """
         mask_fname = reader.read(group_name="mask_fname", func=reader.read_unicode)
         masked_areas = reader.read_object_list("masked_areas", MaskedArea)
+        bits = reader.read(group_name="mask_bits", func=reader.read_array, default=None)
         if mask_fname:
             self.set_mask_filename(mask_fname)
             self.load_mask_data()
+        elif bits is not None and self.data is not None:
+            self.set_masked_areas(masked_areas)
+            self.set_mask(unpack_mask(np.asarray(bits, np.uint8), self.data.shape[1]))
+            self._mask_changed()
         elif masked_areas and self.data is not None:
             self.set_masked_areas(masked_areas)
             self.apply_masked_areas()
@@ -165,6 +174,7 @@ class MaskedImageMixin:
             mask: 2D masked array
         """
         self.data.mask = mask
+        self.set_mask_dirty_rect()
 
     def get_mask(self) -> ma.MaskedArray | None:
         """Get image mask
@@ -198,6 +208,51 @@ class MaskedImageMixin:
         """
         return self._mask_filename
 
+    def set_mask_dirty_rect(
+        self, i0: int = 0, i1: int | None = None, j0: int = 0, j1: int | None = None
+    ) -> None:
+        """Declare a region of the mask as changed
+
+        This is done by all the masking methods of the item: this method has to be
+        called only after changing the mask array in place. The results computed
+        from data are updated (see :py:meth:`data_changed`), in this region only
+        if possible, and the tiles of the bit-packed copy of the mask (see
+        :py:meth:`get_packed_mask`) intersecting this region are marked as dirty.
+
+        Args:
+            i0: First row (Default value = 0)
+            i1: Last row (excluded, Default value = None: last row of mask)
+            j0: First column (Default value = 0)
+            j1: Last column (excluded, Default value = None: last column of mask)
+        """
+        if self.data is None:
+            return
+        if self._packed_mask is not None:
+            self._packed_mask.set_dirty_rect(i0, i1, j0, j1)
+        ni, nj = self.data.shape
+        rect = (i0, ni if i1 is None else i1, j0, nj if j1 is None else j1)
+        self.data_changed(None if rect == (0, ni, 0, nj) else rect)
+
+    def get_packed_mask(self) -> PackedMask | None:
+        """Get the bit-packed copy of the mask (see :py:mod:`.bitmask`), which is
+        used to save the mask
+
+        The copy is created on first call, and then updated incrementally: only
+        the tiles intersecting the regions of the mask changed since the last call
+        are packed again (see :py:meth:`.PackedMask.update`).
+
+        Returns:
+            Bit-packed mask (None if there is no data)
+        """
+        if self.data is None:
+            return None
+        packed = self._packed_mask
+        if packed is None or packed.shape != self.data.shape:
+            packed = self._packed_mask = PackedMask(self.data.shape)
+        mask = ma.getmask(self.data)
+        packed.update(None if mask is ma.nomask else mask)
+        return packed
+
     def load_mask_data(self) -> None:
         """Load mask data from file"""
         data = io.imread(self.get_mask_filename(), to_grayscale=True)
@@ -275,11 +330,13 @@ class MaskedImageMixin:
     def mask_all(self) -> None:
         """Mask all pixels"""
         self.data.mask = True
+        self.set_mask_dirty_rect()
         self._mask_changed()
 
     def unmask_all(self) -> None:
         """Unmask all pixels"""
         self.data.mask = np.ma.nomask
+        self.set_mask_dirty_rect()
         self.set_masked_areas([])
         self._mask_changed()
 
@@ -309,10 +366,9 @@ class MaskedImageMixin:
         ix0, iy0, ix1, iy1 = self.get_closest_index_rect(x0, y0, x1, y1)
         if inside:
             self.data[iy0:iy1, ix0:ix1] = np.ma.masked
+            self.set_mask_dirty_rect(iy0, iy1, ix0, ix1)
         else:
-            indexes = np.ones(self.data.shape, dtype=bool)
-            indexes[iy0:iy1, ix0:ix1] = False
-            self.data[indexes] = np.ma.masked
+            self.__mask_outside_rect(ix0, iy0, ix1, iy1)
         if trace:
             self.add_masked_area("rectangular", x0, y0, x1, y1, inside)
         if do_signal:
@@ -344,26 +400,30 @@ class MaskedImageMixin:
         ix0, iy0, ix1, iy1 = self.get_closest_index_rect(x0, y0, x1, y1)
         xc, yc = 0.5 * (x0 + x1), 0.5 * (y0 + y1)
         radius = 0.5 * (x1 - x0)
-        xdata, ydata = self.get_x_values(ix0, ix1), self.get_y_values(iy0, iy1)
-
-        for ix in range(ix0, ix1):
-            for iy in range(iy0, iy1):
-                distance = np.sqrt(
-                    (xdata[ix - ix0] - xc) ** 2 + (ydata[iy - iy0] - yc) ** 2
-                )
-                if inside:
-                    if distance <= radius:
-                        self.data[iy, ix] = np.ma.masked
-                elif distance > radius:
-                    self.data[iy, ix] = np.ma.masked
-
-        if not inside:
-            self.mask_rectangular_area(x0, y0, x1, y1, inside, trace=False)
+        xdata = np.asarray(self.get_x_values(ix0, ix1), dtype=np.float64)
+        ydata = np.asarray(self.get_y_values(iy0, iy1), dtype=np.float64)
+        # The disk is rasterized at once, within its bounding box only
+        distance = np.sqrt((xdata[None, :] - xc) ** 2 + (ydata[:, None] - yc) ** 2)
+        disk = distance <= radius
+        rows, cols = np.nonzero(disk if inside else ~disk)
+        self.data[rows + iy0, cols + ix0] = np.ma.masked
+        if inside:
+            self.set_mask_dirty_rect(iy0, iy1, ix0, ix1)
+        else:
+            self.__mask_outside_rect(ix0, iy0, ix1, iy1)
         if trace:
             self.add_masked_area("circular", x0, y0, x1, y1, inside)
         if do_signal:
             self._mask_changed()
 
+    def __mask_outside_rect(self, ix0: int, iy0: int, ix1: int, iy1: int) -> None:
+        """Mask all pixels outside a rectangular area (index bounds)"""
+        self.data[:iy0] = np.ma.masked
+        self.data[iy1:] = np.ma.masked
+        self.data[iy0:iy1, :ix0] = np.ma.masked
+        self.data[iy0:iy1, ix1:] = np.ma.masked
+        self.set_mask_dirty_rect()
+
     def is_mask_visible(self) -> bool:
         """Return mask visibility
 
@@ -383,6 +443,46 @@ class MaskedImageMixin:
         if plot is not None:
             plot.replot()
 
+    def get_mask_overlay(self) -> tuple[np.ndarray, int, int, int] | None:
+        """Get the mask overlay blended over the image by the scaler engine
+
+        The mask is passed as is to the scaler engine (no copy), and the overlay
+        is blended over the image while it is resampled: showing the mask does
+        not require another resampling pass.
+
+        Returns:
+            Tuple (mask, ncols, masked_color, unmasked_color), or None if the mask
+            is not visible
+        """
+        if self.data is None or not self.is_mask_visible():
+            return None
+        alpha_masked = int(255 * self.param.alpha_masked + 0.5)
+        alpha_unmasked = int(255 * self.param.alpha_unmasked + 0.5)
+        mask = ma.getmask(self.data)
+        if mask is ma.nomask:
+            mask = np.zeros((1, 1), dtype=bool)
+        return (
+            mask,
+            mask.shape[1],
+            (min(max(alpha_masked, 0), 255) << 24) | 0xFFFFFF,
+            min(max(alpha_unmasked, 0), 255) << 24,
+        )
+
+    def get_draw_lut(self) -> tuple:
+        """Get the pixel value transformation tuple passed to the scaler engine to
+        draw the image, including the mask overlay (if visible)
+
+        Returns:
+            LUT tuple
+        """
+        overlay = self.get_mask_overlay()
+        transfer = self.get_transfer_tuple()
+        if transfer is not None:
+            return tuple(self.lut) + (overlay, transfer)
+        if overlay is None:
+            return self.lut
+        return tuple(self.lut) + (overlay,)
+
     def _set_data(self, data: np.ndarray) -> None:
         """Set image data
 
@@ -391,6 +491,7 @@ class MaskedImageMixin:
         """
         self.orig_data = data
         self.data = data.view(np.ma.MaskedArray)
+        self._packed_mask = None
         self.set_mask(self._mask)
         self._mask = None  # removing reference to this temporary array
         if self.param.filling_value is None:
@@ -496,55 +597,14 @@ class MaskedImageItem(ImageItem, MaskedImageMixin):
         MaskedImageMixin.deserialize(self, reader)
 
     # ---- BaseImageItem API ----------------------------------------------------
-    def draw_image(
-        self,
-        painter: QPainter,
-        canvasRect: QRectF,
-        src_rect: tuple[float, float, float, float],
-        dst_rect: tuple[float, float, float, float],
-        xMap: qwt.scale_map.QwtScaleMap,
-        yMap: qwt.scale_map.QwtScaleMap,
-    ) -> None:
-        """Draw image
+    def get_draw_lut(self) -> tuple:
+        """Get the pixel value transformation tuple passed to the scaler engine to
+        draw the image, including the mask overlay (if visible)
 
-        Args:
-            painter: Painter
-            canvasRect: Canvas rectangle
-            src_rect: Source rectangle
-            dst_rect: Destination rectangle
-            xMap: X axis scale map
-            yMap: Y axis scale map
+        Returns:
+            LUT tuple
         """
-        ImageItem.draw_image(self, painter, canvasRect, src_rect, dst_rect, xMap, yMap)
-        if self.data is None:
-            return
-        if self.is_mask_visible():
-            _a, _b, bg, _cmap = self.lut
-            # pylint: disable=too-many-function-args
-            alpha_masked = (
-                np.uint32(255 * self.param.alpha_masked + 0.5).clip(0, 255) << 24
-            )
-            alpha_unmasked = (
-                np.uint32(255 * self.param.alpha_unmasked + 0.5).clip(0, 255) << 24
-            )
-            cmap = np.array(
-                [
-                    np.uint32(0x000000 & 0xFFFFFF) | alpha_unmasked,
-                    np.uint32(0xFFFFFF & 0xFFFFFF) | alpha_masked,
-                ],
-                dtype=np.uint32,
-            )
-            lut = (1, 0, bg, cmap)
-            shown_data = np.ma.getmaskarray(self.data)
-            src2 = self._rescale_src_rect(src_rect)
-            dst_rect = tuple([int(i) for i in dst_rect])
-            dest = _scale_rect(
-                shown_data, src2, self._offscreen, dst_rect, lut, (INTERP_NEAREST,)
-            )
-            qrect = QC.QRectF(
-                QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3])
-            )
-            painter.drawImage(qrect, self._image, qrect)
+        return MaskedImageMixin.get_draw_lut(self)
 
     # ---- RawImageItem API -----------------------------------------------------
     def set_data(
@@ -665,58 +725,14 @@ class MaskedXYImageItem(XYImageItem, MaskedImageMixin):
         MaskedImageMixin.deserialize(self, reader)
 
     # ---- BaseImageItem API ----------------------------------------------------
-    def draw_image(
-        self,
-        painter: QPainter,
-        canvasRect: QRectF,
-        src_rect: tuple[float, float, float, float],
-        dst_rect: tuple[float, float, float, float],
-        xMap: qwt.scale_map.QwtScaleMap,
-        yMap: qwt.scale_map.QwtScaleMap,
-    ) -> None:
-        """Draw image
+    def get_draw_lut(self) -> tuple:
+        """Get the pixel value transformation tuple passed to the scaler engine to
+        draw the image, including the mask overlay (if visible)
 
-        Args:
-            painter: Painter
-            canvasRect: Canvas rectangle
-            src_rect: Source rectangle
-            dst_rect: Destination rectangle
-            xMap: X axis scale map
-            yMap: Y axis scale map
+        Returns:
+            LUT tuple
         """
-        XYImageItem.draw_image(
-            self, painter, canvasRect, src_rect, dst_rect, xMap, yMap
-        )
-        if self.data is None:
-            return
-        if self.is_mask_visible():
-            _a, _b, bg, _cmap = self.lut
-            # pylint: disable=too-many-function-args
-            alpha_masked = (
-                np.uint32(255 * self.param.alpha_masked + 0.5).clip(0, 255) << 24
-            )
-            alpha_unmasked = (
-                np.uint32(255 * self.param.alpha_unmasked + 0.5).clip(0, 255) << 24
-            )
-            cmap = np.array(
-                [
-                    np.uint32(0x000000 & 0xFFFFFF) | alpha_unmasked,
-                    np.uint32(0xFFFFFF & 0xFFFFFF) | alpha_masked,
-                ],
-                dtype=np.uint32,
-            )
-            lut = (1, 0, bg, cmap)
-            shown_data = np.ma.getmaskarray(self.data)
-
-            xytr = self.x, self.y, src_rect
-            dst_rect = tuple([int(i) for i in dst_rect])
-            dest = _scale_xy(
-                shown_data, xytr, self._offscreen, dst_rect, lut, (INTERP_NEAREST,)
-            )
-            qrect = QC.QRectF(
-                QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3])
-            )
-            painter.drawImage(qrect, self._image, qrect)
+        return MaskedImageMixin.get_draw_lut(self)
 
     def set_data(
         self, data: np.ndarray, lut_range: list[float, float] | None = None
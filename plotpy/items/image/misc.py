@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import sys
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 import numpy as np
 from guidata.dataset import update_dataset
@@ -28,11 +28,13 @@ from plotpy.interfaces import (
 from plotpy.items.image.base import BaseImageItem, RawImageItem
 from plotpy.items.image.transform import TrImageItem
 from plotpy.mathutils.arrayfuncs import get_nan_range
+from plotpy.mathutils.pointindex import PointIndex
+from plotpy.mathutils.threads import get_threads_count, map_ordered
 from plotpy.styles import Histogram2DParam, ImageParam, QuadGridParam
 
 try:
     from plotpy._scaler import _histogram, _scale_quads
-    from plotpy.histogram2d import histogram2d, histogram2d_func
+    from plotpy.histogram2d import histogram2d_stats
 except ImportError:
     print(
         ("Module 'plotpy.items.image.base': missing C extension"),
@@ -140,7 +142,7 @@ class QuadGridItem(RawImageItem):
             _min, _max = get_nan_range(data)
 
         self.data = data
-        self.histogram_cache = None
+        self.data_changed()
         if X is not None:
             assert Y is not None
             self.X = X
@@ -207,6 +209,18 @@ class Histogram2DItem(BaseImageItem):
     __implements__ = (IBasePlotItem, IBaseImageItem, IHistDataSource, IVoiImageItemType)
     _icon_name = "histogram2d.png"
 
+    #: Computations made by the parallel 2-D histogram engine (the 'argmin' and
+    #: 'argmax' computations show the minimum and maximum values of bins)
+    STATS = {0: "max", 1: "min", 2: "sum", 3: "prod", 4: "mean", 5: "min", 6: "max"}
+
+    #: Minimum number of points for building a spatial index of points
+    index_min_points = 1 << 20
+
+    #: If True, bin counts of indexed point clouds may be approximated from the
+    #: count pyramid of the index when zoomed out (fractional counts, see
+    #: :py:meth:`.PointIndex.count_from_pyramid`). Default is False (exact counts)
+    index_approximate_counts = False
+
     def __init__(
         self,
         X: np.ndarray,
@@ -227,6 +241,8 @@ class Histogram2DItem(BaseImageItem):
         # internal use
         self._x = None
         self._y = None
+        self._hist_key = None  # parameters of the last computed histogram
+        self._index: PointIndex | None = None
 
         # Histogram parameters
         self.histparam = param
@@ -251,8 +267,7 @@ class Histogram2DItem(BaseImageItem):
         self.nx_bins = NX
         self.ny_bins = NY
         self.data = np.zeros((self.ny_bins, self.nx_bins), float)
-        if self._z is not None:
-            self.data_tmp = np.zeros((self.ny_bins, self.nx_bins), float)
+        self._hist_key = None
 
     def set_data(
         self, X: np.ndarray, Y: np.ndarray, Z: np.ndarray | None = None
@@ -267,11 +282,67 @@ class Histogram2DItem(BaseImageItem):
         self._x = X
         self._y = Y
         self._z = Z
+        self._hist_key = None
+        self._index = None
         self.bounds = QC.QRectF(
             QC.QPointF(X.min(), Y.min()), QC.QPointF(X.max(), Y.max())
         )
         self.update_border()
 
+    def get_point_index(self) -> PointIndex | None:
+        """Return the spatial index of points, building it on first call
+
+        The index is built only if there are at least :py:attr:`index_min_points`
+        points: it holds sorted float64 copies of X, Y (and Z) data, i.e. up to
+        24 bytes per point in addition to the original data.
+
+        Returns:
+            Point index, or None if there are too few points
+        """
+        if (
+            self._index is None
+            and self._x is not None
+            and self._x.size >= self.index_min_points
+        ):
+            self._index = PointIndex(self._x, self._y, self._z)
+        return self._index
+
+    def __compute_statistics(
+        self, name: str, i1: float, i2: float, j1: float, j2: float
+    ) -> np.ndarray:
+        """Compute 2-D histogram statistics (see `compute_histogram`)"""
+        nthreads = self.get_scaler_threads()
+        args = (i1, i2, j1, j2, self.nx_bins, self.ny_bins)
+        index = self.get_point_index()
+        if index is not None:
+            approximate = self.index_approximate_counts
+            return index.histogram(*args, (name,), nthreads, approximate)[name]
+        z = None if name == "count" else self._z
+        return histogram2d_stats(self._x, self._y, *args, z, (name,), nthreads)[name]
+
+    def compute_histogram(self, i1: float, i2: float, j1: float, j2: float) -> None:
+        """Compute histogram data for the given coordinate range
+
+        All computations are made by the parallel 2-D histogram engine, in a single
+        pass over data (over the visible points only, if the point cloud is
+        indexed: see :py:meth:`get_point_index`).
+
+        Args:
+            i1: X coordinate of the first bin edge
+            i2: X coordinate of the last bin edge
+            j1: Y coordinate of the first bin edge
+            j2: Y coordinate of the last bin edge
+        """
+        computation = self.histparam.computation
+        if computation == -1 or self._z is None:
+            count = self.__compute_statistics("count", i1, i2, j1, j2)
+            if self.logscale:
+                count = np.log1p(count)
+            self.data[:, :] = count
+        else:
+            name = self.STATS[computation]
+            self.data[:, :] = self.__compute_statistics(name, i1, i2, j1, j2)
+
     # ---- QwtPlotItem API ------------------------------------------------------
     fill_canvas = True
 
@@ -296,40 +367,10 @@ class Histogram2DItem(BaseImageItem):
         """
         computation = self.histparam.computation
         i1, j1, i2, j2 = src_rect
-
-        if computation == -1 or self._z is None:
-            self.data[:, :] = 0.0
-            nmax = histogram2d(
-                self._x, self._y, i1, i2, j1, j2, self.data, self.logscale
-            )
-        else:
-            self.data_tmp[:, :] = 0.0
-            if computation in (2, 4):  # sum, avg
-                self.data[:, :] = 0.0
-            elif computation in (1, 5):  # min, argmin
-                val = np.inf
-                self.data[:, :] = val
-            elif computation in (0, 6):  # max, argmax
-                val = -np.inf
-                self.data[:, :] = val
-            elif computation == 3:
-                self.data[:, :] = 1.0
-            histogram2d_func(
-                self._x,
-                self._y,
-                self._z,
-                i1,
-                i2,
-                j1,
-                j2,
-                self.data_tmp,
-                self.data,
-                computation,
-            )
-            if computation in (0, 1, 5, 6):
-                self.data[self.data == val] = np.nan
-            else:
-                self.data[self.data_tmp == 0.0] = np.nan
+        key = (tuple(src_rect), computation, self.logscale, id(self.data))
+        if key != self._hist_key:
+            self.compute_histogram(i1, i2, j1, j2)
+            self._hist_key = key
         if self.histparam.auto_lut:
             nmin, nmax = get_nan_range(self.data)
             self.set_lut_range([nmin, nmax])
@@ -340,7 +381,7 @@ class Histogram2DItem(BaseImageItem):
             return BaseImageItem.draw_image(self, *args)
 
         if self.fill_canvas:
-            x1, y1, x2, y2 = canvasRect.getCoords()
+            x1, y1, x2, y2 = [int(i) for i in canvasRect.getCoords()]
             drawfunc(painter, canvasRect, src_rect, (x1, y1, x2, y2), xMap, yMap)
         else:
             dst_rect = tuple([int(i) for i in dst_rect])
@@ -440,6 +481,32 @@ class Histogram2DItem(BaseImageItem):
 assert_interfaces_valid(Histogram2DItem)
 
 
+#: Size of the destination tiles processed in parallel by
+#: :py:func:`assemble_imageitems` (pixels)
+EXPORT_TILE_SIZE = 1024
+
+
+def get_export_tiles(
+    width: int, height: int, tile_size: int
+) -> list[tuple[int, int, int, int]]:
+    """Split a destination image in tiles
+
+    Args:
+        width: Destination width
+        height: Destination height
+        tile_size: Tile size (pixels)
+
+    Returns:
+        List of tiles (x0, y0, x1, y1), in row-major order
+    """
+    tile_size = max(int(tile_size), 1)
+    return [
+        (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+        for y0 in range(0, height, tile_size)
+        for x0 in range(0, width, tile_size)
+    ]
+
+
 def assemble_imageitems(
     items: list[BaseImageItem],
     src_qrect: QC.QRectF,
@@ -452,9 +519,20 @@ def assemble_imageitems(
     original_resolution: bool = False,
     force_interp_mode: str | None = None,
     force_interp_size: int | None = None,
-) -> np.ndarray:
+    dtype: np.dtype = np.float32,
+    out: np.ndarray | None = None,
+    writer: Callable[[int, int, np.ndarray], None] | None = None,
+    tile_size: int | None = None,
+    nthreads: int | None = None,
+    fill_value: int = 0,
+) -> np.ndarray | None:
     """Assemble together image items and return resulting pixel data
 
+    The destination image is processed by tiles, in a pool of threads: for each
+    tile, only the items intersecting the tile are exported, and superimposed
+    images are added in a buffer of the size of the tile (when `add_images`
+    is True).
+
     Args:
         items: List of image items
         src_qrect: Source rectangle
@@ -467,9 +545,26 @@ def assemble_imageitems(
         original_resolution: Original resolution (Default value = False)
         force_interp_mode: Force interpolation mode (Default value = None)
         force_interp_size: Force interpolation size (Default value = None)
+        dtype: Data type of pixel data (values are computed in floating point
+         and converted to this type: for integer types, values are clipped to
+         the range of the type, and NaN values are replaced by `fill_value`).
+         Default is float32
+        out: Destination array of shape (desth, destw), e.g. a memory-mapped
+         file (Default value = None, i.e. a new array is created)
+        writer: Function called with arguments (x, y, data) for each tile of the
+         destination image, in row-major order, *x* and *y* being the column and
+         row of the top-left pixel of the tile: when set, the destination image
+         is not allocated, each tile being allocated only until it is written
+         (Default value = None)
+        tile_size: Tile size, in pixels (Default value = None, i.e.
+         :py:data:`EXPORT_TILE_SIZE`)
+        nthreads: Number of threads (0: one per CPU core). Default is None
+         (i.e. ``image/threads`` option of the ``plot`` configuration section)
+        fill_value: Value of NaN pixels (e.g. masked pixels), for integer data
+         types (Default value = 0)
 
     Returns:
-        Pixel data
+        Pixel data (`out` if set), or None if `writer` is set
 
     .. warning::
 
@@ -486,14 +581,23 @@ def assemble_imageitems(
     aligned_destw = int(align * ((int(destw) + align - 1) / align))
     aligned_desth = int(desth * aligned_destw / destw)
 
-    try:
-        output = np.zeros((aligned_desth, aligned_destw), np.float32)
-    except ValueError:
-        raise MemoryError
-    if not add_images:
-        dst_image = output
-
-    dst_rect = (0, 0, aligned_destw, aligned_desth)
+    dtype = np.dtype(dtype)
+    if writer is not None:
+        output = None
+    elif out is not None:
+        if out.shape != (aligned_desth, aligned_destw):
+            raise ValueError(f"out must have shape {(aligned_desth, aligned_destw)}")
+        output = out
+    else:
+        try:
+            output = np.zeros((aligned_desth, aligned_destw), dtype)
+        except ValueError:
+            raise MemoryError
+    # Pixel values are computed in the destination tile itself, if possible
+    if dtype in (np.float32, np.float64):
+        buffer_dtype = dtype
+    else:
+        buffer_dtype = np.dtype(np.float64)
 
     src_rect = list(src_qrect.getCoords())
     # The source QRect is generally coming from a rectangle shape which is
@@ -507,13 +611,56 @@ def assemble_imageitems(
     src_rect[1] += 0.5 * pixel_height
     src_rect[2] -= 0.5 * pixel_width
     src_rect[3] -= 0.5 * pixel_height
-
-    for it in sorted(items, key=lambda obj: obj.z()):
-        if it.isVisible() and src_qrect.intersects(it.boundingRect()):
+    # Source step between destination pixels (i.e. the transform of the scaler
+    # engine for the whole destination), to compute the source rectangle of tiles
+    x0, y0, x1, y1 = src_rect
+    dx, dy = (x1 - x0) / aligned_destw, (y1 - y0) / aligned_desth
+
+    items = [
+        it
+        for it in sorted(items, key=lambda obj: obj.z())
+        if it.isVisible() and src_qrect.intersects(it.boundingRect())
+    ]
+    if tile_size is None:
+        tile_size = EXPORT_TILE_SIZE
+    if original_resolution and any(
+        isinstance(it, TrImageItem)
+        and not np.allclose(it.get_transform()[3:5], (pixel_width, pixel_height))
+        for it in items
+    ):
+        # Items exported at their own resolution, which is not the resolution of
+        # the destination image: the source rectangle of a tile would not match
+        tile_size = max(aligned_destw, aligned_desth)
+    nthreads = get_threads_count(nthreads)
+
+    def export_tile(tile: tuple[int, int, int, int]) -> np.ndarray:
+        """Export items to a destination tile"""
+        tx0, ty0, tx1, ty1 = tile
+        shape = (ty1 - ty0, tx1 - tx0)
+        if output is None:
+            dest = np.zeros(shape, dtype)
+        else:
+            dest = output[ty0:ty1, tx0:tx1]
+            dest[...] = 0
+        tile_qrect = QC.QRectF(
+            src_qrect.left() + tx0 * pixel_width,
+            src_qrect.top() + ty0 * pixel_height,
+            shape[1] * pixel_width,
+            shape[0] * pixel_height,
+        )
+        tile_src_rect = [x0 + tx0 * dx, y0 + ty0 * dy, x0 + tx1 * dx, y0 + ty1 * dy]
+        dst_rect = (0, 0, shape[1], shape[0])
+        tile_items = [it for it in items if tile_qrect.intersects(it.boundingRect())]
+        buffer = dest if dest.dtype == buffer_dtype else None
+        for it in tile_items:
+            if buffer is None:
+                buffer = np.zeros(shape, buffer_dtype)
             if add_images:
-                dst_image = np.zeros_like(output)
+                dst_image = np.zeros(shape, buffer_dtype)
+            else:
+                dst_image = buffer
             it.export_roi(
-                src_rect=src_rect,
+                src_rect=tile_src_rect,
                 dst_rect=dst_rect,
                 dst_image=dst_image,
                 apply_lut=apply_lut,
@@ -523,7 +670,22 @@ def assemble_imageitems(
                 force_interp_size=force_interp_size,
             )
             if add_images:
-                output += dst_image
+                buffer += dst_image
+        if buffer is not None and buffer is not dest:
+            if dest.dtype.kind in "iu":
+                # Out-of-range and NaN values have no integer representation
+                info = np.iinfo(dest.dtype)
+                np.clip(buffer, info.min, info.max, out=buffer)
+                buffer[np.isnan(buffer)] = fill_value
+            np.copyto(dest, buffer, casting="unsafe")
+        return dest
+
+    tiles = get_export_tiles(aligned_destw, aligned_desth, tile_size)
+    for (tx0, ty0, _tx1, _ty1), data in zip(
+        tiles, map_ordered(export_tile, tiles, nthreads)
+    ):
+        if writer is not None:
+            writer(tx0, ty0, data)
     return output
 
 
@@ -715,7 +877,11 @@ def get_image_from_plot(
     original_resolution: bool = False,
     force_interp_mode: str | None = None,
     force_interp_size: int | None = None,
-) -> numpy.ndarray:
+    dtype: np.dtype = np.float32,
+    out: np.ndarray | None = None,
+    writer: Callable[[int, int, np.ndarray], None] | None = None,
+    fill_value: int = 0,
+) -> numpy.ndarray | None:
     """Get image pixel data from plot area
 
     Args:
@@ -730,9 +896,16 @@ def get_image_from_plot(
         original_resolution: Original resolution (Default value = False)
         force_interp_mode: Force interpolation mode (Default value = None)
         force_interp_size: Force interpolation size (Default value = None)
+        dtype: Data type of pixel data (Default value = float32)
+        out: Destination array (Default value = None)
+        writer: Function called with arguments (x, y, data) for each tile of the
+         destination image (Default value = None, see
+         :py:func:`assemble_imageitems`)
+        fill_value: Value of NaN pixels, for integer data types (Default value
+         = 0, see :py:func:`assemble_imageitems`)
 
     Returns:
-        Image pixel data
+        Image pixel data (None if `writer` is set)
 
     .. warning::
 
@@ -756,4 +929,8 @@ def get_image_from_plot(
         original_resolution=original_resolution,
         force_interp_mode=force_interp_mode,
         force_interp_size=force_interp_size,
+        dtype=dtype,
+        out=out,
+        writer=writer,
+        fill_value=fill_value,
     )
@@ -0,0 +1,593 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+# pylint: disable=C0103
+
+"""
+Tiled image item
+----------------
+
+The :py:class:`.TiledImageItem` displays out-of-core images (e.g. detector
+mosaics which do not fit in memory): image data is provided by a tile source,
+i.e. any object implementing the :py:class:`.TileSource` protocol, and only the
+tiles intersecting the displayed area are read (through a LRU tile cache).
+
+Tile sources must provide the following attributes and method:
+
+* ``shape``: image shape (rows, columns) at full resolution
+* ``dtype``: image data type
+* ``tile_shape``: tile shape (rows, columns)
+* ``nlevels``: number of resolution levels (level 0 is full resolution, level
+  *k* is reduced by a factor 2**k along each axis)
+* ``read_tile(level, ty, tx)``: return tile (ty, tx) of level as a 2D array
+  (tiles on the right and bottom edges may be smaller than ``tile_shape``)
+
+Tile sources may also provide the exact range of the image data, if it is known
+without reading all tiles (e.g. stored in the file metadata), with the
+``get_range()`` method: otherwise, the LUT range of the image is computed on a
+reduced resolution level, so that it is approximate (see
+:py:meth:`.TiledImageItem.get_lut_range_full`).
+
+:py:class:`.ArrayTileSource` wraps any sliceable 2D array (NumPy array,
+``np.memmap``, HDF5 dataset, ...) into a tile source.
+"""
+
+from __future__ import annotations
+
+import abc
+import collections
+import math
+import threading
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from guidata.utils.misc import assert_interfaces_valid
+from qtpy import QtCore as QC
+
+from plotpy._scaler import INTERP_NEAREST, _scale_rect
+from plotpy.interfaces import (
+    IBaseImageItem,
+    IBasePlotItem,
+    IColormapImageItemType,
+    ICSImageItemType,
+    IExportROIImageItemType,
+    IHistDataSource,
+    IImageItemType,
+    ITrackableItemType,
+    IVoiImageItemType,
+)
+from plotpy.items.image.image_items import ImageItem
+from plotpy.mathutils.arrayfuncs import get_nan_histogram, get_nan_range
+
+if TYPE_CHECKING:
+    import qwt.scale_map
+    from qtpy.QtCore import QRectF
+    from qtpy.QtGui import QPainter
+
+    from plotpy.interfaces import IItemType
+    from plotpy.styles.image import ImageParam
+
+#: Default tile cache memory budget (in bytes)
+DEFAULT_TILE_CACHE_MEMORY = 512 * 1024**2
+
+#: Maximum number of pixels of the overview level used for statistics
+#: (LUT range, histogram): the finest level below this size is used
+OVERVIEW_MAX_PIXELS = 4 * 1024**2
+
+
+class TileSource(abc.ABC):
+    """Base class for tile sources (see module documentation for the protocol)"""
+
+    shape: tuple[int, int] = (0, 0)
+    dtype: np.dtype = np.dtype(np.float64)
+    tile_shape: tuple[int, int] = (512, 512)
+    nlevels: int = 1
+
+    @abc.abstractmethod
+    def read_tile(self, level: int, ty: int, tx: int) -> np.ndarray:
+        """Read tile
+
+        Args:
+            level: resolution level (0: full resolution)
+            ty: tile row index
+            tx: tile column index
+
+        Returns:
+            Tile data
+        """
+
+    def get_range(self) -> tuple[float, float] | None:
+        """Return the exact range of the image data, if it is known without
+        reading all tiles (e.g. stored in the file metadata)
+
+        Returns:
+            Tuple (min, max), or None if the range is unknown (default)
+        """
+        return None
+
+
+def get_level_shape(source: TileSource, level: int) -> tuple[int, int]:
+    """Return image shape at resolution level
+
+    Args:
+        source: tile source
+        level: resolution level
+
+    Returns:
+        Image shape (rows, columns) at this level
+    """
+    factor = 2**level
+    ni, nj = source.shape
+    return -(-ni // factor), -(-nj // factor)
+
+
+class ArrayTileSource(TileSource):
+    """Tile source wrapping a sliceable 2D array
+
+    Args:
+        data: 2D array-like object supporting NumPy basic slicing with steps
+         (e.g. ``numpy.ndarray``, ``numpy.memmap``, ``h5py.Dataset``)
+        tile_size: tile size (tiles are square). Default is 512
+
+    Reduced levels are obtained by nearest-pixel subsampling of the source.
+    """
+
+    def __init__(self, data: Any, tile_size: int = 512) -> None:
+        if len(data.shape) != 2:
+            raise ValueError("Tiled data must be a 2D array")
+        self.data = data
+        self.shape = tuple(data.shape)
+        self.dtype = np.dtype(data.dtype)
+        self.tile_shape = (tile_size, tile_size)
+        self.nlevels = max(1, math.ceil(math.log2(max(self.shape) / tile_size)) + 1)
+
+    def read_tile(self, level: int, ty: int, tx: int) -> np.ndarray:
+        """Read tile
+
+        Args:
+            level: resolution level (0: full resolution)
+            ty: tile row index
+            tx: tile column index
+
+        Returns:
+            Tile data
+        """
+        factor = 2**level
+        th, tw = self.tile_shape
+        rows = slice(ty * th * factor, (ty + 1) * th * factor, factor)
+        cols = slice(tx * tw * factor, (tx + 1) * tw * factor, factor)
+        return np.asarray(self.data[rows, cols])
+
+
+class TileCache:
+    """LRU cache of tiles
+
+    Args:
+        max_memory: maximum memory used by the cached tiles, in bytes.
+         Default is None (i.e. :py:data:`DEFAULT_TILE_CACHE_MEMORY`)
+    """
+
+    def __init__(self, max_memory: int | None = None) -> None:
+        if max_memory is None:
+            max_memory = DEFAULT_TILE_CACHE_MEMORY
+        self.max_memory = max_memory
+        self.nbytes = 0
+        self._tiles: collections.OrderedDict[tuple, np.ndarray] = (
+            collections.OrderedDict()
+        )
+        # Tiles may be requested by several threads (e.g. parallel export)
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Remove all tiles from cache"""
+        with self._lock:
+            self._tiles.clear()
+            self.nbytes = 0
+
+    def get_tile(self, source: TileSource, level: int, ty: int, tx: int) -> np.ndarray:
+        """Return tile, reading it from source if it is not cached
+
+        Args:
+            source: tile source
+            level: resolution level
+            ty: tile row index
+            tx: tile column index
+
+        Returns:
+            Tile data
+        """
+        key = (id(source), level, ty, tx)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+        tile = source.read_tile(level, ty, tx)
+        with self._lock:
+            if key in self._tiles:  # Tile read meanwhile by another thread
+                return self._tiles[key]
+            while self._tiles and self.nbytes + tile.nbytes > self.max_memory:
+                _key, old_tile = self._tiles.popitem(last=False)
+                self.nbytes -= old_tile.nbytes
+            self._tiles[key] = tile
+            self.nbytes += tile.nbytes
+        return tile
+
+
+class TiledArray:
+    """Read-only array-like view of a tile source (full resolution level)
+
+    Indexing with integers, slices or integer arrays only reads the tiles
+    intersecting the requested area. Converting the whole object to a NumPy
+    array (e.g. with ``numpy.asarray``) reads all tiles.
+
+    Args:
+        source: tile source
+        cache: tile cache. Default is None (a new cache is created)
+    """
+
+    def __init__(self, source: TileSource, cache: TileCache | None = None) -> None:
+        self.source = source
+        self.cache = TileCache() if cache is None else cache
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Array shape"""
+        return tuple(self.source.shape)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Array data type"""
+        return np.dtype(self.source.dtype)
+
+    @property
+    def ndim(self) -> int:
+        """Number of dimensions"""
+        return 2
+
+    @property
+    def size(self) -> int:
+        """Number of elements"""
+        return self.shape[0] * self.shape[1]
+
+    def get_region(self, level: int, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Assemble the region [y0:y1, x0:x1] of a resolution level from tiles
+
+        Args:
+            level: resolution level
+            x0: first column (level pixel coordinates)
+            y0: first row
+            x1: last column (excluded)
+            y1: last row (excluded)
+
+        Returns:
+            Region data
+        """
+        ni, nj = get_level_shape(self.source, level)
+        x0, x1 = max(0, x0), min(nj, x1)
+        y0, y1 = max(0, y0), min(ni, y1)
+        out = np.empty((max(0, y1 - y0), max(0, x1 - x0)), self.dtype)
+        if out.size == 0:
+            return out
+        th, tw = self.source.tile_shape
+        for ty in range(y0 // th, (y1 - 1) // th + 1):
+            for tx in range(x0 // tw, (x1 - 1) // tw + 1):
+                tile = self.cache.get_tile(self.source, level, ty, tx)
+                # Intersection of tile with region, in level pixel coordinates
+                ty0, tx0 = max(y0, ty * th), max(x0, tx * tw)
+                ty1 = min(y1, ty * th + tile.shape[0])
+                tx1 = min(x1, tx * tw + tile.shape[1])
+                out[ty0 - y0 : ty1 - y0, tx0 - x0 : tx1 - x0] = tile[
+                    ty0 - ty * th : ty1 - ty * th, tx0 - tx * tw : tx1 - tx * tw
+                ]
+        return out
+
+    def __getitem__(self, key: Any) -> Any:
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        if len(key) != 2:
+            raise IndexError("Tiled arrays support only 2D indexing")
+        bounds, local_key = [], []
+        for index, size in zip(key, self.shape):
+            if isinstance(index, slice):
+                rng = range(*index.indices(size))
+                if len(rng) == 0:
+                    bounds.append((0, 0))
+                    local_key.append(slice(0, 0))
+                    continue
+                start, stop = min(rng[0], rng[-1]), max(rng[0], rng[-1]) + 1
+                bounds.append((start, stop))
+                local_key.append(slice(rng.start - start, None, rng.step))
+            elif isinstance(index, (int, np.integer)):
+                if index < 0:
+                    index += size
+                if not 0 <= index < size:
+                    raise IndexError(f"Index {index} is out of bounds")
+                bounds.append((index, index + 1))
+                local_key.append(0)
+            else:
+                index = np.asarray(index, dtype=int)
+                index = np.where(index < 0, index + size, index)
+                if index.size == 0:
+                    bounds.append((0, 0))
+                else:
+                    bounds.append((int(index.min()), int(index.max()) + 1))
+                local_key.append(index - bounds[-1][0])
+        (y0, y1), (x0, x1) = bounds
+        region = self.get_region(0, x0, y0, x1, y1)
+        return region[tuple(local_key)]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        data = self.get_region(0, 0, 0, self.shape[1], self.shape[0])
+        return data if dtype is None else data.astype(dtype)
+
+
+class TiledImageItem(ImageItem):
+    """Tiled (out-of-core) image item
+
+    Args:
+        data: tile source (see :py:class:`.TileSource`) or 2D array-like object
+         (e.g. ``np.memmap`` or ``h5py.Dataset``), which is then wrapped in an
+         :py:class:`.ArrayTileSource`
+        param: image parameters
+        max_memory: tile cache memory budget, in bytes. Default is None
+         (i.e. :py:data:`DEFAULT_TILE_CACHE_MEMORY`)
+
+    Only the tiles intersecting the displayed area are read, from the coarsest
+    resolution level which still gives at least one source pixel per screen pixel.
+    LUT range and histogram are computed on an overview level (the finest level
+    having less than :py:data:`OVERVIEW_MAX_PIXELS` pixels), so that they are
+    approximate unless the tile source provides the exact range, and cross
+    sections read only the tiles they intersect.
+
+    Resolution levels are provided by the tile source (see
+    :py:attr:`.TileSource.nlevels`): the multi-resolution pyramid of other image
+    items is not supported (see :py:meth:`set_pyramid_mode`).
+    """
+
+    __implements__ = (
+        IBasePlotItem,
+        IBaseImageItem,
+        IHistDataSource,
+        IVoiImageItemType,
+        IExportROIImageItemType,
+    )
+
+    def __init__(
+        self,
+        data: TileSource | Any | None = None,
+        param: ImageParam | None = None,
+        max_memory: int | None = None,
+    ) -> None:
+        self.tile_cache = TileCache(max_memory)
+        self._overview: np.ndarray | None = None
+        super().__init__(data=data, param=param)
+
+    # ---- Public API ----------------------------------------------------------
+    def get_overview(self) -> tuple[np.ndarray, int]:
+        """Return overview image, used to compute statistics
+
+        Returns:
+            Tuple (data, level): overview data and its resolution level
+        """
+        source = self.data.source
+        level = 0
+        while level < source.nlevels - 1:
+            ni, nj = get_level_shape(source, level)
+            if ni * nj <= OVERVIEW_MAX_PIXELS:
+                break
+            level += 1
+        if self._overview is None:
+            ni, nj = get_level_shape(source, level)
+            self._overview = self.data.get_region(level, 0, 0, nj, ni)
+        return self._overview, level
+
+    def get_tiled_src_data(
+        self, src_rect: tuple[float, float, float, float], level: int
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """Return the region of a resolution level covering the source rectangle
+
+        Args:
+            src_rect: source rectangle (full resolution pixel coordinates)
+            level: resolution level
+
+        Returns:
+            Tuple (data, src_rect) where data is the region data and src_rect
+            the source rectangle in region pixel coordinates
+        """
+        factor = float(2**level)
+        x0, y0, x1, y1 = [coord / factor for coord in src_rect]
+        # One more pixel on the right/bottom for linear interpolation:
+        ix0, ix1 = int(math.floor(min(x0, x1))), int(math.ceil(max(x0, x1))) + 1
+        iy0, iy1 = int(math.floor(min(y0, y1))), int(math.ceil(max(y0, y1))) + 1
+        region = self.data.get_region(level, ix0, iy0, ix1, iy1)
+        ix0, iy0 = max(0, ix0), max(0, iy0)
+        return region, (x0 - ix0, y0 - iy0, x1 - ix0, y1 - iy0)
+
+    # ---- RawImageItem API ----------------------------------------------------
+    def set_data(
+        self, data: TileSource | Any, lut_range: tuple[float, float] | None = None
+    ) -> None:
+        """Set image data
+
+        Args:
+            data: tile source or 2D array-like object
+            lut_range: LUT range -- tuple (levelmin, levelmax) (Default value = None)
+        """
+        if not isinstance(data, TileSource):
+            data = ArrayTileSource(data)
+        super().set_data(TiledArray(data, self.tile_cache), lut_range)
+
+    def data_changed(self, rect: tuple[int, int, int, int] | None = None) -> None:
+        """Notify the item that its data has changed
+
+        This method is called by :py:meth:`set_data`, and must be called after
+        modifying the data of the tile source: tiles and overview are read again.
+
+        Args:
+            rect: region (i0, i1, j0, j1) of data which has changed (ignored:
+             all tiles are read again). Default is None (whole data)
+        """
+        self.tile_cache.clear()
+        self._overview = None
+        super().data_changed(rect)
+
+    def get_lut_range_full(self) -> tuple[float, float]:
+        """Return full dynamic range
+
+        The exact range is returned if the tile source provides it (see
+        :py:meth:`.TileSource.get_range`). Otherwise, the range is computed on the
+        overview level (see :py:meth:`get_overview`): as reduced levels are
+        obtained by subsampling (or averaging) full resolution pixels, this range
+        is approximate, i.e. included in the exact range.
+
+        Returns:
+            tuple[float, float]: Lut range, tuple(min, max)
+        """
+        drange = self.data.source.get_range()
+        if drange is not None:
+            return drange
+        return get_nan_range(self.get_overview()[0])
+
+    def get_histogram(
+        self, nbins: int, drange: tuple[float, float] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return a tuple (hist, bins) where hist is a list of histogram values,
+        computed on the overview level
+
+        Args:
+            nbins: number of bins
+            drange: lower and upper range of the bins. If not provided, range is
+             simply (data.min(), data.max()). Values outside the range are ignored.
+
+        Returns:
+            Tuple (hist, bins)
+        """
+        if self.data is None:
+            return [0], [0, 1]
+        key = (self._data_version, nbins, None if drange is None else tuple(drange))
+        if self.histogram_cache is None or self.histogram_cache[0] != key:
+            data = self.get_overview()[0]
+            self.histogram_cache = key, get_nan_histogram(data, nbins, drange)
+        return self.histogram_cache[1]
+
+    def draw_image(
+        self,
+        painter: QPainter,
+        canvasRect: QRectF,
+        src_rect: tuple[float, float, float, float],
+        dst_rect: tuple[float, float, float, float],
+        xMap: qwt.scale_map.QwtScaleMap,
+        yMap: qwt.scale_map.QwtScaleMap,
+    ) -> None:
+        """Draw image
+
+        Args:
+            painter: Painter
+            canvasRect: Canvas rectangle
+            src_rect: Source rectangle
+            dst_rect: Destination rectangle
+            xMap: X axis scale map
+            yMap: Y axis scale map
+        """
+        if self.data is None:
+            return
+        src2 = self._rescale_src_rect(src_rect)
+        dni, dnj = self._offscreen.shape
+        x0, y0, x1, y1 = src2
+        scale = min(abs(x1 - x0) / max(dnj, 1), abs(y1 - y0) / max(dni, 1))
+        level = 0
+        if scale >= 2.0:
+            level = min(int(math.log2(scale)), self.data.source.nlevels - 1)
+        data, src2 = self.get_tiled_src_data(src2, level)
+        if data.size == 0:
+            return
+        dst_rect = tuple([int(i) for i in dst_rect])
+        try:
+            dest = _scale_rect(
+                data,
+                src2,
+                self._offscreen,
+                dst_rect,
+                self.get_draw_lut(),
+                self.interpolate,
+                self.get_scaler_threads(),
+            )
+        except ValueError:
+            # This exception is raised when zooming unreasonably inside a pixel
+            return
+        qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
+        painter.drawImage(qrect, self._image, qrect)
+
+    def export_roi(
+        self,
+        src_rect: tuple[float, float, float, float],
+        dst_rect: tuple[float, float, float, float],
+        dst_image: np.ndarray,
+        apply_lut: bool = False,
+        apply_interpolation: bool = False,
+        original_resolution: bool = False,
+        force_interp_mode: str | None = None,
+        force_interp_size: int | None = None,
+    ) -> None:
+        """
+        Export a rectangular area of the image to another image
+
+        Args:
+            src_rect: Source rectangle
+            dst_rect: Destination rectangle
+            dst_image: Destination image
+            apply_lut: Apply lut (Default value = False)
+            apply_interpolation: Apply interpolation (Default value = False)
+            original_resolution: Original resolution (Default value = False)
+            force_interp_mode: Force interpolation mode (Default value = None)
+            force_interp_size: Force interpolation size (Default value = None)
+        """
+        interp = self.interpolate if apply_interpolation else (INTERP_NEAREST,)
+        data, src2 = self.get_tiled_src_data(self._rescale_src_rect(src_rect), 0)
+        lut = self.get_export_lut(apply_lut)
+        _scale_rect(data, src2, dst_image, dst_rect, lut, interp)
+
+    def set_pyramid_mode(
+        self, method: str | None = "mean", max_memory: int | None = None
+    ) -> None:
+        """Enable or disable the multi-resolution pyramid
+
+        Resolution levels are provided by the tile source: the pyramid can't be
+        enabled for this item type (it is always disabled).
+
+        Args:
+            method: must be None (disabled pyramid)
+            max_memory: ignored
+
+        Raises:
+            ValueError: if `method` is not None
+        """
+        if method is not None:
+            raise ValueError(
+                "Tiled images have no pyramid: resolution levels are provided "
+                "by the tile source"
+            )
+
+    # ---- IBasePlotItem API ---------------------------------------------------
+    def types(self) -> tuple[type[IItemType], ...]:
+        """Returns a group or category for this item.
+        This should be a tuple of class objects inheriting from IItemType
+
+        Returns:
+            tuple: Tuple of class objects inheriting from IItemType
+        """
+        return (
+            IImageItemType,
+            IVoiImageItemType,
+            IColormapImageItemType,
+            ITrackableItemType,
+            ICSImageItemType,
+            IExportROIImageItemType,
+        )
+
+
+assert_interfaces_valid(TiledImageItem)
@@ -273,7 +273,13 @@ class TrImageItem(RawImageItem):
 
         dst_rect = tuple([int(i) for i in dst_rect])
         dest = _scale_tr(
-            self.data, mat, self._offscreen, dst_rect, self.lut, self.interpolate
+            self.data,
+            mat,
+            self._offscreen,
+            dst_rect,
+            self.get_draw_lut(),
+            self.interpolate,
+            self.get_scaler_threads(),
         )
         qrect = QC.QRectF(QC.QPointF(dest[0], dest[1]), QC.QPointF(dest[2], dest[3]))
         painter.drawImage(qrect, self._image, qrect)
@@ -318,11 +324,6 @@ class TrImageItem(RawImageItem):
             force_interp_mode: Force interpolation mode (Default value = None)
             force_interp_size: Force interpolation size (Default value = None)
         """
-        if apply_lut:
-            a, b, _bg, _cmap = self.lut
-        else:
-            a, b = 1.0, 0.0
-
         xs0, ys0, xs1, ys1 = src_rect
         xd0, yd0, xd1, yd1 = dst_rect
 
@@ -356,7 +357,8 @@ class TrImageItem(RawImageItem):
                 interp = self.interpolate
         else:  # don't apply interpolation --> INTERP_NEAREST
             interp = (INTERP_NEAREST,)
-        _scale_tr(self.data, mat, dst_image, dst_rect, (a, b, None), interp)
+        lut = self.get_export_lut(apply_lut)
+        _scale_tr(self.data, mat, dst_image, dst_rect, lut, interp)
 
     # ---- IBasePlotItem API ---------------------------------------------------
     def move_local_point_to(self, handle: int, pos: QPointF, ctrl: bool = None) -> None:
@@ -16,8 +16,10 @@ from guidata.utils.misc import assert_interfaces_valid
 from qtpy import QtCore as QC
 from qtpy import QtGui as QG
 from qwt import QwtPlotItem
+from qwt.plot_curve import array2d_to_qpolygonf
 
 from plotpy.config import _
+from plotpy.coords import qpointf_array_from_coords
 from plotpy.interfaces import IBasePlotItem, ISerializableType, ITrackableItemType
 from plotpy.styles import PolygonMapParam
 
@@ -30,22 +32,92 @@ if TYPE_CHECKING:
     from plotpy.styles.base import ItemParameters
 
 
+def get_polygon_bounds(pts: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Return the bounding boxes of polygons
+
+    Args:
+        pts: Array of points (Mx2)
+        n: Array of polygon offsets (Nx2, polygon k points starting at
+         index n[k, 1])
+
+    Returns:
+        Array of bounding boxes (Nx4: xmin, xmax, ymin, ymax) of polygons (NaN
+        for polygons without any point)
+    """
+    starts = np.asarray(n[:, 1], dtype=np.intp)
+    bounds = np.full((starts.size, 4), np.nan)
+    counts = np.diff(np.append(starts, pts.shape[0]))
+    nonempty = counts > 0
+    if nonempty.any():
+        indices = starts[nonempty]
+        for col, data in enumerate((pts[:, 0], pts[:, 1])):
+            bounds[nonempty, 2 * col] = np.minimum.reduceat(data, indices)
+            bounds[nonempty, 2 * col + 1] = np.maximum.reduceat(data, indices)
+    return bounds
+
+
+def cull_polygons(
+    bounds: np.ndarray,
+    scale: tuple[float, float, float, float],
+    rect: tuple[float, float, float, float],
+    margin: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cull polygons against a canvas rectangle
+
+    Args:
+        bounds: Bounding boxes of polygons (see :py:func:`get_polygon_bounds`)
+        scale: Linear transform coefficients (ax, bx, ay, by) from plot coordinates
+         to canvas coordinates (x -> ax * x + bx)
+        rect: Canvas rectangle coordinates (x0, y0, x1, y1)
+        margin: Margin around the canvas rectangle, in pixels (e.g. pen width)
+
+    Returns:
+        tuple: indices of the visible polygons which are larger than a pixel,
+        indices of the visible polygons which are smaller than a pixel
+    """
+    ax, bx, ay, by = scale
+    x0, y0, x1, y1 = rect
+    with np.errstate(invalid="ignore"):
+        xa, xb = ax * bounds[:, 0] + bx, ax * bounds[:, 1] + bx
+        ya, yb = ay * bounds[:, 2] + by, ay * bounds[:, 3] + by
+        xmin, xmax = np.minimum(xa, xb), np.maximum(xa, xb)
+        ymin, ymax = np.minimum(ya, yb), np.maximum(ya, yb)
+        visible = (xmax >= x0 - margin) & (xmin <= x1 + margin)
+        visible &= (ymax >= y0 - margin) & (ymin <= y1 + margin)
+        small = (xmax - xmin < 1.0) & (ymax - ymin < 1.0)
+    return np.flatnonzero(visible & ~small), np.flatnonzero(visible & small)
+
+
+def get_canvas_scale(
+    xMap: QwtScaleMap, yMap: QwtScaleMap
+) -> tuple[float, float, float, float]:
+    """Return the linear transform from plot coordinates to canvas coordinates
+
+    Args:
+        xMap: X axis scale map
+        yMap: Y axis scale map
+
+    Returns:
+        Linear transform coefficients (ax, bx, ay, by), i.e. x -> ax * x + bx
+    """
+    p1x = xMap.p1()
+    s1x = xMap.s1()
+    ax = (xMap.p2() - p1x) / (xMap.s2() - s1x)
+    p1y = yMap.p1()
+    s1y = yMap.s1()
+    ay = (yMap.p2() - p1y) / (yMap.s2() - s1y)
+    return ax, p1x - s1x * ax, ay, p1y - s1y * ay
+
+
 def simplify_poly(pts, off, scale, bounds):
-    """Simplify a polygon by removing points outside the canvas"""
+    """Simplify a polygon map by removing polygons outside the canvas"""
     ax, bx, ay, by = scale
     a = np.array([[ax, ay]])
     b = np.array([[bx, by]])
     _pts = a * pts + b
-    poly = []
-    NP = off.shape[0]
-    for i in range(off.shape[0]):
-        i0 = off[i, 1]
-        if i + 1 < NP:
-            i1 = off[i + 1, 1]
-        else:
-            i1 = pts.shape[0]
-        poly.append((_pts[i0:i1], i))
-    return poly
+    large, small = cull_polygons(get_polygon_bounds(pts, off), scale, bounds)
+    ends = np.append(off[1:, 1], pts.shape[0])
+    return [(_pts[off[i, 1] : ends[i]], i) for i in np.union1d(large, small)]
 
 
 class PolygonMapItem(QwtPlotItem):
@@ -77,6 +149,8 @@ class PolygonMapItem(QwtPlotItem):
         self._n = None  # Array of polygon offsets/ends Nx1
         #                 (polygon k points are _pts[_n[k-1]:_n[k]])
         self._c = None  # Color of polygon Nx2 [border,background] as RGBA uint32
+        self._bounds = None  # Bounding boxes of polygons Nx4
+        self._groups = None  # Color group of polygons (same border/background)
         self.update_params()
 
     def types(self) -> tuple[type[IItemType], ...]:
@@ -282,6 +356,11 @@ class PolygonMapItem(QwtPlotItem):
         self._pts = np.asarray(pts)
         self._n = np.asarray(n)
         self._c = np.asarray(c)
+        self._bounds = get_polygon_bounds(self._pts, self._n)
+        colors = self._c.astype(np.uint64)
+        self._groups = np.unique(
+            (colors[:, 0] << np.uint64(32)) | colors[:, 1], return_inverse=True
+        )[1].ravel()
         xmin, ymin = self._pts.min(axis=0)
         xmax, ymax = self._pts.max(axis=0)
         self.bounds = QC.QRectF(xmin, ymin, xmax - xmin, ymax - ymin)
@@ -417,30 +496,92 @@ class PolygonMapItem(QwtPlotItem):
             yMap: Y axis scale map
             canvasRect: Canvas rectangle
         """
-        p1x = xMap.p1()
-        s1x = xMap.s1()
-        ax = (xMap.p2() - p1x) / (xMap.s2() - s1x)
-        p1y = yMap.p1()
-        s1y = yMap.s1()
-        ay = (yMap.p2() - p1y) / (yMap.s2() - s1y)
-        bx, by = p1x - s1x * ax, p1y - s1y * ay
-        _c = self._c
-        _n = self._n
+        if self.is_empty():
+            return
+        scale = get_canvas_scale(xMap, yMap)
+        large, small = cull_polygons(self._bounds, scale, canvasRect.getCoords())
+        if small.size:
+            self.__draw_points(painter, canvasRect, scale, small)
+        if large.size:
+            self.__draw_polygons(painter, scale, large)
+
+    def __draw_points(
+        self,
+        painter: QG.QPainter,
+        canvasRect: QC.QRectF,
+        scale: tuple[float, float, float, float],
+        indices: np.ndarray,
+    ) -> None:
+        """Draw polygons smaller than a pixel as points of their border color:
+        points are rasterized in an image covering the canvas, which is drawn
+        with a single painter call
+
+        Args:
+            painter: Painter
+            canvasRect: Canvas rectangle
+            scale: Linear transform coefficients (ax, bx, ay, by)
+            indices: Indices of the polygons to be drawn
+        """
+        ax, bx, ay, by = scale
+        bounds = self._bounds[indices]
+        x0, y0 = canvasRect.left(), canvasRect.top()
+        width = int(np.ceil(canvasRect.width())) + 1
+        height = int(np.ceil(canvasRect.height())) + 1
+        cols = np.floor(ax * 0.5 * (bounds[:, 0] + bounds[:, 1]) + bx - x0)
+        rows = np.floor(ay * 0.5 * (bounds[:, 2] + bounds[:, 3]) + by - y0)
+        inside = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+        pixels = rows[inside].astype(np.intp) * width + cols[inside].astype(np.intp)
+        # The last polygon drawn on a pixel sets its color, as with painter calls
+        data = np.zeros((height, width), dtype=np.uint32)
+        data.ravel()[pixels] = self._c[indices[inside], 0]
+        image = QG.QImage(data, width, height, 4 * width, QG.QImage.Format_ARGB32)
+        painter.drawImage(QC.QPointF(x0, y0), image)
+
+    def __draw_polygons(
+        self,
+        painter: QG.QPainter,
+        scale: tuple[float, float, float, float],
+        indices: np.ndarray,
+    ) -> None:
+        """Draw polygons grouped by color: pen and brush are set once per run of
+        consecutive polygons of the same color (polygons are drawn in index
+        order, which is their stacking order), and polygon points are
+        transformed all at once into a single Qt array of points, from which
+        polygons are drawn without copying points
+
+        Args:
+            painter: Painter
+            scale: Linear transform coefficients (ax, bx, ay, by)
+            indices: Indices of the polygons to be drawn
+        """
+        ax, bx, ay, by = scale
+        starts = np.asarray(self._n[:, 1], dtype=np.intp)
+        counts = np.diff(np.append(starts, self._pts.shape[0]))[indices]
+        ends = np.cumsum(counts)
+        size = int(ends[-1])
+        offsets = np.repeat(starts[indices] - (ends - counts), counts)
+        pts = self._pts[np.arange(size) + offsets]
+        x, y = ax * pts[:, 0] + bx, ay * pts[:, 1] + by
+        points = qpointf_array_from_coords(np.column_stack((x, y)))
+        groups = self._groups[indices]
+        changes = np.flatnonzero(np.diff(groups)) + 1
         fgcol = QG.QColor()
         bgcol = QG.QColor()
-        polygons = simplify_poly(
-            self._pts, _n, (ax, bx, ay, by), canvasRect.getCoords()
-        )
-        for poly, num in polygons:
-            points = []
-            for i in range(poly.shape[0]):
-                points.append(QC.QPointF(poly[i, 0], poly[i, 1]))
-            pg = QG.QPolygonF(points)
-            fgcol.setRgba(int(_c[num, 0]))
-            bgcol.setRgba(int(_c[num, 1]))
+        for first, last in zip(np.append(0, changes), np.append(changes, groups.size)):
+            fgcol.setRgba(int(self._c[indices[first], 0]))
+            bgcol.setRgba(int(self._c[indices[first], 1]))
             painter.setPen(QG.QPen(fgcol))
             painter.setBrush(QG.QBrush(bgcol))
-            painter.drawPolygon(pg)
+            for end, count in zip(
+                ends[first:last].tolist(), counts[first:last].tolist()
+            ):
+                if points is None:
+                    start = end - count
+                    painter.drawPolygon(
+                        array2d_to_qpolygonf(x[start:end], y[start:end])
+                    )
+                else:
+                    painter.drawPolygon(points[end - count : end])
 
     def boundingRect(self) -> QC.QRectF:
         """Return the bounding rectangle of the shape
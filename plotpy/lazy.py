@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Lazy loading
+------------
+
+The :mod:`plotpy.lazy` module provides lazy attribute loading for the public
+packages of plotpy (e.g. :mod:`plotpy.items`, :mod:`plotpy.tools`): importing a
+package does not import its submodules anymore, an object is imported from its
+submodule on first access only (see :pep:`562`).
+
+The public objects of a package are declared with an explicit mapping of object
+names to the submodules in which they are defined (the package source is not
+parsed at runtime, so that lazy loading also works for packages installed
+without source files, e.g. with PyInstaller). The same objects are imported in
+an ``if TYPE_CHECKING:`` block, for static analysis tools (and IDEs) only:
+
+.. code-block:: python
+
+    from typing import TYPE_CHECKING
+
+    from plotpy.lazy import attach
+
+    if TYPE_CHECKING:
+        from .curve import CurveItem
+
+    __getattr__, __dir__, __all__ = attach(__name__, {"CurveItem": ".curve"})
+
+Submodules are also imported on first access (e.g. ``plotpy.items.contour``).
+
+.. autofunction:: attach
+"""
+
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+from typing import Any
+
+
+def attach(
+    package_name: str, attrs: dict[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]], list[str]]:
+    """Attach lazily loaded objects to a package
+
+    Args:
+        package_name: package name (i.e. ``__name__``)
+        attrs: dictionary of public object names -> relative name of the
+         submodule in which the object is defined (e.g. ``".curve"``)
+
+    Returns:
+        Tuple of the ``__getattr__`` and ``__dir__`` functions and of the
+        ``__all__`` list of the package
+    """
+    package = importlib.import_module(package_name)
+
+    def __getattr__(name: str) -> Any:
+        """Import object or submodule on first access"""
+        if name in attrs:
+            module = importlib.import_module(attrs[name], package_name)
+            value = getattr(module, name)
+        else:
+            try:
+                value = importlib.import_module(f"{package_name}.{name}")
+            except ModuleNotFoundError as exc:
+                if exc.name != f"{package_name}.{name}":
+                    raise
+                raise AttributeError(
+                    f"module {package_name!r} has no attribute {name!r}"
+                ) from None
+        # Next accesses don't go through this function anymore
+        setattr(package, name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        """Return package attributes, including objects not imported yet"""
+        return sorted(set(vars(package)) | set(attrs))
+
+    return __getattr__, __dir__, sorted(attrs)
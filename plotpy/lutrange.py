@@ -13,6 +13,12 @@ the LUT range of plot items.
 .. autofunction:: hist_range_threshold
 
 .. autofunction:: lut_range_threshold
+
+.. autofunction:: get_transfer_range
+
+.. autofunction:: get_equalization_table
+
+.. autofunction:: eval_transfer
 """
 
 from __future__ import annotations
@@ -21,6 +27,15 @@ from typing import TYPE_CHECKING
 
 import numpy as np
 
+from plotpy._scaler import (
+    TRANSFER_ASINH,
+    TRANSFER_GAMMA,
+    TRANSFER_LOG,
+    TRANSFER_SYMLOG,
+    TRANSFER_TABLE,
+)
+from plotpy.constants import LUTTransfer
+
 if TYPE_CHECKING:
     from plotpy.items import BaseImageItem, Histogram2DItem
     from plotpy.items.histogram import HistDataSource
@@ -65,3 +80,89 @@ def lut_range_threshold(
     """
     hist, bin_edges = item.get_histogram(bins)
     return hist_range_threshold(hist, bin_edges, percent)
+
+
+def get_transfer_range(
+    lut_range: tuple[float, float],
+    transfer: LUTTransfer,
+    param: float,
+    inverse: bool = False,
+) -> tuple[float, float]:
+    """Convert a LUT range from data values to transformed values
+
+    Only the LUT range of scale transfer functions (logarithm, symmetric
+    logarithm, inverse hyperbolic sine) is expressed in transformed values:
+    other ranges are returned unchanged.
+
+    Args:
+        lut_range: LUT range (min, max)
+        transfer: Transfer function
+        param: Transfer function parameter
+        inverse: If True, convert from transformed values to data values
+         (Default value = False)
+
+    Returns:
+        tuple[float, float]: The converted LUT range
+    """
+    values = np.array(lut_range, dtype=np.float64)
+    if transfer is LUTTransfer.LOG:
+        if inverse:
+            values = 10.0**values
+        else:
+            values = np.log10(np.maximum(values, param))
+    elif transfer is LUTTransfer.SYMLOG:
+        if inverse:
+            values = np.sign(values) * param * (10.0 ** np.abs(values) - 1.0)
+        else:
+            values = np.sign(values) * np.log10(1.0 + np.abs(values) / param)
+    elif transfer is LUTTransfer.ASINH:
+        values = param * np.sinh(values) if inverse else np.arcsinh(values / param)
+    return float(values[0]), float(values[1])
+
+
+def get_equalization_table(hist: np.ndarray, bin_edges: np.ndarray) -> np.ndarray:
+    """Return the histogram equalization table, i.e. the cumulative distribution
+    of values rescaled to the histogram range and sampled at bin edges
+
+    Args:
+        hist (numpy.ndarray): The histogram
+        bin_edges (numpy.ndarray): The bin edges (regularly spaced)
+
+    Returns:
+        numpy.ndarray: The equalization table (same size as bin edges)
+    """
+    cdf = np.concatenate(([0.0], np.cumsum(hist, dtype=np.float64)))
+    if cdf[-1] <= 0.0:
+        return np.array(bin_edges, dtype=np.float64)
+    return bin_edges[0] + (bin_edges[-1] - bin_edges[0]) * (cdf / cdf[-1])
+
+
+def eval_transfer(values: np.ndarray, transfer: tuple | None) -> np.ndarray:
+    """Evaluate a transfer function tuple, as passed to the scaler engine (this is
+    the NumPy counterpart of the evaluation done by the engine while resampling)
+
+    Args:
+        values (numpy.ndarray): Pixel values
+        transfer (tuple | None): Transfer function tuple (kind[, p0, p1, p2,
+         table]), or None (linear)
+
+    Returns:
+        numpy.ndarray: Transformed values (float64)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if transfer is None:
+        return values
+    # Missing parameters take the default values of the engine
+    kind, p0, p1, p2 = (tuple(transfer) + (0.0, 0.0, 1.0)[len(transfer) - 1 :])[:4]
+    if kind == TRANSFER_LOG:
+        return np.log10(np.maximum(values, p0))
+    if kind == TRANSFER_SYMLOG:
+        return np.sign(values) * np.log10(1.0 + np.abs(values) / p0)
+    if kind == TRANSFER_GAMMA:
+        return p1 + (p2 - p1) * np.clip((values - p1) / (p2 - p1), 0.0, 1.0) ** p0
+    if kind == TRANSFER_ASINH:
+        return np.arcsinh(values / p0)
+    if kind == TRANSFER_TABLE:
+        table = transfer[4]
+        return np.interp(values, np.linspace(p0, p1, len(table)), table)
+    return values
@@ -11,64 +11,181 @@ The :py:mod:`.arrayfuncs` module provides miscellaneous array functions.
 
 The following functions are available:
 
+* :py:func:`.get_nan_stats`
 * :py:func:`.get_nan_min`
 * :py:func:`.get_nan_max`
 * :py:func:`.get_nan_range`
+* :py:func:`.get_nan_histogram`
+
+Statistics are computed by the native engine (``_scaler`` extension), in a
+single multi-threaded pass over data, without copying data to skip NaNs.
 
 Reference
 ^^^^^^^^^
 
+.. autofunction:: get_nan_stats
 .. autofunction:: get_nan_min
 .. autofunction:: get_nan_max
 .. autofunction:: get_nan_range
+.. autofunction:: get_nan_histogram
 """
 
 from __future__ import annotations
 
 import numpy as np
 
+from plotpy.mathutils.threads import get_threads_count
 
-def get_nan_min(data: np.ndarray | np.ma.MaskedArray) -> float:
-    """Return minimum value of data, ignoring NaNs
+
+def get_nan_stats(
+    data: np.ndarray | np.ma.MaskedArray,
+    mask: np.ndarray | None = None,
+    nthreads: int | None = None,
+) -> tuple[float, float, int, float, float]:
+    """Return statistics of data, ignoring NaNs and masked values
 
     Args:
-        data: Data array (or masked array)
+        data: Data array (or masked array: its mask is used if *mask* is None)
+        mask: Boolean array with the same shape as *data* (True values are
+         ignored). Default is None
+        nthreads: Number of threads (0: one per CPU core). Default is None
+         (i.e. ``image/threads`` option, see :py:func:`.threads.get_threads_count`)
 
     Returns:
-        float: Minimum value of data, ignoring NaNs
+        tuple: Minimum, maximum, number of values, sum and sum of squares
+        (minimum and maximum are NaN if there are no valid values)
     """
+    # pylint: disable=import-outside-toplevel
+    from plotpy._scaler import _nan_stats
+
     if isinstance(data, np.ma.MaskedArray):
+        if mask is None and data.mask is not np.ma.nomask:
+            mask = data.mask
         data = data.data
-    if data.dtype.name in ("float32", "float64", "float128"):
-        return np.nanmin(data)
-    else:
-        return data.min()
+    nthreads = get_threads_count(nthreads)
+    if data.ndim != 2:
+        data = data.reshape(-1)
+        if mask is not None:
+            mask = np.asarray(mask).reshape(-1)
+    try:
+        return _nan_stats(data, mask, nthreads)
+    except TypeError:
+        # Unsupported data type (e.g. float16 or float128): fall back to NumPy
+        valid = np.ones(data.shape, bool) if mask is None else ~np.asarray(mask)
+        if data.dtype.kind in "fc":
+            valid &= ~np.isnan(data)
+        values = data[valid]
+        if values.size == 0:
+            return np.nan, np.nan, 0, 0.0, 0.0
+        return (
+            values.min(),
+            values.max(),
+            values.size,
+            float(values.sum()),
+            float((values.astype(float) ** 2).sum()),
+        )
+
+
+def get_nan_min(data: np.ndarray | np.ma.MaskedArray) -> float:
+    """Return minimum value of data, ignoring NaNs
+
+    Args:
+        data: Data array (or masked array: mask is ignored)
+
+    Returns:
+        float: Minimum value of data, ignoring NaNs (scalar of the data type, see
+        :py:func:`get_nan_range`)
+    """
+    return get_nan_range(data)[0]
 
 
 def get_nan_max(data: np.ndarray | np.ma.MaskedArray) -> float:
     """Return maximum value of data, ignoring NaNs
 
     Args:
-        data: Data array (or masked array)
+        data: Data array (or masked array: mask is ignored)
 
     Returns:
-        float: Maximum value of data, ignoring NaNs
+        float: Maximum value of data, ignoring NaNs (scalar of the data type, see
+        :py:func:`get_nan_range`)
     """
-    if isinstance(data, np.ma.MaskedArray):
-        data = data.data
-    if data.dtype.name in ("float32", "float64", "float128"):
-        return np.nanmax(data)
-    else:
-        return data.max()
+    return get_nan_range(data)[1]
 
 
 def get_nan_range(data: np.ndarray | np.ma.MaskedArray) -> tuple[float, float]:
     """Return range of data, i.e. (min, max), ignoring NaNs
 
     Args:
-        data: Data array (or masked array)
+        data: Data array (or masked array: mask is ignored)
+
+    Returns:
+        tuple: Minimum and maximum value of data, ignoring NaNs, as scalars of the
+        data type for integer and floating point data (NaN if there are no valid
+        values)
+    """
+    if isinstance(data, np.ma.MaskedArray):
+        data = data.data
+    vmin, vmax = get_nan_stats(data)[:2]
+    if data.dtype.kind in "iuf" and not np.isnan(vmin):
+        if data.dtype.kind in "iu" and max(abs(vmin), abs(vmax)) >= 2**53:
+            # Extrema were computed in double precision, which is not exact for
+            # these 64-bit integers: there are no NaNs to skip in integer data
+            return data.min(), data.max()
+        vmin, vmax = data.dtype.type(vmin), data.dtype.type(vmax)
+    return vmin, vmax
+
+
+def get_nan_histogram(
+    data: np.ndarray | np.ma.MaskedArray,
+    nbins: int,
+    drange: tuple[float, float] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return histogram of data with *nbins* uniform bins, ignoring NaNs
+
+    This is equivalent to ``np.histogram(data[~np.isnan(data)], nbins, drange)``
+    but NaNs are skipped by the native histogram engine in a single pass, without
+    copying data (8-bit and 16-bit integer data are counted with a lookup table).
+
+    Args:
+        data: Data array (or masked array: mask is ignored)
+        nbins: Number of bins
+        drange: Lower and upper range of the bins. If not provided, range is
+         simply (data.min(), data.max()), ignoring NaNs. Values outside the range
+         are ignored.
 
     Returns:
-        tuple: Minimum and maximum value of data, ignoring NaNs
+        tuple: Histogram values (int64 array of *nbins* elements) and bin edges
     """
-    return get_nan_min(data), get_nan_max(data)
+    # pylint: disable=import-outside-toplevel
+    from plotpy._scaler import _histogram_uniform
+
+    if isinstance(data, np.ma.MaskedArray):
+        data = data.data
+    if drange is None:
+        if data.size == 0:
+            vmin, vmax = 0.0, 1.0
+        else:
+            vmin, vmax = get_nan_range(data)
+            if not (np.isfinite(vmin) and np.isfinite(vmax)):
+                vmin, vmax = 0.0, 1.0  # All-NaN data
+    else:
+        vmin, vmax = drange
+        if vmin > vmax:
+            raise ValueError("max must be larger than min in range parameter.")
+        if not (np.isfinite(vmin) and np.isfinite(vmax)):
+            raise ValueError(f"supplied range of [{vmin}, {vmax}] is not finite")
+    vmin, vmax = float(vmin), float(vmax)
+    if vmin == vmax:
+        vmin, vmax = vmin - 0.5, vmax + 0.5
+    bins = np.linspace(vmin, vmax, nbins + 1)
+    hist = np.zeros(nbins, np.int64)
+    if data.ndim > 2:
+        data = data.reshape(-1)
+    try:
+        _histogram_uniform(data, bins, hist)
+    except TypeError:
+        # Unsupported data type (e.g. float16 or complex): fall back to NumPy
+        if data.dtype.kind in "fc":
+            data = data[~np.isnan(data)]
+        hist = np.histogram(data, bins=bins)[0]
+    return hist, bins
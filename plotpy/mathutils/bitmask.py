@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Bit-packed masks
+----------------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.bitmask` module provides a compact representation of image
+masks: the :py:class:`.PackedMask` class stores one bit per pixel, packed along
+rows (most significant bit first, as with :py:func:`numpy.packbits`), i.e. 8
+times less memory than a boolean array.
+
+A packed mask is a copy of a boolean mask which is kept up to date by tiles:
+the regions of the boolean mask which have changed are declared with
+:py:meth:`.PackedMask.set_dirty_rect`, and only the tiles intersecting these
+regions are packed again by :py:meth:`.PackedMask.update`, which returns them
+(e.g. to save only these tiles).
+
+Regions are given as index bounds (i0, i1, j0, j1), i.e. rows i0 to i1 and
+columns j0 to j1 (excluded).
+
+Reference
+^^^^^^^^^
+
+.. autoclass:: PackedMask
+   :members:
+.. autofunction:: unpack_mask
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+#: Default size of the tiles of packed masks (in pixels, multiple of 8)
+MASK_TILE_SIZE = 256
+
+
+def unpack_mask(bits: np.ndarray, ncols: int) -> np.ndarray:
+    """Unpack bits packed along rows
+
+    Args:
+        bits: 2D uint8 array of packed bits (see :py:func:`numpy.packbits`)
+        ncols: number of columns of the mask
+
+    Returns:
+        2D boolean array
+    """
+    return np.unpackbits(bits, axis=1, count=ncols).view(bool)
+
+
+class PackedMask:
+    """Bit-packed copy of a 2D boolean mask, updated by tiles
+
+    Args:
+        shape: mask shape (rows, columns)
+        tile_size: tile size, in pixels (multiple of 8).
+         Default is None (i.e. :py:data:`MASK_TILE_SIZE`)
+    """
+
+    def __init__(self, shape: tuple[int, int], tile_size: int | None = None) -> None:
+        if tile_size is None:
+            tile_size = MASK_TILE_SIZE
+        if tile_size <= 0 or tile_size % 8:
+            raise ValueError(f"Invalid tile size {tile_size} (multiple of 8)")
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.tile_size = tile_size
+        #: Packed bits: array of shape (rows, (columns + 7) // 8)
+        self.bits = np.zeros((self.shape[0], (self.shape[1] + 7) // 8), np.uint8)
+        ts = tile_size
+        self._tile_shape = (-(-self.shape[0] // ts), -(-self.shape[1] // ts))
+        # All tiles are dirty: the copy has not been packed yet
+        self._dirty: set[tuple[int, int]] = {
+            (ti, tj)
+            for ti in range(self._tile_shape[0])
+            for tj in range(self._tile_shape[1])
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by packed bits, in bytes"""
+        return self.bits.nbytes
+
+    def get_tile_rect(self, ti: int, tj: int) -> tuple[int, int, int, int]:
+        """Return the region of a tile
+
+        Args:
+            ti: tile row index
+            tj: tile column index
+
+        Returns:
+            Tile region (i0, i1, j0, j1)
+        """
+        ts = self.tile_size
+        i0, j0 = ti * ts, tj * ts
+        return i0, min(i0 + ts, self.shape[0]), j0, min(j0 + ts, self.shape[1])
+
+    def set_dirty_rect(
+        self, i0: int = 0, i1: int | None = None, j0: int = 0, j1: int | None = None
+    ) -> None:
+        """Declare a region of the boolean mask as changed
+
+        Args:
+            i0: first row (Default value = 0)
+            i1: last row (excluded, Default value = None: last row of mask)
+            j0: first column (Default value = 0)
+            j1: last column (excluded, Default value = None: last column of mask)
+        """
+        ni, nj = self.shape
+        i1 = ni if i1 is None else min(int(i1), ni)
+        j1 = nj if j1 is None else min(int(j1), nj)
+        i0, j0 = max(int(i0), 0), max(int(j0), 0)
+        if i1 <= i0 or j1 <= j0:
+            return
+        ts = self.tile_size
+        self._dirty.update(
+            (ti, tj)
+            for ti in range(i0 // ts, -(-i1 // ts))
+            for tj in range(j0 // ts, -(-j1 // ts))
+        )
+
+    def get_dirty_tiles(self) -> list[tuple[int, int]]:
+        """Return the tiles which have to be packed again
+
+        Returns:
+            Sorted list of tile indexes (ti, tj)
+        """
+        return sorted(self._dirty)
+
+    def update(self, mask: np.ndarray | None) -> list[tuple[int, int]]:
+        """Pack again the dirty tiles of the boolean mask
+
+        Args:
+            mask: boolean mask of the same shape, or None (nothing is masked)
+
+        Returns:
+            Sorted list of the updated tile indexes (ti, tj)
+        """
+        tiles = self.get_dirty_tiles()
+        for ti, tj in tiles:
+            i0, i1, j0, j1 = self.get_tile_rect(ti, tj)
+            b0, b1 = j0 // 8, (j1 + 7) // 8
+            if mask is None:
+                self.bits[i0:i1, b0:b1] = 0
+            else:
+                self.bits[i0:i1, b0:b1] = np.packbits(mask[i0:i1, j0:j1], axis=1)
+        self._dirty.clear()
+        return tiles
+
+    def to_array(self) -> np.ndarray:
+        """Return the mask as a boolean array
+
+        Returns:
+            2D boolean array
+        """
+        return unpack_mask(self.bits, self.shape[1])
@@ -15,28 +15,38 @@ and tools to manipulate and create them.
 
 The following functions are available:
 
-* :py:func:`.get_cmap`: get a colormap from its name
+* :py:func:`.get_cmap`: get a colormap from its name (colormaps are loaded from
+  their JSON files on first access, see :py:class:`.LazyColormapDict`)
 * :py:func:`.cmap_exists`: check if a colormap exists
 * :py:func:`.add_cmap`: add a colormap to the list of available colormaps
 * :py:func:`.build_icon_from_cmap`: build an icon representing the colormap
 * :py:func:`.build_icon_from_cmap_name`: build an icon representing the colormap
   from its name
+* :py:func:`.interpolate_cmap`: compute the colors of a colormap at many
+  positions at once
+* :py:func:`.get_cmap_lut`: get the lookup table (LUT) of a colormap, which is
+  shared between image items (process-wide cache)
 
 Reference
 ^^^^^^^^^
 
+.. autoclass:: LazyColormapDict
+   :members:
 .. autofunction:: get_cmap
 .. autofunction:: cmap_exists
 .. autofunction:: add_cmap
 .. autofunction:: build_icon_from_cmap
 .. autofunction:: build_icon_from_cmap_name
+.. autofunction:: interpolate_cmap
+.. autofunction:: get_cmap_lut
 """
 
 from __future__ import annotations
 
+import collections.abc
 import json
 import os
-from typing import Dict, Literal, Sequence
+from typing import Any, Callable, Dict, Iterator, Literal, Sequence
 
 import numpy as np
 import qtpy.QtCore as QC
@@ -45,6 +55,7 @@ from guidata.configtools import get_module_data_path
 from qwt import QwtInterval, toQImage
 
 from plotpy.config import CONF
+from plotpy.constants import LUT_SIZE, LUTAlpha
 from plotpy.widgets.colormap.widget import EditableColormap
 
 FULLRANGE = QwtInterval(0.0, 1.0)
@@ -53,6 +64,11 @@ LARGE_ICON_WIDTH, LARGE_ICON_HEIGHT, LARGE_ICON_ORIENTATION = 80, 16, "h"
 
 CmapDictType = Dict[str, EditableColormap]
 
+#: Maximum number of lookup tables kept in the cache of :py:func:`get_cmap_lut`
+LUT_CACHE_SIZE = 64
+
+_LUT_CACHE: collections.OrderedDict[tuple, np.ndarray] = collections.OrderedDict()
+
 
 def load_raw_colormaps_from_json(
     json_path: str,
@@ -140,15 +156,71 @@ CUSTOM_COLORMAPS_PATH = get_cmap_path(
     )
 )
 
-# Load default and custom colormaps from json files
-DEFAULT_COLORMAPS: CmapDictType = load_qwt_colormaps_from_json(DEFAULT_COLORMAPS_PATH)
-CUSTOM_COLORMAPS: CmapDictType = load_qwt_colormaps_from_json(CUSTOM_COLORMAPS_PATH)
+
+class LazyColormapDict(collections.abc.MutableMapping):
+    """Dictionary of colormaps (names -> colormaps), loaded on first access: parsing
+    the JSON files and building the colormaps is not done at import time
+
+    Args:
+        loader: function returning the colormaps dictionary
+    """
+
+    def __init__(self, loader: Callable[[], CmapDictType]) -> None:
+        self._loader = loader
+        self._data: CmapDictType | None = None
+
+    @property
+    def loaded(self) -> bool:
+        """True if colormaps have already been loaded"""
+        return self._data is not None
+
+    @property
+    def data(self) -> CmapDictType:
+        """Colormaps dictionary (colormaps are loaded on first access)"""
+        if self._data is None:
+            self._data = self._loader()
+        return self._data
+
+    def __getitem__(self, name: str) -> EditableColormap:
+        return self.data[name]
+
+    def __setitem__(self, name: str, cmap: EditableColormap) -> None:
+        self.data[name] = cmap
+
+    def __delitem__(self, name: str) -> None:
+        del self.data[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return repr(self.data)
+
+
+# Default and custom colormaps, loaded from json files on first access
+DEFAULT_COLORMAPS = LazyColormapDict(
+    lambda: load_qwt_colormaps_from_json(DEFAULT_COLORMAPS_PATH)
+)
+CUSTOM_COLORMAPS = LazyColormapDict(
+    lambda: load_qwt_colormaps_from_json(CUSTOM_COLORMAPS_PATH)
+)
 
 # Merge default and custom colormaps into a single dictionnary to simplify access
-ALL_COLORMAPS: CmapDictType = {**DEFAULT_COLORMAPS, **CUSTOM_COLORMAPS}
+ALL_COLORMAPS = LazyColormapDict(lambda: {**DEFAULT_COLORMAPS, **CUSTOM_COLORMAPS})
+
+# Name of the default colormap to use if a colormap is not found
+DEFAULT_NAME = "jet"
 
-# Default colormap to use if a colormap is not found
-DEFAULT = ALL_COLORMAPS["jet"]
+
+def __getattr__(name: str) -> Any:
+    """Return module attributes computed on first access"""
+    if name == "DEFAULT":
+        # Default colormap (kept for backward compatibility)
+        return ALL_COLORMAPS[DEFAULT_NAME]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def save_colormaps(json_filename: str, colormaps: CmapDictType):
@@ -259,8 +331,10 @@ def get_cmap(cmap_name: str) -> EditableColormap:
         A CustomQwtLinearColormap instance corresponding to the given name, if no
         colormap is found, returns the DEFAULT colormap.
     """
-    global ALL_COLORMAPS
-    return ALL_COLORMAPS.get(cmap_name.lower(), DEFAULT)
+    cmap = ALL_COLORMAPS.get(cmap_name.lower())
+    if cmap is None:
+        cmap = ALL_COLORMAPS[DEFAULT_NAME]
+    return cmap
 
 
 def cmap_exists(cmap_name: str, cmap_dict: CmapDictType | None = None) -> bool:
@@ -300,3 +374,92 @@ def delete_cmap(cmap: EditableColormap) -> None:
     if CUSTOM_COLORMAPS.pop(cmap.name.lower(), None) is not None:
         del ALL_COLORMAPS[cmap.name.lower()]
         save_colormaps(CUSTOM_COLORMAPS_PATH, CUSTOM_COLORMAPS)
+
+
+def interpolate_cmap(cmap: EditableColormap, values: np.ndarray) -> np.ndarray:
+    """Returns the colors of the colormap at the given values (vectorized
+    counterpart of ``cmap.rgb(FULLRANGE, value)``, with the same rounding)
+
+    Args:
+        cmap: colormap
+        values: positions in the colormap, between 0 and 1
+
+    Returns:
+        Array of ARGB32 colors (uint32)
+    """
+    stops = cmap.colorStops()
+    pos = np.array([stop.pos for stop in stops], dtype=np.float64)
+    channels = np.array(
+        [[stop.a, stop.r, stop.g, stop.b] for stop in stops], dtype=np.float64
+    )
+    values = np.asarray(values, dtype=np.float64)
+    if cmap.invert:
+        values = 1.0 - values + 0.0
+    # Index of the color stop preceding each value (see `ColorStops.findUpper`)
+    index = np.clip(np.searchsorted(pos, values, side="right") - 1, 0, len(stops) - 1)
+    if cmap.mode() == cmap.FixedColors or len(stops) == 1:
+        argb = channels[index]
+    else:
+        index = np.minimum(index, len(stops) - 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (values - pos[index]) / (pos[index + 1] - pos[index])
+        steps = channels[index + 1] - channels[index]
+        argb = np.floor((channels[index] + 0.5) + ratio[:, None] * steps)
+    argb[values <= 0.0] = channels[0]
+    argb[values >= 1.0] = channels[-1]
+    argb = argb.astype(np.uint32)
+    return (argb[:, 0] << 24) | (argb[:, 1] << 16) | (argb[:, 2] << 8) | argb[:, 3]
+
+
+def get_cmap_lut(
+    cmap: EditableColormap,
+    alpha_function: int = LUTAlpha.NONE.value,
+    alpha: float = 1.0,
+    size: int = LUT_SIZE,
+) -> np.ndarray:
+    """Returns the lookup table (LUT) of the colormap, i.e. the ARGB32 colors
+    used to draw images, with the given alpha function
+
+    Lookup tables are cached (the key is the colormap content, not the colormap
+    object itself, so that edited colormaps are handled) and shared between image
+    items: the returned array is read-only.
+
+    Args:
+        cmap: colormap
+        alpha_function: alpha function (see :py:class:`.LUTAlpha`)
+         (Default value = LUTAlpha.NONE.value)
+        alpha: global alpha value (Default value = 1.0)
+        size: LUT size (Default value = LUT_SIZE)
+
+    Returns:
+        Read-only array of ARGB32 colors (uint32)
+    """
+    stops = tuple((stop.pos, stop.rgb) for stop in cmap.colorStops())
+    key = (stops, cmap.mode(), cmap.invert, alpha_function, alpha, size)
+    lut = _LUT_CACHE.get(key)
+    if lut is not None:
+        _LUT_CACHE.move_to_end(key)
+        return lut
+    x = np.arange(size) / float(size - 1)
+    if alpha_function == LUTAlpha.NONE.value:
+        pix_alpha = np.ones(size)
+    elif alpha_function == LUTAlpha.CONSTANT.value:
+        pix_alpha = np.full(size, alpha)
+    elif alpha_function == LUTAlpha.LINEAR.value:
+        pix_alpha = alpha * x
+    elif alpha_function == LUTAlpha.SIGMOID.value:
+        pix_alpha = alpha / (1 + np.exp(-10 * x))
+    elif alpha_function == LUTAlpha.TANH.value:
+        pix_alpha = alpha * np.tanh(5 * x)
+    elif alpha_function == LUTAlpha.STEP.value:
+        # Fully transparent lowest value and `alpha` transparent elsewhere
+        pix_alpha = np.where(x > 0, alpha, 0.0)
+    else:
+        raise ValueError(f"Invalid alpha function {alpha_function}")
+    alpha_channel = np.clip(np.trunc(255 * pix_alpha + 0.5), 0, 255).astype(np.uint32)
+    lut = (interpolate_cmap(cmap, x) & 0xFFFFFF) | (alpha_channel << 24)
+    lut.flags.writeable = False
+    _LUT_CACHE[key] = lut
+    if len(_LUT_CACHE) > LUT_CACHE_SIZE:
+        _LUT_CACHE.popitem(last=False)
+    return lut
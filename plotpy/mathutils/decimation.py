@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Curve decimation
+----------------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.decimation` module provides view-dependent decimation functions
+for large curves, thanks to the native engine (``_scaler`` extension): only
+the visible part of the curve is reduced to a few points per horizontal pixel,
+so that a decimated curve can't be visually distinguished from the original
+curve (unlike a fixed-factor downsampling, which may miss peaks).
+
+The following methods are available:
+
+* ``"m4"``: the first, minimum, maximum and last points of each pixel column
+  are kept (min/max envelope, at most 4 points per pixel)
+* ``"lttb"``: Largest-Triangle-Three-Buckets method (the point forming the
+  largest triangle with its neighbors is kept in each bucket, at most
+  :py:data:`LTTB_POINTS_PER_PIXEL` points per pixel)
+
+Axis-aligned segments (e.g. error bars) may also be reduced to the pixel
+runs they cover in each pixel column, with :py:func:`.collapse_segments`.
+
+The following functions are available:
+
+* :py:func:`.get_visible_range`: index range of the visible points
+* :py:func:`.decimate_m4`: M4 decimation of buckets of points
+* :py:func:`.decimate_lttb`: LTTB decimation of buckets of points
+* :py:func:`.decimate_curve`: view-dependent decimation of a curve
+* :py:func:`.collapse_segments`: culling and merging of axis-aligned segments
+
+Reference
+^^^^^^^^^
+
+.. autofunction:: get_visible_range
+.. autofunction:: decimate_m4
+.. autofunction:: decimate_lttb
+.. autofunction:: decimate_curve
+.. autofunction:: collapse_segments
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from plotpy._scaler import _collapse_segments, _decimate_lttb, _decimate_m4
+from plotpy.mathutils.threads import get_threads_count
+
+#: Number of points per horizontal pixel kept by the LTTB decimation
+LTTB_POINTS_PER_PIXEL = 2
+
+#: Available decimation methods
+DECIMATION_METHODS = ("m4", "lttb")
+
+
+def get_visible_range(x: np.ndarray, xmin: float, xmax: float) -> tuple[int, int]:
+    """Return the index range of the points of a curve which are visible in
+    the [xmin, xmax] interval (including one point outside on each side, so
+    that the curve is continuous at the edges of the view)
+
+    Args:
+        x: X data (sorted in increasing order)
+        xmin: minimum visible X coordinate
+        xmax: maximum visible X coordinate
+
+    Returns:
+        tuple: Start and stop indexes
+    """
+    start = max(int(x.searchsorted(xmin, "left")) - 1, 0)
+    stop = min(int(x.searchsorted(xmax, "right")) + 1, x.size)
+    return start, max(start, stop)
+
+
+def decimate_m4(
+    y: np.ndarray, bounds: np.ndarray, nthreads: int | None = None
+) -> np.ndarray:
+    """Return the indexes of the first, minimum, maximum and last points of
+    each bucket of points (NaN values are ignored)
+
+    Args:
+        y: Y data (1-D array)
+        bounds: bucket bounds: bucket *k* contains the points of indexes
+         ``bounds[k]`` to ``bounds[k+1]-1`` (increasing indexes)
+        nthreads: number of threads (0: one per CPU core). Default is None
+         (i.e. ``image/threads`` option, see :py:func:`.threads.get_threads_count`)
+
+    Returns:
+        Increasing indexes of the selected points
+    """
+    nthreads = get_threads_count(nthreads)
+    bounds = np.asarray(bounds, dtype=np.int64)
+    result = np.empty(4 * (bounds.size - 1), np.int64)
+    _decimate_m4(y, bounds, result, nthreads)
+    return result[result >= 0]
+
+
+def decimate_lttb(x: np.ndarray, y: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Return the indexes of the points selected in each bucket of points by
+    the Largest-Triangle-Three-Buckets method (first and last buckets give the
+    first and last points)
+
+    Args:
+        x: X data (1-D array)
+        y: Y data (1-D array)
+        bounds: bucket bounds: bucket *k* contains the points of indexes
+         ``bounds[k]`` to ``bounds[k+1]-1`` (increasing indexes, non-empty
+         buckets)
+
+    Returns:
+        Increasing indexes of the selected points (one per bucket)
+    """
+    bounds = np.asarray(bounds, dtype=np.int64)
+    result = np.empty(bounds.size - 1, np.int64)
+    _decimate_lttb(np.asarray(x, dtype=float), y, bounds, result)
+    return result
+
+
+def decimate_curve(
+    x: np.ndarray,
+    y: np.ndarray,
+    xmin: float,
+    xmax: float,
+    width: int,
+    method: str = "m4",
+    xsorted: bool = True,
+    xlog: bool = False,
+) -> np.ndarray:
+    """Return the indexes of the curve points to be drawn in a view
+
+    If X data is sorted, only the visible points are processed, and M4
+    buckets are the pixel columns. Otherwise, the whole curve is decimated
+    (with buckets of the same number of points).
+
+    Args:
+        x: X data (1-D array)
+        y: Y data (1-D array)
+        xmin: minimum visible X coordinate
+        xmax: maximum visible X coordinate
+        width: view width (pixels)
+        method: decimation method (see :py:data:`DECIMATION_METHODS`).
+         Default is "m4"
+        xsorted: True if X data is sorted in increasing order. Default is True
+        xlog: True if X axis scale is logarithmic. Default is False
+
+    Returns:
+        Increasing indexes of the points to be drawn (if there are not enough
+        visible points to decimate, indexes of all visible points)
+    """
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method: {method}")
+    xmin, xmax = min(xmin, xmax), max(xmin, xmax)
+    width = max(int(width), 1)
+    start, stop = get_visible_range(x, xmin, xmax) if xsorted else (0, x.size)
+    if method == "m4":
+        if stop - start <= 4 * width:
+            return np.arange(start, stop)
+        if xsorted:
+            if xlog and xmin > 0:
+                edges = np.geomspace(xmin, xmax, width + 1)[1:-1]
+            else:
+                edges = np.linspace(xmin, xmax, width + 1)[1:-1]
+            # Points outside the view are included in the first/last buckets
+            inner = x[start:stop].searchsorted(edges) + start
+            bounds = np.concatenate(([start], inner, [stop]))
+        else:
+            bounds = np.linspace(start, stop, width + 1)
+        return decimate_m4(y, bounds)
+    nout = LTTB_POINTS_PER_PIXEL * width
+    if stop - start <= nout:
+        return np.arange(start, stop)
+    # The first and last buckets contain only the first and last points
+    inner = np.linspace(start + 1, stop - 1, nout - 1)
+    bounds = np.concatenate(([start], inner, [stop]))
+    return decimate_lttb(x, y, bounds)
+
+
+def collapse_segments(
+    c: np.ndarray,
+    a0: np.ndarray,
+    a1: np.ndarray,
+    cmin: float,
+    cmax: float,
+    amin: float,
+    amax: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cull and merge axis-aligned segments drawn on a pixel grid
+
+    Segment *i* is parallel to the "a" axis: it is located at coordinate
+    ``c[i]`` on the "c" axis and goes from ``a0[i]`` to ``a1[i]`` (e.g. for
+    vertical error bars, "c" is the X axis and "a" is the Y axis). Segments
+    outside the [cmin, cmax] x [amin, amax] rectangle are removed, and the
+    overlapping segments of each pixel column are merged into a single segment.
+
+    Args:
+        c: segments coordinates along the "c" axis (pixels)
+        a0: segments start coordinates along the "a" axis (pixels)
+        a1: segments end coordinates along the "a" axis (pixels)
+        cmin: minimum visible coordinate along the "c" axis
+        cmax: maximum visible coordinate along the "c" axis
+        amin: minimum visible coordinate along the "a" axis
+        amax: maximum visible coordinate along the "a" axis
+
+    Returns:
+        tuple: c, a0 and a1 arrays of merged segments (at the center of pixels,
+        with a0 <= a1), sorted by pixel column
+    """
+    c, a0, a1 = [np.asarray(arr, dtype=np.float64).ravel() for arr in (c, a0, a1)]
+    ncols = max(int(np.ceil(cmax - cmin)), 0)
+    nrows = max(int(np.ceil(amax - amin)), 0)
+    result = np.empty((c.size, 3), np.float64)
+    count = _collapse_segments(c, a0, a1, cmin, amin, ncols, nrows, result)
+    return result[:count, 0], result[:count, 1], result[:count, 2]
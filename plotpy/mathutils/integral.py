@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Integral image
+--------------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.integral` module provides a cache of cumulative sums of image
+data along each axis, so that the average cross section of any rectangular
+area of the image (see :py:meth:`.BaseImageItem.get_average_xsection`) is
+computed with one subtraction per pixel of the cross section, whatever the
+size of the area.
+
+Cumulative sums along an axis are computed lazily, on the first averaged
+cross section along this axis. Integer data is summed exactly (64-bit
+integers); other data is summed in double precision.
+
+Non-finite values (NaN, infinity) are not added to the cumulative sums: their
+number is accumulated separately, and the few cross section pixels which are
+affected by non-finite values are computed directly from the image data (so
+that the result is the same as averaging the area with NumPy).
+
+Reference
+^^^^^^^^^
+
+.. autoclass:: IntegralImage
+   :members:
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+#: Areas with fewer pixels are averaged directly when the cumulative sums along
+#: the requested axis have not been computed yet
+SMALL_AREA_SIZE = 1 << 16
+
+
+def get_sum_dtype(dtype: np.dtype) -> np.dtype:
+    """Return the data type used to accumulate data of the given type
+
+    Args:
+        dtype: Image data type
+
+    Returns:
+        64-bit integers for integer types (up to 32 bits), complex numbers for
+        complex types, double precision floating point numbers otherwise
+    """
+    if dtype.kind in "biu" and dtype.itemsize < 8:
+        return np.dtype(np.int64)
+    if dtype.kind == "c":
+        return np.dtype(np.complex128)
+    return np.dtype(np.float64)
+
+
+class IntegralImage:
+    """Cumulative sums of image data along each axis
+
+    Args:
+        data: 2D NumPy array
+    """
+
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = data
+        self.sum_dtype = get_sum_dtype(data.dtype)
+        # Cumulative sums (and counts of non-finite values) for each axis: for
+        # axis 0, array of shape (rows + 1, columns), for axis 1, array of shape
+        # (columns + 1, rows) (i.e. transposed, for contiguous lookups)
+        self._sums: list[np.ndarray | None] = [None, None]
+        self._nonfinite: list[np.ndarray | None] = [None, None]
+        self._has_nonfinite: bool | None = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the cumulative sums, in bytes"""
+        arrays = self._sums + self._nonfinite
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def has_nonfinite(self) -> bool:
+        """Return True if image data contains non-finite values"""
+        if self._has_nonfinite is None:
+            self._has_nonfinite = self.data.dtype.kind in "fc" and not bool(
+                np.isfinite(self.data).all()
+            )
+        return self._has_nonfinite
+
+    def __accumulate(self, data: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        """Return cumulative sums of data along axis 0, with a leading row of
+        zeros (C-contiguous array)"""
+        sums = np.empty((data.shape[0] + 1, data.shape[1]), dtype=dtype)
+        sums[0] = 0
+        np.cumsum(data, axis=0, dtype=dtype, out=sums[1:])
+        return sums
+
+    def get_cumsum(self, axis: int) -> tuple[np.ndarray, np.ndarray | None]:
+        """Return cumulative sums along axis (computed on first call)
+
+        Args:
+            axis: Axis (0: sums of rows, 1: sums of columns)
+
+        Returns:
+            Tuple (sums, nonfinite): cumulative sums with a leading row of zeros
+            (transposed for axis 1), and cumulative counts of non-finite values
+            with the same shape (None if data contains only finite values)
+        """
+        if self._sums[axis] is None:
+            data = self.data if axis == 0 else self.data.T
+            if self.has_nonfinite():
+                isfinite = np.isfinite(data)
+                self._nonfinite[axis] = self.__accumulate(~isfinite, np.int32)
+                data = np.where(isfinite, data, 0)
+            self._sums[axis] = self.__accumulate(data, self.sum_dtype)
+        return self._sums[axis], self._nonfinite[axis]
+
+    def get_average_section(
+        self, axis: int, i0: int, i1: int, j0: int, j1: int
+    ) -> np.ndarray:
+        """Return the average of the data[i0:i1, j0:j1] area along axis
+
+        Args:
+            axis: Axis (0: average of rows, i.e. cross section along x-axis,
+             1: average of columns, i.e. cross section along y-axis)
+            i0: First row index
+            i1: Last row index (excluded)
+            j0: First column index
+            j1: Last column index (excluded)
+
+        Returns:
+            Same as ``data[i0:i1, j0:j1].mean(axis=axis)`` (empty array if the area
+            is empty)
+        """
+        nrows, ncols = self.data.shape
+        i0, i1 = max(i0, 0), min(i1, nrows)
+        j0, j1 = max(j0, 0), min(j1, ncols)
+        if i1 <= i0 or j1 <= j0:
+            return np.array([])
+        area = self.data[i0:i1, j0:j1]
+        if self._sums[axis] is None and area.size <= SMALL_AREA_SIZE:
+            return area.mean(axis=axis)
+        if axis == 1:
+            i0, i1, j0, j1 = j0, j1, i0, i1
+            area = area.T
+        sums, nonfinite = self.get_cumsum(axis)
+        section = (sums[i1, j0:j1] - sums[i0, j0:j1]) / (i1 - i0)
+        if self.data.dtype.kind in "fc":
+            section = section.astype(self.data.dtype, copy=False)
+        if nonfinite is not None:
+            # Averaged values including non-finite values (NaN, +inf, -inf, or
+            # inf - inf) are computed directly from data
+            indexes = np.flatnonzero(nonfinite[i1, j0:j1] != nonfinite[i0, j0:j1])
+            if indexes.size:
+                section[indexes] = area[:, indexes].mean(axis=0)
+        return section
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Point index
+-----------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.pointindex` module provides a spatial index for large scatter
+point clouds, used to compute 2-D histograms of the visible area only
+(e.g. when zooming on a :py:class:`.Histogram2DItem`).
+
+Points are bucketed on a regular grid covering their bounding box and sorted
+by bucket (row-major order): the points of the buckets intersecting a
+rectangle are then stored in one contiguous index range per bucket row, so
+that the histogram cost is proportional to the number of visible points
+instead of the total number of points.
+
+The bucket sizes also form a count grid, from which a pyramid of coarser count
+grids (2x2 sums) is derived: when zoomed out, approximate bin counts may be
+computed from the pyramid level cells instead of the points (cell counts are
+distributed over the bins they overlap, assuming a uniform density inside each
+cell). This approximation is opt-in: histograms are exact by default.
+
+.. note::
+
+    The index holds sorted copies of X, Y (and Z) data (as float64 arrays, i.e.
+    up to 24 bytes per point, in addition to the original data), so that the
+    histogram kernels process contiguous point ranges.
+
+Reference
+^^^^^^^^^
+
+.. autoclass:: PointIndex
+   :members:
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from plotpy.histogram2d import bucket_order, histogram2d_stats
+
+#: Maximum number of buckets along each axis
+MAX_GRID_SIZE = 2048
+
+#: Minimum number of count pyramid cells per histogram bin, along each axis
+MIN_CELLS_PER_BIN = 2
+
+#: Cost of processing a count pyramid cell, relative to the cost of processing
+#: a point: the pyramid is used only if it is cheaper than the points
+CELL_COST = 20
+
+
+def get_default_grid_size(npoints: int) -> int:
+    """Return the default number of buckets along each axis
+
+    Args:
+        npoints: number of points
+
+    Returns:
+        Power of 2 giving about 16 points per bucket (between 16 and
+        :py:data:`MAX_GRID_SIZE`)
+    """
+    size = 2 ** round(math.log2(max(math.sqrt(npoints / 16.0), 1.0)))
+    return int(min(max(size, 16), MAX_GRID_SIZE))
+
+
+class PointIndex:
+    """Grid-bucketed spatial index of a 2-D point cloud
+
+    Args:
+        x: X coordinates (1-D array)
+        y: Y coordinates (1-D array)
+        z: values associated to points (1-D array). Default is None
+        grid_size: number of buckets along each axis (power of 2).
+         Default is None (see :py:func:`get_default_grid_size`)
+
+    Points with non-finite coordinates are ignored. The index holds sorted
+    copies of coordinates and values (:py:attr:`x`, :py:attr:`y` and
+    :py:attr:`z`), which double the memory used by the point cloud.
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray | None = None,
+        grid_size: int | None = None,
+    ) -> None:
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if grid_size is None:
+            grid_size = get_default_grid_size(x.size)
+        self.grid_size = size = grid_size
+        valid = np.isfinite(x) & np.isfinite(y)
+        if valid.any():
+            self.xmin, xmax = x[valid].min(), x[valid].max()
+            self.ymin, ymax = y[valid].min(), y[valid].max()
+        else:
+            self.xmin = xmax = self.ymin = ymax = 0.0
+        self.dx = (xmax - self.xmin) / size or 1.0
+        self.dy = (ymax - self.ymin) / size or 1.0
+        bx = self.__to_bucket(np.where(valid, x, self.xmin), self.xmin, self.dx)
+        by = self.__to_bucket(np.where(valid, y, self.ymin), self.ymin, self.dy)
+        buckets = by * size + bx
+        buckets[~valid] = size * size  # Invalid points are stored at the end
+        counts = np.bincount(buckets, minlength=size * size + 1)
+        offsets = np.zeros(counts.size + 1, np.intp)
+        np.cumsum(counts, out=offsets[1:])
+        order = bucket_order(buckets, offsets)
+        self.x = x[order]
+        self.y = y[order]
+        self.z = None if z is None else np.asarray(z, dtype=float)[order]
+        #: Index of the first point of each bucket (and end of the last bucket)
+        self.offsets = offsets[: size * size + 1]
+        self._levels: list[np.ndarray] = [counts[: size * size].reshape(size, size)]
+
+    def __to_bucket(self, values: np.ndarray, vmin: float, step: float) -> np.ndarray:
+        """Return bucket indexes along one axis"""
+        indexes = ((values - vmin) / step).astype(np.intp)
+        return np.clip(indexes, 0, self.grid_size - 1, out=indexes)
+
+    def __get_cell_range(
+        self, v0: float, v1: float, vmin: float, step: float, ncells: int
+    ) -> tuple[int, int] | None:
+        """Return range of cells intersecting [v0, v1] along one axis"""
+        v0, v1 = min(v0, v1), max(v0, v1)
+        c0 = math.floor((v0 - vmin) / step)
+        c1 = math.floor((v1 - vmin) / step)
+        if c1 < 0 or c0 >= ncells:
+            return None
+        return max(c0, 0), min(c1, ncells - 1)
+
+    def get_ranges(
+        self, x0: float, x1: float, y0: float, y1: float
+    ) -> list[tuple[int, int]]:
+        """Return index ranges of the points which may be inside a rectangle
+
+        Args:
+            x0: X coordinate of the first rectangle edge
+            x1: X coordinate of the second rectangle edge
+            y0: Y coordinate of the first rectangle edge
+            y1: Y coordinate of the second rectangle edge
+
+        Returns:
+            List of (start, stop) ranges of sorted point indexes (points of all
+            buckets intersecting the rectangle)
+        """
+        size = self.grid_size
+        xrange = self.__get_cell_range(x0, x1, self.xmin, self.dx, size)
+        yrange = self.__get_cell_range(y0, y1, self.ymin, self.dy, size)
+        if xrange is None or yrange is None:
+            return []
+        (bx0, bx1), (by0, by1) = xrange, yrange
+        if bx0 == 0 and bx1 == size - 1:
+            # Bucket rows are contiguous
+            return [(self.offsets[by0 * size], self.offsets[(by1 + 1) * size])]
+        ranges = []
+        for by in range(by0, by1 + 1):
+            start = self.offsets[by * size + bx0]
+            stop = self.offsets[by * size + bx1 + 1]
+            if stop > start:
+                ranges.append((start, stop))
+        return ranges
+
+    def get_points(self, x0: float, x1: float, y0: float, y1: float) -> np.ndarray:
+        """Return sorted point indexes of the points inside a rectangle
+
+        Args:
+            x0: X coordinate of the first rectangle edge
+            x1: X coordinate of the second rectangle edge
+            y0: Y coordinate of the first rectangle edge
+            y1: Y coordinate of the second rectangle edge
+
+        Returns:
+            Indexes of the points in :py:attr:`x`, :py:attr:`y` and :py:attr:`z`
+        """
+        ranges = self.get_ranges(x0, x1, y0, y1)
+        if not ranges:
+            return np.zeros(0, np.intp)
+        indexes = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+        x, y = self.x[indexes], self.y[indexes]
+        inside = (x >= min(x0, x1)) & (x <= max(x0, x1))
+        inside &= (y >= min(y0, y1)) & (y <= max(y0, y1))
+        return indexes[inside]
+
+    def get_count_level(self, level: int) -> np.ndarray:
+        """Return count pyramid level, building it if necessary
+
+        Args:
+            level: level index (0: bucket sizes, level *k* is a 2**k reduction)
+
+        Returns:
+            Count grid (number of points in each cell)
+        """
+        while len(self._levels) <= level:
+            counts = self._levels[-1]
+            size = counts.shape[0] // 2
+            self._levels.append(counts.reshape(size, 2, size, 2).sum(axis=(1, 3)))
+        return self._levels[level]
+
+    def select_count_level(self, bin_width: float, bin_height: float) -> int | None:
+        """Select the coarsest count pyramid level which cells are small enough
+        with respect to histogram bins
+
+        Args:
+            bin_width: histogram bin width
+            bin_height: histogram bin height
+
+        Returns:
+            Level index, or None if bins are too small for the count pyramid
+        """
+        ratio = min(
+            abs(bin_width) / (MIN_CELLS_PER_BIN * self.dx),
+            abs(bin_height) / (MIN_CELLS_PER_BIN * self.dy),
+        )
+        if not ratio >= 1.0:
+            return None
+        max_level = int(math.log2(self.grid_size))
+        return min(int(math.floor(math.log2(ratio))), max_level)
+
+    def __split_cells(
+        self, edges: np.ndarray, v0: float, scale: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the first bin overlapped by each cell along one axis, and the
+        fraction of the cell inside this bin (the rest is in the next bin)"""
+        # Same centered bins as the histogram kernels
+        pos = (edges - v0) * scale - 0.5
+        low, high = np.minimum(pos[:-1], pos[1:]), np.maximum(pos[:-1], pos[1:])
+        first = np.floor(low)
+        fraction = np.clip((first + 1.0 - low) / (high - low), 0.0, 1.0)
+        return first.astype(np.intp), fraction
+
+    def count_from_pyramid(
+        self,
+        level: int,
+        i0: float,
+        i1: float,
+        j0: float,
+        j1: float,
+        nx: int,
+        ny: int,
+    ) -> np.ndarray:
+        """Compute approximate bin counts from a count pyramid level
+
+        Args:
+            level: count pyramid level
+            i0: X coordinate of the first bin edge
+            i1: X coordinate of the last bin edge
+            j0: Y coordinate of the first bin edge
+            j1: Y coordinate of the last bin edge
+            nx: number of bins along X
+            ny: number of bins along Y
+
+        Returns:
+            (ny, nx) array of bin counts
+        """
+        counts = self.get_count_level(level)
+        ncells = counts.shape[0]
+        cw, ch = self.dx * 2**level, self.dy * 2**level
+        result = np.zeros(nx * ny)
+        xrange = self.__get_cell_range(i0, i1, self.xmin, cw, ncells)
+        yrange = self.__get_cell_range(j0, j1, self.ymin, ch, ncells)
+        if xrange is None or yrange is None:
+            return result.reshape(ny, nx)
+        (cx0, cx1), (cy0, cy1) = xrange, yrange
+        counts = counts[cy0 : cy1 + 1, cx0 : cx1 + 1]
+        xedges = self.xmin + cw * np.arange(cx0, cx1 + 2)
+        yedges = self.ymin + ch * np.arange(cy0, cy1 + 2)
+        kx, fx = self.__split_cells(xedges, i0, nx / (i1 - i0))
+        ky, fy = self.__split_cells(yedges, j0, ny / (j1 - j0))
+        for dy, wy in ((0, fy), (1, 1.0 - fy)):
+            for dx, wx in ((0, fx), (1, 1.0 - fx)):
+                # As in histogram kernels, last bins only get points which are
+                # exactly on their center: they are ignored here
+                bx, by = kx + dx, ky + dy
+                validx = (bx >= 0) & (bx <= nx - 2)
+                validy = (by >= 0) & (by <= ny - 2)
+                weights = counts[validy][:, validx] * np.outer(wy[validy], wx[validx])
+                ids = np.add.outer(by[validy] * nx, bx[validx])
+                result += np.bincount(ids.ravel(), weights.ravel(), nx * ny)
+        return result.reshape(ny, nx)
+
+    def histogram(
+        self,
+        i0: float,
+        i1: float,
+        j0: float,
+        j1: float,
+        nx: int,
+        ny: int,
+        stats: tuple[str, ...] = ("count",),
+        nthreads: int = 1,
+        approximate: bool = False,
+    ) -> dict[str, np.ndarray]:
+        """Compute 2-D histogram statistics of the points inside the bins range
+
+        Only the points of the buckets intersecting the bins range are processed.
+        If `approximate` is True, bin counts (if no other statistics is requested)
+        are computed from the count pyramid when it is cheaper than processing
+        the points (see :py:meth:`count_from_pyramid`): counts are then fractional.
+
+        Args:
+            i0: X coordinate of the first bin edge
+            i1: X coordinate of the last bin edge
+            j0: Y coordinate of the first bin edge
+            j1: Y coordinate of the last bin edge
+            nx: number of bins along X
+            ny: number of bins along Y
+            stats: statistics to be computed (see
+             :py:func:`plotpy.histogram2d.histogram2d_stats`)
+            nthreads: number of threads (0: one per CPU core). Default is 1
+            approximate: if True, allow approximate bin counts computed from the
+             count pyramid. Default is False (exact bin counts)
+
+        Returns:
+            Dictionary of (ny, nx) arrays, one per requested statistics
+        """
+        ranges = self.get_ranges(i0, i1, j0, j1)
+        if approximate and tuple(stats) == ("count",):
+            level = self.select_count_level((i1 - i0) / nx, (j1 - j0) / ny)
+            if level is not None:
+                ncells = 0
+                xrange = self.__get_cell_range(
+                    i0, i1, self.xmin, self.dx * 2**level, self.grid_size >> level
+                )
+                yrange = self.__get_cell_range(
+                    j0, j1, self.ymin, self.dy * 2**level, self.grid_size >> level
+                )
+                if xrange is not None and yrange is not None:
+                    ncells = (xrange[1] - xrange[0] + 1) * (yrange[1] - yrange[0] + 1)
+                npoints = sum(stop - start for start, stop in ranges)
+                if ncells * CELL_COST < npoints:
+                    counts = self.count_from_pyramid(level, i0, i1, j0, j1, nx, ny)
+                    return {"count": counts}
+        return histogram2d_stats(
+            self.x, self.y, i0, i1, j0, j1, nx, ny, self.z, stats, nthreads, ranges
+        )
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Image profiles
+--------------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.profiles` module provides a batch extraction of image intensity
+profiles along segments, thanks to the native engine (``_scaler`` extension):
+all profiles are extracted with a single call, with bilinear interpolation,
+without resampling the image in an intermediate array for each profile.
+
+A profile may also be extracted across a given width, e.g. along an oriented
+rectangle (see :py:func:`.rectangles_to_segments`): the image is then also
+sampled across the segment (one sample per pixel of width), and samples are
+reduced with one of the following methods:
+
+* ``"mean"``: average of the samples
+* ``"sum"``: sum of the samples
+* ``"max"``: maximum of the samples
+
+NaN samples and samples outside the image are ignored (the profile value is
+NaN if there is no valid sample).
+
+Coordinates are pixel coordinates (see
+:py:meth:`.BaseImageItem.get_pixel_coordinates`): pixel (i, j), i.e.
+``data[i, j]``, covers the [j, j+1[ x [i, i+1[ area, so that its center is
+located at (j+0.5, i+0.5).
+
+The following functions are available:
+
+* :py:func:`.extract_profiles`: extraction of profiles along segments
+* :py:func:`.rectangles_to_segments`: conversion of oriented rectangles to
+  segments and widths
+
+Reference
+^^^^^^^^^
+
+.. autofunction:: extract_profiles
+.. autofunction:: rectangles_to_segments
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from plotpy._scaler import _extract_profiles
+from plotpy.mathutils.threads import get_threads_count
+
+#: Available reduction methods (across the width of profiles)
+PROFILE_METHODS = ("mean", "sum", "max")
+
+
+def rectangles_to_segments(rects: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Convert oriented rectangles to segments and widths
+
+    Args:
+        rects: Oriented rectangles: array of shape (N, 8), each row containing
+         the coordinates of four corners (x0, y0, x1, y1, x2, y2, x3, y3), in
+         this order around the rectangle. The profile runs from the middle of the
+         (0, 3) side to the middle of the (1, 2) side
+
+    Returns:
+        Tuple (segments, widths): segments as an array of shape (N, 4) of
+        (x0, y0, x1, y1) coordinates, and array of widths (length of the (0, 3)
+        side)
+    """
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4, 2)
+    segments = np.empty((rects.shape[0], 4))
+    segments[:, :2] = 0.5 * (rects[:, 0] + rects[:, 3])
+    segments[:, 2:] = 0.5 * (rects[:, 1] + rects[:, 2])
+    widths = np.hypot(*(rects[:, 3] - rects[:, 0]).T)
+    return segments, widths
+
+
+def extract_profiles(
+    data: np.ndarray,
+    segments: np.ndarray,
+    width: float | np.ndarray = 1.0,
+    method: str = "mean",
+    npoints: int | None = None,
+    nthreads: int | None = None,
+) -> list[np.ndarray]:
+    """Extract image intensity profiles along segments
+
+    Args:
+        data: 2D NumPy array (masked values are ignored, like NaN values)
+        segments: Segments: array of shape (N, 4), each row containing the
+         coordinates (x0, y0, x1, y1) of the start and end points of a profile
+         (pixel coordinates)
+        width: Width of profiles, in pixels (scalar or array of N values): the
+         image is sampled across the segment at round(width) points spaced by one
+         pixel. Default is 1.0
+        method: Reduction method across the width of profiles (see
+         :py:data:`PROFILE_METHODS`). Default is "mean"
+        npoints: Number of points of each profile. Default is None (one point
+         per pixel along the segment, i.e. length + 1 points, rounded up)
+        nthreads: number of threads (0: one per CPU core). Default is None
+         (i.e. ``image/threads`` option, see :py:func:`.threads.get_threads_count`)
+
+    Returns:
+        List of N profiles (views of a single array: when `npoints` is not None,
+        the profiles are the rows of a 2D array of shape (N, npoints))
+    """
+    if method not in PROFILE_METHODS:
+        raise ValueError(f"Unknown profile reduction method: {method}")
+    nthreads = get_threads_count(nthreads)
+    if isinstance(data, np.ma.MaskedArray):
+        data = np.ma.filled(data.astype(np.float64), np.nan)
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    nprofiles = segments.shape[0]
+    geometry = np.empty((nprofiles, 5))
+    geometry[:, :4] = segments
+    geometry[:, 4] = width
+    if npoints is None:
+        lengths = np.hypot(
+            segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1]
+        )
+        counts = np.ceil(np.nan_to_num(lengths)).astype(np.int64) + 1
+    else:
+        counts = np.full(nprofiles, max(int(npoints), 0), dtype=np.int64)
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    result = np.empty(int(bounds[-1]), dtype=np.float64)
+    if nprofiles > 0:
+        _extract_profiles(
+            data, geometry, bounds, PROFILE_METHODS.index(method), result, nthreads
+        )
+    if npoints is not None:
+        return list(result.reshape(nprofiles, counts[0] if nprofiles else 0))
+    return np.split(result, bounds[1:-1])
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Image pyramid
+-------------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.pyramid` module provides a multi-resolution (mipmap) cache for
+image data: when an image is displayed zoomed out, drawing a reduced version
+of the image is much faster than resampling the full-resolution data.
+
+Each pyramid level is a 2x2 reduction of the previous one (level 0 is the
+original data), computed lazily on first use with one of the following
+reduction methods:
+
+* ``"mean"``: average of the 2x2 block (NaN values are ignored)
+* ``"min"``: minimum of the 2x2 block (NaN values are ignored)
+* ``"max"``: maximum of the 2x2 block (NaN values are ignored)
+* ``"nearest"``: top-left pixel of the 2x2 block
+
+Masked pixels of masked arrays are ignored as NaN values are: reduced levels
+of a masked array are masked arrays too, whose pixels are masked only if the
+whole block is masked.
+
+The memory used by the cached levels is bounded by a budget: least recently
+used levels are dropped when the budget is exceeded.
+
+When a region of the original data changes, the cached levels may be updated
+in this region only (see :py:meth:`.ImagePyramid.update_region`).
+
+Reference
+^^^^^^^^^
+
+.. autoclass:: ImagePyramid
+   :members:
+"""
+
+from __future__ import annotations
+
+import collections
+import math
+import warnings
+
+import numpy as np
+
+PYRAMID_METHODS = ("mean", "min", "max", "nearest")
+
+#: Default memory budget for pyramid levels (in bytes)
+DEFAULT_PYRAMID_MEMORY = 256 * 1024**2
+
+
+def reduce_image(data: np.ndarray, factor: int, method: str) -> np.ndarray:
+    """Reduce image by *factor* x *factor* blocks
+
+    Args:
+        data: 2D NumPy array (or masked array)
+        factor: reduction factor (power of 2)
+        method: reduction method ('mean', 'min', 'max' or 'nearest')
+
+    Returns:
+        Reduced image: pixel (i, j) covers source pixels
+         [i*factor, (i+1)*factor[ x [j*factor, (j+1)*factor[ (source is padded
+         by edge replication when its shape is not a multiple of *factor*).
+         Masked arrays give masked arrays: masked pixels are ignored, and a
+         reduced pixel is masked (with the reduced value of the masked pixels)
+         only if the whole block is masked.
+    """
+    if isinstance(data, np.ma.MaskedArray):
+        return reduce_masked_image(data, factor, method)
+    if method == "nearest":
+        return np.ascontiguousarray(data[::factor, ::factor])
+    ni, nj = data.shape
+    mi, mj = -(-ni // factor), -(-nj // factor)
+    pad_i, pad_j = mi * factor - ni, mj * factor - nj
+    if pad_i or pad_j:
+        data = np.pad(data, ((0, pad_i), (0, pad_j)), mode="edge")
+    blocks = data.reshape(mi, factor, mj, factor)
+    is_float = data.dtype.kind == "f"
+    with warnings.catch_warnings():
+        # All-NaN blocks are expected: they simply give NaN pixels
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if method == "mean":
+            func = np.nanmean if is_float else np.mean
+            result = func(blocks, axis=(1, 3))
+            if not is_float:
+                result = np.rint(result)
+        elif method == "min":
+            result = (np.nanmin if is_float else np.min)(blocks, axis=(1, 3))
+        elif method == "max":
+            result = (np.nanmax if is_float else np.max)(blocks, axis=(1, 3))
+        else:
+            raise ValueError(f"Invalid pyramid reduction method {method!r}")
+    return result.astype(data.dtype, copy=False)
+
+
+def reduce_masked_image(
+    data: np.ma.MaskedArray, factor: int, method: str
+) -> np.ma.MaskedArray:
+    """Reduce masked image by *factor* x *factor* blocks (see
+    :py:func:`reduce_image`)
+
+    Args:
+        data: 2D masked array
+        factor: reduction factor (power of 2)
+        method: reduction method ('mean', 'min', 'max' or 'nearest')
+
+    Returns:
+        Reduced masked image
+    """
+    mask = np.ma.getmaskarray(data)
+    result = reduce_image(data.data, factor, method)
+    if method == "nearest":
+        return np.ma.MaskedArray(result, mask[::factor, ::factor])
+    blocks_mask = reduce_image(mask.view(np.uint8), factor, "min").view(bool)
+    if mask.any():
+        # Masked pixels are replaced by NaN values, which are ignored
+        valid = reduce_image(np.where(mask, np.nan, data.data), factor, method)
+        if data.dtype.kind != "f":
+            valid = np.rint(valid) if method == "mean" else valid
+        result = np.where(blocks_mask, result, valid).astype(data.dtype)
+    return np.ma.MaskedArray(result, blocks_mask)
+
+
+class ImagePyramid:
+    """Multi-resolution cache of an image
+
+    Args:
+        data: 2D NumPy array (level 0 of the pyramid)
+        method: reduction method ('mean', 'min', 'max' or 'nearest').
+         Default is 'mean'
+        max_memory: maximum memory used by the cached levels, in bytes.
+         Default is None (i.e. :py:data:`DEFAULT_PYRAMID_MEMORY`)
+
+    .. note::
+
+        Packed RGBA data (uint32) may only be reduced with the 'nearest'
+        method: other methods are silently replaced by 'nearest'.
+
+    .. note::
+
+        Mean levels of masked arrays are reduced from the original data (and not
+        from the cached finer levels), so that each pixel is the mean of the
+        unmasked pixels of its block.
+    """
+
+    def __init__(
+        self, data: np.ndarray, method: str = "mean", max_memory: int | None = None
+    ) -> None:
+        if method not in PYRAMID_METHODS:
+            raise ValueError(f"Invalid pyramid reduction method {method!r}")
+        if data.dtype == np.uint32:
+            method = "nearest"
+        self.data = data
+        self.method = method
+        if max_memory is None:
+            max_memory = DEFAULT_PYRAMID_MEMORY
+        self.max_memory = max_memory
+        self._levels: collections.OrderedDict[int, np.ndarray] = (
+            collections.OrderedDict()
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the cached levels, in bytes"""
+        return sum(level.nbytes for level in self._levels.values())
+
+    def get_max_level(self) -> int:
+        """Return the index of the coarsest level (1x1 pixel image)"""
+        return max(0, math.ceil(math.log2(max(self.data.shape[:2]))))
+
+    def select_level(self, scale_x: float, scale_y: float) -> int:
+        """Select the coarsest level which still gives at least one source pixel
+        per screen pixel
+
+        Args:
+            scale_x: number of source pixels per screen pixel along X
+            scale_y: number of source pixels per screen pixel along Y
+
+        Returns:
+            Level index (0: original data)
+        """
+        scale = min(abs(scale_x), abs(scale_y))
+        if not np.isfinite(scale) or scale < 2.0:
+            return 0
+        return min(int(math.log2(scale)), self.get_max_level())
+
+    def get_level(self, level: int) -> np.ndarray | None:
+        """Return pyramid level, building it if necessary
+
+        Args:
+            level: level index (0: original data)
+
+        Returns:
+            Level data, or None if the level does not fit in the memory budget
+        """
+        if level <= 0:
+            return self.data
+        if level in self._levels:
+            self._levels.move_to_end(level)
+            return self._levels[level]
+        ni, nj = self.data.shape[:2]
+        factor = 2**level
+        nbytes = -(-ni // factor) * -(-nj // factor) * self.data.dtype.itemsize
+        if nbytes > self.max_memory:
+            return None
+        # Start from the finest cached level below the requested one (the mean
+        # of partially masked blocks can't be computed from reduced levels)
+        base_level = 0
+        if self.method != "mean" or not isinstance(self.data, np.ma.MaskedArray):
+            base_level = max([lvl for lvl in self._levels if lvl < level], default=0)
+        base = self._levels[base_level] if base_level else self.data
+        data = reduce_image(base, 2 ** (level - base_level), self.method)
+        while self._levels and self.nbytes + nbytes > self.max_memory:
+            self._levels.popitem(last=False)
+        self._levels[level] = data
+        return data
+
+    def update_region(self, i0: int, i1: int, j0: int, j1: int) -> None:
+        """Update the cached levels after a change of a region of the original
+        data: only the pixels of the levels covering this region are computed
+        again (from the original data)
+
+        Args:
+            i0: first row
+            i1: last row (excluded)
+            j0: first column
+            j1: last column (excluded)
+        """
+        ni, nj = self.data.shape[:2]
+        i0, i1, j0, j1 = max(i0, 0), min(i1, ni), max(j0, 0), min(j1, nj)
+        if i1 <= i0 or j1 <= j0:
+            return
+        for level, data in self._levels.items():
+            factor = 2**level
+            li0, li1 = i0 // factor, -(-i1 // factor)
+            lj0, lj1 = j0 // factor, -(-j1 // factor)
+            region = self.data[li0 * factor : li1 * factor, lj0 * factor : lj1 * factor]
+            data[li0:li1, lj0:lj1] = reduce_image(region, factor, self.method)
+
+    def get_src_data(
+        self,
+        src_rect: tuple[float, float, float, float],
+        dst_shape: tuple[int, int],
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """Return the data and source rectangle to be resampled to the destination
+
+        Args:
+            src_rect: source rectangle (x1, y1, x2, y2) in original pixel
+             coordinates, mapped to the whole destination
+            dst_shape: destination (offscreen) array shape
+
+        Returns:
+            Tuple (data, src_rect) where data is the selected pyramid level and
+            src_rect the source rectangle in this level's pixel coordinates
+        """
+        x1, y1, x2, y2 = src_rect
+        dni, dnj = dst_shape[:2]
+        level = self.select_level((x2 - x1) / max(dnj, 1), (y2 - y1) / max(dni, 1))
+        data = self.get_level(level)
+        if level == 0 or data is None:
+            # Finer levels are larger: they would not fit in the budget either
+            return self.data, src_rect
+        factor = float(2**level)
+        return data, (x1 / factor, y1 / factor, x2 / factor, y2 / factor)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Thread pools
+------------
+
+Overview
+^^^^^^^^
+
+The :py:mod:`.threads` module provides the helpers shared by the computations
+which are split in independent tasks processed in a pool of threads (e.g. the
+export of image items by tiles or the computation of contour lines by tiles):
+the number of threads is set by the ``image/threads`` option of the ``plot``
+configuration section (0: one thread per CPU core).
+
+Reference
+^^^^^^^^^
+
+.. autofunction:: get_threads_count
+
+.. autofunction:: map_ordered
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+from plotpy.config import CONF
+
+
+def get_threads_count(nthreads: int | None = None) -> int:
+    """Return the number of threads of a pool of threads
+
+    Args:
+        nthreads: Number of threads (0: one per CPU core). Default is None
+         (i.e. ``image/threads`` option of the ``plot`` configuration section)
+
+    Returns:
+        Number of threads (at least 1)
+    """
+    if nthreads is None:
+        nthreads = CONF.get("plot", "image/threads", 0)
+    if nthreads <= 0:
+        nthreads = os.cpu_count() or 1
+    return nthreads
+
+
+def map_ordered(
+    func: Callable[[Any], Any], args: list[Any], nthreads: int
+) -> Iterator[Any]:
+    """Apply function to arguments in a pool of threads, and yield results in
+    order (at most 2 x `nthreads` results are pending at the same time)
+
+    Args:
+        func: Function
+        args: List of arguments
+        nthreads: Number of threads
+
+    Returns:
+        Iterator over results
+    """
+    if nthreads <= 1 or len(args) <= 1:
+        for arg in args:
+            yield func(arg)
+        return
+    with ThreadPoolExecutor(nthreads) as executor:
+        pending = collections.deque()
+        for arg in args:
+            pending.append(executor.submit(func, arg))
+            if len(pending) >= 2 * nthreads:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
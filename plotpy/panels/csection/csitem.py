@@ -16,6 +16,7 @@ from plotpy.interfaces import IBasePlotItem
 from plotpy.items.curve.errorbar import ErrorBarCurveItem
 from plotpy.items.image.misc import get_image_from_qrect
 from plotpy.mathutils.geometry import rotate, translate, vector_angle, vector_norm
+from plotpy.mathutils.profiles import extract_profiles
 
 if TYPE_CHECKING:
     from plotpy.items import AnnotatedObliqueRectangle, AnnotatedSegment
@@ -213,11 +214,8 @@ def compute_oblique_section(item, obj, debug=False):
 
     destw = int(vector_norm(ix0, iy0, ix1, iy1))
     desth = int(vector_norm(ix0, iy0, ix3, iy3))
-    ysign = -1 if obj.plot().get_axis_direction("left") else 1
-    angle = vector_angle(ix1 - ix0, (iy1 - iy0) * ysign)
-
-    dst_rect = (0, 0, int(destw), int(desth))
-    dst_image = np.empty((int(desth), int(destw)), dtype=np.float64)
+    if destw == 0 or desth == 0:
+        return np.array([]), np.array([])
 
     if isinstance(item.data, np.ma.MaskedArray):
         if item.data.dtype in (np.float32, np.float64):
@@ -230,10 +228,16 @@ def compute_oblique_section(item, obj, debug=False):
 
     ixr = 0.5 * (ixb + ixa)
     iyr = 0.5 * (iyb + iya)
-    mat = translate(ixr, iyr) @ rotate(-angle) @ translate(-0.5 * destw, -0.5 * desth)
-    _scale_tr(data, mat, dst_image, dst_rect, (1.0, 0.0, np.nan), (INTERP_LINEAR,))
 
     if debug:
+        ysign = -1 if obj.plot().get_axis_direction("left") else 1
+        angle = vector_angle(ix1 - ix0, (iy1 - iy0) * ysign)
+        dst_rect = (0, 0, int(destw), int(desth))
+        dst_image = np.empty((int(desth), int(destw)), dtype=np.float64)
+        mat = (
+            translate(ixr, iyr) @ rotate(-angle) @ translate(-0.5 * destw, -0.5 * desth)
+        )
+        _scale_tr(data, mat, dst_image, dst_rect, (1.0, 0.0, np.nan), (INTERP_LINEAR,))
         plot = obj.plot()
         if TEMP_ITEM is None:
             from plotpy.builder import make
@@ -255,10 +259,15 @@ def compute_oblique_section(item, obj, debug=False):
             TEMP_ITEM.param.update_item(TEMP_ITEM)
         plot.replot()
 
-    fixed_image = np.ma.fix_invalid(dst_image, copy=debug)
-    if fixed_image.size == 0:
-        return np.array([]), np.array([])
-    ydata = fixed_image.mean(axis=1)
+    # The section is sampled at pixel centers (destw x desth grid) along the
+    # (0, 3) side of the rectangle, and averaged across the (0, 1) side
+    norm = vector_norm(ix0, iy0, ix3, iy3)
+    ux, uy = (ix3 - ix0) / norm, (iy3 - iy0) / norm
+    t0, t1 = 0.5 - 0.5 * desth, 0.5 * desth - 0.5
+    segment = (ixr + t0 * ux, iyr + t0 * uy, ixr + t1 * ux, iyr + t1 * uy)
+    # Pixel indexes to pixel coordinates (pixel centers)
+    segment = np.array(segment) + 0.5
+    (ydata,) = extract_profiles(data, segment, destw, "mean", desth)
     xdata = item.get_x_values(0, ydata.size)[: ydata.size]
     try:
         xdata -= xdata[0]
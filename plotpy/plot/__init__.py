@@ -5,6 +5,14 @@
 
 from .base import BasePlot, BasePlotOptions
 from .manager import PlotManager
+from .offscreen import (
+    OffscreenPlot,
+    RenderJob,
+    export_batch,
+    export_items,
+    render_items,
+    render_plot,
+)
 from .plotwidget import (
     PlotDialog,
     PlotOptions,
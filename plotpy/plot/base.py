@@ -296,6 +296,10 @@ class BasePlot(qwt.QwtPlot):
 
     EPSILON_ASPECT_RATIO = 1e-6
 
+    #: True if the plot is never shown but rendered offscreen, its geometry being
+    #: set explicitly (see :py:class:`.OffscreenPlot`)
+    offscreen = False
+
     def __init__(
         self,
         parent: QW.QWidget | None = None,
@@ -2262,7 +2266,7 @@ class BasePlot(qwt.QwtPlot):
              :py:meth:`do_autoscale`: it is necessary to ensure that the whole
              image items are visible after autoscale, whatever their aspect ratio)
         """
-        if not self.isVisible():
+        if not (self.isVisible() or self.offscreen):
             return
         current_aspect = self.get_current_aspect_ratio()
         if current_aspect is None or (
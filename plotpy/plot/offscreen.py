@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Offscreen rendering
+-------------------
+
+The :mod:`plotpy.plot.offscreen` module provides functions to render plot items
+into images without showing any widget (e.g. to export thousands of plots to PNG
+files in a report pipeline):
+
+* :py:class:`.OffscreenPlot` is a plot which is never shown: its geometry is set
+  explicitly from the image size and resolution,
+* :py:func:`.render_plot` paints a plot into a `QImage` (or directly into a NumPy
+  buffer) with a `QwtPlotRenderer`, whatever the plot widget visibility,
+* :py:func:`.render_items` and :py:func:`.export_items` render items with the given
+  options, axis limits, size and resolution,
+* :py:func:`.export_batch` runs :py:class:`.RenderJob` jobs in a pool of
+  processes using the "offscreen" Qt platform (no display is needed).
+
+A `QApplication` instance is still required to create plot widgets, but its event
+loop is never run: rendering is synchronous.
+
+Example:
+
+.. code-block:: python
+
+    import numpy as np
+
+    from plotpy.builder import make
+    from plotpy.plot.offscreen import RenderJob, export_batch
+
+
+    def create_items(index):
+        x = np.linspace(0.0, 10.0, 1000)
+        return [make.curve(x, np.sin(x * index), color="b")]
+
+
+    if __name__ == "__main__":  # Required: worker processes import this module
+        jobs = [RenderJob(f"plot{i}.png", create_items, (i,)) for i in range(1000)]
+        export_batch(jobs)
+
+Reference
+^^^^^^^^^
+
+.. autoclass:: OffscreenPlot
+   :members: set_render_size, render
+.. autofunction:: render_plot
+.. autofunction:: render_items
+.. autofunction:: export_items
+.. autoclass:: RenderJob
+   :members:
+.. autofunction:: export_batch
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import qtpy
+from qtpy import QtCore as QC
+from qtpy import QtGui as QG
+from qwt.plot_renderer import QwtPlotRenderer
+
+from plotpy.mathutils.threads import get_threads_count
+from plotpy.plot.base import BasePlot, BasePlotOptions
+
+if TYPE_CHECKING:
+    from plotpy.interfaces import IBasePlotItem
+
+#: Inches per meter (QImage resolution is given in dots per meter)
+INCHES_PER_METER = 1.0 / 0.0254
+
+
+class OffscreenPlot(BasePlot):
+    """Plot which is never shown, but rendered into images
+
+    Args:
+        options: plot options (Default value = None)
+        size: image size in pixels (width, height) (Default value = (800, 600))
+        dpi: image resolution in dots per inch (Default value = None, i.e. the
+         logical resolution of the plot widget): fonts and line widths are
+         scaled by the ratio between this resolution and the plot one
+    """
+
+    def __init__(
+        self,
+        options: BasePlotOptions | dict[str, Any] | None = None,
+        size: tuple[int, int] = (800, 600),
+        dpi: float | None = None,
+    ) -> None:
+        super().__init__(None, options)
+        # Enabled only now: axes scales are set up by the constructor's replot
+        self.offscreen = True
+        self.render_size: tuple[int, int] = (0, 0)
+        self.render_dpi: float = 0.0
+        self.set_render_size(size, dpi)
+
+    def set_render_size(self, size: tuple[int, int], dpi: float | None = None) -> None:
+        """Set image size and resolution: the plot widget (which is never shown)
+        is resized accordingly, so that its layout and aspect ratio match the image
+
+        Args:
+            size: image size in pixels (width, height)
+            dpi: image resolution in dots per inch (Default value = None, i.e. the
+             logical resolution of the plot widget)
+        """
+        width, height = int(size[0]), int(size[1])
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Invalid image size: {size!r}")
+        self.render_size = (width, height)
+        self.render_dpi = float(self.logicalDpiX() if dpi is None else dpi)
+        scale = self.logicalDpiX() / self.render_dpi
+        self.resize(max(round(width * scale), 1), max(round(height * scale), 1))
+        self.updateLayout()
+
+    def render(
+        self, transparent: bool = False, out: np.ndarray | None = None
+    ) -> QG.QImage:
+        """Render plot into an image (see :py:func:`render_plot`)
+
+        Args:
+            transparent: if True, plot and canvas backgrounds are not painted
+             (Default value = False)
+            out: ARGB32 image buffer (uint32 array of shape (height, width)) into
+             which the plot is rendered (Default value = None)
+
+        Returns:
+            Image
+        """
+        self.replot()
+        return render_plot(self, self.render_size, self.render_dpi, transparent, out)
+
+
+def render_plot(
+    plot: BasePlot,
+    size: tuple[int, int] | None = None,
+    dpi: float | None = None,
+    transparent: bool = False,
+    out: np.ndarray | None = None,
+) -> QG.QImage:
+    """Render plot into an image, whether the plot widget is shown or not
+
+    Args:
+        plot: plot
+        size: image size in pixels (width, height) (Default value = None, i.e.
+         the size of the plot widget)
+        dpi: image resolution in dots per inch (Default value = None, i.e. the
+         logical resolution of the plot widget)
+        transparent: if True, plot and canvas backgrounds are not painted
+         (Default value = False)
+        out: ARGB32 image buffer (C-contiguous uint32 array of shape (height,
+         width)) into which the plot is rendered (Default value = None): the
+         returned image shares its data
+
+    Returns:
+        Image
+    """
+    if dpi is None:
+        dpi = plot.logicalDpiX()
+    if out is not None:
+        if out.dtype != np.uint32 or out.ndim != 2 or not out.flags.c_contiguous:
+            raise ValueError("Output buffer must be a C-contiguous 2D uint32 array")
+        if size is not None and tuple(size) != (out.shape[1], out.shape[0]):
+            raise ValueError("Output buffer shape does not match image size")
+        size = (out.shape[1], out.shape[0])
+    elif size is None:
+        scale = dpi / plot.logicalDpiX()
+        size = (round(plot.width() * scale), round(plot.height() * scale))
+    width, height = int(size[0]), int(size[1])
+    if out is None:
+        image = QG.QImage(width, height, QG.QImage.Format_ARGB32)
+    else:
+        # PyQt copies buffer objects into a new image: the buffer address is passed
+        # instead, so that the image shares the array data
+        data = out if qtpy.PYSIDE6 else out.ctypes.data
+        image = QG.QImage(data, width, height, 4 * width, QG.QImage.Format_ARGB32)
+    dots_per_meter = int(round(dpi * INCHES_PER_METER))
+    image.setDotsPerMeterX(dots_per_meter)
+    image.setDotsPerMeterY(dots_per_meter)
+    renderer = QwtPlotRenderer()
+    if transparent:
+        image.fill(QC.Qt.GlobalColor.transparent)
+        renderer.setDiscardFlag(QwtPlotRenderer.DiscardBackground)
+        renderer.setDiscardFlag(QwtPlotRenderer.DiscardCanvasBackground)
+    else:
+        image.fill(QC.Qt.GlobalColor.white)
+    painter = QG.QPainter(image)
+    try:
+        renderer.render(plot, painter, QC.QRectF(0, 0, width, height))
+    finally:
+        painter.end()
+    return image
+
+
+def render_items(
+    items: Sequence[IBasePlotItem],
+    size: tuple[int, int] = (800, 600),
+    dpi: float | None = None,
+    options: BasePlotOptions | dict[str, Any] | None = None,
+    xlim: tuple[float, float] | None = None,
+    ylim: tuple[float, float] | None = None,
+    transparent: bool = False,
+    out: np.ndarray | None = None,
+) -> QG.QImage:
+    """Render plot items into an image, without showing any widget
+
+    Args:
+        items: plot items
+        size: image size in pixels (width, height) (Default value = (800, 600))
+        dpi: image resolution in dots per inch (Default value = None, i.e. the
+         logical resolution of plot widgets)
+        options: plot options (Default value = None)
+        xlim: X axis limits (Default value = None, i.e. autoscale)
+        ylim: Y axis limits (Default value = None, i.e. autoscale)
+        transparent: if True, plot and canvas backgrounds are not painted
+         (Default value = False)
+        out: ARGB32 image buffer (C-contiguous uint32 array of shape (height,
+         width)) into which items are rendered (Default value = None)
+
+    Returns:
+        Image
+    """
+    if out is not None:
+        size = (out.shape[1], out.shape[0])
+    plot = OffscreenPlot(options, size, dpi)
+    for item in items:
+        plot.add_item(item, autoscale=False)
+    plot.do_autoscale(replot=False)
+    if xlim is not None or ylim is not None:
+        x0, x1, y0, y1 = plot.get_plot_limits()
+        if xlim is not None:
+            x0, x1 = xlim
+        if ylim is not None:
+            y0, y1 = ylim
+        plot.set_plot_limits(x0, x1, y0, y1)
+    return plot.render(transparent, out)
+
+
+def export_items(
+    filename: str,
+    items: Sequence[IBasePlotItem],
+    size: tuple[int, int] = (800, 600),
+    dpi: float | None = None,
+    options: BasePlotOptions | dict[str, Any] | None = None,
+    xlim: tuple[float, float] | None = None,
+    ylim: tuple[float, float] | None = None,
+    transparent: bool = False,
+    quality: int = -1,
+) -> None:
+    """Render plot items into an image file, without showing any widget
+
+    Args:
+        filename: image filename (the format is guessed from the extension, e.g.
+         ".png": all image formats supported by Qt are available)
+        items: plot items
+        size: image size in pixels (width, height) (Default value = (800, 600))
+        dpi: image resolution in dots per inch (Default value = None, i.e. the
+         logical resolution of plot widgets)
+        options: plot options (Default value = None)
+        xlim: X axis limits (Default value = None, i.e. autoscale)
+        ylim: Y axis limits (Default value = None, i.e. autoscale)
+        transparent: if True, plot and canvas backgrounds are not painted
+         (Default value = False)
+        quality: image quality, from 0 to 100 (Default value = -1, i.e. the
+         default settings of the image format)
+    """
+    image = render_items(items, size, dpi, options, xlim, ylim, transparent)
+    if not image.save(str(filename), None, quality):
+        raise OSError(f"Unable to save image to {filename!r}")
+
+
+@dataclasses.dataclass
+class RenderJob:
+    """Offscreen rendering job: creates plot items and renders them into an image
+    file (see :py:func:`export_items`)
+
+    Jobs are pickled to be run in worker processes (see :py:func:`export_batch`):
+    the `factory` function must be defined at module level (not a lambda or a
+    nested function), and its arguments must be picklable (e.g. NumPy arrays,
+    filenames, etc.).
+
+    Args:
+        filename: image filename
+        factory: function creating the plot items (returns an item or a list
+         of items)
+        args: positional arguments of `factory` (Default value = ())
+        kwargs: keyword arguments of `factory` (Default value = None)
+        size: image size in pixels (width, height) (Default value = (800, 600))
+        dpi: image resolution in dots per inch (Default value = None)
+        options: plot options (Default value = None)
+        xlim: X axis limits (Default value = None, i.e. autoscale)
+        ylim: Y axis limits (Default value = None, i.e. autoscale)
+        transparent: if True, backgrounds are not painted (Default value = False)
+    """
+
+    filename: str
+    factory: Callable[..., IBasePlotItem | list[IBasePlotItem]]
+    args: tuple = ()
+    kwargs: dict[str, Any] | None = None
+    size: tuple[int, int] = (800, 600)
+    dpi: float | None = None
+    options: BasePlotOptions | dict[str, Any] | None = None
+    xlim: tuple[float, float] | None = None
+    ylim: tuple[float, float] | None = None
+    transparent: bool = False
+
+    def run(self) -> str:
+        """Create plot items and render them into the image file
+
+        Returns:
+            Image filename
+        """
+        items = self.factory(*self.args, **(self.kwargs or {}))
+        if not isinstance(items, (list, tuple)):
+            items = [items]
+        export_items(
+            self.filename,
+            items,
+            self.size,
+            self.dpi,
+            self.options,
+            self.xlim,
+            self.ylim,
+            self.transparent,
+        )
+        return self.filename
+
+
+def _init_worker(platform: str) -> None:
+    """Initialize worker process: create the Qt application
+
+    Args:
+        platform: Qt platform plugin name
+    """
+    # pylint: disable=import-outside-toplevel
+    from guidata import qapplication
+
+    os.environ["QT_QPA_PLATFORM"] = platform
+    global _WORKER_APP  # pylint: disable=global-statement
+    _WORKER_APP = qapplication()
+
+
+def _run_job(job: RenderJob) -> str:
+    """Run job in worker process
+
+    Args:
+        job: rendering job
+
+    Returns:
+        Image filename
+    """
+    return job.run()
+
+
+def export_batch(
+    jobs: Iterable[RenderJob],
+    processes: int | None = None,
+    platform: str = "offscreen",
+    chunksize: int = 1,
+) -> list[str]:
+    """Run rendering jobs in a pool of processes
+
+    Worker processes are started with the "spawn" method (forking a process
+    using Qt is not safe): as with :py:mod:`multiprocessing`, the main module
+    must be importable without side effects (i.e. protected by an
+    ``if __name__ == "__main__":`` block).
+
+    Args:
+        jobs: rendering jobs
+        processes: number of worker processes (Default value = None, i.e. the
+         ``image/threads`` option, see :py:func:`.threads.get_threads_count`).
+         If 0, jobs are run in the current process, which must have a
+         `QApplication` instance
+        platform: Qt platform plugin of worker processes (Default value =
+         "offscreen", i.e. no display is needed)
+        chunksize: number of jobs sent at once to a worker process (Default
+         value = 1: increase it for many small jobs)
+
+    Returns:
+        Image filenames, in job order
+    """
+    jobs = list(jobs)
+    if processes == 0:
+        return [job.run() for job in jobs]
+    if processes is None:
+        processes = get_threads_count()
+    processes = max(min(processes, len(jobs)), 1)
+    with ProcessPoolExecutor(
+        processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(platform,),
+    ) as executor:
+        return list(executor.map(_run_job, jobs, chunksize=chunksize))
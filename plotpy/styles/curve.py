@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 from guidata.dataset import (
     BoolItem,
+    ChoiceItem,
     DataSet,
     FloatItem,
     GetAttrProp,
@@ -46,6 +47,20 @@ class CurveParam(DataSet):
     use_dsamp = BoolItem(_("Use downsampling"), default=False).set_prop(
         "display", store=_use_dsamp_prop
     )
+    dsamp_mode = ChoiceItem(
+        _("Downsampling mode"),
+        [
+            ("factor", _("fixed factor")),
+            ("m4", _("min/max envelope (M4)")),
+            ("lttb", _("largest triangle (LTTB)")),
+        ],
+        default="factor",
+        help=_(
+            "Fixed factor: one point out of N is drawn\n"
+            "M4 and LTTB: visible data is reduced to a few points per pixel, "
+            "depending on the current zoom level"
+        ),
+    ).set_prop("display", active=_use_dsamp_prop)
     dsamp_factor = IntItem(_("Downsampling factor"), default=10, min=1).set_prop(
         "display", active=_use_dsamp_prop
     )
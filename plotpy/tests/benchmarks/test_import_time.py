@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+PlotPy import time benchmark
+----------------------------
+
+This script measures the time needed to import plotpy modules and to show a first
+plot window, each in a new Python process. It also guards against import time
+regressions: heavy dependencies (SciPy, scikit-image, pydicom) and colormaps must
+not be loaded by modules which don't need them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from guidata.env import execenv
+
+#: Modules which are slow to import, and only needed by some features
+HEAVY_MODULES = (
+    "scipy.integrate",
+    "scipy.optimize",
+    "skimage.measure",
+    "pydicom",
+    "plotpy.widgets.fit",
+)
+
+CODE_TEMPLATE = """
+import json, sys, time
+t0 = time.perf_counter()
+{code}
+dt = time.perf_counter() - t0
+import plotpy.mathutils.colormap as cm
+modules = [name for name in {modules!r} if name in sys.modules]
+print(json.dumps({{"dt": dt, "modules": modules, "cmaps": cm.ALL_COLORMAPS.loaded}}))
+"""
+
+WINDOW_CODE = """
+from guidata.qthelpers import qt_app_context
+from qtpy import QtWidgets as QW
+from plotpy.builder import make
+with qt_app_context():
+    win = make.dialog(toolbar=True, type="curve")
+    win.manager.get_plot().add_item(make.curve([0.0, 1.0], [1.0, 0.0]))
+    win.show()
+    QW.QApplication.processEvents()
+"""
+
+#: Benchmark cases: description, code, True if colormaps may be loaded
+CASES = (
+    ("I/O functions", "import plotpy.io", False),
+    ("Items package", "import plotpy.items", False),
+    ("Tools package", "import plotpy.tools", False),
+    ("Builder", "from plotpy.builder import make", False),
+    (
+        "Curve item",
+        "from plotpy.builder import make; make.curve([0, 1], [1, 0])",
+        False,
+    ),
+    (
+        "Image item",
+        "import numpy as np; from plotpy.builder import make; make.image(np.eye(9))",
+        True,
+    ),
+    ("First plot window", WINDOW_CODE, False),
+)
+
+
+def measure_import(code: str) -> dict:
+    """Run code in a new Python process
+
+    Args:
+        code: Python code
+
+    Returns:
+        Dictionary with the execution time ("dt", in seconds), the heavy modules
+        which were imported ("modules") and the colormaps loading state ("cmaps")
+    """
+    env = os.environ.copy()
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    code = CODE_TEMPLATE.format(code=code, modules=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("description, code, cmaps", CASES)
+def test_import_time(description: str, code: str, cmaps: bool) -> None:
+    """Test import time regressions"""
+    result = measure_import(code)
+    execenv.print(f"{int(result['dt'] * 1e3):7} ms | {description}")
+    assert result["modules"] == []
+    assert cmaps or not result["cmaps"]
+
+
+def run() -> None:
+    """Run import time benchmark"""
+    execenv.print("PlotPy import time benchmark")
+    execenv.print()
+    execenv.print("∆t (ms)".rjust(10) + " | Description")
+    execenv.print("-" * 40)
+    for description, code, _cmaps in CASES:
+        result = measure_import(code)
+        row = f"{int(result['dt'] * 1e3):7} ms | {description}"
+        if result["modules"]:
+            row += f" (imported: {', '.join(result['modules'])})"
+        execenv.print(row)
+
+
+if __name__ == "__main__":
+    run()
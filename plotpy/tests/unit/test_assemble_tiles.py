@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the tiled export of image items
+"""
+
+import numpy as np
+import pytest
+from qtpy import QtCore as QC
+
+from plotpy.builder import make
+from plotpy.config import CONF
+from plotpy.items import ImageItem, assemble_imageitems
+from plotpy.items.image.misc import get_export_tiles
+from plotpy.mathutils.threads import get_threads_count, map_ordered
+
+
+def get_items() -> list:
+    """Return superimposed image items"""
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0.0, 100.0, (120, 150))
+    image = make.image(data, xdata=[-20.0, 130.0], ydata=[-10.0, 110.0])
+    trimage = make.trimage(data[:80, :90].astype(np.uint16), dx=0.7, dy=0.9)
+    trimage.set_transform(40.0, 30.0, np.pi / 7, 0.7, 0.9, False, False)
+    trimage.setZ(1)
+    return [image, trimage]
+
+
+def test_export_tiles():
+    """Test splitting of the destination image in tiles"""
+    tiles = get_export_tiles(250, 130, 100)
+    assert tiles[:4] == [(0, 0, 100, 100), (100, 0, 200, 100), (200, 0, 250, 100)] + [
+        (0, 100, 100, 130)
+    ]
+    assert len(tiles) == 6
+    assert sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in tiles) == 250 * 130
+
+
+def test_map_ordered():
+    """Test the thread pool helpers shared by tiled computations"""
+    assert get_threads_count(3) == 3 and get_threads_count(0) >= 1
+    assert get_threads_count() == get_threads_count(
+        CONF.get("plot", "image/threads", 0)
+    )
+    for nthreads in (1, 4):
+        results = map_ordered(lambda value: value * value, list(range(50)), nthreads)
+        assert list(results) == [value * value for value in range(50)]
+
+
+@pytest.mark.parametrize("add_images", (False, True))
+def test_assemble_tiles(add_images):
+    """Test tiled export against a single tile export"""
+    items = get_items()
+    qrect = QC.QRectF(-25.0, -15.0, 160.0, 130.0)
+    ref = assemble_imageitems(items, qrect, 317, 251, add_images=add_images)
+    assert ref.dtype == np.float32 and ref.shape == (251, 317) and ref.any()
+    kwargs = {"add_images": add_images, "tile_size": 64}
+    # Source coordinates of tiles are subject to rounding errors: a few pixels on
+    # the edges of the rotated image may differ (nearest neighbor interpolation)
+    data = assemble_imageitems(items[:1], qrect, 317, 251, **kwargs)
+    assert np.array_equal(data, assemble_imageitems(items[:1], qrect, 317, 251))
+    data = assemble_imageitems(items, qrect, 317, 251, nthreads=1, **kwargs)
+    assert np.count_nonzero(data != ref) < 10
+    ref = data
+    data = assemble_imageitems(items, qrect, 317, 251, nthreads=3, **kwargs)
+    assert np.array_equal(data, ref)
+    # Output data type and destination array
+    data = assemble_imageitems(items, qrect, 317, 251, dtype=np.uint8, **kwargs)
+    assert data.dtype == np.uint8
+    assert np.array_equal(data, ref.astype(np.uint8))
+    out = np.full((251, 317), -1.0)
+    data = assemble_imageitems(items, qrect, 317, 251, out=out, **kwargs)
+    assert data is out and np.array_equal(out, ref)
+    with pytest.raises(ValueError):
+        assemble_imageitems(items, qrect, 317, 250, out=out)
+    # Tiles written on the fly
+    written = np.zeros_like(ref)
+    order = []
+
+    def writer(x: int, y: int, tile: np.ndarray) -> None:
+        order.append((x, y))
+        written[y : y + tile.shape[0], x : x + tile.shape[1]] = tile
+
+    data = assemble_imageitems(items, qrect, 317, 251, writer=writer, **kwargs)
+    assert data is None and np.array_equal(written, ref)
+    assert order == [tile[:2] for tile in get_export_tiles(317, 251, 64)]
+
+
+class RawExportImageItem(ImageItem):
+    """Image item exporting its data as is (destination of the same shape)"""
+
+    def export_roi(self, src_rect, dst_rect, dst_image, *args, **kwargs) -> None:
+        """Export data to destination image"""
+        dst_image[...] = self.data
+
+
+@pytest.mark.parametrize("dtype", (np.uint8, np.uint16))
+def test_assemble_integer(dtype):
+    """Test export to integer data types of out-of-range and NaN pixels"""
+    data = np.array([[-5.0, 10.5, 300.0], [7e4, np.nan, 1e10]])
+    item = RawExportImageItem(data)
+    qrect = QC.QRectF(0.0, 0.0, 3.0, 2.0)
+    ref = assemble_imageitems([item], qrect, 3, 2, dtype=np.float64)
+    assert np.array_equal(ref, data, equal_nan=True)
+    exported = assemble_imageitems([item], qrect, 3, 2, dtype=dtype)
+    vmax = np.iinfo(dtype).max
+    assert exported.dtype == dtype
+    assert exported.tolist() == [[0, 10, min(300, vmax)], [vmax, 0, vmax]]
+    exported = assemble_imageitems([item], qrect, 3, 2, dtype=dtype, fill_value=7)
+    assert exported[1, 1] == 7
+
+
+if __name__ == "__main__":
+    test_export_tiles()
+    test_assemble_tiles(True)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for bit-packed masks updated by tiles
+"""
+
+import numpy as np
+import pytest
+
+from plotpy.mathutils.bitmask import PackedMask, unpack_mask
+
+
+def test_packed_mask():
+    """Test that only dirty tiles are packed again"""
+    mask = np.random.default_rng(0).random((100, 203)) > 0.5
+    packed = PackedMask(mask.shape, tile_size=32)
+    assert packed.nbytes == 100 * 26
+    assert len(packed.update(mask)) == 4 * 7
+    assert np.array_equal(packed.bits, np.packbits(mask, axis=1))
+    assert np.array_equal(packed.to_array(), mask)
+    assert packed.update(mask) == []
+    mask[40:70, 190:] = True
+    packed.set_dirty_rect(40, 70, 190, 250)
+    assert packed.get_dirty_tiles() == [(1, 5), (1, 6), (2, 5), (2, 6)]
+    mask[0, 0] = not mask[0, 0]  # Not declared: not updated
+    assert packed.update(mask) == [(1, 5), (1, 6), (2, 5), (2, 6)]
+    assert np.array_equal(packed.to_array()[1:], mask[1:])
+    assert packed.to_array()[0, 0] != mask[0, 0]
+    packed.set_dirty_rect(0, 1, 0, 1)
+    packed.update(None)
+    assert not packed.to_array()[:32, :32].any() and packed.to_array()[32:].any()
+    assert np.array_equal(unpack_mask(np.packbits(mask, axis=1), 203), mask)
+    with pytest.raises(ValueError):
+        PackedMask(mask.shape, tile_size=12)
+
+
+if __name__ == "__main__":
+    test_packed_mask()
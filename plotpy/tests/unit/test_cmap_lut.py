@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the shared colormap lookup tables
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+from qtpy import QtGui as QG
+
+from plotpy.builder import make
+from plotpy.constants import LUT_MAX, LUT_SIZE, LUTAlpha
+from plotpy.mathutils.colormap import (
+    ALL_COLORMAPS,
+    FULLRANGE,
+    get_cmap_lut,
+    interpolate_cmap,
+)
+from plotpy.tools import ColormapTool, ReverseColormapTool
+from plotpy.tools.image import set_images_colormap
+from plotpy.widgets.colormap.widget import EditableColormap
+
+
+def get_ref_lut(cmap: EditableColormap, alpha_function: int, alpha: float):
+    """Return the lookup table computed entry by entry"""
+    lut = np.zeros(LUT_SIZE, np.uint32)
+    for i in range(LUT_SIZE):
+        x = i / float(LUT_SIZE - 1)
+        pix_alpha = {
+            LUTAlpha.NONE.value: 1.0,
+            LUTAlpha.CONSTANT.value: alpha,
+            LUTAlpha.LINEAR.value: alpha * x,
+            LUTAlpha.SIGMOID.value: alpha / (1 + np.exp(-10 * x)),
+            LUTAlpha.TANH.value: alpha * np.tanh(5 * x),
+            LUTAlpha.STEP.value: alpha if x > 0 else 0,
+        }[alpha_function]
+        alpha_channel = max(min(np.uint32(255 * pix_alpha + 0.5), 255), 0) << 24
+        lut[i] = np.uint32(cmap.rgb(FULLRANGE, i / LUT_MAX) & 0xFFFFFF) | alpha_channel
+    return lut
+
+
+@pytest.mark.parametrize("invert", (False, True))
+@pytest.mark.parametrize("name", ("jet", "gray", "viridis", "rainbow", "hsv"))
+def test_cmap_lut(name, invert):
+    """Test vectorized lookup tables against Qwt colormap interpolation"""
+    cmap = ALL_COLORMAPS[name]
+    old_invert = cmap.invert
+    try:
+        cmap.invert = invert
+        values = np.arange(256) * (1.0 / 255)
+        assert interpolate_cmap(cmap, values).tolist() == cmap.colorTable(FULLRANGE)
+        for alpha_function in LUTAlpha:
+            for alpha in (1.0, 0.37):
+                lut = get_cmap_lut(cmap, alpha_function.value, alpha)
+                ref = get_ref_lut(cmap, alpha_function.value, alpha)
+                assert np.array_equal(lut, ref)
+                assert get_cmap_lut(cmap, alpha_function.value, alpha) is lut
+                assert not lut.flags.writeable
+    finally:
+        cmap.invert = old_invert
+
+
+def test_cmap_lut_key():
+    """Test that lookup tables depend on colormap content"""
+    cmap = EditableColormap(QG.QColor(0, 0, 0), QG.QColor(255, 255, 255), name="bw")
+    lut = get_cmap_lut(cmap)
+    assert np.array_equal(lut, get_ref_lut(cmap, LUTAlpha.NONE.value, 1.0))
+    other = EditableColormap(QG.QColor(0, 0, 0), QG.QColor(255, 255, 255), name="c")
+    assert get_cmap_lut(other) is lut
+    cmap.addColorStop(0.5, QG.QColor(255, 0, 0))
+    edited = get_cmap_lut(cmap)
+    assert edited is not lut
+    assert np.array_equal(edited, get_ref_lut(cmap, LUTAlpha.NONE.value, 1.0))
+    cmap.setMode(cmap.FixedColors)
+    fixed = get_cmap_lut(cmap)
+    assert fixed is not edited
+    assert np.array_equal(fixed, get_ref_lut(cmap, LUTAlpha.NONE.value, 1.0))
+    with pytest.raises(ValueError):
+        get_cmap_lut(cmap, 99)
+
+
+def test_colormap_tools():
+    """Test that image items share lookup tables, and batch colormap changes"""
+    data = np.random.default_rng(0).uniform(size=(50, 60))
+    with qt_app_context(exec_loop=False):
+        items = [make.image(data, colormap="jet") for _index in range(20)]
+        assert all(item.lut[3] is items[0].lut[3] for item in items)
+        win = make.dialog(toolbar=True, type="image")
+        plot = win.manager.get_plot()
+        for item in items:
+            plot.add_item(item)
+        plot.select_some_items(items)
+        emitted = []
+        plot.SIG_ITEM_PARAMETERS_CHANGED.connect(emitted.append)
+        updated = []
+        plot.update_colormap_axis = updated.append
+        tool = win.manager.get_tool(ColormapTool)
+        tool.activate_cmap("viridis")
+        assert len(emitted) == len(items) and updated == [items[-1]]
+        lut = get_cmap_lut(ALL_COLORMAPS["viridis"])
+        assert all(item.lut[3] is lut for item in items)
+        assert all(item.get_color_map().name == "viridis" for item in items)
+        updated.clear()
+        emitted.clear()
+        win.manager.get_tool(ReverseColormapTool).activate_command(plot, True)
+        assert updated == [items[-1]] and emitted == items
+        assert all(item.get_color_map().invert for item in items)
+        # Each item keeps its own colormap when only inverting
+        set_images_colormap(plot, items[:2], "gray")
+        set_images_colormap(plot, items[:4], invert=False)
+        assert [item.get_color_map().name for item in items[:4]] == [
+            "gray",
+            "gray",
+            "viridis",
+            "viridis",
+        ]
+        set_images_colormap(plot, items, "viridis", invert=True)
+        win.manager.get_tool(ReverseColormapTool).activate_command(plot, False)
+        del plot.update_colormap_axis
+        win.show()
+        plot.replot()
+        plot.grab()
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_cmap_lut("jet", False)
+    test_cmap_lut_key()
+    test_colormap_tools()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the tiled and cached computation of contour lines
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+from skimage.measure import find_contours
+
+from plotpy.builder import make
+from plotpy.items.contour import ContourEngine, compute_contours, simplify_lines
+from plotpy.tests.data import gen_xyz_data
+
+
+def get_segments(pts: np.ndarray, starts: np.ndarray) -> set:
+    """Return the set of the (unordered) segments of lines"""
+    ends = np.append(starts[1:], pts.shape[0])
+    segments = set()
+    for start, end in zip(starts, ends):
+        line = np.round(pts[start:end], 9)
+        for p0, p1 in zip(line[:-1].tolist(), line[1:].tolist()):
+            segments.add(tuple(sorted((tuple(p0), tuple(p1)))))
+    return segments
+
+
+def get_data() -> np.ndarray:
+    """Return a smooth random image"""
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(150, 230)).cumsum(axis=0).cumsum(axis=1)
+    return (data - data.mean()) / data.std()
+
+
+@pytest.mark.parametrize("nthreads", (1, 3))
+def test_contour_engine(nthreads):
+    """Test tiled contour lines against whole contour lines"""
+    data = get_data()
+    levels = np.linspace(-1.5, 1.5, 7)
+    x, y = np.linspace(-1.0, 1.0, 230), np.linspace(10.0, 20.0, 150) ** 2
+    lines = [line[:, ::-1] for level in levels for line in find_contours(data, level)]
+    ref = get_segments(
+        np.concatenate(lines), np.cumsum([0] + [len(line) for line in lines[:-1]])
+    )
+    engine = ContourEngine(data, tile_size=40, nthreads=nthreads)
+    pts, starts, line_levels = engine.get_lines(levels)
+    assert len(starts) > len(lines) and set(line_levels.tolist()) == set(levels)
+    assert get_segments(pts, starts) == ref
+    assert len(compute_contours(data, levels, nthreads=nthreads)) == len(lines)
+    # Cached results
+    assert engine.get_lines(levels)[0] is pts
+    assert len(engine.get_lines(levels[::2])[1]) < len(starts)
+    assert len(engine._cache) == 7 * 4 * 6
+    # Bounded cache: least recently used results are dropped
+    engine = ContourEngine(data, tile_size=40, cache_size=30)
+    assert get_segments(*engine.get_lines(levels)[:2]) == ref
+    tasks = [
+        (ti, tj, level)
+        for level in levels.tolist()
+        for ti in range(4)
+        for tj in range(6)
+    ]
+    assert list(engine._cache) == tasks[-30:]
+    engine.get_lines(levels[0])
+    assert list(engine._cache) == tasks[-6:] + tasks[:24]
+    # Coordinates
+    engine = ContourEngine(data, x, np.tile(y[:, None], (1, 230)), tile_size=40)
+    xy_pts, xy_starts, _levels = engine.get_lines(levels)
+    assert np.array_equal(xy_starts, starts)
+    assert np.allclose(xy_pts[:, 0], np.interp(pts[:, 0], np.arange(230), x))
+    assert np.allclose(xy_pts[:, 1], np.interp(pts[:, 1], np.arange(150), y))
+
+
+def test_contour_engine_region():
+    """Test computation of contour lines of a changed region only"""
+    data = get_data()
+    levels = [-1.0, 0.0, 0.5]
+    engine = ContourEngine(data, tile_size=32)
+    engine.get_lines(levels)
+    cache = dict(engine._cache)
+    data[70:75, 100:140] = 2.0
+    engine.set_data(data, rect=(70, 75, 100, 140))
+    recomputed = [key for key in cache if key not in engine._cache]
+    assert sorted({key[:2] for key in recomputed}) == [
+        (ti, tj) for ti in (2,) for tj in (3, 4)
+    ]
+    pts, starts, _levels = engine.get_lines(levels)
+    assert all(
+        engine._cache[key] is cache[key] for key in cache if key not in recomputed
+    )
+    ref = ContourEngine(data, tile_size=32).get_lines(levels)
+    assert get_segments(pts, starts) == get_segments(ref[0], ref[1])
+    # Tiles sharing the changed border row
+    engine.set_data(data, rect=(64, 65, 0, 10))
+    assert {key[:2] for key in cache if key not in engine._cache} >= {(1, 0), (2, 0)}
+    with pytest.raises(TypeError):
+        engine.set_data(data[0])
+
+
+def test_simplify_lines():
+    """Test level-of-detail simplification of lines"""
+    t = np.linspace(0.0, 1.0, 1001)
+    line = np.column_stack((t, t**2))
+    pts = np.concatenate((line, line + 0.5, [[0.2, 0.2], [0.2001, 0.2]]))
+    starts = np.array([0, 1001, 2002])
+    coords, counts = simplify_lines(pts, starts, np.arange(3), (10.0, 0.0, 10.0, 0.0))
+    assert counts.tolist() == [counts[0], counts[0], 2] and counts[0] < 25
+    assert coords.shape == (counts.sum(), 2)
+    assert np.array_equal(coords[[0, counts[0] - 1]], [[0.0, 0.0], [10.0, 10.0]])
+    coords, counts = simplify_lines(pts, starts, np.array([2]), (1e4, 0.0, 1e4, 0.0))
+    assert counts.tolist() == [2] and np.allclose(coords, [[2000, 2000], [2001, 2000]])
+
+
+def test_contourmap_item():
+    """Test drawing contour lines as a single item"""
+    x, y, z = gen_xyz_data()
+    with qt_app_context(exec_loop=False):
+        item = make.contourmap(z, np.arange(-2, 2, 0.5), x, y, title="Contours")
+        pts, starts, levels = item.get_lines()
+        assert len(starts) == len(levels) > 0 and item.title().text() == "Contours"
+        item.set_levels(1.0)
+        assert set(item.get_lines()[2].tolist()) == {1.0}
+        item.set_contour_data(np.abs(z), x, y)
+        assert len(item.get_lines()[1]) == len(compute_contours(np.abs(z), 1.0))
+        item.set_levels(100.0)
+        pts, starts, levels = item.get_lines()
+        assert pts.size == starts.size == levels.size == 0 and item.is_empty()
+        item.set_levels(1.0)
+        item.set_contour_data(np.zeros_like(z), x, y)
+        assert item.get_lines()[0].size == 0 and item.is_empty()
+        item.set_levels(np.arange(-2, 2, 0.25))
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(make.image(z))
+        plot.add_item(item)
+        win.show()
+        plot.replot()
+        plot.grab()
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_contour_engine(3)
+    test_contour_engine_region()
+    test_simplify_lines()
+    test_contourmap_item()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the view-dependent curve decimation (M4 and LTTB)
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy.builder import make
+from plotpy.mathutils.decimation import (
+    decimate_curve,
+    decimate_lttb,
+    decimate_m4,
+    get_visible_range,
+)
+
+
+def get_data(size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return noisy sine data with a single-sample peak and a few NaNs"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0.0, 100.0, size)
+    y = np.sin(x) + 0.1 * rng.normal(size=size)
+    y[size // 2 + 3] = 50.0
+    y[::10001] = np.nan
+    return x, y
+
+
+@pytest.mark.parametrize("nthreads", (1, 0))
+def test_decimate_m4(nthreads):
+    """Test M4 decimation against a per-bucket reference"""
+    x, y = get_data(2000000)
+    bounds = np.linspace(0, x.size, 1001).astype(np.int64)
+    bounds[500] = bounds[501]  # Empty bucket
+    indexes = decimate_m4(y, bounds, nthreads)
+    assert (np.diff(indexes) > 0).all()
+    for k in range(bounds.size - 1):
+        i1, i2 = bounds[k], bounds[k + 1]
+        selected = indexes[(indexes >= i1) & (indexes < i2)]
+        if i1 == i2:
+            assert selected.size == 0
+            continue
+        segment = y[i1:i2]
+        ref = {i1, i2 - 1, i1 + np.nanargmin(segment), i1 + np.nanargmax(segment)}
+        assert set(selected) == ref
+    with pytest.raises(ValueError):
+        decimate_m4(y, [10, 5])
+
+
+def test_decimate_lttb():
+    """Test LTTB decimation"""
+    x, y = get_data(100000)
+    bounds = np.concatenate(([0], np.linspace(1, x.size - 1, 99), [x.size]))
+    indexes = decimate_lttb(x, y, bounds)
+    assert indexes.size == 100 and indexes[0] == 0 and indexes[-1] == x.size - 1
+    assert (np.diff(indexes) > 0).all()
+    assert x.size // 2 + 3 in indexes  # Peak is kept
+    with pytest.raises(ValueError):
+        decimate_lttb(x, y, [0, 0, 10])
+
+
+def test_decimate_curve():
+    """Test view-dependent decimation of a curve"""
+    x, y = get_data(1000000)
+    assert get_visible_range(x, 10.0, 20.0) == (99999, 200001)
+    for method in ("m4", "lttb"):
+        indexes = decimate_curve(x, y, 40.0, 60.0, 500, method)
+        assert indexes.size <= 4 * 500 and x.size // 2 + 3 in indexes
+        assert x[indexes[0]] < 40.0 and x[indexes[-1]] > 60.0
+        assert (x[indexes[1:-1]] >= 40.0).all() and (x[indexes[1:-1]] <= 60.0).all()
+    # Not enough visible points: all visible points are returned
+    indexes = decimate_curve(x, y, 50.0, 50.001, 500)
+    assert np.array_equal(indexes, np.arange(*get_visible_range(x, 50.0, 50.001)))
+    # Unsorted X data: the whole curve is decimated
+    indexes = decimate_curve(x[::-1], y[::-1], 40.0, 60.0, 500, xsorted=False)
+    assert indexes[0] == 0 and indexes[-1] == x.size - 1
+    with pytest.raises(ValueError):
+        decimate_curve(x, y, 0.0, 1.0, 500, "median")
+
+
+def test_curve_item_decimation():
+    """Test that curve item draws decimated data, but keeps full resolution
+    data for hit test and coordinates"""
+    x, y = get_data(1000000)
+    y[np.isnan(y)] = 0.0  # Non-finite values are not stored in curve samples
+    with qt_app_context(exec_loop=False):
+        curve = make.curve(x, y, use_dsamp=True, dsamp_mode="m4")
+        assert curve.dataSize() == x.size
+        win = make.dialog(type="curve")
+        plot = win.manager.get_plot()
+        plot.add_item(curve)
+        win.show()
+        plot.set_plot_limits(45.0, 55.0, -2.0, 2.0)
+        plot.replot()
+        plot.grab()
+        assert curve.dataSize() == x.size
+        series = list(curve._dsamp_cache.values())[-1]
+        assert series.size() < 10000 and series.yData().max() == 50.0
+        # Closest point is searched in full resolution data
+        xc, yc = curve.get_closest_coordinates(x[500100] + 1e-6, y[500100] + 1e-3)
+        i = int(np.flatnonzero(x == xc)[0])
+        assert abs(i - 500100) <= 1 and yc == y[i]
+        curve.param.dsamp_mode = "lttb"
+        curve.update_params()
+        assert not curve._dsamp_cache
+        plot.replot()
+        plot.grab()
+        assert len(curve._dsamp_cache) == 1
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_decimate_m4(0)
+    test_decimate_lttb()
+    test_decimate_curve()
+    test_curve_item_decimation()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the batched drawing of error bar curves
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+from qtpy import QtCore as QC
+from qtpy import QtGui as QG
+
+from plotpy.builder import make
+from plotpy.items.curve.errorbar import draw_lines
+from plotpy.mathutils.decimation import collapse_segments
+
+
+def get_coverage(
+    c: np.ndarray, a0: np.ndarray, a1: np.ndarray, ncols: int, nrows: int
+) -> np.ndarray:
+    """Return the pixels covered by axis-aligned segments (brute-force)"""
+    coverage = np.zeros((ncols, nrows), bool)
+    for ci, ai0, ai1 in zip(c, np.minimum(a0, a1), np.maximum(a0, a1)):
+        if 0 <= ci < ncols and ai1 >= 0 and ai0 < nrows:
+            coverage[int(ci), max(int(ai0), 0) : min(int(ai1), nrows - 1) + 1] = True
+    return coverage
+
+
+@pytest.mark.parametrize("size", (50, 5000))
+def test_collapse_segments(size):
+    """Test culling and merging of axis-aligned segments"""
+    rng = np.random.default_rng(0)
+    c = rng.uniform(-10.0, 110.0, size)
+    a0, a1 = rng.uniform(-10.0, 70.0, size), rng.uniform(-10.0, 70.0, size)
+    a0[::7] = np.nan
+    mc, ma0, ma1 = collapse_segments(c, a0, a1, 0.0, 100.0, 0.0, 60.0)
+    assert np.array_equal(
+        get_coverage(mc, ma0, ma1, 100, 60), get_coverage(c, a0, a1, 100, 60)
+    )
+    assert (np.diff(mc) >= 0).all() and (ma0 <= ma1).all()
+    # Merged segments of a pixel column neither overlap nor touch each other
+    same_column = mc[1:] == mc[:-1]
+    assert (ma0[1:][same_column] > ma1[:-1][same_column] + 1).all()
+
+
+def test_draw_lines():
+    """Test drawing lines from NumPy arrays"""
+    rng = np.random.default_rng(0)
+    x1, y1, x2, y2 = rng.uniform(0, 100, (4, 200))
+    images = []
+    with qt_app_context(exec_loop=False):
+        for batched in (True, False):
+            image = QG.QImage(100, 100, QG.QImage.Format_ARGB32)
+            image.fill(0)
+            painter = QG.QPainter(image)
+            if batched:
+                draw_lines(painter, x1, y1, x2, y2)
+            else:
+                painter.drawLines([QC.QLineF(*line) for line in zip(x1, y1, x2, y2)])
+            painter.end()
+            images.append(image)
+    assert images[0] == images[1]
+
+
+@pytest.mark.parametrize("mode", ("bars", "area"))
+def test_errorbar_item_draw(mode):
+    """Test drawing error bar curves with many points"""
+    x = np.linspace(0.0, 10.0, 200000)
+    y = np.sin(x)
+    with qt_app_context(exec_loop=False):
+        curve = make.error(x, y, np.full_like(x, 0.01), np.abs(y) / 10.0, errorbarcap=4)
+        curve.errorbarparam.mode = 0 if mode == "bars" else 1
+        curve.errorbarparam.update_item(curve)
+        win = make.dialog(type="curve")
+        plot = win.manager.get_plot()
+        plot.add_item(curve)
+        win.show()
+        for xmin, xmax in ((-1.0, 11.0), (4.0, 4.001)):
+            plot.set_plot_limits(xmin, xmax, -1.5, 1.5)
+            plot.replot()
+            plot.grab()
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_collapse_segments(5000)
+    test_draw_lines()
+    test_errorbar_item_draw("bars")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for curve hit test and closest point queries
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+from qtpy import QtCore as QC
+
+from plotpy.builder import make
+from plotpy.items.curve.base import closest_segment
+
+
+def get_curve_data(sorted_x: bool) -> tuple[np.ndarray, np.ndarray]:
+    """Return sorted X data (noisy sine) or unsorted X data (spiral)"""
+    rng = np.random.default_rng(0)
+    if sorted_x:
+        x = np.linspace(0.0, 20.0, 200000)
+        y = np.sin(x) + 0.05 * rng.normal(size=x.size)
+        y[1000:1010] = np.nan
+    else:
+        t = np.linspace(0.0, 20 * np.pi, 200000)
+        x, y = t * np.cos(t), t * np.sin(t)
+    return x, y
+
+
+def test_closest_segment():
+    """Test closest segment search"""
+    X, Y = np.array([0.0, 10.0, 10.0, np.nan, 0.0]), np.array([0.0, 0.0, 10, 0, 5])
+    assert closest_segment((3.0, 1.0), X, Y) == (0, 1.0)
+    assert closest_segment((12.0, 8.0), X, Y) == (2, 2.0)
+    mask = np.array([False, True, True, True])
+    assert closest_segment((3.0, 1.0), X, Y, mask) == (1, 7.0)
+    assert closest_segment((1.0, 1.0), X[3:4], Y[3:4]) == (-1, np.inf)
+
+
+@pytest.mark.parametrize("sorted_x", (True, False))
+def test_curve_hit_test(sorted_x):
+    """Test curve hit test and closest coordinates against a brute-force search"""
+    x, y = get_curve_data(sorted_x)
+    with qt_app_context(exec_loop=False):
+        curve = make.curve(x, y)
+        win = make.dialog(type="curve")
+        plot = win.manager.get_plot()
+        plot.add_item(curve)
+        win.show()
+        plot.replot()
+        plot.grab()
+        assert curve.is_x_sorted() is sorted_x
+        xmap = plot.canvasMap(curve.xAxis())
+        ymap = plot.canvasMap(curve.yAxis())
+        cx, cy = xmap.transform_scalar(x), ymap.transform_scalar(y)
+        rng = np.random.default_rng(1)
+        for px, py in rng.uniform(50, 350, (20, 2)):
+            distance, i, _inside, _other = curve.hit_test(QC.QPointF(px, py))
+            ref_i, ref_distance = closest_segment((px, py), cx, cy)
+            assert distance == pytest.approx(ref_distance, abs=1e-6)
+            assert i == ref_i or np.hypot(cx[i] - px, cy[i] - py) == pytest.approx(
+                np.hypot(cx[ref_i] - px, cy[ref_i] - py)
+            )
+            xc, yc = curve.get_closest_coordinates(
+                xmap.invTransform(px), ymap.invTransform(py)
+            )
+            assert (xc, yc) == (x[i], y[i])
+        assert (curve._point_index is None) is sorted_x
+        exec_dialog(win)
+
+
+@pytest.mark.parametrize("sorted_x", (True, False))
+def test_curve_closest_x(sorted_x):
+    """Test closest point search along X axis"""
+    x, y = get_curve_data(sorted_x)
+    x[5] = np.nan
+    curve = make.curve(x, y)
+    for xc in (-100.0, -3.21, 0.0, 7.5, 100.0):
+        i = np.nanargmin(np.abs(x - xc))
+        assert curve.get_closest_x(xc) == (x[i], y[i])
+    curve.set_data(x[::-1].copy(), y[::-1].copy())
+    assert curve.get_closest_x(7.5)[0] == x[np.nanargmin(np.abs(x - 7.5))]
+
+
+if __name__ == "__main__":
+    test_closest_segment()
+    test_curve_hit_test(True)
+    test_curve_hit_test(False)
+    test_curve_closest_x(False)
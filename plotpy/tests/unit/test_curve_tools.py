@@ -162,11 +162,13 @@ def test_edit_point_tool():
         curve_item.param.dsamp_factor = 20
         win.manager.add_tool(DownSamplingTool).activate()
         # The steps must be very small to ensure the mouse passes close
-        # enough to the first point of the curve to move it (distance < threshold)
+        # enough to the first point of the curve to move it (distance < threshold).
+        # The drag starts at mid-height, close to the first point of the curve,
+        # so that this point is selected by the hit test (closest curve point).
         n = 1000
         min_v, max_v = 0, 1
         x_path = np.full(n, min_v)
-        y_path = np.linspace(max_v, min_v, n)
+        y_path = np.linspace(0.5 * max_v, min_v, n)
         drag_mouse(win, x_path, y_path)
 
         x_path = np.full(n, max_v)
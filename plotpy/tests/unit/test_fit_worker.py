@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the background curve fitting engine and the debounced refresh of
+the fit widget
+"""
+
+import threading
+import time
+
+import numpy as np
+from guidata.qthelpers import exec_dialog, qt_app_context
+from qtpy import QtCore as QC
+from qtpy import QtWidgets as QW
+
+from plotpy.widgets.fit import FitDialog, FitParam, FitWorker
+
+
+def cos_fit(x, params):
+    """Fit function"""
+    a, b = params
+    return np.cos(b * x) + a
+
+
+def get_data(size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return noisy data to be fitted"""
+    x = np.linspace(-10.0, 10.0, size)
+    y = np.cos(1.5 * x) + 0.3 + np.random.default_rng(0).normal(0.0, 0.05, size)
+    return x, y
+
+
+def create_dialog(size: int, fitfunc=cos_fit) -> FitDialog:
+    """Create fit dialog"""
+    win = FitDialog(auto_fit=True, options={"type": "curve"})
+    params = [FitParam("Offset", 0.2, 0.0, 2.0), FitParam("Frequency", 1.45, 1.0, 2.0)]
+    win.set_data(*get_data(size), fitfunc, params)
+    return win
+
+
+def wait_until(condition, timeout: float = 20.0) -> None:
+    """Process events until condition is met"""
+    t0 = time.perf_counter()
+    while not condition():
+        assert time.perf_counter() - t0 < timeout
+        QW.QApplication.processEvents()
+        time.sleep(0.005)
+
+
+def test_fit_worker():
+    """Test fit worker: progress, result, failure and cancellation"""
+    with qt_app_context(exec_loop=False):
+        results, progress = [], []
+
+        def optimize():
+            for index in range(5):
+                worker.check(np.array([index, 0.0]))
+            return [1.0, 2.0]
+
+        worker = FitWorker(optimize, progress_interval=0.0)
+        worker.SIG_PROGRESS.connect(progress.append)
+        worker.SIG_FINISHED.connect(lambda *args: results.append(args))
+        worker.run()
+        assert len(progress) == 5 and progress[-1].tolist() == [4.0, 0.0]
+        assert results[-1][0].tolist() == [1.0, 2.0] and results[-1][1] == ""
+        worker.optimize = lambda: 1 / 0
+        worker.run()
+        assert results[-1][0] is None and results[-1][1] == "division by zero"
+        worker.optimize = optimize
+        worker.cancel()
+        assert worker.is_cancelled()
+        worker.run()
+        assert results[-1] == (None, "")
+
+
+def test_debounced_refresh():
+    """Test that fit curve refreshes are merged and evaluated on visible X"""
+    with qt_app_context(exec_loop=False):
+        win = create_dialog(1_000_000)
+        fitw = win.fit_widget
+        win.show()
+        QW.QApplication.processEvents()
+        x, y = fitw.fit_curve.get_data()
+        assert x.size <= fitw.MAX_FIT_CURVE_POINTS
+        assert x[0] == fitw.x[0] and x[-1] >= fitw.x[-2]
+        # Successive slider changes: the fit curve is evaluated only once
+        ncalls = []
+        fitw.fitfunc = lambda x, params: ncalls.append(1) or cos_fit(x, params)
+        slider = fitw.fitparams[0].slider
+        for value in range(100, 200):
+            slider.setValue(value)
+        assert not ncalls and fitw.refresh_timer.isActive()
+        wait_until(lambda: not fitw.refresh_timer.isActive())
+        assert len(ncalls) == 1
+        offset = fitw.fitparams[0].value
+        _x, yfit = fitw.fit_curve.get_data()
+        assert np.allclose(yfit, cos_fit(_x, [offset, 1.45]))
+        # Zoom: the fit curve is evaluated on the visible X range
+        plot = fitw.plot_widget.plot
+        plot.set_axis_limits(plot.get_active_axes()[0], 1.0, 2.0)
+        plot.replot()
+        plot.SIG_PLOT_AXIS_CHANGED.emit(plot)
+        wait_until(lambda: not fitw.refresh_timer.isActive())
+        x, _y = fitw.fit_curve.get_data()
+        assert x[0] < 1.0 < x[1] and x[-2] < 2.0 < x[-1]
+        assert fitw.MAX_FIT_CURVE_POINTS // 2 < x.size <= fitw.MAX_FIT_CURVE_POINTS
+        exec_dialog(win)
+
+
+def test_unsorted_refresh():
+    """Test that the fit curve is evaluated on all X values if they are unsorted"""
+    with qt_app_context(exec_loop=False):
+        win = create_dialog(100_000)
+        fitw = win.fit_widget
+        assert fitw.x_sorted
+        x, y = get_data(100_000)
+        fitw.set_data(x[::-1], y[::-1])
+        assert not fitw.x_sorted
+        win.show()
+        plot = fitw.plot_widget.plot
+        plot.set_axis_limits(plot.get_active_axes()[0], 1.0, 2.0)
+        plot.replot()
+        plot.SIG_PLOT_AXIS_CHANGED.emit(plot)
+        wait_until(lambda: not fitw.refresh_timer.isActive())
+        x, _y = fitw.fit_curve.get_data()
+        assert x[0] == fitw.x[0] and x[-1] == fitw.x[-1]
+        assert x.size <= fitw.MAX_FIT_CURVE_POINTS
+        exec_dialog(win)
+
+
+def test_background_fit():
+    """Test automatic fit in a background thread"""
+    with qt_app_context(exec_loop=False):
+        win = create_dialog(100_000)
+        fitw = win.fit_widget
+        fitw.autofit()
+        ref_values = win.get_values()
+        assert np.allclose(ref_values, [0.3, 1.5], atol=1e-2)
+        win = create_dialog(100_000)
+        fitw = win.fit_widget
+        finished = []
+        fitw.SIG_AUTOFIT_FINISHED.connect(finished.append)
+        fitw.autofit_button.click()
+        assert fitw.is_fitting() and not fitw.params_group.isEnabled()
+        assert fitw.autofit_button.isEnabled()
+        wait_until(lambda: finished)
+        assert finished == [True] and not fitw.is_fitting()
+        assert fitw.params_group.isEnabled()
+        assert np.allclose(win.get_values(), ref_values)
+        exec_dialog(win)
+
+
+def test_cancel_fit():
+    """Test cancelling a background fit, and streamed parameter values"""
+    with qt_app_context(exec_loop=False):
+        threads, sizes = set(), set()
+
+        def slow_fit(x, params):
+            threads.add(threading.get_ident())
+            if threading.get_ident() != threading.main_thread().ident:
+                sizes.add(x.size)
+            time.sleep(0.01)
+            return cos_fit(x, params)
+
+        win = create_dialog(10_000, slow_fit)
+        fitw = win.fit_widget
+        fitw.autofit_prm.method = "simplex"
+        # Tolerances which cannot be reached: the fit runs until it is cancelled
+        fitw.autofit_prm.xtol = fitw.autofit_prm.ftol = 1e-300
+        finished, progress = [], []
+        fitw.SIG_AUTOFIT_FINISHED.connect(finished.append)
+        assert fitw.start_autofit() and not fitw.start_autofit()
+        fitw.autofit_worker.SIG_PROGRESS.connect(progress.append)
+        wait_until(lambda: len(progress) >= 2)
+        assert win.get_values() != [0.2, 1.45]
+        # Changing the fitting range does not affect the running fit
+        fitw.range_changed(None, 0.0, 5.0)
+        wait_until(lambda: len(progress) >= 4)
+        assert sizes == {10_000}
+        assert len(threads) == 2  # Worker thread and GUI thread (preview)
+        fitw.cancel_autofit(wait=True)
+        assert finished == [False] and not fitw.is_fitting()
+        assert fitw.autofit_thread is None and fitw.autofit_worker is None
+        # Closing the dialog cancels the fit
+        assert fitw.start_autofit()
+        win.reject()
+        assert finished == [False, False] and not fitw.is_fitting()
+        QC.QCoreApplication.processEvents()
+
+
+if __name__ == "__main__":
+    test_fit_worker()
+    test_debounced_refresh()
+    test_unsorted_refresh()
+    test_background_fit()
+    test_cancel_fit()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the parallel multi-statistic 2-D histogram engine
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy.builder import make
+from plotpy.histogram2d import HISTOGRAM2D_STATS, histogram2d_stats
+
+NX, NY = 60, 40
+RANGE = (-3.0, 3.0, -2.0, 2.0)
+
+
+def get_data(size: int = 600000) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return random X, Y and Z data"""
+    rng = np.random.default_rng(0)
+    return rng.normal(size=size), rng.normal(size=size), rng.random(size)
+
+
+def get_reference(X: np.ndarray, Y: np.ndarray, Z: np.ndarray) -> dict:
+    """Return 2-D histogram statistics computed with NumPy"""
+    i0, i1, j0, j1 = RANGE
+    ix = (X - i0) * NX / (i1 - i0) - 0.5  # Centered bins
+    iy = (Y - j0) * NY / (j1 - j0) - 0.5
+    inside = (ix >= 0) & (ix <= NX - 1) & (iy >= 0) & (iy <= NY - 1)
+    bins = (iy[inside].astype(int), ix[inside].astype(int))
+    z = Z[inside]
+    ref = {"count": np.zeros((NY, NX)), "sum": np.zeros((NY, NX))}
+    ref["min"], ref["max"] = np.full((NY, NX), np.inf), np.full((NY, NX), -np.inf)
+    ref["prod"] = np.ones((NY, NX))
+    np.add.at(ref["count"], bins, 1.0)
+    np.add.at(ref["sum"], bins, z)
+    np.minimum.at(ref["min"], bins, z)
+    np.maximum.at(ref["max"], bins, z)
+    np.multiply.at(ref["prod"], bins, z)
+    empty = ref["count"] == 0
+    with np.errstate(invalid="ignore"):
+        ref["mean"] = ref["sum"] / ref["count"]
+    for name in ("sum", "min", "max", "prod", "mean"):
+        ref[name][empty] = np.nan
+    return ref
+
+
+@pytest.mark.parametrize("nthreads", (1, 2, 0))
+def test_histogram2d_stats(nthreads):
+    """Test histogram2d_stats against NumPy"""
+    X, Y, Z = get_data()
+    Z = 0.5 + Z  # Products of values around 1
+    stats = histogram2d_stats(X, Y, *RANGE, NX, NY, Z, HISTOGRAM2D_STATS, nthreads)
+    ref = get_reference(X, Y, Z)
+    assert np.array_equal(stats["count"], ref["count"])
+    for name in HISTOGRAM2D_STATS:
+        assert np.allclose(stats[name], ref[name], equal_nan=True), name
+    prod = histogram2d_stats(X, Y, *RANGE, NX, NY, Z, ("prod",), nthreads)["prod"]
+    assert np.allclose(prod, ref["prod"], equal_nan=True)
+    with pytest.raises(ValueError):
+        histogram2d_stats(X, Y, *RANGE, NX, NY, stats=("sum",))
+    with pytest.raises(ValueError):
+        histogram2d_stats(X, Y, *RANGE, NX, NY, Z, ("median",))
+
+
+def test_histogram2d_item_cache():
+    """Test that the 2-D histogram item is not recomputed on each repaint"""
+    X, Y, Z = get_data(10000)
+    with qt_app_context(exec_loop=False):
+        item = make.histogram2D(X, Y, NX, NY, Z=Z, computation=4)
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        win.show()
+        for _i in range(2):  # Colormap axis update may change the layout once
+            plot.replot()
+            plot.grab()
+        key = item._hist_key
+        assert key is not None and not np.isnan(item.data).all()
+        item.data[:, :] = -1.0  # Will be kept if histogram is not recomputed
+        plot.replot()
+        plot.grab()
+        assert item._hist_key is key and (item.data == -1.0).all()
+        plot.set_plot_limits(-1.0, 1.0, -1.0, 1.0)
+        plot.replot()
+        plot.grab()
+        assert item._hist_key is not key and (item.data != -1.0).any()
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_histogram2d_stats(0)
+    test_histogram2d_item_cache()
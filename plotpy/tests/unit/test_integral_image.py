@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the integral image used to compute average cross sections
+"""
+
+import numpy as np
+import pytest
+
+from plotpy.builder import make
+from plotpy.mathutils.integral import IntegralImage
+
+
+def get_data(dtype: str) -> np.ndarray:
+    """Return test image data"""
+    rng = np.random.default_rng(0)
+    data = rng.uniform(-1000.0, 1000.0, (300, 400))
+    if dtype in ("float32", "float64"):
+        data[10, 20:30] = np.nan
+        data[200:205, 50] = np.inf
+        data[150, 50] = -np.inf
+    return data.astype(dtype)
+
+
+@pytest.mark.parametrize("dtype", ("uint8", "int32", "uint16", "float32", "float64"))
+def test_integral_image(dtype):
+    """Test average cross sections against NumPy"""
+    data = get_data(dtype)
+    integral = IntegralImage(data)
+    rng = np.random.default_rng(1)
+    areas = rng.integers(-10, 410, (60, 4))
+    areas[:2] = (0, 300, 0, 400), (290, 300, 0, 1)
+    with np.errstate(invalid="ignore"):
+        for i0, i1, j0, j1 in areas:
+            for axis in (0, 1):
+                section = integral.get_average_section(axis, i0, i1, j0, j1)
+                area = data[max(i0, 0) : i1, max(j0, 0) : j1]
+                if area.size == 0:
+                    assert section.size == 0
+                    continue
+                ref = area.mean(axis=axis)
+                assert section.dtype == ref.dtype
+                atol = 1e-3 if dtype == "float32" else 1e-9  # Data range: 2000
+                assert np.allclose(section, ref, atol=atol, equal_nan=True)
+    assert integral.nbytes > 0 and integral.has_nonfinite() is (dtype[0] == "f")
+
+
+def test_item_average_section():
+    """Test average cross sections of image items"""
+    data = get_data("float64")
+    item = make.image(data)
+    x, y = item.get_average_xsection(10.0, 20.0, 390.0, 290.0)
+    assert np.array_equal(x, item.get_x_values(10, 391))
+    with np.errstate(invalid="ignore"):
+        assert np.allclose(y, data[20:291, 10:391].mean(axis=0), equal_nan=True)
+    integral = item.get_integral_image()
+    assert integral is not None and integral.nbytes > 0
+    # Cumulative sums are cleared when data is changed
+    item.set_data(data[::-1].copy())
+    assert item.get_integral_image() is not integral
+    x, y = item.get_average_ysection(0.0, 0.0, 399.0, 299.0, apply_lut=True)
+    a, b, _bg, _cmap = item.lut
+    with np.errstate(invalid="ignore"):
+        ref = (item.data.mean(axis=1) * a + b).clip(0, 1023)
+    assert np.allclose(y, ref, equal_nan=True)
+    # Masked images: data is averaged directly (the mask may be changed in place)
+    mask = np.zeros(data.shape, bool)
+    mask[:, :100] = True
+    item = make.maskedimage(data, mask)
+    assert item.get_integral_image() is None
+    x, y = item.get_average_xsection(0.0, 0.0, 399.0, 299.0)
+    assert np.ma.is_masked(y) and y.mask[:100].all() and not y.mask[100:].any()
+
+
+if __name__ == "__main__":
+    test_integral_image("float32")
+    test_item_average_section()
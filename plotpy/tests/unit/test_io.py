@@ -19,7 +19,8 @@ try:
 except ImportError:
     pydicom = None
 
-from plotpy.io import imread, imwrite
+from plotpy import io
+from plotpy.io import imread, imwrite, rgb_to_grayscale
 
 
 def compute_image(N=1000, M=1000):
@@ -119,6 +120,60 @@ def test_imread_txt(tmpdir):
     assert data[0, 25] == 25
 
 
+@pytest.mark.parametrize("delimiter", ("\t", ",", ";", " ", "  "))
+def test_imread_txt_delimiters(tmpdir, delimiter):
+    """Test reading of txt file with various delimiters"""
+    img = tmpdir / "img.csv"
+    header = "# Comment line\n\n"
+    lines = (delimiter.join(f"{n + row:d}" for n in range(20)) for row in range(5))
+    img.write_text(header + "\n".join(lines), "ascii")
+    data = imread(img)
+    assert data.shape == (5, 20) and data[3, 7] == 10
+
+
+def test_imread_mmap(tmpdir):
+    """Test memory-mapped reading of npy and tiff files"""
+    tifffile = pytest.importorskip("tifffile")
+    data = np.random.default_rng(0).integers(0, 4096, (300, 200)).astype(np.uint16)
+    for name, write in (
+        ("img.npy", np.save),
+        ("img.tif", tifffile.imwrite),
+    ):
+        fname = str(tmpdir / name)
+        write(fname, data)
+        arr = imread(fname, mmap=True)
+        assert isinstance(arr, np.memmap) and not arr.flags.writeable
+        assert np.array_equal(arr, data)
+        assert not isinstance(imread(fname), np.memmap)
+    # Compressed data can't be mapped: data is read as usual
+    fname = str(tmpdir / "compressed.tif")
+    tifffile.imwrite(fname, data, compression="zlib")
+    arr = imread(fname, mmap=True)
+    assert not isinstance(arr, np.memmap) and np.array_equal(arr, data)
+    # Other file formats are read as usual
+    imwrite(str(tmpdir / "img.txt"), data)
+    assert np.array_equal(imread(str(tmpdir / "img.txt"), mmap=True), data)
+
+
+@pytest.mark.skipif(pydicom is None, reason="pydicom not installed")
+def test_imread_dcm_mmap():
+    """Test memory-mapped reading of dcm file"""
+    brain_path = get_path("mr-brain.dcm")
+    data = imread(brain_path, mmap=True)
+    assert isinstance(data, np.memmap) and data.shape == (512, 512)
+    assert np.array_equal(data, imread(brain_path))
+
+
+def test_rgb_to_grayscale(monkeypatch):
+    """Test grayscale conversion by chunks"""
+    rgba = np.random.default_rng(1).integers(0, 256, (101, 37, 4)).astype(np.uint8)
+    monkeypatch.setattr(io, "GRAYSCALE_CHUNK_SIZE", 37 * 10)
+    for arr in (rgba, rgba[..., :3], rgba * np.uint16(257), rgba.astype(np.float32)):
+        ref = arr[..., :4].mean(axis=2).astype(arr.dtype)
+        data = rgb_to_grayscale(arr)
+        assert data.dtype == arr.dtype and np.array_equal(data, ref)
+
+
 if __name__ == "__main__":
     test_imread_python_icon()
     test_imread_python_icon_grayscale()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for lazy loading of packages and colormaps
+"""
+
+import ast
+import compileall
+import importlib
+import os
+import os.path as osp
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import plotpy
+import plotpy.builder
+import plotpy.items
+import plotpy.tools
+from plotpy.mathutils.colormap import LazyColormapDict
+
+
+def get_type_checking_imports(filename: str) -> dict[str, str]:
+    """Return the objects imported in the ``if TYPE_CHECKING:`` block of a module
+
+    Args:
+        filename: module source filename
+
+    Returns:
+        Dictionary of object names -> relative submodule name (e.g. ".curve")
+    """
+    with open(filename, encoding="utf-8") as fdesc:
+        tree = ast.parse(fdesc.read(), filename)
+    imports = {}
+    for node in tree.body:
+        if isinstance(node, ast.If) and getattr(node.test, "id", "") == "TYPE_CHECKING":
+            for stmt in node.body:
+                for alias in stmt.names:
+                    imports[alias.name] = "." + stmt.module
+    return imports
+
+
+def test_lazy_packages():
+    """Test lazy attribute loading of public packages"""
+    for package in (plotpy.items, plotpy.tools, plotpy.builder):
+        # The lazy objects are the objects seen by static analysis tools
+        imports = get_type_checking_imports(package.__file__)
+        assert sorted(imports) == package.__all__
+        assert set(package.__all__) <= set(dir(package))
+        for name in package.__all__:
+            obj = getattr(package, name)
+            assert package.__dict__[name] is obj  # Cached in package namespace
+            module = importlib.import_module(imports[name], package.__name__)
+            assert getattr(module, name) is obj
+    from plotpy.items.image.base import BaseImageItem
+
+    assert plotpy.items.BaseImageItem is BaseImageItem
+    assert plotpy.items.contour.ContourItem is plotpy.items.ContourItem
+    with pytest.raises(AttributeError):
+        plotpy.items.NotAnItem
+    with pytest.raises(ImportError):
+        from plotpy.tools import NotATool  # noqa: F401
+
+
+def test_lazy_packages_without_sources(tmp_path):
+    """Test lazy loading of packages installed without source files"""
+    src_dir = osp.dirname(plotpy.__file__)
+    dst_dir = str(tmp_path / "plotpy")
+    ignore = shutil.ignore_patterns("tests", "__pycache__", "*.so", "*.pyd")
+    shutil.copytree(src_dir, dst_dir, ignore=ignore)
+    for name in os.listdir(src_dir):
+        if name.endswith((".so", ".pyd")):
+            os.symlink(osp.join(src_dir, name), osp.join(dst_dir, name))
+    assert compileall.compile_dir(dst_dir, quiet=1, legacy=True)
+    for dirpath, _dirnames, filenames in os.walk(dst_dir):
+        for name in filenames:
+            if name.endswith(".py"):
+                os.remove(osp.join(dirpath, name))
+    code = (
+        "import plotpy.items, plotpy.tools, plotpy.builder;"
+        "print(plotpy.__file__,"
+        " plotpy.items.CurveItem.__name__, plotpy.tools.SelectTool.__name__,"
+        " type(plotpy.builder.make).__name__)"
+    )
+    env = dict(os.environ, PYTHONPATH=str(tmp_path), QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(tmp_path),
+    )
+    assert result.returncode == 0, result.stderr
+    filename, *names = result.stdout.split()
+    assert filename == osp.join(dst_dir, "__init__.pyc")
+    assert names == ["CurveItem", "SelectTool", "PlotBuilder"]
+
+
+def test_lazy_colormaps():
+    """Test lazy loading of colormaps"""
+    calls = []
+
+    def loader():
+        calls.append(None)
+        return {"a": 1, "b": 2}
+
+    cmaps = LazyColormapDict(loader)
+    assert not cmaps.loaded and not calls
+    assert "a" in cmaps and cmaps.loaded
+    cmaps["c"] = 3
+    del cmaps["a"]
+    assert dict(cmaps) == {"b": 2, "c": 3} and len(cmaps) == 2
+    assert {**cmaps, "d": 4} == {"b": 2, "c": 3, "d": 4}
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    test_lazy_packages()
+    test_lazy_colormaps()
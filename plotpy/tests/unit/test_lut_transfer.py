@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the nonlinear LUT transfer functions evaluated by the `_scaler`
+engine
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy._scaler import (
+    INTERP_LINEAR,
+    INTERP_NEAREST,
+    TRANSFER_ASINH,
+    TRANSFER_GAMMA,
+    TRANSFER_LOG,
+    TRANSFER_SYMLOG,
+    TRANSFER_TABLE,
+    _scale_rect,
+)
+from plotpy.builder import make
+from plotpy.constants import LUT_SIZE, LUTTransfer
+from plotpy.lutrange import eval_transfer, get_transfer_range
+
+TABLE = np.sort(np.random.default_rng(0).uniform(-100.0, 3000.0, 33))
+TRANSFERS = (
+    (TRANSFER_LOG, 1.0),
+    (TRANSFER_SYMLOG, 10.0),
+    (TRANSFER_GAMMA, 0.4, -50.0, 2000.0),
+    (TRANSFER_ASINH, 20.0),
+    (TRANSFER_TABLE, -20.0, 2500.0, 0.0, TABLE),
+)
+
+
+def get_data(dtype: np.dtype) -> np.ndarray:
+    """Return random data in the [-3000, 3000] range (clipped to dtype range)"""
+    if np.dtype(dtype).kind in "iu":
+        info = np.iinfo(dtype)
+        vmin, vmax = max(info.min, -3000), min(info.max, 3000)
+    else:
+        vmin, vmax = -3000, 3000
+    data = np.random.default_rng(1).uniform(vmin, vmax, (90, 120)).astype(dtype)
+    data[7, 10:20] = vmin
+    return data
+
+
+@pytest.mark.parametrize("interp", (INTERP_NEAREST, INTERP_LINEAR))
+@pytest.mark.parametrize("transfer", TRANSFERS)
+@pytest.mark.parametrize(
+    "dtype", (np.uint8, np.int16, np.uint16, np.int32, np.float32, np.float64)
+)
+def test_scale_rect_transfer(dtype, transfer, interp):
+    """Test transfer functions against their NumPy counterpart"""
+    data = get_data(dtype)
+    values = eval_transfer(data, transfer)
+    vmin, vmax = values.min(), values.max()
+    a = 1000.3 / (vmax - vmin)
+    b = 7.77 - a * vmin
+    # Colormap giving LUT indexes, source pixels sampled at their center
+    lut = (a, b, None, np.arange(LUT_SIZE, dtype=np.uint32), None, transfer)
+    dst = np.zeros(data.shape, np.uint32)
+    rect = (0, 0, data.shape[1], data.shape[0])
+    _scale_rect(data, rect, dst, rect, lut, (interp,))
+    ref = np.clip(np.floor(a * values + b), 0, LUT_SIZE - 1)
+    assert np.array_equal(dst, ref)
+    # Floating point destination
+    dst = np.zeros(data.shape, np.float64)
+    _scale_rect(data, rect, dst, rect, (a, b, None, None, None, transfer), (interp,))
+    assert np.allclose(dst, a * values + b)
+
+
+def test_transfer_errors():
+    """Test transfer function checks"""
+    data, dst = np.ones((10, 10)), np.zeros((10, 10), np.uint32)
+    cmap = np.zeros(LUT_SIZE, np.uint32)
+    for transfer in (
+        (TRANSFER_LOG, 0.0),
+        (TRANSFER_ASINH, -1.0),
+        (TRANSFER_GAMMA, 1.0, 5.0, 5.0),
+        (TRANSFER_TABLE, 0.0, 1.0, 0.0, np.zeros(1)),
+        (TRANSFER_TABLE, 0.0, 1.0, 0.0, np.zeros(10, np.float32)),
+        (99, 1.0),
+    ):
+        lut = (1.0, 0.0, None, cmap, None, transfer)
+        with pytest.raises((TypeError, ValueError)):
+            _scale_rect(data, (0, 0, 10, 10), dst, (0, 0, 10, 10), lut, (0,))
+
+
+def test_transfer_range():
+    """Test conversion of LUT ranges"""
+    for transfer, param in (
+        (LUTTransfer.LOG, 1.0),
+        (LUTTransfer.SYMLOG, 3.0),
+        (LUTTransfer.ASINH, 2.0),
+    ):
+        lut_range = get_transfer_range((-5.0, 100.0), transfer, param)
+        assert lut_range[1] < 100.0
+        lut_range = get_transfer_range(lut_range, transfer, param, inverse=True)
+        vmin = 1.0 if transfer is LUTTransfer.LOG else -5.0
+        assert np.allclose(lut_range, (vmin, 100.0))
+    lut_range = get_transfer_range((-5.0, 100.0), LUTTransfer.GAMMA, 0.5)
+    assert lut_range == (-5.0, 100.0)
+
+
+def test_image_item_transfer():
+    """Test transfer functions of image items"""
+    data = np.random.default_rng(2).integers(0, 4000, (200, 300)).astype(np.uint16)
+    with qt_app_context(exec_loop=False):
+        item = make.image(data)
+        assert item.get_draw_lut() is item.lut
+        item.set_lut_range((10.0, 1000.0))
+        item.set_lut_transfer(LUTTransfer.LOG)
+        assert item.get_lut_transfer() == (LUTTransfer.LOG, 1.0)
+        assert np.allclose(item.get_lut_range(), (1.0, 3.0))
+        assert item.get_draw_lut()[4:] == (None, (TRANSFER_LOG, 1.0))
+        # Cross sections and exported data
+        _x, xsection = item.get_xsection(50, apply_lut=True)
+        a, b = item.lut[:2]
+        ref = (np.log10(np.maximum(data[50], 1.0)) * a + b).clip(0, LUT_SIZE - 1)
+        assert np.allclose(xsection, ref)
+        dst = np.zeros((200, 300))
+        item.export_roi((0, 0, 300, 200), (0, 0, 300, 200), dst, apply_lut=True)
+        assert np.allclose(dst, np.log10(np.maximum(data, 1.0)) * a + b)
+        item.set_lut_transfer(LUTTransfer.LINEAR)
+        assert np.allclose(item.get_lut_range(), (10.0, 1000.0))
+        assert item.get_draw_lut() is item.lut
+        # Contrast curves within the LUT range
+        item.set_lut_transfer(LUTTransfer.GAMMA, 2.0)
+        assert item.get_lut_range() == (10.0, 1000.0)
+        assert item.get_transfer_tuple() == (TRANSFER_GAMMA, 2.0, 10.0, 1000.0)
+        item.set_lut_transfer(LUTTransfer.EQUALIZE, 64)
+        transfer = item.get_transfer_tuple()
+        assert transfer[:4] == (TRANSFER_TABLE, 10.0, 1000.0, 0.0)
+        table = transfer[4]
+        assert table.size == 65 and table[0] == 10.0 and table[-1] == 1000.0
+        assert np.all(np.diff(table) >= 0)
+        assert item.get_transfer_tuple() is transfer  # Cached table
+        item.set_lut_range((0.0, 4000.0))
+        assert item.get_transfer_tuple() is not transfer
+        # Uniform distribution: equalization table is almost linear
+        values = eval_transfer(np.linspace(0.0, 4000.0, 9), item.get_transfer_tuple())
+        assert np.allclose(values, np.linspace(0.0, 4000.0, 9), atol=40.0)
+        # Masked image item: mask overlay and transfer function
+        mitem = make.maskedimage(data, data > 3000, show_mask=True)
+        mitem.set_lut_transfer(LUTTransfer.ASINH, 100.0)
+        lut = mitem.get_draw_lut()
+        assert len(lut) == 6 and lut[4] is not None
+        assert lut[5] == (TRANSFER_ASINH, 100.0)
+        # Base-10 logarithmic Z axis
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        plot.add_item(mitem)
+        item.set_lut_transfer(LUTTransfer.LINEAR)
+        item.set_lut_range((10.0, 1000.0))
+        item.set_zaxis_log_state(True)
+        assert item.get_zaxis_log_state()
+        assert np.allclose(
+            item.get_lut_range(), np.log10([max(data.min(), 1), data.max()])
+        )
+        win.show()
+        plot.replot()
+        plot.grab()
+        item.set_zaxis_log_state(False)
+        assert not item.get_zaxis_log_state()
+        assert item.get_lut_range() == (10.0, 1000.0)
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_scale_rect_transfer(np.uint16, TRANSFERS[0], INTERP_LINEAR)
+    test_transfer_errors()
+    test_transfer_range()
+    test_image_item_transfer()
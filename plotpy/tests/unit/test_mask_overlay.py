@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the mask overlay blended by the `_scaler` engine
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy._scaler import INTERP_LINEAR, INTERP_NEAREST, _scale_rect, _scale_xy
+from plotpy.builder import make
+
+MASKED, UNMASKED = 0x80FFFFFF, 0x40000000
+
+
+def blend(under: np.ndarray, over: np.ndarray) -> np.ndarray:
+    """Blend ARGB32 colors ("source over" composition)"""
+    under = under.view(np.uint8).reshape(*under.shape, 4).astype(np.int64)
+    over = over.view(np.uint8).reshape(*over.shape, 4).astype(np.int64)
+    ao = over[..., 3:]
+    au = under[..., 3:] * (255 - ao)
+    alpha = np.maximum(ao * 255 + au, 1)
+    res = np.empty_like(under)
+    res[..., :3] = (
+        over[..., :3] * ao * 255 + under[..., :3] * au + alpha // 2
+    ) // alpha
+    res[..., 3:] = (alpha + 127) // 255
+    return res.astype(np.uint8).view(np.uint32)[..., 0]
+
+
+def get_mask_lut(bg: int | None) -> tuple:
+    """Return the LUT tuple used to draw the mask in a separate pass"""
+    return (1.0, 0.0, bg, np.array([UNMASKED, MASKED], np.uint32))
+
+
+@pytest.mark.parametrize("interp", (INTERP_NEAREST, INTERP_LINEAR))
+@pytest.mark.parametrize("nthreads", (1, 3))
+def test_scale_rect_overlay(interp, nthreads):
+    """Test mask overlay against a separate resampling pass of the mask"""
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0.0, 1.0, (93, 117))
+    data[5, 5:20] = np.nan
+    mask = rng.uniform(size=data.shape) > 0.7
+    cmap = (rng.integers(0, 1 << 24, 256) | (rng.integers(0, 256, 256) << 24)).astype(
+        np.uint32
+    )
+    lut = (255.0, 0.0, 0x102030, cmap)
+    src_rect, dst_rect = (-3.5, 2.2, 120.3, 80.1), (0, 0, 250, 170)
+    image = np.zeros((170, 250), np.uint32)
+    _scale_rect(data, src_rect, image, dst_rect, lut, (interp,), nthreads)
+    over = np.zeros_like(image)
+    _scale_rect(mask, src_rect, over, dst_rect, get_mask_lut(0), (INTERP_NEAREST,))
+    ref = np.where(over != 0, blend(image, over), image)
+    assert not np.array_equal(ref, image)
+    for overlay in (
+        (mask, mask.shape[1], MASKED, UNMASKED),
+        (mask.view(np.uint8), mask.shape[1], MASKED, UNMASKED),
+        (np.packbits(mask, axis=1), mask.shape[1], MASKED, UNMASKED),
+    ):
+        dst = np.zeros_like(ref)
+        _scale_rect(
+            data, src_rect, dst, dst_rect, lut + (overlay,), (interp,), nthreads
+        )
+        assert np.array_equal(dst, ref)
+    # Mask overlay is ignored when it is None
+    dst = np.zeros_like(ref)
+    _scale_rect(data, src_rect, dst, dst_rect, lut + (None,), (interp,), nthreads)
+    assert np.array_equal(dst, image)
+    with pytest.raises(ValueError):
+        overlay = (mask[:, :-9], mask.shape[1], MASKED, UNMASKED)
+        _scale_rect(data, src_rect, dst, dst_rect, lut + (overlay,), (interp,))
+
+
+def test_scale_xy_overlay():
+    """Test mask overlay with non-uniform coordinates and a downsampled mask"""
+    rng = np.random.default_rng(1)
+    data = rng.uniform(0.0, 1.0, (40, 60)).astype(np.float32)
+    mask = np.zeros((20, 30), bool)
+    mask[5:10, 3:25] = True
+    x, y = np.linspace(0.0, 1.0, 61) ** 2, np.linspace(0.0, 1.0, 41)
+    xytr = (x, y, (0.0, 0.0, 1.0, 1.0))
+    lut = (255.0, 0.0, None, np.full(256, 0xFF000000, np.uint32))
+    dst = np.zeros((100, 100), np.uint32)
+    overlay = (np.packbits(mask, axis=1), 30, 0xFFFF0000, 0)
+    _scale_xy(data, xytr, dst, (0, 0, 100, 100), lut + (overlay,), (INTERP_NEAREST,))
+    ref = np.zeros_like(dst)
+    fullmask = mask.repeat(2, axis=0).repeat(2, axis=1)
+    lut = (1.0, 0.0, None, np.array([0xFF000000, 0xFFFF0000], np.uint32))
+    _scale_xy(fullmask, xytr, ref, (0, 0, 100, 100), lut, (INTERP_NEAREST,))
+    assert np.array_equal(dst, ref) and (dst == 0xFFFF0000).any()
+
+
+def test_masked_image_item():
+    """Test mask overlay of masked image items"""
+    data = np.random.default_rng(2).uniform(0.0, 1.0, (200, 300))
+    mask = np.zeros(data.shape, bool)
+    mask[50:150, 100:200] = True
+    with qt_app_context(exec_loop=False):
+        item = make.maskedimage(data, mask, show_mask=True)
+        lut = item.get_draw_lut()
+        assert len(lut) == 5 and np.shares_memory(lut[4][0], item.data.mask)
+        item.set_mask_visible(False)
+        assert item.get_draw_lut() is item.lut
+        item.set_mask_visible(True)
+        xyitem = make.maskedxyimage(
+            np.arange(300.0), np.arange(200.0), data, mask, show_mask=True
+        )
+        assert len(xyitem.get_draw_lut()) == 5
+        xyitem.unmask_all()
+        assert not xyitem.get_draw_lut()[4][0].any()
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        win.show()
+        plot.replot()
+        plot.grab()
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_scale_rect_overlay(INTERP_LINEAR, 3)
+    test_scale_xy_overlay()
+    test_masked_image_item()
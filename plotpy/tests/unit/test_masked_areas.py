@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the vectorized masking of image areas
+"""
+
+import numpy as np
+import pytest
+from guidata.io import HDF5Reader, HDF5Writer, JSONReader, JSONWriter
+from guidata.qthelpers import qt_app_context
+
+from plotpy.builder import make
+from plotpy.io import load_items, save_items
+from plotpy.mathutils.pyramid import ImagePyramid
+
+
+def mask_circular_area(data: np.ndarray, item, x0, y0, x1, y1, inside: bool) -> None:
+    """Mask circular area pixel by pixel"""
+    ix0, iy0, ix1, iy1 = item.get_closest_index_rect(x0, y0, x1, y1)
+    xc, yc, radius = 0.5 * (x0 + x1), 0.5 * (y0 + y1), 0.5 * (x1 - x0)
+    xdata, ydata = item.get_x_values(ix0, ix1), item.get_y_values(iy0, iy1)
+    outside = np.ones(data.shape, bool)
+    outside[iy0:iy1, ix0:ix1] = False
+    for ix in range(ix0, ix1):
+        for iy in range(iy0, iy1):
+            dist = np.sqrt((xdata[ix - ix0] - xc) ** 2 + (ydata[iy - iy0] - yc) ** 2)
+            if bool(dist <= radius) is inside:
+                data[iy, ix] = np.ma.masked
+    if not inside:
+        data[outside] = np.ma.masked
+
+
+@pytest.mark.parametrize("inside", (True, False))
+def test_masked_areas(inside):
+    """Test masking of circular and rectangular areas"""
+    data = np.random.default_rng(1).uniform(size=(150, 200))
+    item = make.maskedimage(data.copy(), np.zeros(data.shape, bool))
+    ref = np.ma.array(data.copy(), mask=np.zeros(data.shape, bool))
+    item.mask_circular_area(20.3, 30.1, 80.7, 90.2, inside=inside)
+    mask_circular_area(ref, item, 20.3, 30.1, 80.7, 90.2, inside)
+    assert np.array_equal(item.data.mask, ref.mask)
+    item.mask_rectangular_area(100.0, 10.0, 150.0, 20.0, inside=inside)
+    ix0, iy0, ix1, iy1 = item.get_closest_index_rect(100.0, 10.0, 150.0, 20.0)
+    ref_rect = np.zeros(data.shape, bool)
+    ref_rect[iy0:iy1, ix0:ix1] = True
+    ref.mask |= ref_rect if inside else ~ref_rect
+    assert np.array_equal(item.data.mask, ref.mask)
+    item.unmask_all()
+    assert not np.any(item.data.mask)
+
+
+def test_mask_dirty_tiles():
+    """Test that masking operations update the changed region only"""
+    data = np.random.default_rng(2).uniform(size=(600, 700))
+    item = make.maskedimage(data, np.zeros(data.shape, bool))
+    item.set_pyramid_mode("mean")
+    item._pyramid = pyramid = ImagePyramid(item.data, "mean")
+    level = pyramid.get_level(2)
+    packed = item.get_packed_mask()
+    assert packed.get_dirty_tiles() == [] and not packed.bits.any()
+    item.mask_rectangular_area(300.0, 20.0, 320.0, 40.0)
+    assert packed.get_dirty_tiles() == [(0, 1)]
+    assert item._pyramid is pyramid and pyramid.get_level(2) is level
+    ref = ImagePyramid(np.ma.array(data, mask=item.data.mask.copy()), "mean")
+    assert np.array_equal(level.mask, ref.get_level(2).mask)
+    assert np.allclose(level.data, ref.get_level(2).data)
+    item.mask_circular_area(10.0, 500.0, 30.0, 520.0)
+    assert packed.get_dirty_tiles() == [(0, 1), (1, 0), (2, 0)]
+    assert item.get_packed_mask() is packed and packed.get_dirty_tiles() == []
+    assert np.array_equal(packed.to_array(), item.data.mask)
+    item.mask_rectangular_area(100.0, 100.0, 200.0, 200.0, inside=False)
+    assert item._pyramid is None and len(packed.get_dirty_tiles()) == 3 * 3
+
+
+@pytest.mark.parametrize("fmt", ("json", "hdf5"))
+def test_mask_serialization(fmt, tmp_path):
+    """Test saving masks which are not described by masked areas"""
+    data = np.random.default_rng(3).uniform(size=(50, 61))
+    mask = data > 0.7
+    with qt_app_context(exec_loop=False):
+        item = make.maskedimage(data, mask)
+        item.mask_rectangular_area(2.0, 3.0, 10.0, 12.0)
+        fname = str(tmp_path / f"items.{fmt}")
+        writer = JSONWriter(fname) if fmt == "json" else HDF5Writer(fname)
+        save_items(writer, [item])
+        if fmt == "json":
+            writer.save()
+        else:
+            writer.close()
+        reader = JSONReader(fname) if fmt == "json" else HDF5Reader(fname)
+        (restored,) = load_items(reader)
+        reader.close()
+        assert np.array_equal(restored.data.mask, item.data.mask)
+        assert len(restored.get_masked_areas()) == 1
+
+
+if __name__ == "__main__":
+    test_masked_areas(True)
+    test_mask_dirty_tiles()
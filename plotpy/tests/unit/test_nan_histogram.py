@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the native NaN-aware histogram engine
+"""
+
+import numpy as np
+import pytest
+
+from plotpy.items import ImageItem
+from plotpy.mathutils.arrayfuncs import get_nan_histogram
+
+
+@pytest.mark.parametrize(
+    "dtype", (np.float64, np.float32, np.uint8, np.uint16, np.int16, np.int32)
+)
+@pytest.mark.parametrize("nbins, drange", ((256, None), (17, (-1.3, 50.2))))
+def test_nan_histogram(dtype, nbins, drange):
+    """Test that get_nan_histogram gives the same result as np.histogram"""
+    rng = np.random.default_rng(0)
+    data = (rng.random((300, 400)) * 100).astype(dtype)
+    if data.dtype.kind == "f":
+        data[::7, ::3] = np.nan
+    # Non-contiguous data must be handled without copy
+    data = data[::2, 1::3]
+    hist, bins = get_nan_histogram(data, nbins, drange)
+    valid = data[~np.isnan(data)] if data.dtype.kind == "f" else data.ravel()
+    if drange is None:
+        drange = (valid.min(), valid.max())
+    ref_hist, ref_bins = np.histogram(valid.astype(float), nbins, drange)
+    assert np.array_equal(hist, ref_hist)
+    assert np.allclose(bins, ref_bins)
+
+
+def test_image_item_histogram_cache():
+    """Test that image item histogram cache depends on histogram parameters"""
+    data = np.arange(100, dtype=np.float32).reshape(10, 10)
+    item = ImageItem(data)
+    hist, _bins = item.get_histogram(10)
+    assert item.get_histogram(10)[0] is hist
+    assert item.get_histogram(10, (0.0, 50.0))[0].sum() == 51
+    assert item.get_histogram(10)[0] is not hist
+    item.set_data(data * 2)
+    assert item.histogram_cache is None
+    assert np.array_equal(item.get_histogram(10)[1], np.linspace(0, 198, 11))
+
+
+def test_image_item_data_version():
+    """Test that cached results are computed again when data changes in place"""
+    data = np.arange(100, dtype=np.float32).reshape(10, 10)
+    item = ImageItem(data)
+    version = item.get_data_version()
+    hist = item.get_histogram(10, (0.0, 100.0))[0]
+    assert hist.tolist() == [10] * 10
+    item.data[:5] = 0.0
+    assert item.get_histogram(10, (0.0, 100.0))[0] is hist
+    item.data_changed()
+    assert item.get_data_version() == version + 1
+    assert item.get_histogram(10, (0.0, 100.0))[0].tolist() == [50] + [0] * 4 + [10] * 5
+
+
+if __name__ == "__main__":
+    test_nan_histogram(np.float32, 256, None)
+    test_image_item_histogram_cache()
+    test_image_item_data_version()
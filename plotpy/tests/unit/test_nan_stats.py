@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the native NaN-aware statistics engine
+"""
+
+import numpy as np
+import pytest
+
+from plotpy.mathutils.arrayfuncs import get_nan_range, get_nan_stats
+
+
+@pytest.mark.parametrize("dtype", (np.float64, np.float32, np.uint16, np.int32))
+@pytest.mark.parametrize("nthreads", (1, 3, 0))
+def test_nan_stats(dtype, nthreads):
+    """Test get_nan_stats against NumPy, with and without mask"""
+    rng = np.random.default_rng(0)
+    data = (rng.random((1100, 500)) * 1000).astype(dtype)
+    if data.dtype.kind == "f":
+        data[::7, ::3] = np.nan
+    data = data[::-1, 1:]
+    mask = np.zeros(data.shape, bool)
+    mask[100:300, :] = True
+    for msk in (None, mask):
+        valid = np.ones(data.shape, bool) if msk is None else ~msk
+        if data.dtype.kind == "f":
+            valid &= ~np.isnan(data)
+        values = data[valid].astype(float)
+        vmin, vmax, count, vsum, vsumsq = get_nan_stats(data, msk, nthreads)
+        assert (vmin, vmax, count) == (values.min(), values.max(), values.size)
+        assert vsum == pytest.approx(values.sum())
+        assert vsumsq == pytest.approx((values**2).sum())
+    masked = np.ma.array(data, mask=mask)
+    assert get_nan_stats(masked)[2] == get_nan_stats(data, mask)[2]
+    # Mask is ignored by get_nan_range, as before
+    assert get_nan_range(masked) == get_nan_range(data)
+
+
+def test_nan_range_dtype():
+    """Test that the range of data is returned with the data type"""
+    for dtype in (np.uint8, np.int32, np.float32, np.float64):
+        data = np.array([[3, 7], [4, 5]], dtype)
+        if data.dtype.kind == "f":
+            data[1, 0] = np.nan
+        vmin, vmax = get_nan_range(data)
+        assert (vmin, vmax) == (3, 7)
+        assert type(vmin) is type(vmax) is data.dtype.type
+    # 64-bit integers which are not exactly represented as double precision floats
+    data = np.array([2**62 + 1, 2**62 + 3, 2**62 + 2], np.int64)
+    assert get_nan_range(data) == (2**62 + 1, 2**62 + 3)
+    data = np.array([2**64 - 1, 2**64 - 2], np.uint64)
+    assert get_nan_range(data) == (2**64 - 2, 2**64 - 1)
+    assert get_nan_range(data)[1].dtype == np.uint64
+
+
+def test_nan_stats_empty():
+    """Test statistics of data without valid values"""
+    vmin, vmax, count, _sum, _sumsq = get_nan_stats(np.full((5, 5), np.nan))
+    assert np.isnan(vmin) and np.isnan(vmax) and count == 0
+    assert np.isnan(get_nan_range(np.zeros((0,), np.uint8))[0])
+
+
+if __name__ == "__main__":
+    test_nan_stats(np.float32, 0)
+    test_nan_range_dtype()
+    test_nan_stats_empty()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the offscreen rendering API
+"""
+
+import os.path as osp
+
+import numpy as np
+import pytest
+from guidata.qthelpers import qt_app_context
+from qtpy import QtGui as QG
+
+from plotpy.builder import make
+from plotpy.plot.offscreen import (
+    OffscreenPlot,
+    RenderJob,
+    export_batch,
+    export_items,
+    render_items,
+)
+
+
+def create_curve_items(index: int) -> list:
+    """Create curve items (module level function: job factories must be picklable)"""
+    x = np.linspace(0.0, 10.0, 500)
+    return [make.curve(x, np.sin(x * (index + 1)), color="b")]
+
+
+def create_image_item(shape: tuple[int, int]):
+    """Create image item"""
+    return make.image(np.random.default_rng(0).uniform(size=shape))
+
+
+def test_render_items():
+    """Test rendering items into images and buffers"""
+    with qt_app_context(exec_loop=False):
+        image = render_items(create_curve_items(0), size=(320, 240))
+        assert (image.width(), image.height()) == (320, 240)
+        assert image.format() == QG.QImage.Format_ARGB32
+        # Rendering into a NumPy buffer
+        out = np.zeros((240, 320), np.uint32)
+        image = render_items([create_image_item((40, 50))], out=out, dpi=150)
+        assert np.unique(out).size > 100
+        assert image.pixel(100, 100) == out[100, 100]
+        assert round(image.dotsPerMeterX() * 0.0254) == 150
+        with pytest.raises(ValueError):
+            render_items(create_curve_items(0), out=np.zeros((10, 10), np.uint8))
+        # Transparent background
+        out[:] = 0
+        render_items(create_curve_items(0), out=out, transparent=True)
+        assert (out >> 24).min() == 0 and (out >> 24).max() == 255
+        # Axis limits, without showing the plot
+        plot = OffscreenPlot(size=(400, 300))
+        for item in create_curve_items(1):
+            plot.add_item(item)
+        plot.set_plot_limits(2.0, 4.0, -0.5, 0.5)
+        image = plot.render()
+        assert not plot.isVisible()
+        assert (image.width(), image.height()) == (400, 300)
+        assert plot.get_plot_limits() == (2.0, 4.0, -0.5, 0.5)
+        # Same resolution, twice the plot size: the layout is the same
+        plot.set_render_size((800, 600), dpi=plot.logicalDpiX() * 2)
+        assert plot.width() == 400
+        assert plot.render().width() == 800
+
+
+def test_aspect_ratio():
+    """Test that the aspect ratio of offscreen image plots is applied"""
+    with qt_app_context(exec_loop=False):
+        plot = OffscreenPlot({"type": "image"}, size=(600, 300))
+        plot.add_item(create_image_item((100, 100)))
+        plot.do_autoscale()
+        assert abs(plot.get_current_aspect_ratio() - 1.0) < 1e-2
+
+
+def test_export_batch(tmp_path):
+    """Test exporting images in worker processes"""
+    jobs = [
+        RenderJob(str(tmp_path / f"curve{index}.png"), create_curve_items, (index,))
+        for index in range(4)
+    ]
+    jobs.append(RenderJob(str(tmp_path / "image.png"), create_image_item, ((30, 40),)))
+    assert export_batch(jobs, processes=2) == [job.filename for job in jobs]
+    with qt_app_context(exec_loop=False):
+        for job in jobs:
+            image = QG.QImage(job.filename)
+            assert (image.width(), image.height()) == job.size
+        # Serial export, in the current process
+        filename = str(tmp_path / "serial.png")
+        job = RenderJob(filename, create_curve_items, (5,), size=(200, 100))
+        assert export_batch([job], processes=0) == [filename]
+        assert QG.QImage(filename).size().width() == 200
+        with pytest.raises(OSError):
+            export_items(str(tmp_path / "image.unknown"), create_curve_items(0))
+    assert not osp.exists(tmp_path / "image.unknown")
+
+
+if __name__ == "__main__":
+    test_render_items()
+    test_aspect_ratio()
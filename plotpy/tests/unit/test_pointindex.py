@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the spatial index of 2-D point clouds
+"""
+
+import numpy as np
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy.builder import make
+from plotpy.histogram2d import histogram2d_stats
+from plotpy.mathutils.pointindex import PointIndex
+
+
+def get_data(size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return random X, Y and Z data (with a few NaN coordinates)"""
+    rng = np.random.default_rng(0)
+    x, y, z = rng.normal(size=size), rng.normal(size=size), rng.random(size)
+    x[::1000] = np.nan
+    return x, y, z
+
+
+def test_point_index_ranges():
+    """Test that index ranges contain all the points inside a rectangle"""
+    x, y, z = get_data(200000)
+    index = PointIndex(x, y, z, grid_size=64)
+    assert np.array_equal(
+        np.sort(index.x[np.isfinite(index.x)]), np.sort(x[np.isfinite(x)])
+    )
+    rect = (-0.5, 0.25, 0.1, 1.2)
+    ranges = index.get_ranges(*rect)
+    selected = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+    assert selected.size < x.size // 4
+    inside = (index.x >= rect[0]) & (index.x <= rect[1])
+    inside &= (index.y >= rect[2]) & (index.y <= rect[3])
+    assert np.isin(np.flatnonzero(inside), selected).all()
+    assert index.get_ranges(10.0, 11.0, 0.0, 1.0) == []
+
+
+def test_point_index_histogram():
+    """Test 2-D histograms computed with the point index"""
+    x, y, z = get_data(500000)
+    index = PointIndex(x, y, z, grid_size=256)
+    stats = ("count", "sum", "min", "max", "mean")
+    # Zoomed in: exact statistics from the visible points
+    rect, nx, ny = (0.3, -0.2, -0.1, 0.4), 50, 40
+    result = index.histogram(*rect, nx, ny, stats)
+    ref = histogram2d_stats(x, y, *rect, nx, ny, z, stats)
+    for name in stats:
+        assert np.allclose(result[name], ref[name], equal_nan=True)
+    # Zoomed out: exact bin counts by default
+    rect, nx, ny = (-5.0, 5.0, -5.0, 5.0), 30, 20
+    level = index.select_count_level(10.0 / nx, 10.0 / ny)
+    assert level is not None and level > 0
+    ref = histogram2d_stats(x, y, *rect, nx, ny)["count"]
+    assert np.array_equal(index.histogram(*rect, nx, ny)["count"], ref)
+    # Zoomed out: approximate bin counts from the count pyramid (opt-in)
+    count = index.histogram(*rect, nx, ny, approximate=True)["count"]
+    assert not np.array_equal(count, ref)
+    assert abs(count.sum() - ref.sum()) <= 1e-6 * ref.sum()
+    assert np.abs(count - ref).max() <= 0.02 * ref.max()
+
+
+def test_histogram2d_item_index():
+    """Test that the 2-D histogram item uses the point index"""
+    x, y, z = get_data(100000)
+    with qt_app_context(exec_loop=False):
+        item = make.histogram2D(x, y, 40, 30, Z=z, computation=2)
+        item.index_min_points = 1000
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        win.show()
+        plot.set_plot_limits(-1.0, 1.0, -1.0, 1.0)
+        plot.replot()
+        plot.grab()
+        assert item.get_point_index() is item._index is not None
+        i1, j1, i2, j2 = item._hist_key[0]
+        ref = histogram2d_stats(x, y, i1, i2, j1, j2, 40, 30, z, ("sum",))
+        assert np.allclose(item.data, ref["sum"], equal_nan=True)
+        item.set_data(x, y, z)
+        assert item._index is None
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_point_index_ranges()
+    test_point_index_histogram()
+    test_histogram2d_item_index()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the culling and batched drawing of polygon maps
+"""
+
+import numpy as np
+from guidata.qthelpers import exec_dialog, qt_app_context
+from qtpy import QtCore as QC
+from qtpy import QtGui as QG
+from qwt import QwtScaleMap
+
+from plotpy.builder import make
+from plotpy.coords import qpointf_array_from_coords
+from plotpy.items import PolygonMapItem
+from plotpy.items.polygonmap import cull_polygons, get_polygon_bounds
+
+COLORS = np.array(
+    [
+        (0xFF000000, 0xFF00FF00),
+        (0xFF0000FF, 0xFF0000FF),
+        (0xFFFF0000, 0xFF808080),
+    ],
+    dtype=np.uint32,
+)
+
+
+def create_map(
+    ncols: int, nrows: int, size: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return a polygon map of non-overlapping squares (or triangles)"""
+    points, offsets = [], []
+    npts = 0
+    for k in range(ncols * nrows):
+        x, y = k % ncols, k // ncols
+        pts = np.array([(x, y), (x + size, y), (x + size, y + size), (x, y + size)])
+        pts = pts[: 3 + k % 2]
+        offsets.append((k, npts))
+        npts += pts.shape[0]
+        points.append(pts)
+    colors = COLORS[np.arange(ncols * nrows) % len(COLORS)]
+    return np.concatenate(points), np.array(offsets, np.int32), colors
+
+
+def get_scale_maps(
+    xmin: float, xmax: float, ymin: float, ymax: float, width: int, height: int
+) -> tuple[QwtScaleMap, QwtScaleMap]:
+    """Return scale maps (Y axis pointing up)"""
+    xmap, ymap = QwtScaleMap(), QwtScaleMap()
+    xmap.setScaleInterval(xmin, xmax)
+    xmap.setPaintInterval(0, width)
+    ymap.setScaleInterval(ymin, ymax)
+    ymap.setPaintInterval(height, 0)
+    return xmap, ymap
+
+
+def test_cull_polygons():
+    """Test polygon bounding boxes and culling against a brute-force search"""
+    pts, n, _c = create_map(30, 20, 0.5)
+    n[5:, 1] = n[6:, 1].tolist() + [pts.shape[0]]  # Last polygon is empty
+    bounds = get_polygon_bounds(pts, n)
+    ends = np.append(n[1:, 1], pts.shape[0])
+    assert np.isnan(bounds[-1]).all()
+    for i in range(n.shape[0] - 1):
+        poly = pts[n[i, 1] : ends[i]]
+        xmin, ymin = poly.min(axis=0)
+        xmax, ymax = poly.max(axis=0)
+        assert bounds[i].tolist() == [xmin, xmax, ymin, ymax]
+    scale = (10.0, -50.0, -20.0, 300.0)
+    large, small = cull_polygons(bounds, scale, (0.0, 0.0, 100.0, 100.0), 0.0)
+    assert np.intersect1d(large, small).size == 0
+    for i, (xmin, xmax, ymin, ymax) in enumerate(bounds[:-1]):
+        x0, x1 = 10.0 * xmin - 50.0, 10.0 * xmax - 50.0
+        y0, y1 = 300.0 - 20.0 * ymax, 300.0 - 20.0 * ymin
+        visible = bool(x1 >= 0.0 and x0 <= 100.0 and y1 >= 0.0 and y0 <= 100.0)
+        assert (i in large) is visible and i not in small
+    large, small = cull_polygons(bounds, (0.1, 0.0, 0.1, 0.0), (0, 0, 5, 5), 0.0)
+    assert large.size == 0 and small.tolist() == list(range(n.shape[0] - 1))
+
+
+def test_qpointf_array():
+    """Test copying canvas coordinates to a Qt array of points"""
+    coords = np.arange(12.0).reshape(6, 2)
+    points = qpointf_array_from_coords(coords)
+    if points is None:  # Qt bindings without Qt arrays of points
+        return
+    assert len(points) == 6
+    assert (points[5].x(), points[5].y()) == (10.0, 11.0)
+    # Pairs of points (e.g. lines given as x1, y1, x2, y2 columns)
+    points = qpointf_array_from_coords(coords.reshape(3, 4))
+    assert len(points) == 6 and points[1].x() == 2.0
+    assert len(qpointf_array_from_coords(np.zeros((0, 2)))) == 0
+
+
+def test_polygonmap_draw():
+    """Test drawing polygons batched by color, against one call per polygon"""
+    pts, n, c = create_map(30, 20, 0.8)
+    xmap, ymap = get_scale_maps(-2.0, 25.0, -1.0, 15.0, 400, 300)
+    images = []
+    with qt_app_context(exec_loop=False):
+        item = PolygonMapItem()
+        item.set_data(pts, n, c)
+        for batched in (True, False):
+            image = QG.QImage(400, 300, QG.QImage.Format_ARGB32)
+            image.fill(0)
+            painter = QG.QPainter(image)
+            if batched:
+                item.draw(painter, xmap, ymap, QC.QRectF(0, 0, 400, 300))
+            else:
+                ends = np.append(n[1:, 1], pts.shape[0])
+                for i in range(n.shape[0]):
+                    poly = pts[n[i, 1] : ends[i]]
+                    cx, cy = (
+                        xmap.transform_scalar(poly[:, 0]),
+                        ymap.transform_scalar(poly[:, 1]),
+                    )
+                    painter.setPen(QG.QPen(QG.QColor.fromRgba(int(c[i, 0]))))
+                    painter.setBrush(QG.QBrush(QG.QColor.fromRgba(int(c[i, 1]))))
+                    painter.drawPolygon(
+                        QG.QPolygonF([QC.QPointF(*p) for p in zip(cx, cy)])
+                    )
+            painter.end()
+            images.append(image)
+    assert images[0] == images[1]
+
+
+def test_polygonmap_draw_order():
+    """Test that overlapping polygons of different colors are drawn in index
+    order (the last polygon is on top)"""
+    square = np.array([(0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0)])
+    pts = np.concatenate((square, square + 1.0))
+    n = np.array([(0, 0), (1, 4)], np.int32)
+    # The color of the second polygon comes first in color order
+    c = COLORS[[2, 1]]
+    xmap, ymap = get_scale_maps(-0.5, 3.5, -0.5, 3.5, 100, 100)
+    with qt_app_context(exec_loop=False):
+        item = PolygonMapItem()
+        item.set_data(pts, n, c)
+        image = QG.QImage(100, 100, QG.QImage.Format_ARGB32)
+        image.fill(0)
+        painter = QG.QPainter(image)
+        item.draw(painter, xmap, ymap, QC.QRectF(0, 0, 100, 100))
+        painter.end()
+    # Points (0.5, 0.5), (1.5, 1.5) and (2.5, 2.5) of the canvas are covered by
+    # the first square only, by both squares and by the second square only
+    assert image.pixel(25, 75) == c[0, 1]
+    assert image.pixel(50, 50) == c[1, 1]
+    assert image.pixel(75, 25) == c[1, 1]
+
+
+def test_polygonmap_draw_points():
+    """Test drawing polygons smaller than a pixel as points"""
+    pts, n, c = create_map(50, 40, 0.01)
+    xmap, ymap = get_scale_maps(-0.5, 99.5, -0.5, 99.5, 100, 100)
+    with qt_app_context(exec_loop=False):
+        item = PolygonMapItem()
+        item.set_data(pts, n, c)
+        image = QG.QImage(100, 100, QG.QImage.Format_ARGB32)
+        image.fill(0)
+        painter = QG.QPainter(image)
+        item.draw(painter, xmap, ymap, QC.QRectF(0, 0, 100, 100))
+        painter.end()
+        for k in range(n.shape[0]):
+            col, row = k % 50, 99 - k // 50
+            assert image.pixel(col, row) == c[k, 0]
+        assert image.pixel(60, 10) == 0
+
+
+def test_polygonmap_item():
+    """Test drawing a large polygon map in a plot"""
+    pts, n, c = create_map(400, 250, 0.7)
+    with qt_app_context(exec_loop=False):
+        item = PolygonMapItem()
+        item.set_data(pts, n, c)
+        win = make.dialog(type="curve")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        win.show()
+        for limits in ((-1.0, 401.0, -1.0, 251.0), (10.0, 30.0, 10.0, 20.0)):
+            plot.set_plot_limits(*limits)
+            plot.replot()
+            plot.grab()
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_cull_polygons()
+    test_qpointf_array()
+    test_polygonmap_draw()
+    test_polygonmap_draw_order()
+    test_polygonmap_draw_points()
+    test_polygonmap_item()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the batch extraction of image profiles
+"""
+
+import numpy as np
+import pytest
+
+from plotpy.mathutils.profiles import extract_profiles, rectangles_to_segments
+
+
+def sample(data: np.ndarray, x: float, y: float) -> float:
+    """Return the bilinear interpolation of data at (x, y) pixel coordinates"""
+    ni, nj = data.shape
+    if not (0 <= x <= nj and 0 <= y <= ni):
+        return np.nan
+    u, v = min(max(x - 0.5, 0), nj - 1), min(max(y - 0.5, 0), ni - 1)
+    j0, i0 = min(int(u), max(nj - 2, 0)), min(int(v), max(ni - 2, 0))
+    fu, fv = u - j0, v - i0
+    value = 0.0
+    for i, wi in ((i0, 1 - fv), (i0 + 1, fv)):
+        for j, wj in ((j0, 1 - fu), (j0 + 1, fu)):
+            if wi * wj > 0:
+                value += wi * wj * data[i, j]
+    return value
+
+
+def get_profile(
+    data: np.ndarray, segment: np.ndarray, width: float, method: str, npoints: int
+) -> np.ndarray:
+    """Return the profile of data along a segment (brute-force)"""
+    x0, y0, x1, y1 = segment
+    length = np.hypot(x1 - x0, y1 - y0)
+    nx, ny = (y0 - y1) / length, (x1 - x0) / length
+    nw = max(int(round(width)), 1)
+    func = {"mean": np.mean, "sum": np.sum, "max": np.max}[method]
+    profile = []
+    for t in np.linspace(0.0, 1.0, npoints):
+        xs, ys = x0 + t * (x1 - x0), y0 + t * (y1 - y0)
+        values = [
+            sample(data, xs + (m - 0.5 * (nw - 1)) * nx, ys + (m - 0.5 * (nw - 1)) * ny)
+            for m in range(nw)
+        ]
+        values = [value for value in values if not np.isnan(value)]
+        profile.append(func(values) if values else np.nan)
+    return np.array(profile)
+
+
+@pytest.mark.parametrize("method", ("mean", "sum", "max"))
+def test_extract_profiles(method):
+    """Test profile extraction against a brute-force computation"""
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 1000, (60, 80)).astype(np.uint16)
+    segments = rng.uniform(-10.0, 90.0, (20, 4))
+    widths = rng.uniform(0.5, 12.0, 20)
+    profiles = extract_profiles(data, segments, widths, method)
+    assert len(profiles) == 20
+    for segment, width, profile in zip(segments, widths, profiles):
+        length = np.hypot(segment[2] - segment[0], segment[3] - segment[1])
+        assert profile.size == int(np.ceil(length)) + 1
+        ref = get_profile(data, segment, width, method, profile.size)
+        assert np.allclose(profile, ref, equal_nan=True)
+    # Fixed number of points, several threads
+    profiles = extract_profiles(data, segments, widths, method, 50, nthreads=4)
+    assert np.array(profiles).shape == (20, 50)
+    ref = get_profile(data, segments[3], widths[3], method, 50)
+    assert np.allclose(profiles[3], ref, equal_nan=True)
+
+
+def test_extract_profiles_nan():
+    """Test profile extraction with NaN and masked values"""
+    data = np.arange(20.0).reshape(4, 5)
+    # Pixel centers along the first row and the first column
+    profiles = extract_profiles(data, [[0.5, 0.5, 4.5, 0.5], [0.5, 0.5, 0.5, 3.5]])
+    assert np.array_equal(profiles[0], data[0])
+    assert np.array_equal(profiles[1], data[:, 0])
+    data[1, 2] = np.nan
+    profile, wide_profile = extract_profiles(data, [[0.5, 1.5, 4.5, 1.5]] * 2, [1, 3])
+    assert np.isnan(profile[2]) and profile[1] == 6.0
+    assert wide_profile[2] == 7.0 and wide_profile[1] == 6.0
+    mask = np.zeros(data.shape, bool)
+    mask[2, 1:] = True
+    (profile,) = extract_profiles(np.ma.array(data, mask=mask), [0.5, 2.5, 4.5, 2.5])
+    assert profile[0] == 10.0 and np.isnan(profile[1:]).all()
+
+
+def test_rectangles_to_segments():
+    """Test conversion of oriented rectangles to segments"""
+    segments, widths = rectangles_to_segments([[0, 0, 4, 0, 4, 2, 0, 2]])
+    assert segments.tolist() == [[0.0, 1.0, 4.0, 1.0]] and widths.tolist() == [2.0]
+    data = np.tile(np.arange(10.0), (10, 1))
+    (profile,) = extract_profiles(data, segments + 0.5, widths, "mean", 5)
+    assert np.array_equal(profile, np.arange(5.0))
+
+
+if __name__ == "__main__":
+    test_extract_profiles("mean")
+    test_extract_profiles_nan()
+    test_rectangles_to_segments()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the multi-resolution image pyramid
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy.builder import make
+from plotpy.mathutils.pyramid import ImagePyramid, reduce_image
+
+
+def test_reduce_image():
+    """Test 2x2 reduction methods"""
+    data = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]], np.float32)
+    assert np.array_equal(reduce_image(data, 2, "mean"), [[3, 4.5], [7.5, 9]])
+    assert np.array_equal(reduce_image(data, 2, "min"), [[1, 3], [7, 9]])
+    assert np.array_equal(reduce_image(data, 2, "max"), [[5, 6], [8, 9]])
+    assert np.array_equal(reduce_image(data, 2, "nearest"), [[1, 3], [7, 9]])
+    data[0, 0] = np.nan
+    assert reduce_image(data, 2, "mean")[0, 0] == pytest.approx(11.0 / 3.0)
+    idata = np.arange(16, dtype=np.uint16).reshape(4, 4)
+    reduced = reduce_image(idata, 4, "mean")
+    assert reduced.dtype == np.uint16 and reduced.shape == (1, 1)
+
+
+@pytest.mark.parametrize("dtype", (np.float32, np.uint16))
+@pytest.mark.parametrize("method", ("mean", "min", "max", "nearest"))
+def test_reduce_masked_image(dtype, method):
+    """Test that masked pixels are ignored by reduction methods"""
+    data = np.ma.MaskedArray(np.ones((64, 48), dtype), False)
+    data[10:40, 5:31] = np.ma.masked
+    data.data[10:40, 5:31] = 1000
+    pyramid = ImagePyramid(data, method)
+    for level in (1, 2, 4, 3):
+        reduced = pyramid.get_level(level)
+        factor = 2**level
+        ref_mask = reduce_image(data.mask.astype(np.uint8), factor, "min") == 1
+        if method == "nearest":
+            ref_mask = data.mask[::factor, ::factor]
+        assert isinstance(reduced, np.ma.MaskedArray) and reduced.dtype == dtype
+        assert np.array_equal(reduced.mask, ref_mask)
+        assert np.all(reduced.filled(1) == 1)
+        assert np.all(reduced.data[ref_mask] == 1000)
+
+
+def test_pyramid_levels():
+    """Test pyramid level selection, caching and memory budget"""
+    data = np.random.rand(1024, 800)
+    pyramid = ImagePyramid(data)
+    assert pyramid.select_level(0.5, 0.5) == 0
+    assert pyramid.select_level(3.9, 5.0) == 1
+    assert pyramid.select_level(1e6, 1e6) == pyramid.get_max_level() == 10
+    level, src_rect = pyramid.get_src_data((0, 0, 800, 1024), (100, 100))
+    assert level.shape == (128, 100)
+    assert src_rect == (0, 0, 100, 128)
+    assert pyramid.get_level(3) is level
+    # Reduced levels may be built from other cached levels
+    assert np.allclose(pyramid.get_level(4), reduce_image(data, 16, "mean"))
+    # Levels which do not fit in the memory budget are not built
+    pyramid = ImagePyramid(data, "max", max_memory=data.nbytes // 16)
+    assert pyramid.get_level(1) is None
+    assert pyramid.get_level(2) is not None
+    assert pyramid.get_src_data((0, 0, 800, 1024), (512, 400))[0] is data
+    pyramid.get_level(3)
+    assert pyramid.nbytes <= pyramid.max_memory
+
+
+def test_image_item_pyramid():
+    """Test drawing an image item with a pyramid"""
+    data = np.random.rand(4000, 3000).astype(np.float32)
+    with qt_app_context(exec_loop=False):
+        item = make.image(data, pyramid="mean")
+        assert item.get_pyramid_mode() == "mean"
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        win.show()
+        plot.replot()
+        plot.grab()
+        assert item._pyramid is not None and item._pyramid.nbytes > 0
+        item.set_data(data * 2)
+        assert item._pyramid is None
+        plot.replot()
+        plot.grab()
+        assert item._pyramid.data is item.data
+        item.data[:100] = 0.0
+        item.data_changed()
+        assert item._pyramid is None
+        plot.replot()
+        plot.grab()
+        assert item._pyramid.get_level(2)[:25].max() == 0.0
+        item.set_pyramid_mode(None)
+        plot.replot()
+        plot.grab()
+        assert item._pyramid is None
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_reduce_image()
+    test_reduce_masked_image(np.float32, "mean")
+    test_pyramid_levels()
+    test_image_item_pyramid()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the conversion of RGB(A) data to ARGB32 pixels
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import qt_app_context
+
+from plotpy._scaler import INTERP_LINEAR, INTERP_NEAREST, _pack_rgb, _scale_rect
+from plotpy.builder import make
+from plotpy.constants import LUTAlpha
+
+
+def pack(data: np.ndarray, alpha: int, bgr: bool = False) -> np.ndarray:
+    """Pack RGB(A) data in ARGB32 pixels (reference implementation)"""
+    data = data.astype(np.uint32)
+    red, blue = (data[..., 2], data[..., 0]) if bgr else (data[..., 0], data[..., 2])
+    alpha = data[..., 3] if alpha < 0 else alpha
+    return (alpha << 24) | (red << 16) | (data[..., 1] << 8) | blue
+
+
+@pytest.mark.parametrize("nthreads", (1, 3))
+def test_pack_rgb(nthreads):
+    """Test packing kernel against the reference implementation"""
+    data = np.random.default_rng(0).integers(0, 256, (97, 131, 4), dtype=np.uint8)
+    for src in (data, data[:, :, :3], data[::2, ::-3], np.asfortranarray(data)):
+        for alpha in (-1, 0, 128) if src.shape[2] == 4 else (255,):
+            for bgr in (False, True):
+                dst = np.zeros(src.shape[:2], np.uint32)
+                _pack_rgb(src, dst, alpha, bgr, nthreads)
+                assert np.array_equal(dst, pack(src, alpha, bgr))
+    # BGRA data with contiguous pixels is already packed
+    assert np.array_equal(data.view(np.uint32)[..., 0], pack(data, -1, True))
+    with pytest.raises(ValueError):
+        _pack_rgb(data[:, :, :3], np.zeros((97, 131), np.uint32), -1)
+    with pytest.raises(ValueError):
+        _pack_rgb(data, np.zeros((97, 130), np.uint32), -1)
+    with pytest.raises(TypeError):
+        _pack_rgb(data.astype(np.uint16), np.zeros((97, 131), np.uint32), -1)
+
+
+@pytest.mark.parametrize("interp", (INTERP_NEAREST, INTERP_LINEAR))
+def test_scale_rect_rgb(interp):
+    """Test rescaling of RGB(A) data packed on the fly"""
+    data = np.random.default_rng(1).integers(0, 256, (97, 131, 4), dtype=np.uint8)
+    packed = pack(data, -1)
+    # Sampling steps are powers of 2: no rounding error in source coordinates
+    for src_rect, shape in (
+        ((-3.5, 2.25, 120.5, 82.25), (160, 248)),
+        ((10.0, 5.0, 30.0, 20.0), (240, 320)),
+        ((0.0, 0.0, 131.0, 97.0), (97, 131)),
+        ((120.0, 90.0, -8.0, -6.0), (48, 64)),
+        ((200.0, 0.0, 300.0, 50.0), (20, 20)),
+    ):
+        for dst_rect in ((0, 0, shape[1], shape[0]), (5, 3, shape[1] - 7, 11)):
+            ref = np.zeros(shape, np.uint32)
+            rect = _scale_rect(packed, src_rect, ref, dst_rect, None, (interp,), 2)
+            dst = np.zeros(shape, np.uint32)
+            assert _scale_rect(data, src_rect, dst, dst_rect, (-1,), (interp,)) == rect
+            assert np.array_equal(dst, ref)
+    dst = np.zeros((97, 131), np.uint32)
+    _scale_rect(data[..., 2::-1], (0, 0, 131, 97), dst, (0, 0, 131, 97), (255, 1), (0,))
+    assert np.array_equal(dst, pack(data, 255))
+
+
+def test_rgb_image_item():
+    """Test zero-copy and lazy packing of RGB image items"""
+    rgba = np.random.default_rng(2).integers(0, 256, (200, 300, 4), dtype=np.uint8)
+    bgra = np.ascontiguousarray(rgba[..., [2, 1, 0, 3]])
+    with qt_app_context(exec_loop=False):
+        item = make.rgbimage(rgba)
+        item.param.alpha_function = LUTAlpha.CONSTANT.value
+        item.recompute_alpha_channel()
+        assert np.array_equal(item.data, pack(rgba, -1))
+        assert not np.shares_memory(item.data, rgba)
+        item.set_data(bgra, channel_order="BGR")
+        assert np.shares_memory(item.data, bgra)
+        assert np.array_equal(item.data, pack(rgba, -1))
+        item.set_data(rgba[..., :3])
+        assert np.array_equal(item.data, pack(rgba, int(255 * item.param.alpha)))
+        with pytest.raises(ValueError):
+            item.set_data(rgba, channel_order="ARGB")
+        with pytest.raises(ValueError):
+            item.set_data(rgba, lazy=True)  # RGBA data is not packed
+        # Constant alpha: BGRA data is not copied, alpha is applied when drawn
+        item.param.alpha_function = LUTAlpha.NONE.value
+        lazy_item = make.rgbimage(rgba)
+        lazy_item.param.alpha_function = LUTAlpha.NONE.value
+        lazy_item.set_data(bgra, channel_order="BGR", lazy=True)
+        assert np.shares_memory(lazy_item.data, bgra)
+        item.set_data(rgba)
+        assert not np.shares_memory(item.data, rgba)
+        # Item data (used by cross sections, export, etc.) has the same colors
+        assert np.array_equal(lazy_item.data & 0xFFFFFF, item.data & 0xFFFFFF)
+        assert lazy_item.get_data(1, 1) & 0xFFFFFF == item.get_data(1, 1) & 0xFFFFFF
+        images = []
+        for image_item in (item, lazy_item):
+            win = make.dialog(type="image", size=(400, 300))
+            plot = win.manager.get_plot()
+            plot.add_item(image_item)
+            win.show()
+            plot.replot()
+            images.append(plot.grab().toImage())
+            win.close()
+        assert images[0] == images[1]
+
+
+if __name__ == "__main__":
+    test_pack_rgb(3)
+    test_scale_rect_rgb(INTERP_LINEAR)
+    test_rgb_image_item()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the multi-threaded rendering of the `_scaler` engine
+"""
+
+import numpy as np
+import pytest
+
+from plotpy._scaler import (
+    INTERP_AA,
+    INTERP_LINEAR,
+    INTERP_NEAREST,
+    _scale_rect,
+    _scale_tr,
+    _scale_xy,
+)
+from plotpy.constants import LUT_SIZE
+
+INTERPOLATIONS = (
+    (INTERP_NEAREST,),
+    (INTERP_LINEAR,),
+    (INTERP_AA, np.ones((3, 3), np.float32)),
+)
+
+
+def get_lut() -> tuple[float, float, None, np.ndarray]:
+    """Return a LUT tuple mapping [0, 1] to the whole colormap"""
+    cmap = np.arange(LUT_SIZE, dtype=np.uint32)
+    return (float(LUT_SIZE - 1), 0.0, None, cmap)
+
+
+@pytest.mark.parametrize("interp", INTERPOLATIONS)
+@pytest.mark.parametrize("nthreads", (2, 3, 0))
+def test_scale_rect_threads(interp, nthreads):
+    """Test that _scale_rect gives the same result with several threads"""
+    src = np.random.rand(256, 200).astype(np.float32)
+    dst_rect = (0, 0, 400, 512)
+    results = []
+    for nth in (1, nthreads):
+        dst = np.zeros((512, 400), np.uint32)
+        res = _scale_rect(src, (0, 0, 200, 256), dst, dst_rect, get_lut(), interp, nth)
+        assert res == dst_rect
+        results.append(dst)
+    assert np.array_equal(*results)
+
+
+@pytest.mark.parametrize("nthreads", (2, 0))
+def test_scale_tr_threads(nthreads):
+    """Test that _scale_tr gives the same result with several threads"""
+    src = np.random.rand(300, 300)
+    mat = np.array([[0.5, 0.0, 10.0], [0.0, 0.5, 5.0], [0.0, 0.0, 1.0]], float)
+    results = []
+    for nth in (1, nthreads):
+        dst = np.zeros((400, 300), np.float64)
+        _scale_tr(
+            src, mat, dst, (0, 0, 300, 400), (1.0, 0.0, None), (INTERP_LINEAR,), nth
+        )
+        results.append(dst)
+    assert np.array_equal(*results)
+
+
+@pytest.mark.parametrize("nthreads", (2, 0))
+def test_scale_xy_threads(nthreads):
+    """Test that _scale_xy gives the same result with several threads"""
+    src = np.random.rand(128, 128).astype(np.float32)
+    x = np.linspace(0.0, 1.0, 129) ** 2
+    y = np.linspace(0.0, 1.0, 129)
+    results = []
+    for nth in (1, nthreads):
+        dst = np.zeros((256, 256), np.uint32)
+        _scale_xy(
+            src,
+            (x, y, (0.0, 0.0, 1.0, 1.0)),
+            dst,
+            (0, 0, 256, 256),
+            get_lut(),
+            (INTERP_NEAREST,),
+            nth,
+        )
+        results.append(dst)
+    assert np.array_equal(*results)
+
+
+if __name__ == "__main__":
+    test_scale_rect_threads((INTERP_LINEAR,), 0)
+    test_scale_tr_threads(0)
+    test_scale_xy_threads(0)
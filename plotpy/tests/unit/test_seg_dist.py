@@ -24,6 +24,10 @@ def test_seg_dist_v():
     ix, dist = seg_dist_v((2.1, 3.3), a[:-1, 0], a[:-1, 1], a[1:, 0], a[1:, 1])
     assert ix == 0
     assert round(dist, 2) == 0.85
+    # Projection outside of the segment: distance to the closest end
+    x0, y0, x1, y1 = np.array([0.0]), np.array([0.0]), np.array([1.0]), np.array([0.0])
+    assert seg_dist_v((4.0, 4.0), x0, y0, x1, y1)[1] == 5.0
+    assert seg_dist_v((0.5, -2.0), x0, y0, x1, y1)[1] == 2.0
 
 
 if __name__ == "__main__":
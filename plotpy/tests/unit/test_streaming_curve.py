@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the streaming curve item (ring buffer)
+"""
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy.builder import make
+from plotpy.items import StreamingCurveItem
+
+
+def check_curve(curve: StreamingCurveItem, x: np.ndarray, y: np.ndarray) -> None:
+    """Check curve data and bounds against reference data"""
+    cx, cy = curve.get_data()
+    assert np.array_equal(cx, x) and np.array_equal(cy, y)
+    assert curve.dataSize() == x.size
+    assert curve.get_data_bounds() == (x.min(), x.max(), y.min(), y.max())
+    assert curve.is_x_sorted() == bool((x[1:] >= x[:-1]).all())
+
+
+def test_streaming_curve_maxlen():
+    """Test ring buffer with a maximum number of points"""
+    rng = np.random.default_rng(0)
+    curve = StreamingCurveItem(maxlen=1000)
+    x, y = np.arange(10000.0), rng.normal(size=10000)
+    y[10] = np.nan
+    position = 0
+    for size in rng.integers(1, 300, 60):
+        curve.extend(x[position : position + size], y[position : position + size])
+        position += size
+        ref_x, ref_y = x[:position], y[:position]
+        finite = np.isfinite(ref_y)
+        check_curve(curve, ref_x[finite][-1000:], ref_y[finite][-1000:])
+    # Chunk larger than the buffer
+    curve.extend(x[:5000], y[:5000])
+    check_curve(curve, x[4000:5000], y[4000:5000])
+    # Unsorted X data
+    curve.append(0.0, 100.0)
+    check_curve(curve, np.append(x[4001:5000], 0.0), np.append(y[4001:5000], 100.0))
+    curve.set_data(x[:11], y[:11])
+    assert curve.get_size() == 10 and curve.is_x_sorted()
+    with pytest.raises(ValueError):
+        curve.extend(x[:10], y[:5])
+
+
+def test_streaming_curve_max_age():
+    """Test ring buffer with a maximum age of points"""
+    curve = make.curve([], [], max_age=10.0)
+    assert isinstance(curve, StreamingCurveItem)
+    t = np.linspace(0.0, 100.0, 1001)
+    for i in range(0, t.size, 50):
+        curve.extend(t[i : i + 50], np.sin(t[i : i + 50]))
+        tmax = t[min(i + 50, t.size) - 1]
+        ref_t = t[(t >= tmax - 10.0) & (t <= tmax)]
+        check_curve(curve, ref_t, np.sin(ref_t))
+
+
+def test_streaming_curve_refresh():
+    """Test that only the new segment is painted when the axes have not moved"""
+    with qt_app_context(exec_loop=False):
+        curve = make.curve(np.arange(100.0), np.zeros(100), maxlen=150)
+        win = make.dialog(type="curve")
+        plot = win.manager.get_plot()
+        plot.add_item(curve)
+        win.show()
+        plot.set_plot_limits(0.0, 200.0, -1.0, 1.0)
+        plot.replot()
+        plot.grab()
+        replots, segments = [], []
+        plot.replot = lambda: replots.append(True)
+        curve.directPaint = lambda from_, to: segments.append((from_, to))
+        curve.extend(np.arange(100.0, 120.0), np.ones(20))
+        assert segments == [(99, 119)] and not replots
+        # Evicted points are visible: the whole plot is replotted
+        curve.extend(np.arange(120.0, 160.0), np.ones(40))
+        assert len(replots) == 1 and len(segments) == 1
+        # Evicted points are outside the view
+        del plot.replot
+        plot.set_plot_limits(50.0, 200.0, -1.0, 1.0)
+        plot.replot()
+        plot.grab()
+        plot.replot = lambda: replots.append(True)
+        curve.append(160.0, 0.5)
+        assert segments[-1] == (148, 149) and len(replots) == 1
+        del plot.replot
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_streaming_curve_maxlen()
+    test_streaming_curve_max_age()
+    test_streaming_curve_refresh()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the BSD 3-Clause
+# (see plotpy/LICENSE for details)
+
+"""
+Unit tests for the tiled (out-of-core) image item
+"""
+
+import os.path as osp
+
+import numpy as np
+import pytest
+from guidata.qthelpers import exec_dialog, qt_app_context
+
+from plotpy.builder import make
+from plotpy.items import (
+    ArrayTileSource,
+    TileCache,
+    TiledArray,
+    TiledImageItem,
+    TileSource,
+)
+
+
+def test_tiled_array():
+    """Test tiled array indexing and tile cache"""
+    data = np.random.rand(700, 900)
+    source = ArrayTileSource(data, tile_size=128)
+    assert source.nlevels == 4
+    cache = TileCache(max_memory=10 * 128 * 128 * data.itemsize)
+    tarr = TiledArray(source, cache)
+    assert tarr.shape == data.shape and tarr.dtype == data.dtype
+    assert np.array_equal(tarr[10:600:3, 100:800], data[10:600:3, 100:800])
+    assert np.array_equal(tarr[650, :], data[650, :])
+    assert np.array_equal(tarr[:, -1], data[:, -1])
+    assert np.array_equal(tarr[::-2, 5], data[::-2, 5])
+    assert tarr[699, 899] == data[699, 899]
+    rows, cols = np.array([5, 300, 650]), np.array([800, 2, 400])
+    assert np.array_equal(tarr[rows, cols], data[rows, cols])
+    assert np.array_equal(tarr.get_region(2, 0, 0, 225, 175), data[::4, ::4])
+    assert cache.nbytes <= cache.max_memory
+    assert np.array_equal(np.asarray(tarr), data)
+
+
+class RangeTileSource(ArrayTileSource):
+    """Tile source providing the exact range of data"""
+
+    def get_range(self) -> tuple[float, float]:
+        """Return the exact range of data"""
+        return 0.0, float(self.data.max())
+
+
+def test_tile_source():
+    """Test tile source protocol and exact LUT range"""
+    with pytest.raises(TypeError):
+        TileSource()  # pylint: disable=abstract-class-instantiated
+    data = np.zeros((3000, 2500), np.uint8)
+    data[1001, 2001] = 200  # Not in the overview level
+    with qt_app_context(exec_loop=False):
+        item = make.image(ArrayTileSource(data))
+        assert item.get_lut_range() == (0, 0)
+        item = make.image(RangeTileSource(data))
+        assert item.get_lut_range() == (0.0, 200.0)
+
+
+def test_tiled_image_item(tmpdir):
+    """Test drawing a memory-mapped image with a tiled image item"""
+    fname = osp.join(str(tmpdir), "image.raw")
+    data = np.memmap(fname, dtype=np.uint16, mode="w+", shape=(3000, 2500))
+    data[:] = np.arange(2500, dtype=np.uint16)[np.newaxis, :]
+    data.flush()
+    with qt_app_context(exec_loop=False):
+        item = make.image(data, tiled=256)
+        assert isinstance(item, TiledImageItem)
+        # Resolution levels come from the tile source: no pyramid
+        item.set_pyramid_mode(None)
+        assert item.get_pyramid_mode() is None
+        with pytest.raises(ValueError):
+            item.set_pyramid_mode("mean")
+        # LUT range is computed on the overview level: it is approximate
+        vmin, vmax = item.get_lut_range()
+        assert vmin == 0 and 2499 - 2 <= vmax <= 2499
+        overview, level = item.get_overview()
+        assert level == 1 and overview.shape == (1500, 1250)
+        hist, _bins = item.get_histogram(10)
+        assert hist.sum() == overview.size
+        assert np.array_equal(item.get_xsection(100)[1], data[100, :])
+        item.tile_cache.clear()
+        win = make.dialog(type="image")
+        plot = win.manager.get_plot()
+        plot.add_item(item)
+        win.show()
+        plot.replot()
+        plot.grab()
+        # Zoomed out: the whole image is drawn from a reduced level
+        assert all(key[1] > 0 for key in item.tile_cache._tiles)
+        nbytes = item.tile_cache.nbytes
+        plot.set_plot_limits(0, 200, 0, 200)
+        plot.replot()
+        plot.grab()
+        # Zoomed in: only a few full resolution tiles are read
+        full_res = [key for key in item.tile_cache._tiles if key[1] == 0]
+        assert 0 < len(full_res) <= 4
+        assert item.tile_cache.nbytes - nbytes <= 4 * 256 * 256 * data.itemsize
+        exec_dialog(win)
+
+
+if __name__ == "__main__":
+    test_tiled_array()
+    test_tile_source()
+    test_tiled_image_item(".")
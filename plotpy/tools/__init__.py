@@ -3,97 +3,189 @@
 # pylint: disable=unused-import
 # flake8: noqa
 
-from .annotation import (
-    AnnotatedCircleTool,
-    AnnotatedEllipseTool,
-    AnnotatedObliqueRectangleTool,
-    AnnotatedPointTool,
-    AnnotatedRectangleTool,
-    AnnotatedSegmentTool,
-    AnnotatedPolygonTool,
-)
-from .axes import AxisScaleTool, PlaceAxesTool
-from .base import (
-    ActionTool,
-    CommandTool,
-    DefaultToolbarID,
-    InteractiveTool,
-    PanelTool,
-    RectangularActionTool,
-    ToggleTool,
-)
-from .cross_section import (
-    AverageCrossSectionTool,
-    CrossSectionTool,
-    LCSPanelTool,
-    LineCrossSectionTool,
-    ObliqueCrossSectionTool,
-    OCSPanelTool,
-    XCSPanelTool,
-    YCSPanelTool,
-)
-from .cursor import HCursorTool, HRangeTool, VCursorTool, XCursorTool
-from .curve import (
-    AntiAliasingTool,
-    CurveStatsTool,
-    DownSamplingTool,
-    EditPointTool,
-    SelectPointsTool,
-    SelectPointTool,
-)
-from .image import (
-    AspectRatioTool,
-    ColormapTool,
-    ContrastPanelTool,
-    ImageMaskTool,
-    ImageStatsTool,
-    ZAxisLogTool,
-    LockTrImageTool,
-    OpenImageTool,
-    ReverseColormapTool,
-    LockLUTRangeTool,
-    ReverseXAxisTool,
-    ReverseYAxisTool,
-    RotateCropTool,
-    RotationCenterTool,
-)
-from .item import (
-    DeleteItemTool,
-    EditItemDataTool,
-    ExportItemDataTool,
-    ItemCenterTool,
-    ItemListPanelTool,
-    LoadItemsTool,
-    SaveItemsTool,
-)
-from .label import LabelTool
-from .misc import (
-    AboutTool,
-    CopyToClipboardTool,
-    FilterTool,
-    HelpTool,
-    OpenFileTool,
-    PrintTool,
-    SaveAsTool,
-    SnapshotTool,
-)
-from .plot import (
-    BasePlotMenuTool,
-    DisplayCoordsTool,
-    DoAutoscaleTool,
-    DummySeparatorTool,
-    RectangularSelectionTool,
-    RectZoomTool,
-)
-from .selection import SelectTool
-from .shape import (
-    CircleTool,
-    EllipseTool,
-    PolygonTool,
-    MultiLineTool,
-    ObliqueRectangleTool,
-    PointTool,
-    RectangleTool,
-    RectangularShapeTool,
-    SegmentTool,
+from typing import TYPE_CHECKING
+
+from plotpy.lazy import attach
+
+if TYPE_CHECKING:
+    from .annotation import (
+        AnnotatedCircleTool,
+        AnnotatedEllipseTool,
+        AnnotatedObliqueRectangleTool,
+        AnnotatedPointTool,
+        AnnotatedRectangleTool,
+        AnnotatedSegmentTool,
+        AnnotatedPolygonTool,
+    )
+    from .axes import AxisScaleTool, PlaceAxesTool
+    from .base import (
+        ActionTool,
+        CommandTool,
+        DefaultToolbarID,
+        InteractiveTool,
+        PanelTool,
+        RectangularActionTool,
+        ToggleTool,
+    )
+    from .cross_section import (
+        AverageCrossSectionTool,
+        CrossSectionTool,
+        LCSPanelTool,
+        LineCrossSectionTool,
+        ObliqueCrossSectionTool,
+        OCSPanelTool,
+        XCSPanelTool,
+        YCSPanelTool,
+    )
+    from .cursor import HCursorTool, HRangeTool, VCursorTool, XCursorTool
+    from .curve import (
+        AntiAliasingTool,
+        CurveStatsTool,
+        DownSamplingTool,
+        EditPointTool,
+        SelectPointsTool,
+        SelectPointTool,
+    )
+    from .image import (
+        AspectRatioTool,
+        ColormapTool,
+        ContrastPanelTool,
+        ImageMaskTool,
+        ImageStatsTool,
+        ZAxisLogTool,
+        LockTrImageTool,
+        OpenImageTool,
+        ReverseColormapTool,
+        LockLUTRangeTool,
+        ReverseXAxisTool,
+        ReverseYAxisTool,
+        RotateCropTool,
+        RotationCenterTool,
+    )
+    from .item import (
+        DeleteItemTool,
+        EditItemDataTool,
+        ExportItemDataTool,
+        ItemCenterTool,
+        ItemListPanelTool,
+        LoadItemsTool,
+        SaveItemsTool,
+    )
+    from .label import LabelTool
+    from .misc import (
+        AboutTool,
+        CopyToClipboardTool,
+        FilterTool,
+        HelpTool,
+        OpenFileTool,
+        PrintTool,
+        SaveAsTool,
+        SnapshotTool,
+    )
+    from .plot import (
+        BasePlotMenuTool,
+        DisplayCoordsTool,
+        DoAutoscaleTool,
+        DummySeparatorTool,
+        RectangularSelectionTool,
+        RectZoomTool,
+    )
+    from .selection import SelectTool
+    from .shape import (
+        CircleTool,
+        EllipseTool,
+        PolygonTool,
+        MultiLineTool,
+        ObliqueRectangleTool,
+        PointTool,
+        RectangleTool,
+        RectangularShapeTool,
+        SegmentTool,
+    )
+
+# Objects are imported from their submodule on first access (see plotpy.lazy)
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AnnotatedCircleTool": ".annotation",
+        "AnnotatedEllipseTool": ".annotation",
+        "AnnotatedObliqueRectangleTool": ".annotation",
+        "AnnotatedPointTool": ".annotation",
+        "AnnotatedRectangleTool": ".annotation",
+        "AnnotatedSegmentTool": ".annotation",
+        "AnnotatedPolygonTool": ".annotation",
+        "AxisScaleTool": ".axes",
+        "PlaceAxesTool": ".axes",
+        "ActionTool": ".base",
+        "CommandTool": ".base",
+        "DefaultToolbarID": ".base",
+        "InteractiveTool": ".base",
+        "PanelTool": ".base",
+        "RectangularActionTool": ".base",
+        "ToggleTool": ".base",
+        "AverageCrossSectionTool": ".cross_section",
+        "CrossSectionTool": ".cross_section",
+        "LCSPanelTool": ".cross_section",
+        "LineCrossSectionTool": ".cross_section",
+        "ObliqueCrossSectionTool": ".cross_section",
+        "OCSPanelTool": ".cross_section",
+        "XCSPanelTool": ".cross_section",
+        "YCSPanelTool": ".cross_section",
+        "HCursorTool": ".cursor",
+        "HRangeTool": ".cursor",
+        "VCursorTool": ".cursor",
+        "XCursorTool": ".cursor",
+        "AntiAliasingTool": ".curve",
+        "CurveStatsTool": ".curve",
+        "DownSamplingTool": ".curve",
+        "EditPointTool": ".curve",
+        "SelectPointsTool": ".curve",
+        "SelectPointTool": ".curve",
+        "AspectRatioTool": ".image",
+        "ColormapTool": ".image",
+        "ContrastPanelTool": ".image",
+        "ImageMaskTool": ".image",
+        "ImageStatsTool": ".image",
+        "ZAxisLogTool": ".image",
+        "LockTrImageTool": ".image",
+        "OpenImageTool": ".image",
+        "ReverseColormapTool": ".image",
+        "LockLUTRangeTool": ".image",
+        "ReverseXAxisTool": ".image",
+        "ReverseYAxisTool": ".image",
+        "RotateCropTool": ".image",
+        "RotationCenterTool": ".image",
+        "DeleteItemTool": ".item",
+        "EditItemDataTool": ".item",
+        "ExportItemDataTool": ".item",
+        "ItemCenterTool": ".item",
+        "ItemListPanelTool": ".item",
+        "LoadItemsTool": ".item",
+        "SaveItemsTool": ".item",
+        "LabelTool": ".label",
+        "AboutTool": ".misc",
+        "CopyToClipboardTool": ".misc",
+        "FilterTool": ".misc",
+        "HelpTool": ".misc",
+        "OpenFileTool": ".misc",
+        "PrintTool": ".misc",
+        "SaveAsTool": ".misc",
+        "SnapshotTool": ".misc",
+        "BasePlotMenuTool": ".plot",
+        "DisplayCoordsTool": ".plot",
+        "DoAutoscaleTool": ".plot",
+        "DummySeparatorTool": ".plot",
+        "RectangularSelectionTool": ".plot",
+        "RectZoomTool": ".plot",
+        "SelectTool": ".selection",
+        "CircleTool": ".shape",
+        "EllipseTool": ".shape",
+        "PolygonTool": ".shape",
+        "MultiLineTool": ".shape",
+        "ObliqueRectangleTool": ".shape",
+        "PointTool": ".shape",
+        "RectangleTool": ".shape",
+        "RectangularShapeTool": ".shape",
+        "SegmentTool": ".shape",
+    },
 )
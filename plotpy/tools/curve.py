@@ -7,7 +7,6 @@ import weakref
 from typing import TYPE_CHECKING, Any, Callable
 
 import numpy as np
-import scipy.integrate as spt
 from guidata.dataset import ChoiceItem, DataSet, FloatItem, IntItem
 from guidata.qthelpers import execenv
 from guidata.widgets.arrayeditor import ArrayEditor
@@ -39,6 +38,25 @@ if TYPE_CHECKING:
     from plotpy.plot.manager import PlotManager
 
 
+def trapezoid(y: np.ndarray, x: np.ndarray | None = None) -> float:
+    """Integrate `y` along `x` using the composite trapezoidal rule
+
+    SciPy is imported on first call only, to keep this module fast to import.
+
+    Args:
+        y: Values to integrate
+        x: Sample points corresponding to the `y` values (Default value = None,
+         i.e. evenly spaced points with a spacing of 1)
+
+    Returns:
+        Definite integral
+    """
+    # pylint: disable=import-outside-toplevel
+    import scipy.integrate as spt
+
+    return spt.trapezoid(y, x)
+
+
 class CurveStatsTool(BaseCursorTool):
     """Curve statistics tool
 
@@ -74,8 +92,8 @@ class CurveStatsTool(BaseCursorTool):
                 ("%g &lt; y &lt; %g", lambda *args: (args[1].min(), args[1].max())),
                 ("&lt;y&gt;=%g", lambda *args: args[1].mean()),
                 ("σ(y)=%g", lambda *args: args[1].std()),
-                ("∑(y)=%g", lambda *args: spt.trapezoid(args[1])),
-                ("∫ydx=%g", lambda *args: spt.trapezoid(args[1], args[0])),
+                ("∑(y)=%g", lambda *args: trapezoid(args[1])),
+                ("∫ydx=%g", lambda *args: trapezoid(args[1], args[0])),
             )
         self.labelfuncs = labelfuncs
 
@@ -583,6 +583,40 @@ def get_selected_images(plot: BasePlot, item_type: Any) -> list[BaseImageItem]:
     return items
 
 
+def set_images_colormap(
+    plot: BasePlot,
+    items: list[BaseImageItem],
+    cmap_name: str | None = None,
+    invert: bool | None = None,
+) -> None:
+    """Set the colormap of image items in one batch: lookup tables are shared
+    between items (see :py:func:`.get_cmap_lut`), and the colormap axis is updated
+    and the plot is invalidated only once.
+
+    Args:
+        plot: Plot instance
+        items: Image items
+        cmap_name: Colormap name (Default value = None, i.e. keep the current
+         colormap of each item)
+        invert: True to invert colormap, False otherwise (Default value = None,
+         i.e. keep the current state of each item)
+    """
+    for item in items:
+        cmap = item.get_color_map()
+        item_cmap_name, item_invert = cmap_name, invert
+        if cmap is not None:
+            if item_cmap_name is None:
+                item_cmap_name = cmap.name
+            if item_invert is None:
+                item_invert = cmap.invert
+        item.set_color_map(item_cmap_name, item_invert, update_axis=False)
+    if items:
+        plot.update_colormap_axis(items[-1])
+        for item in items:
+            plot.SIG_ITEM_PARAMETERS_CHANGED.emit(item)
+    plot.invalidate()
+
+
 class ColormapTool(CommandTool):
     """Tool used to select and manage colormaps (inculding visualization, edition
     and saving).
@@ -650,11 +684,7 @@ class ColormapTool(CommandTool):
         """
         plot: BasePlot = self.get_active_plot()
         items = get_selected_images(plot, IColormapImageItemType)
-        for item in items:
-            cmap = item.get_color_map()
-            item.set_color_map(cmap_name, cmap.invert)
-            plot.SIG_ITEM_PARAMETERS_CHANGED.emit(item)
-        plot.invalidate()
+        set_images_colormap(plot, items, cmap_name)
 
     def update_status(self, plot: BasePlot) -> None:
         """Update tool status if the plot type is not PlotType.CURVE.
@@ -703,11 +733,7 @@ class ReverseColormapTool(ToggleTool):
         plot: BasePlot = self.get_active_plot()
         if self._active_colormap is not None and plot is not None:
             items = get_selected_images(plot, IColormapImageItemType)
-            for item in items:
-                cmap = item.get_color_map()
-                item.set_color_map(cmap.name, invert=checked)
-            plot.SIG_ITEM_PARAMETERS_CHANGED.emit(item)
-            plot.invalidate()
+            set_images_colormap(plot, items, invert=checked)
             self.update_status(plot)
 
     def update_status(self, plot: BasePlot) -> None:
@@ -7,7 +7,7 @@
 
 from __future__ import annotations
 
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
 from guidata.qthelpers import get_std_icon
 from qtpy import QtWidgets as QW
@@ -26,12 +26,14 @@ from plotpy.items import (
     RawImageItem,
     RectangleShape,
 )
-from plotpy.plot import BasePlot
 from plotpy.tools.base import CommandTool, DefaultToolbarID, PanelTool
 from plotpy.tools.curve import edit_curve_data, export_curve_data
 from plotpy.tools.image import edit_image_data, export_image_data
 from plotpy.tools.misc import OpenFileTool
 
+if TYPE_CHECKING:
+    from plotpy.plot import BasePlot
+
 
 class ItemManipulationBaseTool(CommandTool):
     """Base class for item manipulation tools."""
@@ -9,6 +9,8 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import numpy as np
 from qtpy import QtCore as QC
 from qtpy import QtGui as QG
@@ -22,9 +24,11 @@ from plotpy.events import (
     setup_standard_tool_filter,
 )
 from plotpy.items import TrImageItem
-from plotpy.plot import BasePlot
 from plotpy.tools.base import InteractiveTool
 
+if TYPE_CHECKING:
+    from plotpy.plot import BasePlot
+
 
 class SelectTool(InteractiveTool):
     """
@@ -8,7 +8,7 @@
 from __future__ import annotations
 
 import warnings
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
 import numpy as np
 from qtpy import QtCore as QC
@@ -28,9 +28,11 @@ from plotpy.items import (
     PolygonShape,
     SegmentShape,
 )
-from plotpy.plot import BasePlot
 from plotpy.tools.base import DefaultToolbarID, InteractiveTool, RectangularActionTool
 
+if TYPE_CHECKING:
+    from plotpy.plot import BasePlot
+
 
 class MultiLineTool(InteractiveTool):
     """
@@ -17,6 +17,13 @@ The :mod:`.widgets.fit` module provides interactive curve fitting widgets allowi
 * to fit data manually (by moving sliders)
 * or automatically (with standard optimization algorithms provided by `scipy`).
 
+Automatic fits run in a background thread (see :py:class:`FitWorker`): the
+parameter values are updated while the optimization is running, and the fit may
+be cancelled at any time. When a parameter is changed manually, the fit curve is
+refreshed after a short delay (successive changes, e.g. when a slider is moved,
+are merged) and is only evaluated on the visible part of the X axis, using at
+most :py:attr:`FitWidget.MAX_FIT_CURVE_POINTS` points.
+
 The :func:`guifit` function is a factory function that returns a dialog box
 allowing to fit data with a given function.
 
@@ -38,6 +45,10 @@ Reference
 
 .. autoclass:: FitDialog
    :members:
+.. autoclass:: FitWidget
+   :members:
+.. autoclass:: FitWorker
+   :members:
 .. autoclass:: FitParam
    :members:
 .. autoclass:: AutoFitParam
@@ -46,6 +57,9 @@ Reference
 
 from __future__ import annotations
 
+import functools
+import threading
+import time
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
@@ -69,7 +83,6 @@ from numpy import inf  # noqa: F401
 from qtpy import QtCore as QC
 from qtpy import QtWidgets as QW
 from qtpy.QtWidgets import QWidget  # only to help intersphinx find QWidget
-from scipy.optimize import fmin, fmin_bfgs, fmin_cg, fmin_l_bfgs_b, fmin_powell, leastsq
 
 from plotpy.builder import make
 from plotpy.config import _
@@ -114,6 +127,85 @@ class AutoFitParam(DataSet):
     )
 
 
+class FitCancelledError(Exception):
+    """Raised by the error function when the running fit is cancelled"""
+
+
+class FitWorker(QC.QObject):
+    """Curve fitting worker, running an optimization in a background thread
+    (see :py:meth:`FitWidget.start_autofit`)
+
+    The error function of the optimization must call :py:meth:`check` at each
+    evaluation: this is how the current parameter values are streamed back to the
+    GUI thread and how the optimization is interrupted when cancelled.
+
+    Args:
+        optimize: function running the optimization (without argument) and
+         returning the fitted parameter values
+        progress_interval: minimum time between two progress signals, in seconds.
+         Default is 0.1.
+    """
+
+    #: Signal emitted during optimization with the current parameter values
+    #: (NumPy array), at most every `progress_interval` seconds
+    SIG_PROGRESS = QC.Signal(object)
+
+    #: Signal emitted when the optimization is over, with the fitted parameter
+    #: values (NumPy array, or None if the fit was cancelled or failed) and the
+    #: error message (empty string if the fit did not fail)
+    SIG_FINISHED = QC.Signal(object, str)
+
+    def __init__(
+        self, optimize: Callable[[], np.ndarray], progress_interval: float = 0.1
+    ) -> None:
+        super().__init__()
+        self.optimize = optimize
+        self.progress_interval = progress_interval
+        self._cancel_event = threading.Event()
+        self._last_progress = 0.0
+
+    def cancel(self) -> None:
+        """Cancel optimization (thread-safe): the optimization is interrupted at
+        the next error function evaluation"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        """Return True if optimization has been cancelled
+
+        Returns:
+            True if optimization has been cancelled
+        """
+        return self._cancel_event.is_set()
+
+    def check(self, params: np.ndarray) -> None:
+        """Check optimization state: called by the error function at each
+        evaluation (in the worker thread)
+
+        Args:
+            params: current parameter values
+
+        Raises:
+            FitCancelledError: if optimization has been cancelled
+        """
+        if self._cancel_event.is_set():
+            raise FitCancelledError
+        now = time.perf_counter()
+        if now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            self.SIG_PROGRESS.emit(np.array(params, dtype=float))
+
+    def run(self) -> None:
+        """Run optimization (connected to the `started` signal of the thread)"""
+        values, message = None, ""
+        try:
+            values = np.asarray(self.optimize(), dtype=float)
+        except FitCancelledError:
+            pass
+        except Exception as exc:  # pylint: disable=broad-except
+            message = str(exc) or exc.__class__.__name__
+        self.SIG_FINISHED.emit(values, message)
+
+
 class FitParamDataSet(DataSet):
     """Fit parameter dataset"""
 
@@ -397,6 +489,19 @@ class FitWidget(QWidget):
 
     SIG_TOGGLE_VALID_STATE = QC.Signal(bool)
 
+    #: Signal emitted when an automatic fit running in the background is over,
+    #: with True if the fitted values were applied (False if the fit was
+    #: cancelled or failed)
+    SIG_AUTOFIT_FINISHED = QC.Signal(bool)
+
+    #: Maximum number of points of the fit curve: the fit function is evaluated
+    #: on the data X values within the visible range, decimated if necessary
+    MAX_FIT_CURVE_POINTS = 20000
+
+    #: Delay (in milliseconds) before refreshing the fit curve after a parameter
+    #: change: successive changes (e.g. moving a slider) are merged
+    REFRESH_DELAY = 20
+
     def __init__(
         self,
         parent: QWidget = None,
@@ -407,6 +512,7 @@ class FitWidget(QWidget):
         super().__init__(parent)
         self.x = None
         self.y = None
+        self.x_sorted = False
         self.fitfunc = None
         self.fitargs = None
         self.fitkwargs = None
@@ -425,8 +531,18 @@ class FitWidget(QWidget):
         self.button_list: list[QW.QPushButton] = []
 
         self.params_layout: QW.QGridLayout = None
+        self.params_group: QW.QGroupBox = None
+        self.autofit_button: QW.QPushButton = None
         self.plot_widget: PlotWidget = None
 
+        self.autofit_worker: FitWorker | None = None
+        self.autofit_thread: QC.QThread | None = None
+        self.autofit_data: tuple[np.ndarray, np.ndarray] | None = None
+        self.refresh_timer = QC.QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.refresh_fit_curve)
+
         self.setup_widget()
 
     def set_plot_widget(self, plot_widget: PlotWidget) -> None:
@@ -437,6 +553,7 @@ class FitWidget(QWidget):
         """
         self.plot_widget = plot_widget
         plot_widget.plot.SIG_RANGE_CHANGED.connect(self.range_changed)
+        plot_widget.plot.SIG_PLOT_AXIS_CHANGED.connect(self.schedule_refresh)
         self.refresh()
 
     def resizeEvent(self, event) -> None:
@@ -453,13 +570,13 @@ class FitWidget(QWidget):
         """Setup widget"""
         fit_layout = QW.QHBoxLayout()
         self.params_layout = QW.QGridLayout()
-        params_group = create_groupbox(
+        self.params_group = create_groupbox(
             self, _("Fit parameters"), layout=self.params_layout
         )
         if self.auto_fit_enabled:
             auto_group = self.create_autofit_group()
             fit_layout.addWidget(auto_group)
-        fit_layout.addWidget(params_group)
+        fit_layout.addWidget(self.params_group)
         self.setLayout(fit_layout)
 
     def create_autofit_group(self) -> QW.QGroupBox:
@@ -468,8 +585,9 @@ class FitWidget(QWidget):
         Returns:
             Autofit group
         """
-        auto_button = QW.QPushButton(get_icon("apply.png"), _("Run"), self)
-        auto_button.clicked.connect(self.autofit)
+        self.autofit_button = auto_button = QW.QPushButton(self)
+        auto_button.clicked.connect(self.toggle_autofit)
+        self.update_autofit_button()
         autoprm_button = QW.QPushButton(get_icon("settings.png"), _("Settings"), self)
         autoprm_button.clicked.connect(self.edit_parameters)
         xrange_button = QW.QPushButton(get_icon("xrange.png"), _("Bounds"), self)
@@ -502,10 +620,12 @@ class FitWidget(QWidget):
             fitargs: fit args. Defaults to None.
             fitkwargs: fit kwargs. Defaults to None.
         """
+        self.cancel_autofit(wait=True)
         if self.fitparams is not None and fitparams is not None:
             self.clear_params_layout()
         self.x = x
         self.y = y
+        self.x_sorted = bool(np.all(np.diff(x) >= 0))
         if fitfunc is not None:
             self.fitfunc = fitfunc
         if fitparams is not None:
@@ -537,6 +657,7 @@ class FitWidget(QWidget):
             fitargs: fit args. Defaults to None.
             fitkwargs: fit kwargs. Defaults to None.
         """
+        self.cancel_autofit(wait=True)
         if self.fitparams is not None:
             self.clear_params_layout()
         self.fitfunc = fitfunc
@@ -557,7 +678,10 @@ class FitWidget(QWidget):
     def populate_params_layout(self) -> None:
         """Populate params layout"""
         add_fitparam_widgets_to(
-            self.params_layout, self.fitparams, self.refresh, param_cols=self.param_cols
+            self.params_layout,
+            self.fitparams,
+            self.schedule_refresh,
+            param_cols=self.param_cols,
         )
 
     def get_fitfunc_arguments(self) -> tuple[list, dict]:
@@ -587,18 +711,15 @@ class FitWidget(QWidget):
             and len(self.fitparams) > 0
         )
         for btn in self.button_list:
-            btn.setEnabled(enable)
+            btn.setEnabled(
+                enable and (btn is self.autofit_button or not self.is_fitting())
+            )
         self.SIG_TOGGLE_VALID_STATE.emit(enable)
 
         if not enable:
             # Fit widget is not yet configured
             return
 
-        fitargs, fitkwargs = self.get_fitfunc_arguments()
-        yfit = self.fitfunc(
-            self.x, [p.value for p in self.fitparams], *fitargs, **fitkwargs
-        )
-
         plot = self.plot_widget.plot
 
         if self.legend is None:
@@ -619,11 +740,55 @@ class FitWidget(QWidget):
         if self.fit_curve is None:
             self.fit_curve = make.curve([], [], _("Fit"), color="r", linewidth=2)
             plot.add_item(self.fit_curve)
-        self.fit_curve.set_data(self.x, yfit)
+        self.update_fit_curve()
 
         plot.replot()
         plot.disable_autoscale()
 
+    def schedule_refresh(self, *args) -> None:  # pylint: disable=unused-argument
+        """Schedule fit curve refresh (see :py:attr:`REFRESH_DELAY`): called when
+        a parameter value or the plot axes are changed"""
+        self.refresh_timer.start()
+
+    def get_fit_curve_x(self) -> np.ndarray:
+        """Return the X values on which the fit curve is evaluated: data X values
+        within the visible range (or all data X values if the plot is
+        autoscaled or if data X values are not sorted in ascending order),
+        decimated to :py:attr:`MAX_FIT_CURVE_POINTS` points at most
+
+        Returns:
+            X values
+        """
+        i0, i1 = 0, self.x.size
+        plot = self.plot_widget.plot
+        xaxis = self.fit_curve.xAxis()
+        if self.x_sorted and not plot.axisAutoScale(xaxis):
+            xmin, xmax = sorted(plot.get_axis_limits(xaxis))
+            # Keep the closest points outside the visible range, so that the
+            # fit curve is drawn up to the plot borders
+            i0 = max(self.x.searchsorted(xmin) - 1, 0)
+            i1 = min(self.x.searchsorted(xmax, side="right") + 1, self.x.size)
+        step = max(-(-(i1 - i0 - 1) // (self.MAX_FIT_CURVE_POINTS - 1)), 1)
+        x = self.x[i0:i1:step]
+        if (i1 - 1 - i0) % step:
+            x = np.append(x, self.x[i1 - 1])  # Last point is always included
+        return x
+
+    def update_fit_curve(self) -> None:
+        """Evaluate fit function and update fit curve data (without replot)"""
+        x = self.get_fit_curve_x()
+        fitargs, fitkwargs = self.get_fitfunc_arguments()
+        yfit = self.fitfunc(x, [p.value for p in self.fitparams], *fitargs, **fitkwargs)
+        self.fit_curve.set_data(x, yfit)
+
+    def refresh_fit_curve(self) -> None:
+        """Refresh fit curve only (data curve is unchanged)"""
+        if self.fit_curve is None or self.x is None or self.fitparams is None:
+            self.refresh()
+            return
+        self.update_fit_curve()
+        self.plot_widget.plot.replot()
+
     def range_changed(
         self, xrange_obj: XRangeSelection, xmin: float, xmax: float
     ) -> None:  # pylint: disable=unused-argument
@@ -666,6 +831,14 @@ class FitWidget(QWidget):
         self.i_min = self.x.searchsorted(self.autofit_prm.xmin)
         self.i_max = self.x.searchsorted(self.autofit_prm.xmax, side="right")
 
+    def get_fit_data(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the data within the automatic fitting range
+
+        Returns:
+            Tuple (x, y)
+        """
+        return self.x[self.i_min : self.i_max], self.y[self.i_min : self.i_max]
+
     def errorfunc(self, params: list[float]) -> np.ndarray:
         """Get error function
 
@@ -675,34 +848,173 @@ class FitWidget(QWidget):
         Returns:
             Error function
         """
-        x = self.x[self.i_min : self.i_max]
-        y = self.y[self.i_min : self.i_max]
+        if self.autofit_data is None:
+            x, y = self.get_fit_data()
+        else:
+            x, y = self.autofit_data
         fitargs, fitkwargs = self.get_fitfunc_arguments()
+        worker = self.autofit_worker
+        if worker is not None:
+            worker.check(params)
         return y - self.fitfunc(x, params, *fitargs, **fitkwargs)
 
+    def get_autofit_method(self) -> Callable[[np.ndarray], np.ndarray] | None:
+        """Return the automatic fit method selected in fit parameters
+
+        Returns:
+            Method taking the initial parameter values and returning the fitted
+            values, or None if the method is unknown
+        """
+        return {
+            "lq": self.autofit_lq,
+            "simplex": self.autofit_simplex,
+            "powel": self.autofit_powel,
+            "bfgs": self.autofit_bfgs,
+            "l_bfgs_b": self.autofit_l_bfgs,
+            "cg": self.autofit_cg,
+        }.get(self.autofit_prm.method)
+
+    def set_fitted_values(self, values: np.ndarray, refresh: bool = True) -> None:
+        """Set fit parameter values and update parameter widgets
+
+        Args:
+            values: fit parameter values
+            refresh: if True, refresh fit curve immediately (default: True)
+        """
+        for v, p in zip(values, self.fitparams):
+            p.value = v
+        for prm in self.fitparams:
+            prm.update(refresh=False)
+        if refresh:
+            self.refresh()
+        else:
+            self.schedule_refresh()
+
     def autofit(self) -> None:
-        """Autofit"""
-        meth = self.autofit_prm.method
+        """Autofit, in the GUI thread (see :py:meth:`start_autofit` to run the
+        fit in a background thread)"""
+        if self.is_fitting():
+            return
+        method = self.get_autofit_method()
+        if method is None:
+            return
         x0 = np.array([p.value for p in self.fitparams])
-        if meth == "lq":
-            x = self.autofit_lq(x0)
-        elif meth == "simplex":
-            x = self.autofit_simplex(x0)
-        elif meth == "powel":
-            x = self.autofit_powel(x0)
-        elif meth == "bfgs":
-            x = self.autofit_bfgs(x0)
-        elif meth == "l_bfgs_b":
-            x = self.autofit_l_bfgs(x0)
-        elif meth == "cg":
-            x = self.autofit_cg(x0)
+        self.set_fitted_values(method(x0))
+
+    def is_fitting(self) -> bool:
+        """Return True if an automatic fit is running in the background
+
+        Returns:
+            True if an automatic fit is running
+        """
+        return self.autofit_thread is not None
+
+    def start_autofit(self) -> bool:
+        """Start automatic fit in a background thread: parameter values are
+        updated while the fit is running, and :py:attr:`SIG_AUTOFIT_FINISHED` is
+        emitted when it is over
+
+        Returns:
+            True if the fit was started
+        """
+        if self.is_fitting():
+            return False
+        method = self.get_autofit_method()
+        if method is None:
+            return False
+        x0 = np.array([p.value for p in self.fitparams])
+        # The fitting range may be changed while the fit is running: the worker
+        # thread works on the data selected when the fit was started
+        self.autofit_data = self.get_fit_data()
+        self.autofit_worker = worker = FitWorker(functools.partial(method, x0))
+        self.autofit_thread = thread = QC.QThread(self)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.SIG_PROGRESS.connect(self.autofit_progress)
+        worker.SIG_FINISHED.connect(self.autofit_finished)
+        self.set_fitting_state(True)
+        thread.start()
+        return True
+
+    def cancel_autofit(self, wait: bool = False) -> None:
+        """Cancel automatic fit running in the background: parameters keep the
+        last values received from the worker thread
+
+        Args:
+            wait: if True, wait for the worker thread to finish (default: False)
+        """
+        if not self.is_fitting():
+            return
+        self.autofit_worker.cancel()
+        if wait:
+            # The thread event loop exits as soon as the optimization is over
+            self.autofit_thread.quit()
+            self.autofit_thread.wait()
+            # Deliver the signals queued by the worker thread (the receivers may be
+            # proxy objects created by the Qt bindings, hence the `None` argument)
+            QC.QCoreApplication.sendPostedEvents(None, QC.QEvent.MetaCall)
+
+    def toggle_autofit(self) -> None:
+        """Start automatic fit, or cancel it if it is running"""
+        if self.is_fitting():
+            self.cancel_autofit()
         else:
+            self.start_autofit()
+
+    def autofit_progress(self, values: np.ndarray) -> None:
+        """Automatic fit progress: show current parameter values
+
+        Args:
+            values: current fit parameter values
+        """
+        if self.is_fitting():
+            self.set_fitted_values(values, refresh=False)
+
+    def autofit_finished(self, values: np.ndarray | None, message: str) -> None:
+        """Automatic fit is over
+
+        Args:
+            values: fitted parameter values, or None if the fit was cancelled or
+             failed
+            message: error message (empty string if the fit did not fail)
+        """
+        thread = self.autofit_thread
+        if thread is None:
             return
-        for v, p in zip(x, self.fitparams):
-            p.value = v
-        self.refresh()
-        for prm in self.fitparams:
-            prm.update()
+        thread.quit()
+        thread.wait()
+        thread.deleteLater()
+        self.autofit_worker = self.autofit_thread = self.autofit_data = None
+        self.set_fitting_state(False)
+        if values is not None:
+            self.set_fitted_values(values)
+        elif message:
+            QW.QMessageBox.critical(self, _("Automatic fit"), message)
+        self.SIG_AUTOFIT_FINISHED.emit(values is not None)
+
+    def set_fitting_state(self, state: bool) -> None:
+        """Enable or disable widgets depending on automatic fit state
+
+        Args:
+            state: True if an automatic fit is running
+        """
+        self.params_group.setEnabled(not state)
+        for btn in self.button_list:
+            if btn is not self.autofit_button:
+                btn.setEnabled(not state)
+        self.update_autofit_button()
+
+    def update_autofit_button(self) -> None:
+        """Update automatic fit button (run or stop)"""
+        if self.autofit_button is None:
+            return
+        if self.is_fitting():
+            icon = self.style().standardIcon(QW.QStyle.SP_BrowserStop)
+            self.autofit_button.setIcon(icon)
+            self.autofit_button.setText(_("Stop"))
+        else:
+            self.autofit_button.setIcon(get_icon("apply.png"))
+            self.autofit_button.setText(_("Run"))
 
     def get_norm_func(self) -> Callable:
         """Get norm function
@@ -711,7 +1023,7 @@ class FitWidget(QWidget):
             Norm function
         """
         prm = self.autofit_prm
-        err_norm = eval(prm.err_norm)
+        err_norm = eval(str(prm.err_norm))
 
         def func(params):
             """
@@ -733,6 +1045,8 @@ class FitWidget(QWidget):
         Returns:
             Fitted values
         """
+        from scipy.optimize import fmin  # pylint: disable=import-outside-toplevel
+
         prm = self.autofit_prm
 
         x = fmin(self.get_norm_func(), x0, xtol=prm.xtol, ftol=prm.ftol)
@@ -747,6 +1061,8 @@ class FitWidget(QWidget):
         Returns:
             Fitted values
         """
+        from scipy.optimize import fmin_powell  # pylint: disable=import-outside-toplevel
+
         prm = self.autofit_prm
 
         x = fmin_powell(self.get_norm_func(), x0, xtol=prm.xtol, ftol=prm.ftol)
@@ -761,6 +1077,8 @@ class FitWidget(QWidget):
         Returns:
             Fitted values
         """
+        from scipy.optimize import fmin_bfgs  # pylint: disable=import-outside-toplevel
+
         prm = self.autofit_prm
 
         x = fmin_bfgs(self.get_norm_func(), x0, gtol=prm.gtol, norm=eval(prm.norm))
@@ -775,6 +1093,8 @@ class FitWidget(QWidget):
         Returns:
             Fitted values
         """
+        from scipy.optimize import fmin_l_bfgs_b  # pylint: disable=import-outside-toplevel
+
         prm = self.autofit_prm
         bounds = [(p.min, p.max) for p in self.fitparams]
 
@@ -792,6 +1112,8 @@ class FitWidget(QWidget):
         Returns:
             Fitted values
         """
+        from scipy.optimize import fmin_cg  # pylint: disable=import-outside-toplevel
+
         prm = self.autofit_prm
 
         x = fmin_cg(self.get_norm_func(), x0, gtol=prm.gtol, norm=eval(prm.norm))
@@ -806,6 +1128,8 @@ class FitWidget(QWidget):
         Returns:
             Fitted values
         """
+        from scipy.optimize import leastsq  # pylint: disable=import-outside-toplevel
+
         prm = self.autofit_prm
 
         def func(params: list[float]) -> np.ndarray:
@@ -886,6 +1210,15 @@ class FitDialog(PlotDialog):
         self.fit_widget.SIG_TOGGLE_VALID_STATE.connect(ok_btn.setEnabled)
         self.setWindowFlags(QC.Qt.Window)
 
+    def done(self, result: int) -> None:
+        """Reimplement Qt method: cancel automatic fit running in the background
+
+        Args:
+            result: dialog result
+        """
+        self.fit_widget.cancel_autofit(wait=True)
+        super().done(result)
+
     def set_data(
         self,
         x: np.ndarray,
@@ -39,7 +39,8 @@ INCLUDE_DIRS = [SRCPATH, numpy.get_include()]
 MACROS_CYTHON = [("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")]
 CFLAGS_CYTHON = []
 MACROS_CPP = [("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")]
-CFLAGS_CPP = ["/EHsc", "/fp:fast"] if is_msvc() else ["-Wall"]
+CFLAGS_CPP = ["/EHsc", "/fp:fast"] if is_msvc() else ["-Wall", "-pthread"]
+LFLAGS_CPP = [] if is_msvc() else ["-pthread"]
 if platform.system() == "Darwin":
     CFLAGS_CPP += ["-std=c++11"]
 
@@ -63,6 +64,7 @@ setup(
             name=f"{LIBNAME}._scaler",
             sources=[osp.join(SRCPATH, "scaler.cpp"), osp.join(SRCPATH, "pcolor.cpp")],
             extra_compile_args=CFLAGS_CPP,
+            extra_link_args=LFLAGS_CPP,
             depends=[
                 osp.join(SRCPATH, "traits.hpp"),
                 osp.join(SRCPATH, "points.hpp"),
@@ -6,93 +6,279 @@
 
 """2D-Histogram algorithm"""
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from plotpy.mathutils.threads import get_threads_count
+
 cimport cython
 cimport numpy as cnp
-from libc.math cimport log
+from libc.math cimport INFINITY
 
 cnp.import_array()
 
-cdef inline double double_max(double a, double b): return a if a >= b else b
-cdef inline double double_min(double a, double b): return a if a <= b else b
+#: Statistics which may be computed by :py:func:`histogram2d_stats`
+HISTOGRAM2D_STATS = ("count", "sum", "min", "max", "mean", "prod")
+
+#: Minimum number of points processed by a single worker thread
+MIN_CHUNK_POINTS = 1 << 18
+
+cdef inline double double_max(double a, double b) noexcept nogil: return a if a >= b else b
+cdef inline double double_min(double a, double b) noexcept nogil: return a if a <= b else b
+
+# Per-point kernels: one kernel per statistics level, so that the inner loop
+# does not branch on the computation type
 
-@cython.profile(False)
 @cython.boundscheck(False)
-def histogram2d(cnp.ndarray[double, ndim=1] X, cnp.ndarray[double, ndim=1] Y,
-                double i0, double i1, double j0, double j1,
-                cnp.ndarray[double, ndim=2] data, logscale):
-    """Compute 2-D Histogram from data X, Y"""
-    cdef double cx, cy, nmax, ix, iy
-    cdef unsigned int i
-    cdef Py_ssize_t n = X.shape[0]
-    cdef Py_ssize_t nx = data.shape[1]
-    cdef Py_ssize_t ny = data.shape[0]
-
-    cx = nx/(i1-i0)
-    cy = ny/(j1-j0)
-
-    for i in range(n):
+@cython.wraparound(False)
+cdef void _count_points(const double[:] X, const double[:] Y,
+                        Py_ssize_t start, Py_ssize_t stop,
+                        double i0, double j0, double cx, double cy,
+                        double[:, :] count) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t nx = count.shape[1]
+    cdef Py_ssize_t ny = count.shape[0]
+    cdef double ix, iy
+    for i in range(start, stop):
         #  Centered bins => - .5
         ix = (X[i] - i0) * cx - .5
         iy = (Y[i] - j0) * cy - .5
         if ix >= 0 and ix <= nx-1 and iy >= 0 and iy <= ny-1:
-            data[<int> iy, <int> ix] += 1
-
-    nmax = 0.
-    if logscale:
-        for j in range(ny):
-            for i in range(nx):
-                data[j, i] = log(1+data[j, i])
-                nmax = double_max(nmax, data[j, i])
-    else:
-        for j in range(ny):
-            for i in range(nx):
-                nmax = double_max(nmax, data[j, i])
-    return nmax
+            count[<int> iy, <int> ix] += 1
+
 
-@cython.profile(False)
 @cython.boundscheck(False)
-def histogram2d_func(cnp.ndarray[double, ndim=1] X,
-                     cnp.ndarray[double, ndim=1] Y,
-                     cnp.ndarray[double, ndim=1] Z,
-                     double i0, double i1, double j0, double j1,
-                     cnp.ndarray[double, ndim=2] data_tmp,
-                     cnp.ndarray[double, ndim=2] data, int computation):
-    """Compute 2-D Histogram from data X, Y"""
-    cdef double cx, cy, nmax, ix, iy
-    cdef unsigned int i, u, v
-    cdef Py_ssize_t n = X.shape[0]
-    cdef Py_ssize_t nx = data.shape[1]
-    cdef Py_ssize_t ny = data.shape[0]
-
-    cx = nx/(i1-i0)
-    cy = ny/(j1-j0)
-
-    for i in range(n):
-        #  Centered bins => - .5
+@cython.wraparound(False)
+cdef void _sum_points(const double[:] X, const double[:] Y, const double[:] Z,
+                      Py_ssize_t start, Py_ssize_t stop,
+                      double i0, double j0, double cx, double cy,
+                      double[:, :] count, double[:, :] vsum) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t nx = count.shape[1]
+    cdef Py_ssize_t ny = count.shape[0]
+    cdef double ix, iy
+    cdef int u, v
+    for i in range(start, stop):
+        ix = (X[i] - i0) * cx - .5
+        iy = (Y[i] - j0) * cy - .5
+        if ix >= 0 and ix <= nx-1 and iy >= 0 and iy <= ny-1:
+            u, v = <int> iy, <int> ix
+            count[u, v] += 1
+            vsum[u, v] += Z[i]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _stats_points(const double[:] X, const double[:] Y, const double[:] Z,
+                        Py_ssize_t start, Py_ssize_t stop,
+                        double i0, double j0, double cx, double cy,
+                        double[:, :] count, double[:, :] vsum,
+                        double[:, :] vmin, double[:, :] vmax) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t nx = count.shape[1]
+    cdef Py_ssize_t ny = count.shape[0]
+    cdef double ix, iy, z
+    cdef int u, v
+    for i in range(start, stop):
         ix = (X[i] - i0) * cx - .5
         iy = (Y[i] - j0) * cy - .5
         if ix >= 0 and ix <= nx-1 and iy >= 0 and iy <= ny-1:
             u, v = <int> iy, <int> ix
-            if computation == 0:  # max
-                data_tmp[u, v] += 1
-                data[u, v] = double_max(data[u, v], Z[i])
-            elif computation == 1:  # min
-                data_tmp[u, v] += 1
-                data[u, v] = double_min(data[u, v], Z[i])
-            elif computation == 2:  # sum
-                data_tmp[u, v] += 1
-                data[u, v] += Z[i]
-            elif computation == 3:  # prod
-                data_tmp[u, v] += 1
-                data[u, v] *= Z[i]
-            elif computation == 4:  # avg
-                data_tmp[u, v] += 1
-                data[u, v] += (Z[i]-data[u, v])/data_tmp[u, v]
-            elif computation == 5:  # argmin
-                if data[u, v] > Z[i]:
-                    data_tmp[u, v] = i
-                    data[u, v] = Z[i]
-            elif computation == 6:  # argmax
-                if data[u, v] < Z[i]:
-                    data_tmp[u, v] = i
-                    data[u, v] = Z[i]
+            z = Z[i]
+            count[u, v] += 1
+            vsum[u, v] += z
+            vmin[u, v] = double_min(vmin[u, v], z)
+            vmax[u, v] = double_max(vmax[u, v], z)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _prod_points(const double[:] X, const double[:] Y, const double[:] Z,
+                       Py_ssize_t start, Py_ssize_t stop,
+                       double i0, double j0, double cx, double cy,
+                       double[:, :] vprod) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t nx = vprod.shape[1]
+    cdef Py_ssize_t ny = vprod.shape[0]
+    cdef double ix, iy
+    for i in range(start, stop):
+        ix = (X[i] - i0) * cx - .5
+        iy = (Y[i] - j0) * cy - .5
+        if ix >= 0 and ix <= nx-1 and iy >= 0 and iy <= ny-1:
+            vprod[<int> iy, <int> ix] *= Z[i]
+
+
+def histogram2d_chunk(const double[:] X, const double[:] Y, const double[:] Z,
+                      double i0, double i1, double j0, double j1,
+                      Py_ssize_t start, Py_ssize_t stop,
+                      double[:, :] count, double[:, :] vsum=None,
+                      double[:, :] vmin=None, double[:, :] vmax=None,
+                      double[:, :] vprod=None):
+    """Accumulate points [start, stop[ of data X, Y (and Z) in 2-D histogram grids
+
+    The GIL is released during the computation. Grids which are None are not
+    computed: *vsum* requires *Z*, and *vmin*/*vmax* require *vsum*. Products
+    *vprod* (which require *Z*) are accumulated in a second pass.
+    """
+    cdef double cx = count.shape[1]/(i1-i0)
+    cdef double cy = count.shape[0]/(j1-j0)
+    if vsum is None:
+        with nogil:
+            _count_points(X, Y, start, stop, i0, j0, cx, cy, count)
+    elif vmin is None or vmax is None:
+        with nogil:
+            _sum_points(X, Y, Z, start, stop, i0, j0, cx, cy, count, vsum)
+    else:
+        with nogil:
+            _stats_points(X, Y, Z, start, stop, i0, j0, cx, cy,
+                          count, vsum, vmin, vmax)
+    if vprod is not None:
+        with nogil:
+            _prod_points(X, Y, Z, start, stop, i0, j0, cx, cy, vprod)
+
+
+def split_ranges(ranges, int nchunks):
+    """Split index ranges in *nchunks* chunks of about the same number of points
+
+    Args:
+        ranges: sequence of (start, stop) index ranges
+        nchunks: number of chunks
+
+    Returns:
+        List of *nchunks* lists of (start, stop) index ranges
+    """
+    total = sum(stop - start for start, stop in ranges)
+    size = -(-total // nchunks) if total else 1
+    chunks = [[] for _index in range(nchunks)]
+    index, filled = 0, 0
+    for start, stop in ranges:
+        while start < stop:
+            end = min(stop, start + size - filled)
+            chunks[index].append((start, end))
+            filled += end - start
+            start = end
+            if filled == size and index < nchunks - 1:
+                index, filled = index + 1, 0
+    return chunks
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def bucket_order(const cnp.intp_t[:] buckets, cnp.intp_t[:] offsets):
+    """Return the permutation sorting points by bucket (stable counting sort)
+
+    Args:
+        buckets: bucket index of each point
+        offsets: index of the first point of each bucket in the sorted order
+         (i.e. cumulative sum of bucket sizes, starting with 0). This array is
+         used as a work buffer and is left unchanged
+
+    Returns:
+        Permutation array
+    """
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = buckets.shape[0]
+    cdef cnp.intp_t[:] pos = offsets.copy()
+    order_arr = np.empty(n, np.intp)
+    cdef cnp.intp_t[:] order = order_arr
+    with nogil:
+        for i in range(n):
+            order[pos[buckets[i]]] = i
+            pos[buckets[i]] += 1
+    return order_arr
+
+
+def histogram2d_stats(X, Y, double i0, double i1, double j0, double j1,
+                      int nx, int ny, Z=None, stats=("count",), int nthreads=1,
+                      ranges=None):
+    """Compute 2-D histogram statistics from data X, Y (and Z) in a single pass
+
+    Points are split in chunks processed in parallel (the GIL is released),
+    each worker thread accumulating its own partial grids, which are merged at
+    the end.
+
+    Args:
+        X: X coordinates (1-D float64 array)
+        Y: Y coordinates (1-D float64 array)
+        i0: X coordinate of the first bin edge
+        i1: X coordinate of the last bin edge
+        j0: Y coordinate of the first bin edge
+        j1: Y coordinate of the last bin edge
+        nx: number of bins along X
+        ny: number of bins along Y
+        Z: values (1-D float64 array), required by all statistics except 'count'
+        stats: statistics to be computed (see :py:data:`HISTOGRAM2D_STATS`)
+        nthreads: number of threads (0: one per CPU core). Default is 1
+        ranges: sequence of (start, stop) index ranges of the points to be
+         processed (e.g. points of a spatial index which may be visible).
+         Default is None (all points)
+
+    Returns:
+        Dictionary of (ny, nx) arrays, one per requested statistics (empty
+        bins are NaN, except for 'count')
+    """
+    for name in stats:
+        if name not in HISTOGRAM2D_STATS:
+            raise ValueError(f"Invalid 2-D histogram statistics {name!r}")
+    need_minmax = "min" in stats or "max" in stats
+    need_sum = need_minmax or "sum" in stats or "mean" in stats
+    need_prod = "prod" in stats
+    if (need_sum or need_prod) and Z is None:
+        raise ValueError("Z values are required to compute statistics")
+    if ranges is None:
+        ranges = [(0, len(X))]
+    n = sum(stop - start for start, stop in ranges)
+    nthreads = get_threads_count(nthreads)
+    nchunks = max(1, min(nthreads, n // MIN_CHUNK_POINTS))
+    chunks = split_ranges(ranges, nchunks)
+
+    def new_grids():
+        count = np.zeros((ny, nx), float)
+        vsum = np.zeros((ny, nx), float) if need_sum else None
+        vmin = np.full((ny, nx), INFINITY) if need_minmax else None
+        vmax = np.full((ny, nx), -INFINITY) if need_minmax else None
+        vprod = np.ones((ny, nx), float) if need_prod else None
+        return count, vsum, vmin, vmax, vprod
+
+    def run_chunk(index):
+        grids = new_grids()
+        for start, stop in chunks[index]:
+            histogram2d_chunk(X, Y, Z, i0, i1, j0, j1, start, stop, *grids)
+        return grids
+
+    if nchunks == 1:
+        partials = [run_chunk(0)]
+    else:
+        with ThreadPoolExecutor(max_workers=nchunks) as executor:
+            partials = list(executor.map(run_chunk, range(nchunks)))
+    count, vsum, vmin, vmax, vprod = partials[0]
+    for pcount, psum, pmin, pmax, pprod in partials[1:]:
+        count += pcount
+        if need_sum:
+            vsum += psum
+        if need_minmax:
+            np.minimum(vmin, pmin, out=vmin)
+            np.maximum(vmax, pmax, out=vmax)
+        if need_prod:
+            vprod *= pprod
+    empty = count == 0
+    result = {}
+    for name in stats:
+        if name == "count":
+            result[name] = count
+            continue
+        if name == "sum":
+            values = vsum
+        elif name == "min":
+            values = vmin
+        elif name == "max":
+            values = vmax
+        elif name == "prod":
+            values = vprod
+        else:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = vsum / count
+        values[empty] = np.nan
+        result[name] = values
+    return result
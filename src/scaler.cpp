@@ -32,6 +32,9 @@ those allowed */
 #include <algorithm>
 #include <iostream>
 #include <vector>
+#include <limits>
+#include <functional>
+#include <thread>
 #include "points.hpp"
 #include "arrays.hpp"
 #include "scaler.hpp"
@@ -48,6 +51,19 @@ enum
     INTERP_AA = 2
 };
 
+/* Minimum number of destination rows processed by a single worker thread:
+   below this, thread creation overhead outweighs the parallel speedup */
+#define MIN_BAND_ROWS 32
+
+/* Minimum number of pixels for computing statistics with several threads */
+#define MIN_STATS_PIXELS (1 << 18)
+
+/* Minimum number of points for decimating curve data with several threads */
+#define MIN_DECIMATION_POINTS (1 << 20)
+
+/* Minimum number of image samples for extracting profiles with several threads */
+#define MIN_PROFILE_SAMPLES (1 << 16)
+
 typedef union
 {
     npy_uint32 v;
@@ -66,7 +82,7 @@ struct params
            Transform &_trans) : p_dst(_dst), p_dst_data(_dst_data),
                                 p_src(_src),
                                 p_lut(_lut), p_interpolation(_interp),
-                                trans(_trans)
+                                trans(_trans), nthreads(1)
     {
     }
     // Source, dest, coordinate transformation
@@ -78,6 +94,7 @@ struct params
     Transform &trans;
 
     int dx1, dx2, dy1, dy2;
+    int nthreads; // Number of worker threads (0: one per CPU core)
 };
 
 template <class T, class TR>
@@ -307,11 +324,95 @@ struct SubSampleInterpolation
     const Array2D<T> &mask;
 };
 
-template <class DEST, class ST, class Scale, class Trans, class Interpolation>
+/* No overlay: destination pixels are left as computed by the pixel scale */
+struct NoOverlay
+{
+    template <class D, class Point>
+    void apply(D &dest, const Point &p) const {}
+};
+
+/* Mask overlay: the color of masked (resp. unmasked) source pixels is blended
+   over the destination pixel, as if the overlay was drawn over the image with
+   the "source over" composition mode (non-premultiplied ARGB32 colors).
+
+   The mask is either an array of bytes (nonzero: masked) or an array of bits
+   packed along rows (most significant bit first, see numpy.packbits), with
+   `ncols` columns. If the mask shape differs from the source shape (e.g. the
+   source is a downsampled level of the image), the mask pixel at the same
+   relative position is used. */
+class MaskOverlay
+{
+public:
+    MaskOverlay(PyArrayObject *p_mask, int _ncols,
+                npy_uint32 masked, npy_uint32 unmasked,
+                int _src_ni, int _src_nj) : mask(p_mask), ncols(_ncols),
+                                            src_ni(_src_ni), src_nj(_src_nj)
+    {
+        packed = mask.nj != ncols;
+        rescale = mask.ni != src_ni || ncols != src_nj;
+        colors[0].v = unmasked;
+        colors[1].v = masked;
+    }
+    bool is_masked(int x, int y) const
+    {
+        if (rescale)
+        {
+            x = (int)((long long)x * ncols / src_nj);
+            y = (int)((long long)y * mask.ni / src_ni);
+        }
+        if (packed)
+            return (mask.value(x >> 3, y) >> (7 - (x & 7))) & 1;
+        return mask.value(x, y) != 0;
+    }
+    template <class Point>
+    void apply(npy_uint32 &dest, const Point &p) const
+    {
+        const rgba_t &over = colors[is_masked(p.ix(), p.iy()) ? 1 : 0];
+        unsigned int ao = over.c[3];
+        if (ao == 0)
+            return;
+        if (ao == 255)
+        {
+            dest = over.v;
+            return;
+        }
+        rgba_t under, res;
+        under.v = dest;
+        if (under.c[3] == 255)
+        {
+            // Opaque pixel (same result as below, with a constant divisor)
+            for (int k = 0; k < 3; ++k)
+            {
+                res.c[k] = (over.c[k] * ao + under.c[k] * (255 - ao) + 127) / 255;
+            }
+            res.c[3] = 255;
+            dest = res.v;
+            return;
+        }
+        // Alpha values are scaled by 255*255
+        unsigned int au = under.c[3] * (255 - ao);
+        unsigned int a = ao * 255 + au;
+        for (int k = 0; k < 3; ++k)
+        {
+            res.c[k] = (over.c[k] * ao * 255 + under.c[k] * au + a / 2) / a;
+        }
+        res.c[3] = (a + 127) / 255;
+        dest = res.v;
+    }
+
+protected:
+    Array2D<npy_uint8> mask;
+    int ncols, src_ni, src_nj;
+    bool packed, rescale;
+    rgba_t colors[2];
+};
+
+template <class DEST, class ST, class Scale, class Trans, class Interpolation,
+          class Overlay>
 void _scale_rgb(DEST &dest,
                 Array2D<ST> &src, const Scale &scale, const Trans &tr,
                 int dx1, int dy1, int dx2, int dy2,
-                Interpolation &interpolate)
+                Interpolation &interpolate, const Overlay &overlay)
 {
     int i, j;
     ST val;
@@ -347,6 +448,7 @@ void _scale_rgb(DEST &dest,
                 {
                     it() = scale.eval(val);
                 }
+                overlay.apply(it(), p);
             }
             tr.incx(p);
             it.move(1, 0);
@@ -463,6 +565,92 @@ static bool check_transform(PyArrayObject *p_tr)
     return true;
 }
 
+static bool check_mask_overlay(PyArrayObject *p_mask, int ncols)
+{
+    if (!check_array_2d("Mask", p_mask, -1))
+        return false;
+    if (PyArray_TYPE(p_mask) != NPY_BOOL && PyArray_TYPE(p_mask) != NPY_UINT8)
+    {
+        PyErr_SetString(PyExc_TypeError, "Mask data type must be bool or uint8");
+        return false;
+    }
+    npy_intp nj = PyArray_DIM(p_mask, 1);
+    if (ncols <= 0 || PyArray_DIM(p_mask, 0) <= 0 ||
+        (nj != ncols && (PyArray_TYPE(p_mask) != NPY_UINT8 || nj != (ncols + 7) / 8)))
+    {
+        PyErr_SetString(PyExc_ValueError, "Mask must have ncols columns "
+                                          "(or (ncols + 7) // 8 bytes per row if packed)");
+        return false;
+    }
+    return true;
+}
+
+/* Parse the transfer function tuple (kind[, p0, p1, p2, table]) */
+static bool parse_transfer(PyObject *p_transfer, Transfer &transfer)
+{
+    PyObject *p_table = 0;
+    if (!PyArg_ParseTuple(p_transfer, "i|dddO:transfer function", &transfer.kind,
+                          &transfer.p0, &transfer.p1, &transfer.p2, &p_table))
+        return false;
+    switch (transfer.kind)
+    {
+    case TRANSFER_LINEAR:
+        return true;
+    case TRANSFER_LOG:
+    case TRANSFER_SYMLOG:
+        if (!(transfer.p0 > 0.0))
+        {
+            PyErr_SetString(PyExc_ValueError, "Transfer parameter must be positive");
+            return false;
+        }
+        return true;
+    case TRANSFER_ASINH:
+        if (!(transfer.p0 > 0.0))
+        {
+            PyErr_SetString(PyExc_ValueError, "Transfer parameter must be positive");
+            return false;
+        }
+        transfer.scale = 1.0 / transfer.p0;
+        return true;
+    case TRANSFER_GAMMA:
+        if (!(transfer.p0 > 0.0) || !(transfer.p2 != transfer.p1))
+        {
+            PyErr_SetString(PyExc_ValueError,
+                            "Gamma must be positive, with a non-empty input range");
+            return false;
+        }
+        transfer.scale = 1.0 / (transfer.p2 - transfer.p1);
+        return true;
+    case TRANSFER_TABLE:
+    {
+        PyArrayObject *p_arr = (PyArrayObject *)p_table;
+        if (!p_table || !PyArray_Check(p_table) || PyArray_NDIM(p_arr) != 1 ||
+            PyArray_TYPE(p_arr) != NPY_FLOAT64 || PyArray_DIM(p_arr, 0) < 2)
+        {
+            PyErr_SetString(PyExc_TypeError,
+                            "Transfer table must be a 1D float64 array of size >= 2");
+            return false;
+        }
+        if (!(transfer.p1 != transfer.p0))
+        {
+            PyErr_SetString(PyExc_ValueError, "Transfer table input range is empty");
+            return false;
+        }
+        Array1D<double> table(p_arr);
+        transfer.table.resize(table.ni);
+        for (int k = 0; k < table.ni; ++k)
+        {
+            transfer.table[k] = table.value(k);
+        }
+        transfer.scale = (table.ni - 1) / (transfer.p1 - transfer.p0);
+        return true;
+    }
+    default:
+        PyErr_SetString(PyExc_ValueError, "Unknown transfer function");
+        return false;
+    }
+}
+
 static void check_image_bounds(int ni, int nj, int &dx, int &dy)
 {
     if (dx < 0)
@@ -475,8 +663,59 @@ static void check_image_bounds(int ni, int nj, int &dx, int &dy)
         dy = ni;
 }
 
-template <class Params, class PixelScale, class Interp>
-static bool scale_src_dst_interp(Params &p, PixelScale &pixel_scale, Interp &interp)
+/* Return the number of row bands used to process *nrows* destination rows
+   with at most *nthreads* threads (0: one thread per CPU core) */
+static int get_band_count(int nthreads, int nrows)
+{
+    if (nthreads <= 0)
+    {
+        nthreads = (int)std::thread::hardware_concurrency();
+        if (nthreads <= 0)
+            nthreads = 1;
+    }
+    int nbands = min(nthreads, nrows / MIN_BAND_ROWS);
+    return max(nbands, 1);
+}
+
+/* Split the destination rectangle in horizontal bands and process each band
+   in its own thread: pixel scale, transform and interpolation objects are
+   only read during the resampling, so they may be shared between threads */
+template <class DEST, class ST, class Scale, class Trans, class Interpolation,
+          class Overlay>
+void _scale_rgb_bands(DEST &dest,
+                      Array2D<ST> &src, const Scale &scale, const Trans &tr,
+                      int dx1, int dy1, int dx2, int dy2,
+                      Interpolation &interpolate, const Overlay &overlay,
+                      int nthreads)
+{
+    int nbands = get_band_count(nthreads, dy2 - dy1);
+    if (nbands == 1)
+    {
+        _scale_rgb(dest, src, scale, tr, dx1, dy1, dx2, dy2, interpolate, overlay);
+        return;
+    }
+    vector<std::thread> workers;
+    int band_height = (dy2 - dy1 + nbands - 1) / nbands;
+    for (int band_y = dy1 + band_height; band_y < dy2; band_y += band_height)
+    {
+        int band_y2 = min(band_y + band_height, dy2);
+        workers.push_back(std::thread(
+            _scale_rgb<DEST, ST, Scale, Trans, Interpolation, Overlay>,
+            std::ref(dest), std::ref(src), std::cref(scale), std::cref(tr),
+            dx1, band_y, dx2, band_y2, std::ref(interpolate), std::cref(overlay)));
+    }
+    // The calling thread handles the first band
+    _scale_rgb(dest, src, scale, tr,
+               dx1, dy1, dx2, min(dy1 + band_height, dy2), interpolate, overlay);
+    for (size_t k = 0; k < workers.size(); ++k)
+    {
+        workers[k].join();
+    }
+}
+
+template <class Params, class PixelScale, class Interp, class Overlay>
+static bool scale_src_dst_interp(Params &p, PixelScale &pixel_scale, Interp &interp,
+                                 const Overlay &overlay)
 {
     typedef typename PixelScale::source_type ST;
     typedef typename PixelScale::dest_type DT;
@@ -484,13 +723,16 @@ static bool scale_src_dst_interp(Params &p, PixelScale &pixel_scale, Interp &int
     Array2D<ST> src(p.p_src);
     Array2D<DT> dst(p.p_dst);
 
-    _scale_rgb(dst, src, pixel_scale, p.trans,
-               p.dx1, p.dy1, p.dx2, p.dy2, interp);
+    Py_BEGIN_ALLOW_THREADS
+    _scale_rgb_bands(dst, src, pixel_scale, p.trans,
+                     p.dx1, p.dy1, p.dx2, p.dy2, interp, overlay, p.nthreads);
+    Py_END_ALLOW_THREADS
     return true;
 }
 
-template <class Params, class PixelScale>
-static bool scale_src_dst(Params &p, PixelScale &pixel_scale)
+template <class Params, class PixelScale, class Overlay = NoOverlay>
+static bool scale_src_dst(Params &p, PixelScale &pixel_scale,
+                          const Overlay &overlay = Overlay())
 {
     typedef typename PixelScale::source_type ST;
     typedef typename Params::transform_type TR;
@@ -511,7 +753,8 @@ static bool scale_src_dst(Params &p, PixelScale &pixel_scale)
     case INTERP_NEAREST:
     {
         Nearest interp;
-        return scale_src_dst_interp<Params, PixelScale, Nearest>(p, pixel_scale, interp);
+        return scale_src_dst_interp<Params, PixelScale, Nearest, Overlay>(
+            p, pixel_scale, interp, overlay);
     }
     case INTERP_AA:
     {
@@ -519,18 +762,63 @@ static bool scale_src_dst(Params &p, PixelScale &pixel_scale)
             return false;
         Array2D<ST> mask(p_mask);
         SubAA interp(mask);
-        return scale_src_dst_interp<Params, PixelScale, SubAA>(p, pixel_scale, interp);
+        return scale_src_dst_interp<Params, PixelScale, SubAA, Overlay>(
+            p, pixel_scale, interp, overlay);
     }
     case INTERP_LINEAR:
     {
         Linear interp;
-        return scale_src_dst_interp<Params, PixelScale, Linear>(p, pixel_scale, interp);
+        return scale_src_dst_interp<Params, PixelScale, Linear, Overlay>(
+            p, pixel_scale, interp, overlay);
     }
     default:
         PyErr_SetString(PyExc_ValueError, "Unknown interpolation type");
         return false;
     };
 }
+/* Scale source to an RGB destination, blending the mask overlay (if any) */
+template <class Params, class PixelScale>
+static bool scale_src_color(Params &p, PixelScale &scale, PyObject *p_overlay)
+{
+    if (p_overlay && p_overlay != Py_None)
+    {
+        PyArrayObject *p_mask = 0;
+        int ncols;
+        unsigned long masked, unmasked;
+        if (!PyArg_ParseTuple(p_overlay, "Oikk:mask overlay",
+                              &p_mask, &ncols, &masked, &unmasked))
+            return false;
+        if (!check_mask_overlay(p_mask, ncols))
+            return false;
+        MaskOverlay overlay(p_mask, ncols, masked, unmasked,
+                            PyArray_DIM(p.p_src, 0), PyArray_DIM(p.p_src, 1));
+        return scale_src_dst<Params, PixelScale, MaskOverlay>(p, scale, overlay);
+    }
+    return scale_src_dst<Params, PixelScale>(p, scale);
+}
+
+/* Scale source to a floating point destination */
+template <class Params, class ST, class DT>
+static bool scale_src_float(Params &p, double a, double b, PyObject *p_bg,
+                            const Transfer &transfer)
+{
+    double bg = 0.0;
+    bool apply_bg = p_bg != Py_None;
+    if (apply_bg)
+    {
+        bg = PyFloat_AsDouble(p_bg);
+        if (PyErr_Occurred())
+            return false;
+    }
+    if (transfer.kind != TRANSFER_LINEAR)
+    {
+        TransferScale<ST, DT> scale(a, b, bg, apply_bg, transfer);
+        return scale_src_dst<Params, TransferScale<ST, DT>>(p, scale);
+    }
+    LinearScale<ST, DT> scale(a, b, bg, apply_bg);
+    return scale_src_dst<Params, LinearScale<ST, DT>>(p, scale);
+}
+
 /* we know the transformation and source type, now we dispatch
    on the destination type, which determines the LUT transformation
 */
@@ -538,20 +826,22 @@ template <class Params, class ST>
 static bool scale_src_bw(Params &p)
 {
     typedef LutScale<ST, npy_uint32> color_scale;
-    typedef LinearScale<ST, npy_float32> bw32_scale;
-    typedef LinearScale<ST, npy_float64> bw64_scale;
+    typedef TransferLutScale<ST, npy_uint32> transfer_color_scale;
     double a, b;
     PyObject *p_bg;
     PyArrayObject *p_cmap = 0;
-    bool apply_bg = true;
+    PyObject *p_overlay = 0;
+    PyObject *p_transfer = 0;
+    Transfer transfer;
 
-    if (!PyArg_ParseTuple(p.p_lut, "ddO|O", &a, &b, &p_bg, &p_cmap))
+    if (!PyArg_ParseTuple(p.p_lut, "ddO|OOO", &a, &b, &p_bg, &p_cmap, &p_overlay,
+                          &p_transfer))
     {
         PyErr_SetString(PyExc_ValueError, "Can't interpret pixel transformation tuple");
         return false;
     }
-    if (p_bg == Py_None)
-        apply_bg = false;
+    if (p_transfer && p_transfer != Py_None && !parse_transfer(p_transfer, transfer))
+        return false;
 
     switch (PyArray_TYPE(p.p_dst))
     {
@@ -559,6 +849,7 @@ static bool scale_src_bw(Params &p)
     {
         /* Destination is RGB */
         unsigned long bg = 0;
+        bool apply_bg = p_bg != Py_None;
         if (apply_bg)
         {
 #if PY_MAJOR_VERSION >= 3
@@ -574,33 +865,23 @@ static bool scale_src_bw(Params &p)
             return false;
         }
         Array1D<npy_uint32> cmap(p_cmap);
-        color_scale scale(a, b, cmap, bg, apply_bg);
-        return scale_src_dst<Params, color_scale>(p, scale);
-    }
-    case NPY_FLOAT32:
-    {
-        double bg = 0.0;
-        if (apply_bg)
+        if (transfer.kind != TRANSFER_LINEAR)
         {
-            bg = PyFloat_AsDouble(p_bg);
-            if (PyErr_Occurred())
-                return false;
+            // Colors of integer values are computed with the rounding mode
+            // used when resampling (see _scale_rgb)
+            int round = fegetround();
+            fesetround(FE_TOWARDZERO);
+            transfer_color_scale scale(a, b, cmap, bg, apply_bg, transfer);
+            fesetround(round);
+            return scale_src_color<Params, transfer_color_scale>(p, scale, p_overlay);
         }
-        bw32_scale scale(a, b, bg, apply_bg);
-        return scale_src_dst<Params, bw32_scale>(p, scale);
+        color_scale scale(a, b, cmap, bg, apply_bg);
+        return scale_src_color<Params, color_scale>(p, scale, p_overlay);
     }
+    case NPY_FLOAT32:
+        return scale_src_float<Params, ST, npy_float32>(p, a, b, p_bg, transfer);
     case NPY_FLOAT64:
-    {
-        double bg = 0.0;
-        if (apply_bg)
-        {
-            bg = PyFloat_AsDouble(p_bg);
-            if (PyErr_Occurred())
-                return false;
-        }
-        bw64_scale scale(a, b, bg, apply_bg);
-        return scale_src_dst<Params, bw64_scale>(p, scale);
-    }
+        return scale_src_float<Params, ST, npy_float64>(p, a, b, p_bg, transfer);
     default:
         PyErr_SetString(PyExc_TypeError, "Destination array must be uint32 (rgb) or float (BW)");
         return false;
@@ -679,18 +960,191 @@ static PyObject *dispatch_source(Params &p)
     return Py_BuildValue("iiii", p.dx1, p.dy1, p.dx2, p.dy2);
 }
 
+/* Packing of RGB(A) pixels, i.e. uint8 arrays of shape (ni, nj, nc) with
+   nc >= 3 and any strides, in ARGB32 pixels (the format of RGB images) */
+class RGBPacking
+{
+public:
+    RGBPacking(PyArrayObject *_src, int _alpha, bool _bgr) : p_src(_src),
+                                                             alpha(_alpha),
+                                                             bgr(_bgr)
+    {
+        si = PyArray_STRIDE(p_src, 0);
+        sj = PyArray_STRIDE(p_src, 1);
+        sc = PyArray_STRIDE(p_src, 2);
+    }
+
+    /* Pack rows k1 to k2 of the source region which origin is (i0, j0) */
+    void pack_rows(Array2D<npy_uint32> &dst, npy_intp i0, npy_intp j0,
+                   int k1, int k2) const
+    {
+        const char *base = (const char *)PyArray_DATA(p_src);
+        npy_intp sr = bgr ? 2 * sc : 0, sb = bgr ? 0 : 2 * sc;
+        rgba_t color;
+        color.c[3] = (npy_uint8)alpha;
+        for (int k = k1; k < k2; ++k)
+        {
+            const char *pixel = base + (i0 + k) * si + j0 * sj;
+            for (int j = 0; j < dst.nj; ++j, pixel += sj)
+            {
+                color.c[0] = *(const npy_uint8 *)(pixel + sb);
+                color.c[1] = *(const npy_uint8 *)(pixel + sc);
+                color.c[2] = *(const npy_uint8 *)(pixel + sr);
+                if (alpha < 0)
+                    color.c[3] = *(const npy_uint8 *)(pixel + 3 * sc);
+                dst.value(j, k) = color.v;
+            }
+        }
+    }
+
+    /* Pack the source region of the shape of dst which origin is (i0, j0) */
+    void run(Array2D<npy_uint32> &dst, npy_intp i0, npy_intp j0, int nthreads) const
+    {
+        int nbands = get_band_count(nthreads, dst.ni);
+        vector<std::thread> workers;
+        int band_size = (dst.ni + nbands - 1) / nbands;
+        for (int k = 1; k < nbands; ++k)
+        {
+            int k1 = min(k * band_size, dst.ni);
+            int k2 = min(k1 + band_size, dst.ni);
+            workers.push_back(std::thread(&RGBPacking::pack_rows, this,
+                                          std::ref(dst), i0, j0, k1, k2));
+        }
+        // The calling thread handles the first band
+        pack_rows(dst, i0, j0, 0, min(band_size, dst.ni));
+        for (size_t k = 0; k < workers.size(); ++k)
+        {
+            workers[k].join();
+        }
+    }
+
+    PyArrayObject *p_src;
+    int alpha; // Alpha value (-1: alpha channel of source)
+    bool bgr;  // Source channels are in BGR(A) order
+    npy_intp si, sj, sc;
+};
+
+static bool check_rgb_source(PyArrayObject *p_src, int alpha)
+{
+    if (!PyArray_Check(p_src) || PyArray_NDIM(p_src) != 3 ||
+        PyArray_TYPE(p_src) != NPY_UINT8)
+    {
+        PyErr_SetString(PyExc_TypeError, "RGB data must be a 3-D uint8 array");
+        return false;
+    }
+    if (PyArray_DIM(p_src, 2) < (alpha < 0 ? 4 : 3))
+    {
+        PyErr_SetString(PyExc_ValueError,
+                        "RGB data must have 3 channels (4 channels with alpha)");
+        return false;
+    }
+    if (alpha > 255)
+    {
+        PyErr_SetString(PyExc_ValueError, "alpha must be lower than 256");
+        return false;
+    }
+    return true;
+}
+
+/* Rescale RGB(A) source data, packing only the source pixels which may be
+   sampled to compute the destination rectangle (lazy packing) */
+static PyObject *scale_rect_rgb(PyArrayObject *p_src, double x1, double y1,
+                                double x2, double y2, PyArrayObject *p_dst,
+                                PyObject *p_dst_data, PyObject *p_lut_data,
+                                PyObject *p_interp_data, int nthreads)
+{
+    typedef params<ScaleTransform> Params;
+    int alpha, bgr = 0;
+    int dx1, dy1, dx2, dy2;
+
+    if (!PyArg_ParseTuple(p_lut_data, "i|i:RGB packing", &alpha, &bgr))
+    {
+        return NULL;
+    }
+    if (!check_rgb_source(p_src, alpha))
+    {
+        return NULL;
+    }
+    if (PyArray_TYPE(p_dst) != NPY_UINT32)
+    {
+        PyErr_SetString(PyExc_TypeError, "dst data type must be uint32 for RGB data");
+        return NULL;
+    }
+    if (!PyArg_ParseTuple(p_dst_data, "iiii", &dx1, &dy1, &dx2, &dy2))
+    {
+        PyErr_SetString(PyExc_ValueError, "Invalid destination rectangle (expected tuple of 4 integers)");
+        return NULL;
+    }
+    int ni = PyArray_DIM(p_src, 0);
+    int nj = PyArray_DIM(p_src, 1);
+    int dni = PyArray_DIM(p_dst, 0);
+    int dnj = PyArray_DIM(p_dst, 1);
+    double dx = (x2 - x1) / dnj;
+    double dy = (y2 - y1) / dni;
+    // Source pixels sampled by interpolation: some margin is kept around the
+    // destination rectangle mapped to source coordinates, so that the
+    // interpolation never reaches a border of the region which is not a
+    // border of the image (linear and antialiasing kernels read neighbors)
+    double xa = x1 + min(dx1, dx2) * dx, xb = x1 + max(dx1, dx2) * dx;
+    double ya = y1 + min(dy1, dy2) * dy, yb = y1 + max(dy1, dy2) * dy;
+    int mj = 2 + (int)ceil(fabs(dx)), mi = 2 + (int)ceil(fabs(dy));
+    if (ni == 0 || nj == 0 || isnan(xa + xb + ya + yb))
+    {
+        PyErr_SetString(PyExc_ValueError, "invalid RGB data or source rectangle");
+        return NULL;
+    }
+    int j0 = (int)max(floor(min(xa, xb)) - mj, 0.);
+    int j1 = (int)min(ceil(max(xa, xb)) + mj, (double)nj);
+    int i0 = (int)max(floor(min(ya, yb)) - mi, 0.);
+    int i1 = (int)min(ceil(max(ya, yb)) + mi, (double)ni);
+    // Region is not empty: it is bounded by the image when the destination
+    // rectangle is outside the image
+    j0 = min(j0, nj - 1);
+    i0 = min(i0, ni - 1);
+    j1 = max(j1, j0 + 1);
+    i1 = max(i1, i0 + 1);
+
+    npy_intp dims[2] = {i1 - i0, j1 - j0};
+    PyArrayObject *p_region = (PyArrayObject *)PyArray_SimpleNew(2, dims, NPY_UINT32);
+    if (!p_region)
+    {
+        return NULL;
+    }
+    Array2D<npy_uint32> region(p_region);
+    RGBPacking packing(p_src, alpha, bgr != 0);
+    Py_BEGIN_ALLOW_THREADS;
+    packing.run(region, i0, j0, nthreads);
+    Py_END_ALLOW_THREADS;
+
+    ScaleTransform trans(j1 - j0, i1 - i0, x1 - j0, y1 - i0, dx, dy);
+    Params scale_params(p_region, p_dst, p_dst_data,
+                        Py_None, p_interp_data, trans);
+    scale_params.nthreads = nthreads;
+    PyObject *result = dispatch_source<Params>(scale_params);
+    Py_DECREF(p_region);
+    return result;
+}
+
 /* Input data :
 
    SRC, SRC_DATA, DST, DST_DATA, LUT_DATA
 
    SRC : PyArrayObject (i8,u8,i16,u16,float32,float64)
+         or, with _scale_rect only, RGB(A) data: uint8 array of shape
+         (ni, nj, nc), packed on the fly in ARGB32 (see RGBPacking)
    DST : PyArrayObject : u32 -> rgb, float32 : bw
    SRC_DATA : varies :
        Scale : source rect (x1,y1,x2,y2)
        Transform : transformation matrix
        XY : source rect, X array, Y array
    DST_DATA : dest rect (dx1,dy1,dx2,dy2)
-   LUT_DATA : (a,b,bg) if DST is bw or (a,b,bg,cmap) if DST is rgb
+   LUT_DATA : (a,b,bg) if DST is bw or (a,b,bg,cmap[,overlay]) if DST is rgb,
+              overlay being None or a mask overlay tuple
+              (mask, ncols, masked_color, unmasked_color) blended over
+              destination pixels (see MaskOverlay), or (alpha[,bgr]) if SRC
+              is RGB(A) data, alpha being -1 to use the alpha channel
+   NTHREADS : (optional) number of threads used to process the destination
+              rectangle (default: 1, 0: one thread per CPU core)
 */
 
 static PyObject *py_scale_xy(PyObject *self, PyObject *args)
@@ -699,11 +1153,12 @@ static PyObject *py_scale_xy(PyObject *self, PyObject *args)
     PyArrayObject *p_src = 0, *p_dst = 0, *p_ax = 0, *p_ay = 0;
     PyObject *p_lut_data, *p_src_data, *p_dst_data, *p_interp_data;
     double x1, y1, x2, y2;
+    int nthreads = 1;
 
-    if (!PyArg_ParseTuple(args, "OOOOOO:_scale_xy",
+    if (!PyArg_ParseTuple(args, "OOOOOO|i:_scale_xy",
                           &p_src, &p_src_data,
                           &p_dst, &p_dst_data,
-                          &p_lut_data, &p_interp_data))
+                          &p_lut_data, &p_interp_data, &nthreads))
     {
         return NULL;
     }
@@ -726,6 +1181,7 @@ static PyObject *py_scale_xy(PyObject *self, PyObject *args)
     XYScale trans(nj, ni, ax, ay, x1, y1, dx, dy);
     Params scale_params(p_src, p_dst, p_dst_data,
                         p_lut_data, p_interp_data, trans);
+    scale_params.nthreads = nthreads;
 
     // examine source type
     return dispatch_source<Params>(scale_params);
@@ -736,11 +1192,12 @@ static PyObject *py_scale_tr(PyObject *self, PyObject *args)
     typedef params<LinearTransform> Params;
     PyArrayObject *p_src = 0, *p_dst = 0, *p_tr;
     PyObject *p_lut_data, *p_dst_data, *p_interp_data;
+    int nthreads = 1;
 
-    if (!PyArg_ParseTuple(args, "OOOOOO:_scale_tr",
+    if (!PyArg_ParseTuple(args, "OOOOOO|i:_scale_tr",
                           &p_src, &p_tr,
                           &p_dst, &p_dst_data,
-                          &p_lut_data, &p_interp_data))
+                          &p_lut_data, &p_interp_data, &nthreads))
     {
         return NULL;
     }
@@ -763,6 +1220,7 @@ static PyObject *py_scale_tr(PyObject *self, PyObject *args)
     );
     Params scale_params(p_src, p_dst, p_dst_data,
                         p_lut_data, p_interp_data, trans);
+    scale_params.nthreads = nthreads;
 
     // examine source type
     return dispatch_source<Params>(scale_params);
@@ -774,20 +1232,28 @@ static PyObject *py_scale_rect(PyObject *self, PyObject *args)
     PyArrayObject *p_src = 0, *p_dst = 0;
     PyObject *p_lut_data, *p_dst_data, *p_interp_data, *p_src_data;
     double x1, x2, y1, y2;
+    int nthreads = 1;
 
-    if (!PyArg_ParseTuple(args, "OOOOOO:_scale_rect",
+    if (!PyArg_ParseTuple(args, "OOOOOO|i:_scale_rect",
                           &p_src, &p_src_data,
                           &p_dst, &p_dst_data,
-                          &p_lut_data, &p_interp_data))
+                          &p_lut_data, &p_interp_data, &nthreads))
     {
         return NULL;
     }
-    if (!check_arrays(p_src, p_dst))
+    if (!PyArg_ParseTuple(p_src_data, "dddd:_scale_rect",
+                          &x1, &y1, &x2, &y2))
     {
         return NULL;
     }
-    if (!PyArg_ParseTuple(p_src_data, "dddd:_scale_rect",
-                          &x1, &y1, &x2, &y2))
+    if (PyArray_Check(p_src) && PyArray_NDIM(p_src) == 3 && PyArray_Check(p_dst) &&
+        PyArray_NDIM(p_dst) == 2)
+    {
+        // RGB(A) source data: packed on the fly
+        return scale_rect_rgb(p_src, x1, y1, x2, y2, p_dst, p_dst_data,
+                              p_lut_data, p_interp_data, nthreads);
+    }
+    if (!check_arrays(p_src, p_dst))
     {
         return NULL;
     }
@@ -802,6 +1268,7 @@ static PyObject *py_scale_rect(PyObject *self, PyObject *args)
 
     Params scale_params(p_src, p_dst, p_dst_data,
                         p_lut_data, p_interp_data, trans);
+    scale_params.nthreads = nthreads;
 
     // examine source type
     return dispatch_source<Params>(scale_params);
@@ -865,6 +1332,1066 @@ static PyObject *py_histogram(PyObject *self, PyObject *args)
     return Py_None;
 }
 
+/* Histogram with uniform bins, following the binning rules of numpy.histogram:
+   values are counted in [bins[0], bins[n]] (the last bin is closed),
+   NaN and out-of-range values are ignored.
+   8-bit and 16-bit integer data are first counted in a lookup table (one
+   counter per possible value), which is then distributed over the bins. */
+class UniformHistogram
+{
+public:
+    UniformHistogram(PyArrayObject *_data, PyArrayObject *_bins,
+                     PyArrayObject *_res) : p_data(_data),
+                                            p_bins(_bins),
+                                            p_res(_res)
+    {
+    }
+
+    int bin_index(const Array1D<double> &bins, double v) const
+    {
+        int n = bins.ni - 1;
+        double first = bins.value(0), last = bins.value(n);
+        if (!(v >= first && v <= last))
+        {
+            return -1; // NaN or out-of-range value
+        }
+        int idx = (int)(((v - first) / (last - first)) * n);
+        if (idx >= n)
+        {
+            idx = n - 1;
+        }
+        // Correct rounding errors at bin edges
+        if (v < bins.value(idx))
+        {
+            idx--;
+        }
+        else if (idx != n - 1 && v >= bins.value(idx + 1))
+        {
+            idx++;
+        }
+        return idx;
+    }
+
+    template <class T>
+    void run()
+    {
+        Array1D<double> bins(p_bins);
+        Array1D<npy_int64> res(p_res);
+        int ndim = PyArray_NDIM(p_data);
+        npy_intp ni = ndim == 2 ? PyArray_DIM(p_data, 0) : 1;
+        npy_intp nj = PyArray_DIM(p_data, ndim - 1);
+        npy_intp si = ndim == 2 ? PyArray_STRIDE(p_data, 0) : 0;
+        npy_intp sj = PyArray_STRIDE(p_data, ndim - 1);
+        char *base = (char *)PyArray_DATA(p_data);
+        if (std::numeric_limits<T>::is_integer && sizeof(T) <= 2)
+        {
+            const int offset = -(int)std::numeric_limits<T>::min();
+            vector<npy_int64> counts(1 << (8 * sizeof(T)), 0);
+            for (npy_intp i = 0; i < ni; ++i)
+            {
+                char *row = base + i * si;
+                for (npy_intp j = 0; j < nj; ++j)
+                {
+                    counts[(int)*(T *)(row + j * sj) + offset]++;
+                }
+            }
+            for (size_t k = 0; k < counts.size(); ++k)
+            {
+                if (counts[k])
+                {
+                    int idx = bin_index(bins, (double)((int)k - offset));
+                    if (idx >= 0)
+                    {
+                        res.value(idx) += counts[k];
+                    }
+                }
+            }
+        }
+        else
+        {
+            for (npy_intp i = 0; i < ni; ++i)
+            {
+                char *row = base + i * si;
+                for (npy_intp j = 0; j < nj; ++j)
+                {
+                    int idx = bin_index(bins, (double)*(T *)(row + j * sj));
+                    if (idx >= 0)
+                    {
+                        res.value(idx)++;
+                    }
+                }
+            }
+        }
+    }
+    PyArrayObject *p_data, *p_bins, *p_res;
+};
+
+static PyObject *py_histogram_uniform(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_data = 0, *p_bins = 0, *p_res = 0;
+
+    if (!PyArg_ParseTuple(args, "OOO:_histogram_uniform", &p_data, &p_bins,
+                          &p_res))
+    {
+        return NULL;
+    }
+    if (!PyArray_Check(p_data) ||
+        !PyArray_Check(p_bins) ||
+        !PyArray_Check(p_res))
+    {
+        PyErr_SetString(PyExc_TypeError, "data, bins, dest must be ndarray");
+        return NULL;
+    }
+    if (PyArray_NDIM(p_data) != 1 && PyArray_NDIM(p_data) != 2)
+    {
+        PyErr_SetString(PyExc_TypeError, "data must be a 1-D or 2-D array");
+        return NULL;
+    }
+    if (PyArray_NDIM(p_bins) != 1 || PyArray_TYPE(p_bins) != NPY_FLOAT64 ||
+        PyArray_DIM(p_bins, 0) < 2)
+    {
+        PyErr_SetString(PyExc_TypeError,
+                        "bins must be a 1-D float64 array of at least 2 edges");
+        return NULL;
+    }
+    if (PyArray_NDIM(p_res) != 1 || PyArray_TYPE(p_res) != NPY_INT64 ||
+        PyArray_DIM(p_res, 0) != PyArray_DIM(p_bins, 0) - 1)
+    {
+        PyErr_SetString(PyExc_TypeError,
+                        "dest must be a 1-D int64 array of len(bins)-1 elements");
+        return NULL;
+    }
+    if (!check_dispatch_type("data", p_data))
+    {
+        return NULL;
+    }
+    UniformHistogram hist(p_data, p_bins, p_res);
+    Py_BEGIN_ALLOW_THREADS;
+    dispatch_array(PyArray_TYPE(p_data), hist);
+    Py_END_ALLOW_THREADS;
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+/* Statistics of data (minimum, maximum, number of values, sum and sum of
+   squares), ignoring NaN values and masked values (non-zero mask values) */
+struct DataStats
+{
+    DataStats() : vmin(0.), vmax(0.), sum(0.), sumsq(0.), count(0) {}
+    void merge(const DataStats &other)
+    {
+        if (!other.count)
+            return;
+        if (!count || other.vmin < vmin)
+            vmin = other.vmin;
+        if (!count || other.vmax > vmax)
+            vmax = other.vmax;
+        sum += other.sum;
+        sumsq += other.sumsq;
+        count += other.count;
+    }
+    double vmin, vmax, sum, sumsq;
+    npy_int64 count;
+};
+
+class NanStats
+{
+public:
+    NanStats(PyArrayObject *_data, PyArrayObject *_mask,
+             int _nthreads) : p_data(_data),
+                              p_mask(_mask),
+                              nthreads(_nthreads)
+    {
+    }
+
+    template <class T>
+    void run_rows(npy_intp i1, npy_intp i2, DataStats *stats)
+    {
+        int ndim = PyArray_NDIM(p_data);
+        npy_intp nj = PyArray_DIM(p_data, ndim - 1);
+        npy_intp si = ndim == 2 ? PyArray_STRIDE(p_data, 0) : 0;
+        npy_intp sj = PyArray_STRIDE(p_data, ndim - 1);
+        npy_intp msi = 0, msj = 0;
+        char *base = (char *)PyArray_DATA(p_data);
+        char *mbase = 0;
+        if (p_mask)
+        {
+            mbase = (char *)PyArray_DATA(p_mask);
+            msi = ndim == 2 ? PyArray_STRIDE(p_mask, 0) : 0;
+            msj = PyArray_STRIDE(p_mask, ndim - 1);
+        }
+        // Local accumulators are faster than updating the shared structure
+        double vmin = 0., vmax = 0., sum = 0., sumsq = 0.;
+        npy_int64 count = 0;
+        for (npy_intp i = i1; i < i2; ++i)
+        {
+            char *row = base + i * si;
+            char *mrow = mbase ? mbase + i * msi : 0;
+            for (npy_intp j = 0; j < nj; ++j)
+            {
+                if (mrow && *(npy_uint8 *)(mrow + j * msj))
+                    continue;
+                double v = (double)*(T *)(row + j * sj);
+                if (isnan(v))
+                    continue; // NaN
+                if (!count)
+                {
+                    vmin = vmax = v;
+                }
+                else if (v < vmin)
+                {
+                    vmin = v;
+                }
+                else if (v > vmax)
+                {
+                    vmax = v;
+                }
+                sum += v;
+                sumsq += v * v;
+                count++;
+            }
+        }
+        stats->vmin = vmin;
+        stats->vmax = vmax;
+        stats->sum = sum;
+        stats->sumsq = sumsq;
+        stats->count = count;
+    }
+
+    template <class T>
+    void run()
+    {
+        int ndim = PyArray_NDIM(p_data);
+        npy_intp ni = ndim == 2 ? PyArray_DIM(p_data, 0) : 1;
+        npy_intp nj = PyArray_DIM(p_data, ndim - 1);
+        int nbands = 1;
+        if (ni * nj >= MIN_STATS_PIXELS)
+        {
+            nbands = get_band_count(nthreads, (int)ni);
+        }
+        vector<DataStats> bands(nbands);
+        vector<std::thread> workers;
+        npy_intp band_height = (ni + nbands - 1) / nbands;
+        for (int k = 1; k < nbands; ++k)
+        {
+            npy_intp i1 = min(k * band_height, ni);
+            npy_intp i2 = min(i1 + band_height, ni);
+            workers.push_back(std::thread(&NanStats::run_rows<T>, this,
+                                          i1, i2, &bands[k]));
+        }
+        // The calling thread handles the first band
+        run_rows<T>(0, min(band_height, ni), &bands[0]);
+        for (size_t k = 0; k < workers.size(); ++k)
+        {
+            workers[k].join();
+        }
+        for (int k = 0; k < nbands; ++k)
+        {
+            stats.merge(bands[k]);
+        }
+    }
+    PyArrayObject *p_data, *p_mask;
+    int nthreads;
+    DataStats stats;
+};
+
+static PyObject *py_nan_stats(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_data = 0;
+    PyObject *p_mask = Py_None;
+    int nthreads = 1;
+
+    if (!PyArg_ParseTuple(args, "O|Oi:_nan_stats", &p_data, &p_mask, &nthreads))
+    {
+        return NULL;
+    }
+    if (!PyArray_Check(p_data))
+    {
+        PyErr_SetString(PyExc_TypeError, "data must be ndarray");
+        return NULL;
+    }
+    if (PyArray_NDIM(p_data) != 1 && PyArray_NDIM(p_data) != 2)
+    {
+        PyErr_SetString(PyExc_TypeError, "data must be a 1-D or 2-D array");
+        return NULL;
+    }
+    if (!check_dispatch_type("data", p_data))
+    {
+        return NULL;
+    }
+    PyArrayObject *mask = 0;
+    if (p_mask != Py_None)
+    {
+        if (!PyArray_Check(p_mask) ||
+            (PyArray_TYPE((PyArrayObject *)p_mask) != NPY_BOOL &&
+             PyArray_TYPE((PyArrayObject *)p_mask) != NPY_UINT8) ||
+            !PyArray_SAMESHAPE((PyArrayObject *)p_mask, p_data))
+        {
+            PyErr_SetString(PyExc_TypeError,
+                            "mask must be a bool or uint8 array with the same shape as data");
+            return NULL;
+        }
+        mask = (PyArrayObject *)p_mask;
+    }
+    NanStats nan_stats(p_data, mask, nthreads);
+    Py_BEGIN_ALLOW_THREADS;
+    dispatch_array(PyArray_TYPE(p_data), nan_stats);
+    Py_END_ALLOW_THREADS;
+    const DataStats &st = nan_stats.stats;
+    if (!st.count)
+    {
+        return Py_BuildValue("ddLdd", Py_NAN, Py_NAN, (long long)0, 0., 0.);
+    }
+    return Py_BuildValue("ddLdd", st.vmin, st.vmax, (long long)st.count,
+                         st.sum, st.sumsq);
+}
+
+static bool check_index_array(const char *name, PyArrayObject *arr)
+{
+    if (!PyArray_Check(arr) || PyArray_NDIM(arr) != 1 ||
+        PyArray_TYPE(arr) != NPY_INT64)
+    {
+        PyErr_Format(PyExc_TypeError, "%s must be a 1-D int64 array", name);
+        return false;
+    }
+    return true;
+}
+
+/* Check that curve point indexes bounds are increasing and inside data */
+static bool check_bucket_bounds(PyArrayObject *p_bounds, npy_intp npoints)
+{
+    npy_intp nb = PyArray_DIM(p_bounds, 0);
+    if (nb < 2)
+    {
+        PyErr_SetString(PyExc_ValueError, "bounds must have at least 2 elements");
+        return false;
+    }
+    for (npy_intp k = 0; k < nb; ++k)
+    {
+        npy_int64 b = *(npy_int64 *)PyArray_GETPTR1(p_bounds, k);
+        if (b < 0 || b > npoints ||
+            (k > 0 && b < *(npy_int64 *)PyArray_GETPTR1(p_bounds, k - 1)))
+        {
+            PyErr_SetString(PyExc_ValueError,
+                            "bounds must be increasing indexes of data points");
+            return false;
+        }
+    }
+    return true;
+}
+
+/* M4 decimation: keep the first, minimum, maximum and last points of each
+   bucket of curve points (bucket k contains points bounds[k] to
+   bounds[k+1]-1), ignoring NaN values for the minimum and the maximum.
+   The (at most 4) selected indexes of bucket k are written in increasing
+   order in res[4*k:4*k+4], unused slots are set to -1 */
+class M4Decimation
+{
+public:
+    M4Decimation(PyArrayObject *_y, PyArrayObject *_bounds, PyArrayObject *_res,
+                 int _nthreads) : p_y(_y),
+                                  p_bounds(_bounds),
+                                  p_res(_res),
+                                  nthreads(_nthreads)
+    {
+    }
+
+    template <class T>
+    void run_buckets(npy_intp k1, npy_intp k2)
+    {
+        char *base = (char *)PyArray_DATA(p_y);
+        npy_intp sy = PyArray_STRIDE(p_y, 0);
+        for (npy_intp k = k1; k < k2; ++k)
+        {
+            npy_int64 i1 = bound(k), i2 = bound(k + 1);
+            npy_int64 imin = -1, imax = -1;
+            double vmin = 0., vmax = 0.;
+            for (npy_int64 i = i1; i < i2; ++i)
+            {
+                double v = (double)*(T *)(base + i * sy);
+                if (isnan(v))
+                    continue; // NaN
+                if (imin < 0)
+                {
+                    imin = imax = i;
+                    vmin = vmax = v;
+                }
+                else if (v < vmin)
+                {
+                    imin = i;
+                    vmin = v;
+                }
+                else if (v > vmax)
+                {
+                    imax = i;
+                    vmax = v;
+                }
+            }
+            npy_int64 selected[4] = {i1, min(imin, imax), max(imin, imax), i2 - 1};
+            npy_int64 last = -1;
+            int count = 0;
+            for (int j = 0; i2 > i1 && j < 4; ++j)
+            {
+                // Skipping duplicates (and -1 indexes if all values are NaN)
+                if (selected[j] > last)
+                {
+                    last = selected[j];
+                    result(4 * k + count++) = last;
+                }
+            }
+            for (; count < 4; ++count)
+            {
+                result(4 * k + count) = -1;
+            }
+        }
+    }
+
+    template <class T>
+    void run()
+    {
+        npy_intp nbuckets = PyArray_DIM(p_bounds, 0) - 1;
+        int nbands = 1;
+        if (bound(nbuckets) - bound(0) >= MIN_DECIMATION_POINTS)
+        {
+            nbands = get_band_count(nthreads, (int)nbuckets);
+        }
+        vector<std::thread> workers;
+        npy_intp band_size = (nbuckets + nbands - 1) / nbands;
+        for (int k = 1; k < nbands; ++k)
+        {
+            npy_intp k1 = min(k * band_size, nbuckets);
+            npy_intp k2 = min(k1 + band_size, nbuckets);
+            workers.push_back(std::thread(&M4Decimation::run_buckets<T>, this,
+                                          k1, k2));
+        }
+        // The calling thread handles the first band
+        run_buckets<T>(0, min(band_size, nbuckets));
+        for (size_t k = 0; k < workers.size(); ++k)
+        {
+            workers[k].join();
+        }
+    }
+
+    npy_int64 bound(npy_intp k) const
+    {
+        return *(npy_int64 *)PyArray_GETPTR1(p_bounds, k);
+    }
+    npy_int64 &result(npy_intp k)
+    {
+        return *(npy_int64 *)PyArray_GETPTR1(p_res, k);
+    }
+    PyArrayObject *p_y, *p_bounds, *p_res;
+    int nthreads;
+};
+
+static PyObject *py_decimate_m4(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_y = 0, *p_bounds = 0, *p_res = 0;
+    int nthreads = 1;
+
+    if (!PyArg_ParseTuple(args, "OOO|i:_decimate_m4", &p_y, &p_bounds, &p_res,
+                          &nthreads))
+    {
+        return NULL;
+    }
+    if (!PyArray_Check(p_y) || PyArray_NDIM(p_y) != 1)
+    {
+        PyErr_SetString(PyExc_TypeError, "y must be a 1-D array");
+        return NULL;
+    }
+    if (!check_dispatch_type("y", p_y) ||
+        !check_index_array("bounds", p_bounds) ||
+        !check_index_array("dest", p_res))
+    {
+        return NULL;
+    }
+    if (PyArray_DIM(p_res, 0) != 4 * (PyArray_DIM(p_bounds, 0) - 1))
+    {
+        PyErr_SetString(PyExc_TypeError,
+                        "dest must have 4*(len(bounds)-1) elements");
+        return NULL;
+    }
+    if (!check_bucket_bounds(p_bounds, PyArray_DIM(p_y, 0)))
+    {
+        return NULL;
+    }
+    M4Decimation m4(p_y, p_bounds, p_res, nthreads);
+    Py_BEGIN_ALLOW_THREADS;
+    dispatch_array(PyArray_TYPE(p_y), m4);
+    Py_END_ALLOW_THREADS;
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+/* Largest-Triangle-Three-Buckets decimation: select one point per bucket of
+   curve points (bucket k contains points bounds[k] to bounds[k+1]-1), the
+   one forming the largest triangle with the point selected in the previous
+   bucket and the average point of the next bucket (NaN values are ignored).
+   The first and last buckets give the first and the last points */
+class LTTBDecimation
+{
+public:
+    LTTBDecimation(PyArrayObject *_x, PyArrayObject *_y, PyArrayObject *_bounds,
+                   PyArrayObject *_res) : p_x(_x),
+                                          p_y(_y),
+                                          p_bounds(_bounds),
+                                          p_res(_res)
+    {
+    }
+
+    template <class T>
+    void run()
+    {
+        char *xbase = (char *)PyArray_DATA(p_x);
+        char *ybase = (char *)PyArray_DATA(p_y);
+        npy_intp sx = PyArray_STRIDE(p_x, 0);
+        npy_intp sy = PyArray_STRIDE(p_y, 0);
+        npy_intp nbuckets = PyArray_DIM(p_bounds, 0) - 1;
+        npy_int64 a = bound(0);
+        result(0) = a;
+        for (npy_intp k = 1; k < nbuckets - 1; ++k)
+        {
+            // Average point of the next bucket
+            double avgx = 0., avgy = 0.;
+            npy_int64 count = 0;
+            for (npy_int64 i = bound(k + 1); i < bound(k + 2); ++i)
+            {
+                double x = *(double *)(xbase + i * sx);
+                double y = (double)*(T *)(ybase + i * sy);
+                if (x != x || y != y)
+                    continue; // NaN
+                avgx += x;
+                avgy += y;
+                count++;
+            }
+            if (count)
+            {
+                avgx /= count;
+                avgy /= count;
+            }
+            double xa = *(double *)(xbase + a * sx);
+            double ya = (double)*(T *)(ybase + a * sy);
+            double max_area = -1.;
+            npy_int64 selected = bound(k);
+            for (npy_int64 i = bound(k); i < bound(k + 1); ++i)
+            {
+                double x = *(double *)(xbase + i * sx);
+                double y = (double)*(T *)(ybase + i * sy);
+                // Twice the triangle area (NaN areas are never selected)
+                double area = fabs((xa - avgx) * (y - ya) - (xa - x) * (avgy - ya));
+                if (area > max_area)
+                {
+                    max_area = area;
+                    selected = i;
+                }
+            }
+            result(k) = a = selected;
+        }
+        result(nbuckets - 1) = bound(nbuckets) - 1;
+    }
+
+    npy_int64 bound(npy_intp k) const
+    {
+        return *(npy_int64 *)PyArray_GETPTR1(p_bounds, k);
+    }
+    npy_int64 &result(npy_intp k)
+    {
+        return *(npy_int64 *)PyArray_GETPTR1(p_res, k);
+    }
+    PyArrayObject *p_x, *p_y, *p_bounds, *p_res;
+};
+
+static PyObject *py_decimate_lttb(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_x = 0, *p_y = 0, *p_bounds = 0, *p_res = 0;
+
+    if (!PyArg_ParseTuple(args, "OOOO:_decimate_lttb", &p_x, &p_y, &p_bounds,
+                          &p_res))
+    {
+        return NULL;
+    }
+    if (!PyArray_Check(p_x) || PyArray_NDIM(p_x) != 1 ||
+        PyArray_TYPE(p_x) != NPY_FLOAT64)
+    {
+        PyErr_SetString(PyExc_TypeError, "x must be a 1-D float64 array");
+        return NULL;
+    }
+    if (!PyArray_Check(p_y) || PyArray_NDIM(p_y) != 1 ||
+        PyArray_DIM(p_y, 0) != PyArray_DIM(p_x, 0))
+    {
+        PyErr_SetString(PyExc_TypeError,
+                        "y must be a 1-D array with the same size as x");
+        return NULL;
+    }
+    if (!check_dispatch_type("y", p_y) ||
+        !check_index_array("bounds", p_bounds) ||
+        !check_index_array("dest", p_res))
+    {
+        return NULL;
+    }
+    if (PyArray_DIM(p_res, 0) != PyArray_DIM(p_bounds, 0) - 1)
+    {
+        PyErr_SetString(PyExc_TypeError, "dest must have len(bounds)-1 elements");
+        return NULL;
+    }
+    if (!check_bucket_bounds(p_bounds, PyArray_DIM(p_y, 0)))
+    {
+        return NULL;
+    }
+    for (npy_intp k = 0; k < PyArray_DIM(p_res, 0); ++k)
+    {
+        if (*(npy_int64 *)PyArray_GETPTR1(p_bounds, k + 1) ==
+            *(npy_int64 *)PyArray_GETPTR1(p_bounds, k))
+        {
+            PyErr_SetString(PyExc_ValueError, "buckets must not be empty");
+            return NULL;
+        }
+    }
+    LTTBDecimation lttb(p_x, p_y, p_bounds, p_res);
+    Py_BEGIN_ALLOW_THREADS;
+    dispatch_array(PyArray_TYPE(p_y), lttb);
+    Py_END_ALLOW_THREADS;
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+/* Axis-aligned segments collapsing: segment i is parallel to the "a" axis, at
+   coordinate c[i] on the "c" axis, from a0[i] to a1[i] (canvas coordinates).
+   Segments are culled to the grid of ncols x nrows pixels starting at
+   (cmin, amin), and the overlapping segments of each pixel column are merged.
+   Merged segments (c, a0, a1) are written at the center of pixels in res[k]
+   in column order, and their number is returned */
+class SegmentCollapse
+{
+public:
+    SegmentCollapse(PyArrayObject *_c, PyArrayObject *_a0, PyArrayObject *_a1,
+                    double _cmin, double _amin, int _ncols, int _nrows,
+                    PyArrayObject *_res) : p_c(_c),
+                                           p_a0(_a0),
+                                           p_a1(_a1),
+                                           cmin(_cmin),
+                                           amin(_amin),
+                                           ncols(_ncols),
+                                           nrows(_nrows),
+                                           p_res(_res),
+                                           count(0)
+    {
+    }
+
+    void run()
+    {
+        npy_intp n = PyArray_DIM(p_c, 0);
+        // Coverage counts are computed on the whole pixel grid if it is not
+        // much larger than the number of segments, otherwise column by column
+        if ((double)ncols * (nrows + 1) <= 4. * n)
+            run_grid(n);
+        else
+            run_columns(n);
+    }
+
+    /* Return the pixel column of segment i (-1 if it is culled) and set its
+       first and last pixel rows */
+    inline int get_pixels(npy_intp i, int &row0, int &row1) const
+    {
+        double vc = value(p_c, i) - cmin;
+        double va0 = value(p_a0, i) - amin, va1 = value(p_a1, i) - amin;
+        double vmin = va0 < va1 ? va0 : va1, vmax = va0 < va1 ? va1 : va0;
+        if (!(vc >= 0. && vc < ncols && vmax >= 0. && vmin < nrows) ||
+            va0 != va0 || va1 != va1)
+            return -1; // Outside the grid or NaN
+        row0 = vmin > 0. ? (int)vmin : 0;
+        row1 = vmax < nrows ? (int)vmax : nrows - 1;
+        return (int)vc;
+    }
+
+    void run_grid(npy_intp n)
+    {
+        vector<int> coverage((size_t)ncols * (nrows + 1), 0);
+        int row0, row1;
+        for (npy_intp i = 0; i < n; ++i)
+        {
+            int col = get_pixels(i, row0, row1);
+            if (col >= 0)
+            {
+                int *column = &coverage[(size_t)col * (nrows + 1)];
+                column[row0]++;
+                column[row1 + 1]--;
+            }
+        }
+        for (int col = 0; col < ncols; ++col)
+        {
+            scan_column(col, &coverage[(size_t)col * (nrows + 1)], 0, nrows - 1);
+        }
+    }
+
+    void run_columns(npy_intp n)
+    {
+        // Counting sort of segments by pixel column
+        vector<int> cols(n), rows(2 * n);
+        vector<npy_intp> offsets(ncols + 1, 0);
+        for (npy_intp i = 0; i < n; ++i)
+        {
+            cols[i] = get_pixels(i, rows[2 * i], rows[2 * i + 1]);
+            if (cols[i] >= 0)
+                offsets[cols[i] + 1]++;
+        }
+        for (int col = 0; col < ncols; ++col)
+        {
+            offsets[col + 1] += offsets[col];
+        }
+        vector<npy_intp> pos(offsets.begin(), offsets.end() - 1);
+        vector<int> sorted_rows(2 * offsets[ncols]);
+        for (npy_intp i = 0; i < n; ++i)
+        {
+            if (cols[i] >= 0)
+            {
+                npy_intp k = pos[cols[i]]++;
+                sorted_rows[2 * k] = rows[2 * i];
+                sorted_rows[2 * k + 1] = rows[2 * i + 1];
+            }
+        }
+        vector<int> coverage(nrows + 1, 0);
+        for (int col = 0; col < ncols; ++col)
+        {
+            npy_intp k1 = offsets[col], k2 = offsets[col + 1];
+            if (k2 - k1 == 1)
+            {
+                add_segment(col, sorted_rows[2 * k1], sorted_rows[2 * k1 + 1]);
+                continue;
+            }
+            int rmin = nrows, rmax = -1;
+            for (npy_intp k = k1; k < k2; ++k)
+            {
+                coverage[sorted_rows[2 * k]]++;
+                coverage[sorted_rows[2 * k + 1] + 1]--;
+                rmin = min(rmin, sorted_rows[2 * k]);
+                rmax = max(rmax, sorted_rows[2 * k + 1]);
+            }
+            scan_column(col, &coverage[0], rmin, rmax);
+        }
+    }
+
+    /* Add the segments of a pixel column from its coverage count differences
+       (which are reset), rows rmin to rmax being the only covered rows */
+    void scan_column(int col, int *coverage, int rmin, int rmax)
+    {
+        int depth = 0, start = 0;
+        for (int row = rmin; row <= rmax + 1; ++row)
+        {
+            int previous = depth;
+            depth += coverage[row];
+            coverage[row] = 0;
+            if (previous == 0 && depth > 0)
+                start = row;
+            else if (previous > 0 && depth == 0)
+                add_segment(col, start, row - 1);
+        }
+    }
+
+    void add_segment(int col, int row0, int row1)
+    {
+        double *dest = (double *)PyArray_GETPTR2(p_res, count++, 0);
+        dest[0] = cmin + col + .5;
+        dest[1] = amin + row0 + .5;
+        dest[2] = amin + row1 + .5;
+    }
+
+    static inline double value(PyArrayObject *arr, npy_intp i)
+    {
+        return *(double *)((char *)PyArray_DATA(arr) + i * PyArray_STRIDE(arr, 0));
+    }
+
+    PyArrayObject *p_c, *p_a0, *p_a1;
+    double cmin, amin;
+    int ncols, nrows;
+    PyArrayObject *p_res;
+    npy_intp count;
+};
+
+static PyObject *py_collapse_segments(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_c = 0, *p_a0 = 0, *p_a1 = 0, *p_res = 0;
+    double cmin, amin;
+    int ncols, nrows;
+
+    if (!PyArg_ParseTuple(args, "OOOddiiO:_collapse_segments", &p_c, &p_a0,
+                          &p_a1, &cmin, &amin, &ncols, &nrows, &p_res))
+    {
+        return NULL;
+    }
+    PyArrayObject *arrays[3] = {p_c, p_a0, p_a1};
+    for (int k = 0; k < 3; ++k)
+    {
+        if (!PyArray_Check(arrays[k]) || PyArray_NDIM(arrays[k]) != 1 ||
+            PyArray_TYPE(arrays[k]) != NPY_FLOAT64 ||
+            PyArray_DIM(arrays[k], 0) != PyArray_DIM(p_c, 0))
+        {
+            PyErr_SetString(PyExc_TypeError,
+                            "c, a0 and a1 must be 1-D float64 arrays of the same size");
+            return NULL;
+        }
+    }
+    if (!PyArray_Check(p_res) || PyArray_NDIM(p_res) != 2 ||
+        PyArray_TYPE(p_res) != NPY_FLOAT64 || PyArray_DIM(p_res, 1) != 3 ||
+        PyArray_DIM(p_res, 0) < PyArray_DIM(p_c, 0))
+    {
+        PyErr_SetString(PyExc_TypeError,
+                        "dest must be a float64 array of shape (len(c), 3)");
+        return NULL;
+    }
+    if (ncols < 0 || nrows < 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "grid size must be positive");
+        return NULL;
+    }
+    SegmentCollapse collapse(p_c, p_a0, p_a1, cmin, amin, ncols, nrows, p_res);
+    Py_BEGIN_ALLOW_THREADS;
+    collapse.run();
+    Py_END_ALLOW_THREADS;
+    return PyLong_FromSsize_t(collapse.count);
+}
+
+/* Profile extraction: profile k is sampled at bounds[k+1]-bounds[k] points
+   evenly spaced along the segment geometry[k, 0:4] = (x0, y0, x1, y1), in
+   pixel coordinates (pixel (i, j) covers [j, j+1[ x [i, i+1[), with bilinear
+   interpolation. At each point, the image is also sampled across the segment
+   (round(geometry[k, 4]) points spaced by one pixel, centered on the
+   segment), and these samples are reduced to their mean, sum or maximum.
+   NaN samples and samples outside the image are ignored (the result is NaN
+   if there is no valid sample) */
+enum
+{
+    PROFILE_MEAN = 0,
+    PROFILE_SUM = 1,
+    PROFILE_MAX = 2
+};
+
+class ProfileExtraction
+{
+public:
+    ProfileExtraction(PyArrayObject *_data, PyArrayObject *_geometry,
+                      PyArrayObject *_bounds, int _mode, PyArrayObject *_res,
+                      int _nthreads) : p_data(_data),
+                                       p_geometry(_geometry),
+                                       p_bounds(_bounds),
+                                       p_res(_res),
+                                       mode(_mode),
+                                       nthreads(_nthreads)
+    {
+        ni = PyArray_DIM(p_data, 0);
+        nj = PyArray_DIM(p_data, 1);
+        si = PyArray_STRIDE(p_data, 0);
+        sj = PyArray_STRIDE(p_data, 1);
+    }
+
+    template <class T>
+    double sample(double x, double y) const
+    {
+        if (!(x >= 0. && x <= nj && y >= 0. && y <= ni))
+            return NAN; // Outside the image (or NaN coordinates)
+        // Pixel centers are at half-integer coordinates: samples between the
+        // image border and the first/last pixel centers are not extrapolated
+        double u = min(max(x - .5, 0.), (double)(nj - 1));
+        double v = min(max(y - .5, 0.), (double)(ni - 1));
+        npy_intp j0 = min((npy_intp)u, max(nj - 2, (npy_intp)0));
+        npy_intp i0 = min((npy_intp)v, max(ni - 2, (npy_intp)0));
+        double fu = u - j0, fv = v - i0;
+        const char *base = (const char *)PyArray_DATA(p_data);
+        double value = 0.;
+        for (int di = 0; di < 2; ++di)
+        {
+            double wi = di ? fv : 1. - fv;
+            if (wi == 0.)
+                continue; // Neighbors with a null weight may be NaN
+            for (int dj = 0; dj < 2; ++dj)
+            {
+                double w = wi * (dj ? fu : 1. - fu);
+                if (w == 0.)
+                    continue;
+                value += w * (double)*(const T *)(base + (i0 + di) * si +
+                                                  (j0 + dj) * sj);
+            }
+        }
+        return value;
+    }
+
+    template <class T>
+    void run_profiles(npy_intp k1, npy_intp k2)
+    {
+        for (npy_intp k = k1; k < k2; ++k)
+        {
+            double x0 = geometry(k, 0), y0 = geometry(k, 1);
+            double dx = geometry(k, 2) - x0, dy = geometry(k, 3) - y0;
+            double length = sqrt(dx * dx + dy * dy);
+            // Unit vector normal to the segment (null for an empty segment)
+            double nx = length > 0. ? -dy / length : 0.;
+            double ny = length > 0. ? dx / length : 0.;
+            double width = geometry(k, 4);
+            int nw = width >= 1.5 ? (int)(width + .5) : 1;
+            npy_int64 b1 = bound(k), b2 = bound(k + 1);
+            npy_int64 npoints = b2 - b1;
+            for (npy_int64 s = 0; s < npoints; ++s)
+            {
+                double t = npoints > 1 ? (double)s / (npoints - 1) : 0.;
+                double xs = x0 + t * dx, ys = y0 + t * dy;
+                double acc = mode == PROFILE_MAX ? -INFINITY : 0.;
+                int count = 0;
+                for (int m = 0; m < nw; ++m)
+                {
+                    double offset = m - .5 * (nw - 1);
+                    double value = sample<T>(xs + offset * nx, ys + offset * ny);
+                    if (value != value)
+                        continue; // NaN
+                    if (mode == PROFILE_MAX)
+                        acc = max(acc, value);
+                    else
+                        acc += value;
+                    ++count;
+                }
+                if (count == 0)
+                    acc = NAN;
+                else if (mode == PROFILE_MEAN)
+                    acc /= count;
+                *(double *)PyArray_GETPTR1(p_res, b1 + s) = acc;
+            }
+        }
+    }
+
+    template <class T>
+    void run()
+    {
+        npy_intp nprofiles = PyArray_DIM(p_bounds, 0) - 1;
+        int nbands = 1;
+        npy_int64 nsamples = bound(nprofiles) - bound(0);
+        if (nsamples * (npy_int64)max(mean_width(), 1.) >= MIN_PROFILE_SAMPLES)
+        {
+            nbands = get_band_count(nthreads, (int)nprofiles);
+        }
+        vector<std::thread> workers;
+        npy_intp band_size = (nprofiles + nbands - 1) / nbands;
+        for (int k = 1; k < nbands; ++k)
+        {
+            npy_intp k1 = min(k * band_size, nprofiles);
+            npy_intp k2 = min(k1 + band_size, nprofiles);
+            workers.push_back(std::thread(&ProfileExtraction::run_profiles<T>,
+                                          this, k1, k2));
+        }
+        // The calling thread handles the first band
+        run_profiles<T>(0, min(band_size, nprofiles));
+        for (size_t k = 0; k < workers.size(); ++k)
+        {
+            workers[k].join();
+        }
+    }
+
+    double mean_width() const
+    {
+        npy_intp nprofiles = PyArray_DIM(p_geometry, 0);
+        double total = 0.;
+        for (npy_intp k = 0; k < nprofiles; ++k)
+        {
+            total += geometry(k, 4);
+        }
+        return nprofiles > 0 ? total / nprofiles : 0.;
+    }
+
+    double geometry(npy_intp k, int col) const
+    {
+        return *(double *)PyArray_GETPTR2(p_geometry, k, col);
+    }
+    npy_int64 bound(npy_intp k) const
+    {
+        return *(npy_int64 *)PyArray_GETPTR1(p_bounds, k);
+    }
+
+    PyArrayObject *p_data, *p_geometry, *p_bounds, *p_res;
+    int mode, nthreads;
+    npy_intp ni, nj, si, sj;
+};
+
+static PyObject *py_extract_profiles(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_data = 0, *p_geometry = 0, *p_bounds = 0, *p_res = 0;
+    int mode, nthreads = 1;
+
+    if (!PyArg_ParseTuple(args, "OOOiO|i:_extract_profiles", &p_data,
+                          &p_geometry, &p_bounds, &mode, &p_res, &nthreads))
+    {
+        return NULL;
+    }
+    if (!check_array_2d("data", p_data, -1) ||
+        !check_dispatch_type("data", p_data) ||
+        !check_array_2d("geometry", p_geometry, NPY_FLOAT64) ||
+        !check_index_array("bounds", p_bounds))
+    {
+        return NULL;
+    }
+    if (PyArray_DIM(p_data, 0) == 0 || PyArray_DIM(p_data, 1) == 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "data must not be empty");
+        return NULL;
+    }
+    if (PyArray_DIM(p_geometry, 1) != 5 ||
+        PyArray_DIM(p_bounds, 0) != PyArray_DIM(p_geometry, 0) + 1)
+    {
+        PyErr_SetString(PyExc_TypeError,
+                        "geometry must have 5 columns and len(bounds)-1 rows");
+        return NULL;
+    }
+    if (!PyArray_Check(p_res) || PyArray_NDIM(p_res) != 1 ||
+        PyArray_TYPE(p_res) != NPY_FLOAT64)
+    {
+        PyErr_SetString(PyExc_TypeError, "dest must be a 1-D float64 array");
+        return NULL;
+    }
+    if (mode != PROFILE_MEAN && mode != PROFILE_SUM && mode != PROFILE_MAX)
+    {
+        PyErr_SetString(PyExc_ValueError, "invalid reduction mode");
+        return NULL;
+    }
+    if (!check_bucket_bounds(p_bounds, PyArray_DIM(p_res, 0)))
+    {
+        return NULL;
+    }
+    ProfileExtraction extraction(p_data, p_geometry, p_bounds, mode, p_res,
+                                 nthreads);
+    Py_BEGIN_ALLOW_THREADS;
+    dispatch_array(PyArray_TYPE(p_data), extraction);
+    Py_END_ALLOW_THREADS;
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+static PyObject *py_pack_rgb(PyObject *self, PyObject *args)
+{
+    PyArrayObject *p_src = 0, *p_dst = 0;
+    int alpha, bgr = 0, nthreads = 1;
+
+    if (!PyArg_ParseTuple(args, "OOi|ii:_pack_rgb", &p_src, &p_dst, &alpha,
+                          &bgr, &nthreads))
+    {
+        return NULL;
+    }
+    if (!check_rgb_source(p_src, alpha) ||
+        !check_array_2d("dst", p_dst, NPY_UINT32))
+    {
+        return NULL;
+    }
+    if (PyArray_DIM(p_dst, 0) != PyArray_DIM(p_src, 0) ||
+        PyArray_DIM(p_dst, 1) != PyArray_DIM(p_src, 1))
+    {
+        PyErr_SetString(PyExc_ValueError, "src and dst must have the same shape");
+        return NULL;
+    }
+    Array2D<npy_uint32> dst(p_dst);
+    RGBPacking packing(p_src, alpha, bgr != 0);
+    Py_BEGIN_ALLOW_THREADS;
+    packing.run(dst, 0, 0, nthreads);
+    Py_END_ALLOW_THREADS;
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
 PyObject *py_vert_line(PyObject *self, PyObject *args);
 PyObject *py_scale_quads(PyObject *self, PyObject *args);
 
@@ -879,6 +2406,20 @@ static PyMethodDef _meths[] = {
      "Linear rescale of a structured grid to destination parallel to axes"},
     {"_histogram", py_histogram, METH_VARARGS,
      "Compute histogram of 1d data"},
+    {"_histogram_uniform", py_histogram_uniform, METH_VARARGS,
+     "Compute histogram of 1d or 2d data with uniform bins, ignoring NaNs"},
+    {"_nan_stats", py_nan_stats, METH_VARARGS,
+     "Compute (min, max, count, sum, sumsq) of 1d or 2d data, ignoring NaNs"},
+    {"_decimate_m4", py_decimate_m4, METH_VARARGS,
+     "Select first, min, max and last points of curve data buckets"},
+    {"_decimate_lttb", py_decimate_lttb, METH_VARARGS,
+     "Select curve data points with the Largest-Triangle-Three-Buckets method"},
+    {"_collapse_segments", py_collapse_segments, METH_VARARGS,
+     "Cull and merge overlapping axis-aligned segments of each pixel column"},
+    {"_extract_profiles", py_extract_profiles, METH_VARARGS,
+     "Extract image profiles along segments, with bilinear interpolation"},
+    {"_pack_rgb", py_pack_rgb, METH_VARARGS,
+     "Pack RGB(A) pixels of a 3-D uint8 array in ARGB32 pixels"},
     {"_line_test", py_vert_line, METH_VARARGS,
      "Rasterize lines"},
     {NULL, NULL, 0, NULL} /* Sentinel */
@@ -915,6 +2456,12 @@ init_scaler()
     PyModule_AddIntConstant(m, "INTERP_NEAREST", INTERP_NEAREST);
     PyModule_AddIntConstant(m, "INTERP_LINEAR", INTERP_LINEAR);
     PyModule_AddIntConstant(m, "INTERP_AA", INTERP_AA);
+    PyModule_AddIntConstant(m, "TRANSFER_LINEAR", TRANSFER_LINEAR);
+    PyModule_AddIntConstant(m, "TRANSFER_LOG", TRANSFER_LOG);
+    PyModule_AddIntConstant(m, "TRANSFER_SYMLOG", TRANSFER_SYMLOG);
+    PyModule_AddIntConstant(m, "TRANSFER_GAMMA", TRANSFER_GAMMA);
+    PyModule_AddIntConstant(m, "TRANSFER_ASINH", TRANSFER_ASINH);
+    PyModule_AddIntConstant(m, "TRANSFER_TABLE", TRANSFER_TABLE);
 
 #if PY_MAJOR_VERSION >= 3
     return m;
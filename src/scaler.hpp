@@ -7,6 +7,8 @@
 #ifndef _SCALER_HPP
 #define _SCALER_HPP
 
+#include <limits>
+#include <vector>
 #include "points.hpp"
 #include "arrays.hpp"
 
@@ -89,6 +91,154 @@ protected:
     bool has_bg;
 };
 
+/* Nonlinear transfer functions, applied to pixel values before the linear
+   transformation to LUT indexes (parameters p0, p1, p2) */
+enum
+{
+    TRANSFER_LINEAR = 0, // x
+    TRANSFER_LOG = 1,    // log10(max(x, p0))
+    TRANSFER_SYMLOG = 2, // sign(x) * log10(1 + |x| / p0)
+    TRANSFER_GAMMA = 3,  // p1 + (p2 - p1) * clip((x - p1) / (p2 - p1), 0, 1) ** p0
+    TRANSFER_ASINH = 4,  // asinh(x / p0)
+    TRANSFER_TABLE = 5   // table linearly interpolated from x = p0 to x = p1
+};
+
+class Transfer
+{
+public:
+    Transfer() : kind(TRANSFER_LINEAR), p0(0.0), p1(0.0), p2(1.0), scale(1.0) {}
+
+    double eval(double x) const
+    {
+        switch (kind)
+        {
+        case TRANSFER_LOG:
+            return log10(x > p0 ? x : p0);
+        case TRANSFER_SYMLOG:
+            return x < 0 ? -log10(1.0 - x / p0) : log10(1.0 + x / p0);
+        case TRANSFER_GAMMA:
+        {
+            double u = (x - p1) * scale;
+            if (!(u > 0.0))
+                return p1;
+            if (u >= 1.0)
+                return p2;
+            return p1 + (p2 - p1) * pow(u, p0);
+        }
+        case TRANSFER_ASINH:
+            return asinh(x * scale);
+        case TRANSFER_TABLE:
+        {
+            double u = (x - p0) * scale;
+            int last = (int)table.size() - 1;
+            if (!(u > 0.0))
+                return table[0];
+            if (u >= last)
+                return table[last];
+            int k = (int)u;
+            return table[k] + (u - k) * (table[k + 1] - table[k]);
+        }
+        default:
+            return x;
+        }
+    }
+
+    int kind;
+    double p0, p1, p2;
+    double scale; // Inverse of the input range (or of p0 for asinh)
+    std::vector<double> table;
+};
+
+/* LutScale with a nonlinear transfer function: for 8-bit and 16-bit integer
+   sources, colors of all possible source values are computed once */
+template <class T, class D>
+class TransferLutScale
+{
+public:
+    typedef T source_type;
+    typedef D dest_type;
+    TransferLutScale(double _a, double _b, Array1D<D> &_lut, D _bg, bool apply_bg,
+                     const Transfer &_transfer) : a(_a), b(_b), lut(_lut),
+                                                  transfer(_transfer),
+                                                  bg(_bg), has_bg(apply_bg),
+                                                  offset(0)
+    {
+        if (std::numeric_limits<T>::is_integer && sizeof(T) <= 2)
+        {
+            offset = -(long)std::numeric_limits<T>::min();
+            colors.resize(1L << (8 * sizeof(T)));
+            for (long k = 0; k < (long)colors.size(); ++k)
+            {
+                colors[k] = color(transfer.eval((double)(k - offset)));
+            }
+        }
+    }
+
+    D color(double t) const
+    {
+        double val = a * t + b;
+        if (!(val >= 0.0))
+        {
+            return lut.value(0);
+        }
+        else if (val >= lut.ni)
+        {
+            return lut.value(lut.ni - 1);
+        }
+        return lut.value((int)val);
+    }
+    D eval(T x) const
+    {
+        if (!colors.empty())
+        {
+            return colors[(long)x + offset];
+        }
+        return color(transfer.eval(x));
+    }
+    void set_bg(D &dest) const
+    {
+        if (has_bg)
+            dest = bg;
+    }
+
+protected:
+    double a, b;
+    Array1D<D> &lut;
+    const Transfer &transfer;
+    D bg;
+    bool has_bg;
+    long offset;
+    std::vector<D> colors;
+};
+
+/* LinearScale with a nonlinear transfer function */
+template <class T, class D>
+class TransferScale
+{
+public:
+    typedef T source_type;
+    typedef D dest_type;
+    TransferScale(double _a, double _b, D _bg, bool apply_bg,
+                  const Transfer &_transfer) : a(_a), b(_b), transfer(_transfer),
+                                               bg(_bg), has_bg(apply_bg) {}
+
+    D eval(T x) const
+    {
+        return a * transfer.eval(x) + b;
+    }
+    void set_bg(D &dest) const
+    {
+        if (has_bg)
+            dest = bg;
+    }
+
+protected:
+    double a, b;
+    const Transfer &transfer;
+    D bg;
+    bool has_bg;
+};
+
 template <class T, class D>
 class NoScale
 {